@@ -4,64 +4,99 @@ Creador de Carteras Bitcoin HD
 ============================
 
 Aplicación para generar y gestionar carteras Bitcoin HD (BIP-32/39/44)
+
+Solo se importa al arrancar lo necesario para mostrar la ventana. Los módulos
+pesados se cargan la primera vez que se usan:
+
+- mnemonic, bip32utils y ecdsa, al generar o importar la primera semilla;
+- los backends de historial (asyncio, sqlite3, sockets), al consultar saldos;
+- el derivador paralelo (multiprocessing), en generaciones grandes;
+- los diálogos, al abrirlos.
+
+Con ``--perfil-arranque`` se escribe en stderr el tiempo de cada importación
+(como ``python -X importtime``) y de cada hito hasta la primera ventana.
 """
 
 import os
 import sys
-import json
-import tkinter as tk
-from tkinter import ttk, messagebox, filedialog, scrolledtext
-from typing import Dict, List, Optional, Tuple, Any, Union, Callable
-from datetime import datetime
-import webbrowser
-import qrcode
-from PIL import Image, ImageTk, ImageDraw, ImageFont
-import io
-import base64
-import hashlib
-import hmac
-import ecdsa
-import bech32
-import unicodedata
-import secrets
-import string
+import time
+
+# Instante de arranque, antes de cualquier importación pesada
+INICIO_ARRANQUE = time.perf_counter()
 
 # Añadir el directorio raíz al path de Python
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-# Importar dependencias de criptomonedas
+from creador.startup import EXIT_FLAG, StartupProfile, profile_requested
+
+PERFIL_ARRANQUE = StartupProfile(INICIO_ARRANQUE) if profile_requested() else None
+if PERFIL_ARRANQUE is not None:
+    PERFIL_ARRANQUE.install()
+
+import json
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog, scrolledtext, simpledialog
+from datetime import datetime
+
+# Importar el núcleo de derivación (sus dependencias criptográficas se cargan al usarlo)
 try:
-    from mnemonic import Mnemonic
-    from bip32utils import BIP32Key
-    from bitcoinutils.setup import setup
-    from bitcoinutils.keys import P2pkhAddress, P2shAddress, P2wpkhAddress, PrivateKey, PublicKey
-    from bitcoinutils.script import Script
+    from creador.seed import SeedContext
+    from creador.derivation import (
+        DerivationEngine, CHAIN_RECEIVE, TYPE_BY_PURPOSE, record_addresses, reencode_record
+    )
+    from creador.jobs import DerivationJob
+    from creador.xpub import WatchOnlyContext, export_account_xpub
+    from creador.index import AddressIndex
+    from creador.walletfile import WalletFile, is_wallet_stream, write_wallet
+    from creador.descriptor import WalletDescriptor
+    from creador.columnar import AddressStore
+    from creador.encoding import (
+        ADDR_TYPE_MULTI, ADDR_TYPE_P2PKH, ADDR_TYPE_P2SH_P2WPKH, ADDR_TYPE_P2WPKH, ADDR_TYPES,
+        encode_address
+    )
 except ImportError as e:
     print(f"Error al importar dependencias de criptomonedas: {e}")
     print("Por favor, instale las dependencias necesarias con: pip install -r requirements.txt")
     sys.exit(1)
 
-# Importar diálogos
-try:
-    from dialogs.preferences_ui import PreferencesDialog
-    from dialogs.network_settings_dialog import NetworkSettingsDialog
-except ImportError as e:
-    print(f"Error al importar diálogos: {e}")
-    sys.exit(1)
-
 # Importar utilidades
 try:
-    from utils.ui_utils import ToolTip, ValidatedEntry, ScrolledFrame, QRCodeDialog
-    from utils.ui_constants import THEMES, LANGUAGES, BUTTON_STYLES
+    from utils.ui_utils import VirtualTreeview
 except ImportError as e:
     print(f"Error al importar utilidades: {e}")
     sys.exit(1)
 
+if PERFIL_ARRANQUE is not None:
+    PERFIL_ARRANQUE.mark("módulos importados")
+
+
+# Número máximo de direcciones por generación (la tabla es virtualizada)
+MAX_DIRECCIONES = 1_000_000
+
+# A partir de este número de direcciones se reparte la derivación entre procesos
+UMBRAL_PARALELO = 20_000
+
+# Intervalo en milisegundos entre drenados de la cola del trabajador
+INTERVALO_DRENADO_MS = 30
+
+# Satoshis por bitcoin
+SATOSHIS_POR_BTC = 100_000_000
+
+# Sufijo del archivo de índice inverso que acompaña a cada cartera guardada
+SUFIJO_INDICE = ".idx"
 
-# Constantes para tipos de direcciones
-ADDR_TYPE_P2PKH = 'p2pkh'        # Legacy (1...)
-ADDR_TYPE_P2SH_P2WPKH = 'p2sh'  # Nested SegWit (3...)
-ADDR_TYPE_P2WPKH = 'p2wpkh'      # Native SegWit (bc1...)
+# Extensión de las carteras en flujo (las .json del formato anterior se siguen abriendo)
+EXTENSION_CARTERA = ".cartera"
+TIPOS_ARCHIVO_CARTERA = [("Archivos de Cartera", "*.cartera *.json"), ("Todos los archivos", "*.*")]
+
+# Rutas de derivación seleccionables: etiqueta -> (propósito, propósito estándar por tipo)
+RUTA_BIP44 = "BIP-44 (m/44'/...) para todos los tipos"
+RUTAS_DERIVACION = {
+    RUTA_BIP44: (44, False),
+    "BIP-49 (m/49'/...)": (49, False),
+    "BIP-84 (m/84'/...)": (84, False),
+    "Estándar por tipo (44'/49'/84')": (None, True),
+}
 
 
 class CreadorCarterasApp(tk.Tk):
@@ -88,14 +123,29 @@ class CreadorCarterasApp(tk.Tk):
         
         # Inicializar variables
         self.semilla = None
+        self.contexto_semilla = None  # Semilla estirada y clave raíz de la sesión
         self.direcciones = []
-        self.tipo_direccion = ADDR_TYPE_P2WPKH  # Por defecto, usar SegWit nativo
+        self.archivo_cartera = None  # Cartera en flujo abierta (WalletFile)
+        self.indice_direcciones = AddressIndex()  # Índice inverso dirección -> origen
+        self.saldos = {}  # Estado (ScriptStatus) por índice de la cadena de recepción
+        self.descriptor_cartera = None  # Origen de derivación de las direcciones (None si no se pueden rederivar)
+        self.ultimas_usadas = {}  # Último índice con historial por cadena
+        self.trabajo_saldos = None  # Descubrimiento de saldos en segundo plano
+        self.trabajo_indice = None  # Reconstrucción del índice inverso en segundo plano
+        self.configuracion_red = {'mode': 'auto', 'use_custom_servers': False, 'servers': []}
+        self.cache_saldos = None  # Caché persistente de saldos (se abre bajo demanda)
+        self.saldos_sin_cache = set()  # Índices ya buscados en la caché sin resultado
+        self.tipo_direccion = ADDR_TYPE_P2WPKH  # Tipo en que se muestran las direcciones
+        self.trabajo = None  # Trabajo de derivación en segundo plano
         
         # Configurar la interfaz
         self._configurar_interfaz()
         
         # Configurar el menú
         self._configurar_menu()
+        
+        # Al cambiar el tipo se recodifican las filas ya generadas (sin derivar)
+        self.addr_type.trace_add('write', self._cambiar_tipo_direccion)
     
     def _configurar_interfaz(self):
         """Configura los elementos de la interfaz de usuario."""
@@ -129,26 +179,51 @@ class CreadorCarterasApp(tk.Tk):
                        variable=self.addr_type, value=ADDR_TYPE_P2SH_P2WPKH).pack(anchor=tk.W)
         ttk.Radiobutton(addr_frame, text="Legacy (1...)", 
                        variable=self.addr_type, value=ADDR_TYPE_P2PKH).pack(anchor=tk.W)
+        ttk.Radiobutton(addr_frame, text="Todos los formatos (una sola derivación)", 
+                       variable=self.addr_type, value=ADDR_TYPE_MULTI).pack(anchor=tk.W)
+        
+        # Ruta de derivación: BIP-44 para todos los tipos (compatible con las
+        # carteras ya generadas) o el propósito estándar de cada tipo
+        ruta_frame = ttk.Frame(addr_frame)
+        ruta_frame.pack(anchor=tk.W, pady=(5, 0))
+        ttk.Label(ruta_frame, text="Ruta de derivación:").pack(side=tk.LEFT)
+        self.ruta_derivacion = tk.StringVar(value=RUTA_BIP44)
+        ttk.Combobox(ruta_frame, textvariable=self.ruta_derivacion, values=list(RUTAS_DERIVACION),
+                     state='readonly', width=32).pack(side=tk.LEFT, padx=5)
         
         # Sección de generación de direcciones
         gen_frame = ttk.LabelFrame(main_frame, text="Generar Direcciones", padding="5")
         gen_frame.pack(fill=tk.X, pady=5)
         
         ttk.Label(gen_frame, text="Número de direcciones a generar:").pack(side=tk.LEFT, padx=5)
-        self.num_direcciones = ttk.Spinbox(gen_frame, from_=1, to=100, width=5)
+        self.num_direcciones = ttk.Spinbox(gen_frame, from_=1, to=MAX_DIRECCIONES, width=9)
         self.num_direcciones.pack(side=tk.LEFT, padx=5)
         self.num_direcciones.set("10")
         
-        ttk.Button(gen_frame, text="Generar Direcciones", 
-                  command=self._generar_direcciones).pack(side=tk.LEFT, padx=5)
+        self.btn_generar = ttk.Button(gen_frame, text="Generar Direcciones", 
+                                      command=self._generar_direcciones)
+        self.btn_generar.pack(side=tk.LEFT, padx=5)
+        
+        self.btn_cancelar = ttk.Button(gen_frame, text="Cancelar", state=tk.DISABLED,
+                                       command=self._cancelar_generacion)
+        self.btn_cancelar.pack(side=tk.LEFT, padx=5)
+        
+        # Progreso del trabajo en segundo plano
+        self.progreso = ttk.Progressbar(gen_frame, mode='determinate', length=150)
+        self.progreso.pack(side=tk.LEFT, padx=5)
+        
+        self.velocidad_var = tk.StringVar(value="")
+        ttk.Label(gen_frame, textvariable=self.velocidad_var, width=18).pack(side=tk.LEFT, padx=5)
         
         # Área de visualización de direcciones
         self.direcciones_frame = ttk.LabelFrame(main_frame, text="Direcciones Generadas", padding="5")
         self.direcciones_frame.pack(fill=tk.BOTH, expand=True, pady=5)
         
-        # Crear Treeview para mostrar direcciones
-        columns = ("#", "Dirección", "Clave Privada (WIF)", "Saldo")
-        self.tree = ttk.Treeview(self.direcciones_frame, columns=columns, show="headings", selectmode="browse")
+        # Crear tabla virtualizada para mostrar direcciones: solo se materializan
+        # las filas visibles, que se piden a self.direcciones al desplazarse
+        columns = ("#", "Dirección", "Nested SegWit", "SegWit Nativo", "Clave Privada (WIF)", "Saldo")
+        self.tree = VirtualTreeview(self.direcciones_frame, columns=columns,
+                                    row_fetcher=self._fila_direccion)
         
         # Configurar columnas
         for col in columns:
@@ -158,16 +233,15 @@ class CreadorCarterasApp(tk.Tk):
         # Ajustar ancho de columnas
         self.tree.column("#", width=50)
         self.tree.column("Dirección", width=300)
+        self.tree.column("Nested SegWit", width=300)
+        self.tree.column("SegWit Nativo", width=300)
         self.tree.column("Clave Privada (WIF)", width=300)
         self.tree.column("Saldo", width=100)
         
-        # Añadir scrollbar
-        scrollbar = ttk.Scrollbar(self.direcciones_frame, orient=tk.VERTICAL, command=self.tree.yview)
-        self.tree.configure(yscrollcommand=scrollbar.set)
+        self._configurar_columnas(False)
         
-        # Empaquetar Treeview y scrollbar
-        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        # Empaquetar la tabla (incluye su propia barra de desplazamiento)
+        self.tree.pack(fill=tk.BOTH, expand=True)
         
         # Menú contextual para copiar direcciones
         self._setup_context_menu()
@@ -182,11 +256,17 @@ class CreadorCarterasApp(tk.Tk):
         file_menu.add_command(label="Abrir Cartera...", command=self._abrir_cartera)
         file_menu.add_command(label="Guardar Cartera Como...", command=self._guardar_cartera_como)
         file_menu.add_separator()
+        file_menu.add_command(label="Importar xpub (solo lectura)...", command=self._importar_xpub)
+        file_menu.add_command(label="Exportar xpub de la cuenta...", command=self._exportar_xpub)
+        file_menu.add_separator()
         file_menu.add_command(label="Salir", command=self.quit)
         menubar.add_cascade(label="Archivo", menu=file_menu)
         
         # Menú Herramientas
         tools_menu = tk.Menu(menubar, tearoff=0)
+        tools_menu.add_command(label="Buscar Dirección...", command=self._buscar_direccion)
+        tools_menu.add_command(label="Descubrir Direcciones y Saldos", command=self._descubrir_saldos)
+        tools_menu.add_separator()
         tools_menu.add_command(label="Preferencias", command=self._mostrar_preferencias)
         tools_menu.add_command(label="Configuración de Red", command=self._configurar_red)
         menubar.add_cascade(label="Herramientas", menu=tools_menu)
@@ -208,23 +288,31 @@ class CreadorCarterasApp(tk.Tk):
         self.context_menu.add_command(label="Ver en Explorador", command=self._ver_en_explorador)
         
         # Vincular evento de clic derecho
-        self.tree.bind("<Button-3>", self._mostrar_menu_contextual)
+        self.tree.tree.bind("<Button-3>", self._mostrar_menu_contextual)
     
     def _mostrar_menu_contextual(self, event):
         """Muestra el menú contextual en la posición del ratón."""
-        item = self.tree.identify_row(event.y)
-        if item:
-            self.tree.selection_set(item)
+        indice = self.tree.identify_index(event.y)
+        if indice is not None:
+            self.tree.select_index(indice)
             self.context_menu.post(event.x_root, event.y_root)
     
     def _generar_semilla(self):
         """Genera una nueva semilla mnemotécnica."""
         try:
+            from mnemonic import Mnemonic
+
             mnemo = Mnemonic("spanish")
+            self._cancelar_trabajo()
             self.semilla = mnemo.generate(strength=256)  # 24 palabras
+            self._cargar_contexto_semilla()
             self.seed_text.delete(1.0, tk.END)
             self.seed_text.insert(tk.END, self.semilla)
             self.direcciones = []  # Limpiar direcciones anteriores
+            self.indice_direcciones = AddressIndex()
+            self.saldos = {}
+            self.descriptor_cartera = None
+            self.ultimas_usadas = {}
             self._limpiar_tabla()
         except Exception as e:
             messagebox.showerror("Error", f"Error al generar semilla: {str(e)}")
@@ -237,18 +325,101 @@ class CreadorCarterasApp(tk.Tk):
             return
         
         try:
+            from mnemonic import Mnemonic
+
             # Validar la semilla
             mnemo = Mnemonic("spanish")
             if not mnemo.check(semilla):
                 raise ValueError("Semilla mnemotécnica inválida")
                 
+            self._cancelar_trabajo()
             self.semilla = semilla
+            self._cargar_contexto_semilla()
             self.direcciones = []  # Limpiar direcciones anteriores
+            self.indice_direcciones = AddressIndex()
+            self.saldos = {}
+            self.descriptor_cartera = None
+            self.ultimas_usadas = {}
             self._limpiar_tabla()
             messagebox.showinfo("Éxito", "Semilla importada correctamente.")
         except Exception as e:
             messagebox.showerror("Error", f"Error al importar semilla: {str(e)}")
     
+    def _cargar_contexto_semilla(self):
+        """Ejecuta el estiramiento de la semilla actual una sola vez para toda la sesión."""
+        self._descartar_contexto_semilla()
+        if self.semilla:
+            self.contexto_semilla = SeedContext(self.semilla)
+    
+    def _descartar_contexto_semilla(self):
+        """Descarta la semilla estirada y la clave raíz de la sesión."""
+        if self.contexto_semilla is not None:
+            self.contexto_semilla.clear()
+            self.contexto_semilla = None
+    
+    def _importar_xpub(self):
+        """Importa la xpub/ypub/zpub de una cuenta y pasa a modo de solo lectura."""
+        xkey = simpledialog.askstring(
+            "Importar xpub",
+            "Clave extendida pública de la cuenta (xpub/ypub/zpub):",
+            parent=self
+        )
+        if not xkey:
+            return
+        
+        try:
+            contexto = WatchOnlyContext(xkey)
+        except Exception as e:
+            messagebox.showerror("Error", f"Error al importar la xpub: {str(e)}")
+            return
+        
+        self._activar_solo_lectura(contexto)
+        self.direcciones = []
+        self.indice_direcciones = AddressIndex()
+        self.saldos = {}
+        self.descriptor_cartera = None
+        self.ultimas_usadas = {}
+        self._limpiar_tabla()
+        messagebox.showinfo("Éxito", "xpub importada. La cartera está en modo de solo lectura.")
+    
+    def _activar_solo_lectura(self, contexto):
+        """Sustituye la semilla por un contexto de solo lectura (sin claves privadas)."""
+        self._cancelar_trabajo()
+        self._descartar_contexto_semilla()
+        self.semilla = None
+        self.contexto_semilla = contexto
+        self.addr_type.set(contexto.addr_type)
+        self.seed_text.delete(1.0, tk.END)
+        self.seed_text.insert(tk.END, contexto.xpub)
+    
+    def _exportar_xpub(self):
+        """Muestra y copia la xpub de la cuenta actual para el tipo de dirección seleccionado."""
+        if self.contexto_semilla is None:
+            messagebox.showwarning("Advertencia", "Por favor, genere o importe una semilla primero.")
+            return
+        
+        aviso = ""
+        try:
+            if self.contexto_semilla.watch_only:
+                xkey = self.contexto_semilla.xpub
+            else:
+                motor = self._motor_derivacion()
+                # El prefijo (xpub/ypub/zpub) lo fija el propósito de la ruta (SLIP-132)
+                xkey = export_account_xpub(self.contexto_semilla, None, motor.purpose, motor.account)
+                tipo = TYPE_BY_PURPOSE[motor.purpose]
+                if motor.addr_type not in (tipo, ADDR_TYPE_MULTI):
+                    aviso = (f"\n\nAtención: la ruta m/{motor.purpose}' corresponde a direcciones {tipo}; "
+                             f"otras carteras no derivarán las direcciones {motor.addr_type} mostradas. "
+                             "Use la ruta estándar por tipo para exportar la clave de este tipo.")
+        except Exception as e:
+            messagebox.showerror("Error", f"Error al exportar la xpub: {str(e)}")
+            return
+        
+        self.clipboard_clear()
+        self.clipboard_append(xkey)
+        mostrar = messagebox.showwarning if aviso else messagebox.showinfo
+        mostrar("xpub de la cuenta", f"{xkey}\n\nLa clave ha sido copiada al portapapeles.{aviso}")
+    
     def _copiar_semilla(self):
         """Copia la semilla al portapapeles."""
         if not self.semilla:
@@ -260,33 +431,297 @@ class CreadorCarterasApp(tk.Tk):
         messagebox.showinfo("Copiado", "La semilla ha sido copiada al portapapeles.")
     
     def _generar_direcciones(self):
-        """Genera direcciones a partir de la semilla."""
-        if not self.semilla:
+        """Genera direcciones a partir de la semilla en un hilo trabajador."""
+        if not self.semilla and self.contexto_semilla is None:
             messagebox.showwarning("Advertencia", "Por favor, genere o importe una semilla primero.")
             return
         
+        try:
+            motor = self._motor_derivacion()
+        except Exception as e:
+            messagebox.showerror("Error", f"Error al preparar la derivación: {str(e)}")
+            return
+        
         try:
             num_direcciones = int(self.num_direcciones.get())
-            if num_direcciones < 1 or num_direcciones > 100:
-                raise ValueError("El número de direcciones debe estar entre 1 y 100")
+            if num_direcciones < 1 or num_direcciones > MAX_DIRECCIONES:
+                raise ValueError(f"El número de direcciones debe estar entre 1 y {MAX_DIRECCIONES}")
                 
-            # Limpiar direcciones anteriores
-            self.direcciones = []
-            self._limpiar_tabla()
+            # Limpiar direcciones anteriores; las nuevas se guardan por columnas
+            # (claves en binario, direcciones y WIF codificados al mostrarlos)
+            self._cancelar_trabajo()
+            self.direcciones = AddressStore(motor.context.network, engine=motor)
+            # El índice se vuelca a un archivo temporal por tramos para que su
+            # memoria no crezca con el número de direcciones
+            self.indice_direcciones = AddressIndex.temporary()
+            self.saldos = {}
+            self.descriptor_cartera = WalletDescriptor.from_engine(motor)
+            self.ultimas_usadas = {}
+            self.tipo_direccion = motor.addr_type
             
-            # Generar direcciones
-            for i in range(num_direcciones):
-                direccion = self._generar_direccion(i)
-                self.direcciones.append(direccion)
-                self._agregar_direccion_a_tabla(i, direccion)
-                
-            messagebox.showinfo("Éxito", f"Se han generado {num_direcciones} direcciones.")
+            # La derivación se ejecuta fuera del hilo de la interfaz; los
+            # resultados llegan por lotes a través de la cola del trabajo
+            self._mostrar_direcciones()
+            
+            # Solo se indexa el tipo generado (los tres en multiformato)
+            indice = self.indice_direcciones
+            
+            def fuente():
+                if num_direcciones >= UMBRAL_PARALELO and (os.cpu_count() or 1) > 1:
+                    from creador.parallel import ParallelDeriver
+
+                    xkey = motor.chain_extended_key(CHAIN_RECEIVE)
+                    with ParallelDeriver() as deriver:
+                        registros = deriver.derive_range(xkey, motor.addr_type, 0, num_direcciones)
+                        yield from indice.feed(registros, motor.account, CHAIN_RECEIVE)
+                else:
+                    registros = motor.derive_range(CHAIN_RECEIVE, 0, num_direcciones)
+                    yield from indice.feed(registros, motor.account, CHAIN_RECEIVE)
+            
+            self.trabajo = DerivationJob(fuente, num_direcciones)
+            self.progreso.configure(maximum=num_direcciones, value=0)
+            self.velocidad_var.set("")
+            self.btn_generar.state(['disabled'])
+            self.btn_cancelar.state(['!disabled'])
+            self.trabajo.start()
+            self.after(INTERVALO_DRENADO_MS, self._drenar_trabajo, self.trabajo)
             
         except ValueError as ve:
             messagebox.showerror("Error", f"Número de direcciones inválido: {str(ve)}")
         except Exception as e:
             messagebox.showerror("Error", f"Error al generar direcciones: {str(e)}")
     
+    def _drenar_trabajo(self, trabajo):
+        """Vuelca en la tabla los lotes disponibles sin bloquear el bucle de eventos."""
+        if trabajo is not self.trabajo:
+            return  # Trabajo cancelado o sustituido por otro
+        
+        lote = trabajo.drain()
+        if lote:
+            self.direcciones.extend(lote)
+            self.tree.set_row_count(len(self.direcciones))
+            self.progreso.configure(value=trabajo.consumed)
+            self.velocidad_var.set(f"{trabajo.rate:,.0f} direcciones/s")
+        
+        if not trabajo.done:
+            self.after(INTERVALO_DRENADO_MS, self._drenar_trabajo, trabajo)
+            return
+        
+        self._finalizar_trabajo()
+        if trabajo.error is not None:
+            messagebox.showerror("Error", f"Error al generar direcciones: {str(trabajo.error)}")
+        elif trabajo.cancelled:
+            messagebox.showinfo("Cancelado", f"Generación cancelada. {len(self.direcciones)} direcciones generadas.")
+        else:
+            messagebox.showinfo("Éxito", f"Se han generado {len(self.direcciones)} direcciones.")
+    
+    def _backend_historial(self, motor=None):
+        """Backend de historial según la configuración de red.
+        
+        En modo nodo completo, si el directorio de bloques del nodo es accesible,
+        los saldos salen del índice local de UTXO. En modo ligero se cruzan los
+        filtros compactos (BIP-158) de un nodo. En el resto de casos se consultan
+        los servidores Electrum.
+        
+        Args:
+            motor: Motor cuyas cadenas se van a recorrer; el índice local de UTXO
+                lo usa para buscar las dos cadenas hasta el límite de huecos. Sin
+                motor solo se buscan las direcciones del índice de la cartera.
+        """
+        red = self.contexto_semilla.network
+        if self.configuracion_red.get('mode') == 'spv':
+            from creador.headers import HeaderStore, default_headers_path
+            from creador.p2p import PeerConnection, peers_from_settings
+            from creador.spv import SpvEngine, SpvHistoryBackend
+            from creador.spv import default_state_path as estado_spv
+
+            nodo = peers_from_settings(self.configuracion_red, red)[0]
+            # Las cabeceras validadas y los bloques ya comprobados se guardan: la
+            # siguiente sincronización parte de donde terminó la anterior
+            cabeceras = HeaderStore(default_headers_path(red), red, workers=os.cpu_count() or 1)
+            motor = SpvEngine(PeerConnection(nodo, red), self.indice_direcciones, red,
+                              start_height=self.configuracion_red.get('birthday_height', 0), headers=cabeceras,
+                              state_path=estado_spv(red))
+            return SpvHistoryBackend(motor)
+        if self.configuracion_red.get('mode') == 'full' and not self.configuracion_red.get('use_custom_servers'):
+            from creador.utxo import UtxoHistoryBackend, UtxoIndexer, default_blocks_dir, default_state_path
+
+            directorio = self.configuracion_red.get('blocks_dir') or default_blocks_dir(red)
+            if os.path.isdir(directorio):
+                if motor is None:
+                    # Filas sin origen de derivación: solo se buscan las del índice de la cartera
+                    indexador = UtxoIndexer(directorio, self.indice_direcciones, default_state_path(red), red)
+                    return UtxoHistoryBackend(indexador)
+                indexador = UtxoIndexer(directorio, AddressIndex(), default_state_path(red), red)
+                return UtxoHistoryBackend(indexador, engine=motor)
+        from creador.cache import CachingHistoryBackend
+        from creador.electrum import ElectrumHistoryBackend, ElectrumPool, servers_from_settings
+
+        servidores = servers_from_settings(self.configuracion_red, red)
+        if not servidores:
+            return None
+        # Las conexiones se abren en el bucle de eventos del descubrimiento
+        backend = ElectrumHistoryBackend(ElectrumPool(servidores))
+        cache = self._cache_saldos()
+        return CachingHistoryBackend(backend, cache) if cache is not None else backend
+    
+    def _cache_saldos(self):
+        """Abre la caché persistente de saldos (None si no se puede usar)."""
+        if self.cache_saldos is None:
+            try:
+                from creador.cache import BalanceCache, default_cache_path
+
+                self.cache_saldos = BalanceCache(default_cache_path())
+            except Exception:
+                return None  # Sin caché: los saldos se consultan siempre al servidor
+        return self.cache_saldos
+    
+    def _saldo_direccion(self, direccion_info):
+        """Estado de la dirección: el consultado en esta sesión o el último guardado en caché."""
+        return self.saldos.get(direccion_info['indice'])
+    
+    def _cargar_saldos_en_cache(self, inicio, fin):
+        """Lee de una sola vez de la caché los saldos de las filas [inicio, fin) aún no conocidos."""
+        if self.cache_saldos is None:
+            return
+        pendientes = [registro for registro in (self.direcciones[posicion] for posicion in range(inicio, fin))
+                      if registro['indice'] not in self.saldos and registro['indice'] not in self.saldos_sin_cache]
+        if not pendientes:
+            return
+        from creador.cache import cached_statuses_many
+        from creador.discovery import record_scripthashes
+
+        estados = cached_statuses_many(self.cache_saldos, [record_scripthashes(registro) for registro in pendientes])
+        for registro, estado in zip(pendientes, estados):
+            if estado is None:
+                self.saldos_sin_cache.add(registro['indice'])
+            else:
+                self.saldos[registro['indice']] = estado
+    
+    def _descubrir_saldos(self):
+        """Recorre las cadenas de la cuenta hasta el límite de huecos y rellena los saldos."""
+        if self.contexto_semilla is None:
+            messagebox.showwarning("Advertencia", "Por favor, genere o importe una semilla primero.")
+            return
+        if self.trabajo is not None or self.trabajo_saldos is not None or self.trabajo_indice is not None:
+            messagebox.showwarning("Advertencia", "Espere a que termine el trabajo en curso.")
+            return
+        try:
+            motor = self._motor_derivacion()
+            # Filas cargadas sin origen de derivación: se consultan ellas mismas
+            # (en el tipo mostrado) en lugar de recorrer la cadena de la semilla
+            solo_filas = bool(self.direcciones) and self.descriptor_cartera is None
+            if self.direcciones and not solo_filas:
+                motor = self.descriptor_cartera.engine(self.contexto_semilla)
+        except Exception as e:
+            messagebox.showerror("Error", f"Error al preparar la derivación: {str(e)}")
+            return
+        if self.configuracion_red.get('mode') == 'spv' and len(self.indice_direcciones) == 0:
+            # Sin claves no hay nada que buscar en los filtros de bloque
+            messagebox.showwarning("Advertencia", "El modo ligero solo busca las direcciones generadas. "
+                                                  "Genere direcciones antes de descubrir saldos.")
+            return
+        backend = self._backend_historial(None if solo_filas else motor)
+        if backend is None:
+            messagebox.showwarning("Advertencia", "No hay ningún servidor configurado en Configuración de Red.")
+            return
+        
+        from creador.discovery import DiscoveryEngine
+
+        # Los registros descubiertos se añaden a la tabla: si sus direcciones
+        # tienen origen de derivación, el descubrimiento continúa esa misma cadena
+        self._descubiertos = {}  # Registros de recepción que aún no caben al final de la tabla
+        if solo_filas:
+            red = self._red()
+            registros = (reencode_record(registro, self.tipo_direccion, red) for registro in self.direcciones)
+            descubrimiento = DiscoveryEngine(motor, backend, chains=(CHAIN_RECEIVE,))
+            self._descubiertos = None
+            self.trabajo_saldos = DerivationJob(lambda: descubrimiento.iter_results(registros), 0)
+        else:
+            if not self.direcciones:
+                self.descriptor_cartera = WalletDescriptor.from_engine(motor)
+            descubrimiento = DiscoveryEngine(motor, backend)
+            self.trabajo_saldos = DerivationJob(descubrimiento.iter_results, 0)
+        self.btn_generar.state(['disabled'])
+        self.velocidad_var.set("Consultando saldos...")
+        self.trabajo_saldos.start()
+        self.after(INTERVALO_DRENADO_MS, self._drenar_saldos, self.trabajo_saldos)
+    
+    def _drenar_saldos(self, trabajo):
+        """Vuelca en la tabla los saldos recibidos hasta el momento."""
+        if trabajo is not self.trabajo_saldos:
+            return
+        
+        lote = trabajo.drain()
+        if lote:
+            for resultado in lote:
+                if resultado.status.used:
+                    self.ultimas_usadas[resultado.chain] = max(resultado.index,
+                                                               self.ultimas_usadas.get(resultado.chain, -1))
+                if resultado.chain != CHAIN_RECEIVE:
+                    continue
+                self.saldos[resultado.index] = resultado.status
+                if self._descubiertos is not None and resultado.index >= len(self.direcciones):
+                    self._descubiertos[resultado.index] = resultado.record
+            # Los resultados llegan desordenados: se añaden los contiguos al final
+            while self._descubiertos and len(self.direcciones) in self._descubiertos:
+                self.direcciones.append(self._descubiertos.pop(len(self.direcciones)))
+            self.tree.set_row_count(len(self.direcciones))
+            self.tree.refresh()
+            self.velocidad_var.set(f"{trabajo.consumed:,} consultadas")
+        
+        if not trabajo.done:
+            self.after(INTERVALO_DRENADO_MS, self._drenar_saldos, trabajo)
+            return
+        
+        self.trabajo_saldos = None
+        self.btn_generar.state(['!disabled'])
+        if trabajo.error is not None:
+            messagebox.showerror("Error", f"Error al consultar saldos: {str(trabajo.error)}")
+            return
+        total = sum(estado.balance for estado in self.saldos.values())
+        usadas = sum(1 for estado in self.saldos.values() if estado.used)
+        messagebox.showinfo("Saldos", f"{usadas} direcciones de recepción con historial.\n"
+                                      f"Saldo total: {total / SATOSHIS_POR_BTC:.8f} BTC")
+    
+    def _cancelar_generacion(self):
+        """Solicita la cancelación del trabajo en curso (conserva lo ya generado)."""
+        if self.trabajo is not None:
+            self.trabajo.cancel()
+            self.btn_cancelar.state(['disabled'])
+    
+    def _cancelar_trabajo(self):
+        """Cancela el trabajo en curso descartando sus resultados pendientes."""
+        if self.trabajo is not None:
+            self.trabajo.cancel()
+            self._finalizar_trabajo()
+        if self.trabajo_saldos is not None:
+            self.trabajo_saldos.cancel()
+            self.trabajo_saldos = None
+            self.btn_generar.state(['!disabled'])
+        if self.trabajo_indice is not None:
+            self.trabajo_indice.cancel()
+            self.trabajo_indice = None
+            self.velocidad_var.set("")
+    
+    def _finalizar_trabajo(self):
+        """Restablece los controles de generación."""
+        self.trabajo = None
+        self.btn_generar.state(['!disabled'])
+        self.btn_cancelar.state(['disabled'])
+    
+    def _motor_derivacion(self):
+        """Devuelve un motor de derivación para la semilla y el tipo de dirección actuales."""
+        # Contexto de semilla (la semilla se estira una sola vez por sesión)
+        if self.contexto_semilla is None:
+            self._cargar_contexto_semilla()
+        if self.contexto_semilla.watch_only:
+            # La ruta la fija la xpub importada
+            return DerivationEngine(self.contexto_semilla, self.addr_type.get())
+        purpose, rutas_estandar = RUTAS_DERIVACION[self.ruta_derivacion.get()]
+        return DerivationEngine(self.contexto_semilla, self.addr_type.get(), purpose=purpose,
+                                standard_paths=rutas_estandar)
+    
     def _generar_direccion(self, indice):
         """
         Genera una dirección Bitcoin a partir de la semilla y el índice.
@@ -295,48 +730,12 @@ class CreadorCarterasApp(tk.Tk):
             indice: Índice de la dirección a generar.
             
         Returns:
-            dict: Diccionario con la información de la dirección generada.
+            DerivedAddress: Registro de la dirección generada (se lee como un diccionario).
         """
         try:
-            # Configurar la red (mainnet o testnet)
-            setup('mainnet')
-            
-            # Obtener la semilla como bytes
-            mnemo = Mnemonic("spanish")
-            seed_bytes = mnemo.to_seed(self.semilla)
-            
-            # Crear clave raíz BIP32
-            root_key = BIP32Key.fromEntropy(seed_bytes)
-            
-            # Derivar según BIP44: m/44'/0'/0'/0/indice
-            # 44' - Propósito (BIP44)
-            # 0' - Moneda (Bitcoin)
-            # 0' - Cuenta
-            # 0 - Recepción/Cambio (0 para recepción)
-            # indice - Índice de la dirección
-            child_key = root_key.ChildKey(44 + 0x80000000)  # 44' (BIP44)
-            child_key = child_key.ChildKey(0 + 0x80000000)   # 0' (Bitcoin)
-            child_key = child_key.ChildKey(0 + 0x80000000)   # 0' (Cuenta)
-            child_key = child_key.ChildKey(0)                # 0 (Recepción)
-            child_key = child_key.ChildKey(indice)           # Índice
-            
-            # Obtener la clave privada en formato WIF
-            wif = child_key.WalletImportFormat()
-            
-            # Obtener la clave pública
-            public_key = child_key.PublicKey().hex()
-            
-            # Generar dirección según el tipo seleccionado
-            tipo = self.addr_type.get()
-            direccion = self._generar_direccion_por_tipo(public_key, tipo)
-            
-            return {
-                'indice': indice,
-                'direccion': direccion,
-                'clave_privada': wif,
-                'clave_publica': public_key,
-                'tipo': tipo
-            }
+            # m/propósito'/moneda'/cuenta'/0/indice: el propósito sale de la ruta
+            # elegida (RUTAS_DERIVACION) o de la xpub importada
+            return self._motor_derivacion().derive(CHAIN_RECEIVE, indice)
             
         except Exception as e:
             raise Exception(f"Error al generar la dirección: {str(e)}")
@@ -353,115 +752,289 @@ class CreadorCarterasApp(tk.Tk):
             str: Dirección Bitcoin generada.
         """
         try:
-            # Crear objeto de clave pública
-            pub_key = PublicKey.from_hex(public_key_hex)
-            
-            if tipo == ADDR_TYPE_P2PKH:
-                # P2PKH (Legacy) - 1...
-                return P2pkhAddress.from_public_key(pub_key).to_string()
-                
-            elif tipo == ADDR_TYPE_P2SH_P2WPKH:
-                # P2SH-P2WPKH (Nested SegWit) - 3...
-                return P2shAddress.from_script(
-                    P2wpkhAddress.from_public_key(pub_key).to_script_pub_key()
-                ).to_string()
-                
-            elif tipo == ADDR_TYPE_P2WPKH:
-                # P2WPKH (Native SegWit) - bc1...
-                return P2wpkhAddress.from_public_key(pub_key).to_string()
-                
-            else:
-                raise ValueError(f"Tipo de dirección no soportado: {tipo}")
-                
+            return encode_address(bytes.fromhex(public_key_hex), tipo, self._red())
         except Exception as e:
             raise Exception(f"Error al generar dirección {tipo}: {str(e)}")
     
-    def _agregar_direccion_a_tabla(self, indice, direccion_info):
-        """Agrega una dirección a la tabla de direcciones."""
-        self.tree.insert("", tk.END, values=(
+    def _cambiar_tipo_direccion(self, *args):
+        """Muestra las direcciones existentes en el tipo seleccionado.
+        
+        Solo se marcan las filas para recodificar: la tabla vuelve a pedir las
+        visibles y cada una se codifica desde su clave pública en caché, así que
+        el coste no depende del número de direcciones de la cartera.
+        """
+        tipo = self.addr_type.get()
+        if tipo == self.tipo_direccion:
+            return
+        self.tipo_direccion = tipo
+        self._configurar_columnas(tipo == ADDR_TYPE_MULTI)
+        self.tree.refresh()
+    
+    def _red(self):
+        """Red del contexto actual ('mainnet' si no hay semilla)."""
+        return self.contexto_semilla.network if self.contexto_semilla is not None else 'mainnet'
+    
+    def _direcciones_en_vista(self, direccion_info):
+        """Direcciones del registro en el tipo que muestra la tabla."""
+        return record_addresses(direccion_info, self.tipo_direccion, self._red())
+    
+    def _fila_direccion(self, posicion):
+        """Devuelve los valores de la fila de la tabla para la dirección en ``posicion``."""
+        direccion_info = self.direcciones[posicion]
+        formatos = self._direcciones_en_vista(direccion_info)
+        if self.tipo_direccion == ADDR_TYPE_MULTI:
+            direccion = formatos[ADDR_TYPE_P2PKH]
+            anidada, nativa = formatos[ADDR_TYPE_P2SH_P2WPKH], formatos[ADDR_TYPE_P2WPKH]
+        else:
+            direccion = formatos[self.tipo_direccion]
+            anidada = nativa = ""
+        return (
             direccion_info['indice'],
-            direccion_info['direccion'],
-            direccion_info['clave_privada'],
-            "0.0"  # Saldo (se actualizaría con una consulta a la blockchain)
-        ))
+            direccion,
+            anidada,
+            nativa,
+            direccion_info['clave_privada'] or "(solo lectura)",
+            self._formatear_saldo(self._saldo_direccion(direccion_info))
+        )
+    
+    def _formatear_saldo(self, estado):
+        """Saldo en BTC de un ScriptStatus (0.0 si aún no se ha consultado)."""
+        if estado is None:
+            return "0.0"
+        saldo = f"{estado.balance / SATOSHIS_POR_BTC:.8f}"
+        return f"{saldo} (+{estado.unconfirmed / SATOSHIS_POR_BTC:.8f})" if estado.unconfirmed else saldo
+    
+    def _mostrar_direcciones(self):
+        """Vincula la tabla virtualizada a las direcciones actuales."""
+        self._configurar_columnas(self.tipo_direccion == ADDR_TYPE_MULTI)
+        self.saldos_sin_cache = set()
+        self.tree.set_rows(len(self.direcciones), self._fila_direccion, self._cargar_saldos_en_cache)
+    
+    def _configurar_columnas(self, multiformato):
+        """Muestra una columna por formato en modo multiformato o una sola dirección."""
+        if multiformato:
+            self.tree.heading("Dirección", text="Legacy")
+            self.tree.tree.configure(displaycolumns=("#", "Dirección", "Nested SegWit", "SegWit Nativo",
+                                                     "Clave Privada (WIF)", "Saldo"))
+        else:
+            self.tree.heading("Dirección", text="Dirección")
+            self.tree.tree.configure(displaycolumns=("#", "Dirección", "Clave Privada (WIF)", "Saldo"))
     
     def _limpiar_tabla(self):
         """Limpia la tabla de direcciones."""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        self.saldos_sin_cache = set()
+        self.tree.clear()
+    
+    def _direccion_seleccionada(self):
+        """Devuelve el registro de la dirección seleccionada o None."""
+        posicion = self.tree.selected_index()
+        if posicion is None or posicion >= len(self.direcciones):
+            return None
+        return self.direcciones[posicion]
+    
+    def _cargar_indice(self, filepath):
+        """Abre el índice guardado junto a la cartera o lo reconstruye en segundo plano.
+        
+        Las carteras con descriptor no guardan índice: sus direcciones se
+        vuelven a derivar en un hilo trabajador, igual que las de una cartera
+        sin índice (o con el índice dañado), mientras la tabla ya se puede usar.
+        """
+        ruta = filepath + SUFIJO_INDICE
+        if self.descriptor_cartera is None and os.path.exists(ruta):
+            try:
+                return AddressIndex(ruta)
+            except ValueError:
+                pass  # Índice dañado: se reconstruye
+        indice = AddressIndex.temporary()
+        if not self.direcciones:
+            return indice
+        
+        cuenta = (self.descriptor_cartera.account if self.descriptor_cartera is not None
+                  else getattr(self.contexto_semilla, 'account', 0))
+        tipos = (self.tipo_direccion,) if self.tipo_direccion in ADDR_TYPES else ADDR_TYPES
+        registros = self.direcciones
+        self.trabajo_indice = DerivationJob(
+            lambda: indice.feed(registros, cuenta, CHAIN_RECEIVE, tipos), len(registros))
+        self.trabajo_indice.start()
+        self.after(INTERVALO_DRENADO_MS, self._drenar_indice, self.trabajo_indice)
+        return indice
+    
+    def _drenar_indice(self, trabajo):
+        """Sigue la reconstrucción del índice; al terminar lo guarda junto a la cartera en flujo."""
+        if trabajo is not self.trabajo_indice:
+            return
+        
+        trabajo.drain()  # Los registros ya están en la tabla: solo interesa el índice
+        if not trabajo.done:
+            self.velocidad_var.set(f"Indexando direcciones: {trabajo.consumed:,} de {trabajo.total:,}")
+            self.after(INTERVALO_DRENADO_MS, self._drenar_indice, trabajo)
+            return
+        
+        self.trabajo_indice = None
+        self.velocidad_var.set("")
+        if trabajo.error is not None:
+            messagebox.showerror("Error", f"Error al indexar las direcciones: {str(trabajo.error)}")
+            return
+        # Las carteras con registros guardan el índice para abrirse al instante la próxima vez
+        if self.descriptor_cartera is None and self.archivo_cartera is not None:
+            try:
+                self.indice_direcciones.flush(self.archivo_cartera.path + SUFIJO_INDICE)
+            except OSError:
+                pass  # Se volverá a construir al abrirla
+    
+    def _buscar_direccion(self):
+        """Indica si una dirección pertenece a la cartera y de qué índice procede."""
+        direccion = simpledialog.askstring("Buscar Dirección", "Introduzca la dirección:", parent=self)
+        if not direccion:
+            return
+        
+        entrada = self.indice_direcciones.lookup_address(direccion.strip(), self._red())
+        if entrada is None and self.trabajo_indice is not None:
+            messagebox.showinfo("Buscar Dirección",
+                                f"No se ha encontrado entre las {self.trabajo_indice.consumed:,} direcciones "
+                                f"indexadas hasta ahora. El índice aún se está construyendo; "
+                                f"vuelva a intentarlo en unos segundos.")
+            return
+        if entrada is None:
+            messagebox.showinfo("Buscar Dirección", "La dirección no pertenece a las direcciones generadas.")
+            return
+        
+        cadena = "recepción" if entrada.chain == CHAIN_RECEIVE else "cambio"
+        if (entrada.chain == CHAIN_RECEIVE and entrada.index < len(self.direcciones)
+                and self.direcciones[entrada.index]['indice'] == entrada.index):
+            self.tree.select_index(entrada.index)
+        messagebox.showinfo("Buscar Dirección",
+                            f"La dirección pertenece a la cartera.\n\n"
+                            f"Cuenta: {entrada.account}\nCadena: {cadena}\n"
+                            f"Índice: {entrada.index}\nTipo: {entrada.addr_type}")
     
     def _copiar_direccion(self):
         """Copia la dirección seleccionada al portapapeles."""
-        seleccion = self.tree.selection()
+        seleccion = self._direccion_seleccionada()
         if not seleccion:
             messagebox.showwarning("Advertencia", "Por favor, seleccione una dirección.")
             return
             
-        direccion = self.tree.item(seleccion[0])['values'][1]
+        # En modo multiformato se copian los tres formatos, uno por línea
+        direccion = "\n".join(self._direcciones_en_vista(seleccion).values())
         self.clipboard_clear()
         self.clipboard_append(direccion)
         messagebox.showinfo("Copiado", "Dirección copiada al portapapeles.")
     
     def _copiar_clave_privada(self):
         """Copia la clave privada seleccionada al portapapeles."""
-        seleccion = self.tree.selection()
+        seleccion = self._direccion_seleccionada()
         if not seleccion:
             messagebox.showwarning("Advertencia", "Por favor, seleccione una dirección.")
             return
             
-        clave_privada = self.tree.item(seleccion[0])['values'][2]
+        clave_privada = seleccion['clave_privada']
+        if not clave_privada:
+            messagebox.showwarning("Advertencia", "La cartera es de solo lectura: no hay clave privada.")
+            return
         self.clipboard_clear()
         self.clipboard_append(clave_privada)
         messagebox.showinfo("Copiado", "Clave privada copiada al portapapeles.")
     
     def _ver_en_explorador(self):
         """Abre la dirección seleccionada en un explorador de blockchain."""
-        seleccion = self.tree.selection()
+        seleccion = self._direccion_seleccionada()
         if not seleccion:
             messagebox.showwarning("Advertencia", "Por favor, seleccione una dirección.")
             return
             
-        direccion = self.tree.item(seleccion[0])['values'][1]
+        direccion = next(iter(self._direcciones_en_vista(seleccion).values()))
         url = f"https://www.blockchain.com/btc/address/{direccion}"
+        import webbrowser
+
         webbrowser.open(url)
     
     def _nueva_cartera(self):
         """Crea una nueva cartera."""
         if messagebox.askyesno("Nueva Cartera", "¿Está seguro de que desea crear una nueva cartera? Se perderán los datos no guardados."):
+            self._cancelar_trabajo()
             self.semilla = None
+            self._descartar_contexto_semilla()
             self.direcciones = []
+            self._cerrar_archivo_cartera()
+            self.indice_direcciones = AddressIndex()
+            self.saldos = {}
+            self.descriptor_cartera = None
+            self.ultimas_usadas = {}
             self.seed_text.delete(1.0, tk.END)
             self._limpiar_tabla()
     
+    def _cerrar_archivo_cartera(self):
+        """Cierra la cartera en flujo abierta, si la hay."""
+        if self.archivo_cartera is not None:
+            self.archivo_cartera.close()
+            self.archivo_cartera = None
+    
     def _abrir_cartera(self):
-        """Abre un archivo de cartera existente."""
+        """Abre un archivo de cartera existente.
+        
+        Las carteras en flujo no se cargan enteras: solo se leen su cabecera e
+        índice, y la tabla decodifica los registros de las filas visibles. Si la
+        cabecera trae el descriptor de derivación, las direcciones se vuelven a
+        derivar bajo demanda.
+        """
         filepath = filedialog.askopenfilename(
             title="Abrir Cartera",
-            filetypes=[("Archivos de Cartera", "*.json"), ("Todos los archivos", "*.*")]
+            filetypes=TIPOS_ARCHIVO_CARTERA
         )
         
         if not filepath:
             return
             
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            archivo = None
+            if is_wallet_stream(filepath):
+                archivo = WalletFile(filepath)
+                data = dict(archivo.metadata, direcciones=archivo)
+            else:
+                with open(filepath, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
                 
             # Validar el formato del archivo
-            if 'semilla' not in data or 'direcciones' not in data:
+            if ('semilla' not in data and 'xpub' not in data) or 'direcciones' not in data:
+                if archivo is not None:
+                    archivo.close()
                 raise ValueError("Formato de archivo de cartera inválido")
                 
             # Cargar datos
-            self.semilla = data['semilla']
+            if 'semilla' in data:
+                self._cancelar_trabajo()
+                self.semilla = data['semilla']
+                self._cargar_contexto_semilla()
+                self.seed_text.delete(1.0, tk.END)
+                self.seed_text.insert(tk.END, self.semilla)
+            else:
+                self._activar_solo_lectura(WatchOnlyContext(data['xpub']))
+            self._cerrar_archivo_cartera()
+            if archivo is not None and 'descriptor' in data:
+                descriptor, generadas, usadas = WalletDescriptor.from_dict(data['descriptor'])
+                archivo.close()
+                archivo = None
+                data['direcciones'] = descriptor.addresses(self.contexto_semilla,
+                                                           generadas.get(CHAIN_RECEIVE, 0))
+                self.descriptor_cartera, self.ultimas_usadas = descriptor, usadas
+            else:
+                self.descriptor_cartera, self.ultimas_usadas = None, {}
+            self.archivo_cartera = archivo
             self.direcciones = data['direcciones']
+            self.saldos = {}
+            self._cache_saldos()  # Los saldos conocidos se muestran al instante
             
-            # Actualizar la interfaz
-            self.seed_text.delete(1.0, tk.END)
-            self.seed_text.insert(tk.END, self.semilla)
+            # Mostrar las direcciones en el tipo con que se guardaron; el
+            # selector permite después recodificarlas desde sus claves públicas
+            tipo = data.get('tipo') or (self.direcciones[0].get('tipo') if self.direcciones else None)
+            if tipo:
+                self.tipo_direccion = tipo
+                self.addr_type.set(self.tipo_direccion)
+            self.indice_direcciones = self._cargar_indice(filepath)
             
-            self._limpiar_tabla()
-            for i, direccion in enumerate(self.direcciones):
-                self._agregar_direccion_a_tabla(i, direccion)
+            # Actualizar la interfaz
+            self._mostrar_direcciones()
                 
             messagebox.showinfo("Éxito", f"Cartera cargada correctamente. {len(self.direcciones)} direcciones cargadas.")
             
@@ -469,14 +1042,24 @@ class CreadorCarterasApp(tk.Tk):
             messagebox.showerror("Error", f"Error al abrir la cartera: {str(e)}")
     
     def _guardar_cartera_como(self):
-        """Guarda la cartera actual en un archivo."""
-        if not self.semilla:
+        """Guarda la cartera actual en un archivo.
+        
+        Si las direcciones salen de la semilla (o xpub) actual, solo se guardan
+        el descriptor de derivación, el número de direcciones y el último índice
+        usado de cada cadena. Las cargadas de un archivo antiguo se guardan
+        registro a registro; sobre la cartera en flujo abierta, con el mismo tipo
+        de dirección, solo se añaden al final las nuevas.
+        """
+        if not self.semilla and self.contexto_semilla is None:
             messagebox.showwarning("Advertencia", "No hay datos de cartera para guardar.")
             return
+        if self.trabajo_indice is not None:
+            messagebox.showwarning("Advertencia", "Espere a que termine de construirse el índice de direcciones.")
+            return
             
         filepath = filedialog.asksaveasfilename(
-            defaultextension=".json",
-            filetypes=[("Archivos de Cartera", "*.json"), ("Todos los archivos", "*.*")],
+            defaultextension=EXTENSION_CARTERA,
+            filetypes=TIPOS_ARCHIVO_CARTERA,
             title="Guardar Cartera Como"
         )
         
@@ -484,15 +1067,49 @@ class CreadorCarterasApp(tk.Tk):
             return
             
         try:
+            archivo = self.archivo_cartera
+            mismo_archivo = archivo is not None and os.path.abspath(filepath) == os.path.abspath(archivo.path)
             data = {
-                'version': '1.0',
-                'fecha_creacion': datetime.now().isoformat(),
-                'semilla': self.semilla,
-                'direcciones': self.direcciones
+                'version': '2.0',
+                'fecha_creacion': archivo.metadata.get('fecha_creacion') if mismo_archivo
+                                  else datetime.now().isoformat(),
+                'tipo': self.tipo_direccion,
             }
+            if self.semilla:
+                data['semilla'] = self.semilla
+            else:
+                data['xpub'] = self.contexto_semilla.xpub  # Cartera de solo lectura
+            # Se guardan en el tipo que se está mostrando
+            red = self._red()
+            registros = (reencode_record(registro, self.tipo_direccion, red) for registro in self.direcciones)
             
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=4, ensure_ascii=False)
+            if self.descriptor_cartera is not None:
+                data['descriptor'] = self.descriptor_cartera.to_dict(
+                    {CHAIN_RECEIVE: len(self.direcciones)}, self.ultimas_usadas, red or 'mainnet')
+                if mismo_archivo:
+                    if self.direcciones is archivo:
+                        self.direcciones = list(archivo)
+                    self._cerrar_archivo_cartera()
+                # Sin registros: al abrirla las direcciones se vuelven a derivar
+                write_wallet(filepath, data, ())
+            elif mismo_archivo and self.direcciones is archivo and archivo.metadata.get('tipo') == self.tipo_direccion:
+                archivo.flush()
+            elif mismo_archivo:
+                archivo.rewrite(data, registros)
+                self.direcciones = archivo
+            else:
+                write_wallet(filepath, data, registros)
+                # Las direcciones que se generen después se añadirán a este archivo
+                self._cerrar_archivo_cartera()
+                self.archivo_cartera = self.direcciones = WalletFile(filepath)
+            
+            # Índice inverso junto a las carteras con registros (se proyecta en
+            # memoria al abrirlas); las de descriptor lo reconstruyen al abrirse
+            ruta_indice = filepath + SUFIJO_INDICE
+            if self.descriptor_cartera is None:
+                self.indice_direcciones.flush(ruta_indice)
+            elif os.path.exists(ruta_indice):
+                os.remove(ruta_indice)  # Índice de un guardado anterior con registros
                 
             messagebox.showinfo("Éxito", f"Cartera guardada correctamente en:\n{filepath}")
             
@@ -501,16 +1118,24 @@ class CreadorCarterasApp(tk.Tk):
     
     def _mostrar_preferencias(self):
         """Muestra el diálogo de preferencias."""
+        from dialogs.preferences_ui import PreferencesDialog
+
         dialog = PreferencesDialog(self)
         self.wait_window(dialog)
     
     def _configurar_red(self):
         """Muestra el diálogo de configuración de red."""
-        dialog = NetworkSettingsDialog(self)
-        self.wait_window(dialog)
+        from dialogs.network_settings_dialog import NetworkSettingsDialog
+
+        dialog = NetworkSettingsDialog(self, self.configuracion_red)
+        resultado = dialog.show()
+        if resultado:
+            self.configuracion_red = resultado
     
     def _mostrar_documentacion(self):
         """Abre la documentación en el navegador web."""
+        import webbrowser
+
         webbrowser.open("https://github.com/tu-usuario/creador-carteras-bitcoin-hd")
     
     def _mostrar_acerca_de(self):
@@ -532,6 +1157,19 @@ Desarrollado con Python y Tkinter.
 def main():
     """Función principal de la aplicación."""
     app = CreadorCarterasApp()
+    if PERFIL_ARRANQUE is not None:
+        PERFIL_ARRANQUE.mark("ventana construida")
+    
+    def arranque_completado():
+        # Primera vuelta libre del bucle de eventos: la ventana ya está dibujada
+        if PERFIL_ARRANQUE is not None:
+            PERFIL_ARRANQUE.mark("primera ventana")
+            PERFIL_ARRANQUE.uninstall()
+            print(PERFIL_ARRANQUE.report(), file=sys.stderr)
+        if EXIT_FLAG in sys.argv:
+            app.destroy()
+    
+    app.after_idle(arranque_completado)
     app.mainloop()
 
 
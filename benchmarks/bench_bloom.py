@@ -0,0 +1,87 @@
+"""
+Filtro de Bloom de scripts frente a un conjunto exacto en memoria.
+
+Comprueba con direcciones reales derivadas que el escáner encuentra todas
+las salidas de la cartera; después construye el filtro con claves sintéticas
+y mide memoria, tasa de falsos positivos real y velocidad de escaneo.
+
+Uso:
+    python benchmarks/bench_bloom.py [num_scripts] [tasa_fp] [num_salidas]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Añadir el directorio raíz al path de Python
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from creador.seed import SeedContext
+from creador.derivation import DerivationEngine, CHAIN_RECEIVE
+from creador.encoding import ADDR_TYPE_P2WPKH, hash160, script_pubkey
+from creador.index import AddressIndex
+from creador.bloom import ScriptFilter, WalletScanner
+
+MNEMONICO = "abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon about"
+
+
+def comprobar_escaneo():
+    """Alimenta filtro e índice desde el mismo recorrido de derivación y escanea."""
+    motor = DerivationEngine(SeedContext(MNEMONICO, language="english"), ADDR_TYPE_P2WPKH)
+    indice = AddressIndex()
+    filtro = ScriptFilter(100)
+    registros = list(filtro.feed(indice.feed(motor.derive_range(CHAIN_RECEIVE, 0, 100), 0, CHAIN_RECEIVE)))
+
+    scanner = WalletScanner(filtro, indice)
+    salidas = [script_pubkey(os.urandom(20), ADDR_TYPE_P2WPKH) for _ in range(1000)]
+    propias = {250: 7, 600: 99}
+    for posicion, indice_direccion in propias.items():
+        pk = bytes.fromhex(registros[indice_direccion]['clave_publica'])
+        salidas[posicion] = script_pubkey(hash160(pk), ADDR_TYPE_P2WPKH)
+    encontradas = {posicion: entrada.index for posicion, entrada in scanner.scan(salidas)}
+    assert encontradas == propias, encontradas
+    print(f"Escaneo de comprobación: {len(encontradas)} salidas propias encontradas")
+
+
+def main():
+    num_scripts = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    tasa_fp = float(sys.argv[2]) if len(sys.argv) > 2 else 1e-4
+    num_salidas = int(sys.argv[3]) if len(sys.argv) > 3 else 200_000
+
+    comprobar_escaneo()
+
+    claves = [b'\x02' + os.urandom(20) for _ in range(num_scripts)]
+
+    tracemalloc.start()
+    exacto = set(claves)
+    memoria_exacta = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del exacto
+
+    inicio = time.perf_counter()
+    filtro = ScriptFilter(num_scripts, tasa_fp)
+    for clave in claves:
+        filtro.add(clave)
+    print(f"Filtro: {num_scripts} scripts en {time.perf_counter() - inicio:.2f} s, "
+          f"{filtro.num_hashes} funciones hash")
+    print(f"Memoria: filtro {filtro.size_bytes / 2 ** 20:.1f} MiB | "
+          f"conjunto exacto {memoria_exacta / 2 ** 20:.1f} MiB (solo la tabla, sin las claves)")
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, 'scripts.bloom')
+        filtro.save(ruta)
+        filtro = ScriptFilter.load(ruta)
+    assert all(clave in filtro for clave in claves[:10_000])
+
+    salidas = [script_pubkey(os.urandom(20), ADDR_TYPE_P2WPKH) for _ in range(num_salidas)]
+    inicio = time.perf_counter()
+    positivos = sum(filtro.might_contain_script(script) for script in salidas)
+    duracion = time.perf_counter() - inicio
+    print(f"Escaneo de {num_salidas} salidas ajenas: {num_salidas / duracion:,.0f} salidas/s | "
+          f"falsos positivos {positivos / num_salidas:.2e} (esperada {filtro.estimated_fp_rate():.2e})")
+
+
+if __name__ == "__main__":
+    main()
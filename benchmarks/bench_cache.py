@@ -0,0 +1,109 @@
+"""
+Caché de saldos: descubrimiento en frío y en caliente, invalidación y reapertura.
+
+Contra un servidor Electrum local con latencia simulada:
+
+1. descubrimiento en frío (todo se consulta a la red);
+2. descubrimiento en caliente (todo sale de la caché);
+3. aviso de mempool de un scripthash y aviso de bloque nuevo: solo se
+   vuelven a consultar las entradas invalidadas;
+4. reapertura de la caché desde disco y lectura de los saldos de todas las
+   direcciones, como al rellenar la columna "Saldo" tras abrir una cartera.
+
+Uso:
+    python benchmarks/bench_cache.py [usadas] [latencia_ms]
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+# Añadir el directorio raíz al path de Python
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from creador.seed import SeedContext
+from creador.derivation import DerivationEngine, CHAIN_CHANGE, CHAIN_RECEIVE
+from creador.encoding import ADDR_TYPE_P2WPKH
+from creador.discovery import DiscoveryEngine, record_scripthashes
+from creador.electrum import ElectrumHistoryBackend, ElectrumPool, ElectrumServer
+from creador.electrum_mock import MockElectrumServer
+from creador.cache import BalanceCache, CachingHistoryBackend, cached_statuses
+
+MNEMONICO = "abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon about"
+
+
+async def descubrir(motor, servidor, cache):
+    pool = ElectrumPool([ElectrumServer('127.0.0.1', servidor.port, False)])
+    backend = CachingHistoryBackend(ElectrumHistoryBackend(pool), cache)
+    descubrimiento = DiscoveryEngine(motor, backend)
+    inicio = time.perf_counter()
+    resultados = await descubrimiento.discover()
+    return descubrimiento, backend, resultados, time.perf_counter() - inicio
+
+
+async def escenario(usadas, latencia, ruta):
+    motor = DerivationEngine(SeedContext(MNEMONICO, language="english"), ADDR_TYPE_P2WPKH)
+    registros = list(motor.derive_range(CHAIN_RECEIVE, 0, usadas))
+    scripthashes = [record_scripthashes(registro)[0] for registro in registros]
+    servidor = MockElectrumServer(latency=latencia)
+    for i, scripthash in enumerate(scripthashes):
+        servidor.histories[scripthash] = [{'tx_hash': f"{i:064x}", 'height': 800_000}]
+        servidor.balances[scripthash] = (1_000 + i, 0)
+    # Una transacción en la mempool: se invalidará con el siguiente bloque
+    servidor.histories[scripthashes[0]].append({'tx_hash': 'ff' * 32, 'height': 0})
+    servidor.balances[scripthashes[0]] = (1_000, 500)
+    servidor.height = 800_000
+    await servidor.start()
+
+    cache = BalanceCache(ruta)
+    try:
+        descubrimiento, backend, _, frio = await descubrir(motor, servidor, cache)
+        print(f"En frío:    {frio:6.2f} s | {backend.misses} consultas a la red")
+
+        # En caliente, con la conexión (y las suscripciones) aún abiertas
+        descubrimiento2 = DiscoveryEngine(motor, backend)
+        backend.hits = backend.misses = 0
+        inicio = time.perf_counter()
+        await descubrimiento2.discover()
+        print(f"En caliente: {time.perf_counter() - inicio:5.2f} s | {backend.misses} consultas a la red, "
+              f"{backend.hits} aciertos")
+
+        # Aviso de mempool para un scripthash y bloque nuevo
+        servidor.balances[scripthashes[5]] = (1_005, 42)
+        servidor.histories[scripthashes[5]].append({'tx_hash': 'ee' * 32, 'height': 0})
+        servidor.notify_scripthash(scripthashes[5])
+        servidor.notify_header(800_001)
+        await asyncio.sleep(0.05)
+        backend.hits = backend.misses = 0
+        resultados = await DiscoveryEngine(motor, backend).discover()
+        print(f"Tras avisos: {backend.misses} consultas a la red (mempool y fondos pendientes)")
+        saldo_5 = next(r.status for r in resultados[CHAIN_RECEIVE] if r.index == 5)
+        assert saldo_5.unconfirmed == 42 and backend.misses == 2, (saldo_5, backend.misses)
+        await backend.close()
+    finally:
+        cache.close()
+        await servidor.close()
+
+    # Reapertura: los saldos se muestran sin red aunque hayan caducado
+    inicio = time.perf_counter()
+    cache = BalanceCache(ruta, ttl=0)
+    estados = [cached_statuses(cache, [scripthash]) for scripthash in scripthashes]
+    duracion = time.perf_counter() - inicio
+    assert all(estado is not None for estado in estados)
+    assert estados[7].confirmed == 1_007
+    print(f"Reapertura: saldos de {len(estados)} direcciones en {duracion * 1000:.1f} ms "
+          f"({len(cache)} entradas en disco)")
+    cache.close()
+
+
+def main():
+    usadas = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    latencia = (float(sys.argv[2]) if len(sys.argv) > 2 else 20.0) / 1000
+    with tempfile.TemporaryDirectory() as directorio:
+        asyncio.run(escenario(usadas, latencia, os.path.join(directorio, 'saldos.sqlite3')))
+
+
+if __name__ == "__main__":
+    main()
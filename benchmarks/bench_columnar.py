@@ -0,0 +1,116 @@
+"""
+Memoria del almacén columnar frente a la lista de diccionarios.
+
+Mide con ``tracemalloc`` los bytes por dirección de la lista de registros
+(diccionarios con la dirección, el WIF y la clave pública en texto) sobre
+una muestra. Después llena el almacén columnar con el número de direcciones
+pedido: solo claves públicas (columnas por defecto), con la columna de
+hash160 y con la de claves privadas, y también proyectado en un archivo. Comprueba que los registros reconstruidos son idénticos.
+
+Uso:
+    python benchmarks/bench_columnar.py [num_direcciones] [muestra_diccionarios]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Añadir el directorio raíz al path de Python
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from creador.columnar import AddressStore
+from creador.derivation import DerivationEngine
+from creador.encoding import ADDR_TYPE_P2WPKH, encode_hash160, encode_wif, hash160
+from creador.seed import SeedContext
+
+MNEMONICO = "abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon about"
+
+
+def claves(cantidad, semilla=7):
+    """Pares (clave pública comprimida, clave privada) sintéticos."""
+    azar = random.Random(semilla)
+    for _ in range(cantidad):
+        yield b'\x02' + azar.randbytes(32), azar.randbytes(32)
+
+
+def registro(indice, publica, privada):
+    """Registro con el mismo formato que ``derive_range``."""
+    return {
+        'indice': indice,
+        'direccion': encode_hash160(hash160(publica), ADDR_TYPE_P2WPKH),
+        'clave_privada': encode_wif(privada),
+        'clave_publica': publica.hex(),
+        'tipo': ADDR_TYPE_P2WPKH,
+    }
+
+
+def memoria(funcion):
+    """Memoria retenida por el resultado de ``funcion`` y tiempo de construcción."""
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = funcion()
+    segundos = time.perf_counter() - inicio
+    retenida = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return resultado, retenida, segundos
+
+
+def llenar(almacen, cantidad):
+    for indice, (publica, privada) in enumerate(claves(cantidad)):
+        almacen.append_raw(indice, ADDR_TYPE_P2WPKH, publica, privada)
+    return almacen
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    muestra = int(sys.argv[2]) if len(sys.argv) > 2 else 200_000
+
+    lista, m_lista, _ = memoria(lambda: [registro(i, *par) for i, par in enumerate(claves(muestra))])
+    por_direccion = m_lista / muestra
+    print(f"Lista de diccionarios: {por_direccion:.0f} bytes/dirección "
+          f"(~{por_direccion * total / 2**30:.1f} GiB para {total:,})")
+
+    # Sin columna de claves privadas: los WIF se rederivan con el motor de la cartera
+    motor = DerivationEngine(SeedContext(MNEMONICO, language="english"), ADDR_TYPE_P2WPKH, purpose=84)
+    almacen, m_motor, t_motor = memoria(lambda: llenar(AddressStore(engine=motor), total))
+    print(f"Columnas sin claves privadas: {m_motor / total:.1f} bytes/dirección, "
+          f"{m_motor / 2**20:.0f} MiB para {total:,} ({por_direccion * total / m_motor:.1f}x menos), "
+          f"llenado en {t_motor:.1f} s")
+    inicio = time.perf_counter()
+    pagina = almacen[total // 2:total // 2 + 40]
+    t_pagina = time.perf_counter() - inicio
+    assert [r['direccion'] for r in pagina] == [
+        encode_hash160(hash160(almacen.public_key_at(total // 2 + i)), ADDR_TYPE_P2WPKH) for i in range(40)]
+    print(f"Página de 40 filas (con WIF rederivados): {t_pagina * 1000:.0f} ms")
+    del almacen
+
+    # Con columna de hash160 (para quien recorra todos los hashes)
+    almacen, m_hashes, _ = memoria(lambda: llenar(AddressStore(engine=motor, with_hashes=True), muestra))
+    assert almacen.hash160_at(muestra - 1) == hash160(almacen.public_key_at(muestra - 1))
+    print(f"Columnas con hash160: {m_hashes / muestra:.1f} bytes/dirección ({m_lista / m_hashes:.1f}x menos)")
+    del almacen
+
+    # Con columna de claves privadas: registros idénticos a los de la lista
+    almacen, m_claves, _ = memoria(lambda: llenar(AddressStore(), muestra))
+    assert almacen[:] == lista
+    print(f"Columnas con claves privadas: {m_claves / muestra:.1f} bytes/dirección "
+          f"({m_lista / m_claves:.1f}x menos) | registros idénticos a la lista")
+    del almacen, lista
+
+    # Proyectado en un archivo: la memoria del proceso no crece con las filas
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, 'direcciones.col')
+        cantidad = min(total, 1_000_000)
+        almacen, m_archivo, t_archivo = memoria(lambda: llenar(AddressStore(engine=motor, path=ruta), cantidad))
+        almacen.close()
+        with AddressStore(engine=motor, path=ruta) as reabierto:
+            assert len(reabierto) == cantidad
+        print(f"Columnas en archivo: {cantidad:,} filas en {t_archivo:.1f} s, "
+              f"{os.path.getsize(ruta) / 2**20:.0f} MiB en disco, {m_archivo / 2**10:.0f} KiB en memoria")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Cartera guardada como descriptor de derivación frente a guardar los registros.
+
+Mide, para una cartera de muchas direcciones, el tamaño del archivo y los
+tiempos de guardar, abrir y mostrar la primera página. Compara la cartera
+que solo guarda semilla, ruta y marcas de uso con la que guarda cada
+dirección con sus claves. Comprueba además que las direcciones rederivadas
+coinciden con las originales.
+
+Uso:
+    python benchmarks/bench_descriptor.py [num_direcciones] [num_registros]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Añadir el directorio raíz al path de Python
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from creador.derivation import CHAIN_RECEIVE, DerivationEngine
+from creador.descriptor import WalletDescriptor
+from creador.encoding import ADDR_TYPE_P2WPKH
+from creador.seed import SeedContext
+from creador.walletfile import WalletFile, write_wallet
+
+MNEMONICO = "abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon about"
+FILAS_POR_PAGINA = 40
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    num_registros = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+
+    contexto = SeedContext(MNEMONICO, language="english")
+    motor = DerivationEngine(contexto, ADDR_TYPE_P2WPKH, purpose=84)
+    descriptor = WalletDescriptor.from_engine(motor)
+    metadatos = {'version': '2.0', 'semilla': MNEMONICO, 'tipo': ADDR_TYPE_P2WPKH}
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta_descriptor = os.path.join(directorio, 'descriptor.cartera')
+        ruta_registros = os.path.join(directorio, 'registros.cartera')
+
+        # Guardar: solo metadatos frente a todos los registros (derivados y escritos)
+        inicio = time.perf_counter()
+        datos = dict(metadatos, descriptor=descriptor.to_dict({CHAIN_RECEIVE: total}, {CHAIN_RECEIVE: 17}))
+        write_wallet(ruta_descriptor, datos, ())
+        t_descriptor = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        write_wallet(ruta_registros, metadatos, motor.derive_range(CHAIN_RECEIVE, 0, num_registros))
+        t_registros = time.perf_counter() - inicio
+        tamano = os.path.getsize(ruta_registros)
+        print(f"Guardar {total:,} direcciones como descriptor: {t_descriptor * 1000:.1f} ms, "
+              f"{os.path.getsize(ruta_descriptor):,} bytes")
+        print(f"Guardar {num_registros:,} registros: {t_registros:.2f} s, {tamano / 2**20:.1f} MiB "
+              f"(para {total:,}: ~{t_registros * total / num_registros:.0f} s y "
+              f"~{tamano * total / num_registros / 2**20:.0f} MiB)")
+
+        # Abrir y mostrar la primera página (incluye estirar la semilla)
+        inicio = time.perf_counter()
+        with WalletFile(ruta_descriptor) as archivo:
+            leido, generadas, usadas = WalletDescriptor.from_dict(archivo.metadata['descriptor'])
+        direcciones = leido.addresses(SeedContext(archivo.metadata['semilla'], language="english"),
+                                      generadas[CHAIN_RECEIVE])
+        pagina = direcciones[:FILAS_POR_PAGINA]
+        t_abrir = time.perf_counter() - inicio
+        assert len(direcciones) == total and usadas == {CHAIN_RECEIVE: 17}
+
+        # Página al azar en mitad de la cartera
+        azar = random.Random(1)
+        posicion = azar.randrange(total - FILAS_POR_PAGINA)
+        inicio = time.perf_counter()
+        pagina_intermedia = direcciones[posicion:posicion + FILAS_POR_PAGINA]
+        t_pagina = time.perf_counter() - inicio
+        print(f"Abrir y mostrar la primera página: {t_abrir * 1000:.0f} ms | página en la posición "
+              f"{posicion:,}: {t_pagina * 1000:.0f} ms")
+
+        # Las direcciones rederivadas coinciden con las guardadas como registros
+        with WalletFile(ruta_registros) as registros:
+            assert pagina == registros[:FILAS_POR_PAGINA]
+            for i in azar.sample(range(num_registros), 20):
+                assert direcciones[i] == registros[i]
+        assert pagina_intermedia[0] == motor.derive(CHAIN_RECEIVE, posicion)
+        print("Direcciones rederivadas idénticas a las guardadas")
+
+
+if __name__ == "__main__":
+    main()
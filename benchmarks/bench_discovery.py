@@ -0,0 +1,79 @@
+"""
+Descubrimiento con límite de huecos: consultas en serie frente a lotes concurrentes.
+
+Simula una semilla muy usada (direcciones con historial dispersas hasta un
+índice alto en recepción y cambio) en un ``LocalHistoryBackend`` con latencia
+de red simulada, y compara el recorrido dirección a dirección con el
+recorrido por ventanas crecientes y lotes concurrentes.
+
+Uso:
+    python benchmarks/bench_discovery.py [usadas_recepcion] [latencia_ms]
+"""
+
+import os
+import random
+import sys
+import time
+
+# Añadir el directorio raíz al path de Python
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from creador.seed import SeedContext
+from creador.derivation import DerivationEngine, CHAIN_CHANGE, CHAIN_RECEIVE
+from creador.encoding import ADDR_TYPE_P2WPKH
+from creador.discovery import DiscoveryEngine, LocalHistoryBackend, ScriptStatus, record_scripthashes
+
+MNEMONICO = "abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon about"
+GAP_LIMIT = 20
+
+
+def preparar_backend(motor, usadas, latencia):
+    """Marca como usadas direcciones dispersas (huecos menores que el límite)."""
+    random.seed(1)
+    estados = {}
+    esperado = {}
+    for chain, total in ((CHAIN_RECEIVE, usadas), (CHAIN_CHANGE, usadas // 2)):
+        indices = sorted(random.sample(range(total), total // 3) + [total - 1])
+        for registro in motor.derive_range(chain, 0, total):
+            if registro['indice'] in indices:
+                for scripthash in record_scripthashes(registro):
+                    estados[scripthash] = ScriptStatus(2, 10_000 + registro['indice'], 0)
+        esperado[chain] = total - 1
+    return LocalHistoryBackend(estados, latency=latencia), esperado
+
+
+def descubrir(motor, backend, **opciones):
+    descubrimiento = DiscoveryEngine(motor, backend, gap_limit=GAP_LIMIT, **opciones)
+    inicio = time.perf_counter()
+    resultados = descubrimiento.run()
+    return time.perf_counter() - inicio, descubrimiento.last_used, resultados
+
+
+def main():
+    usadas = int(sys.argv[1]) if len(sys.argv) > 1 else 600
+    latencia = (float(sys.argv[2]) if len(sys.argv) > 2 else 30.0) / 1000
+
+    motor = DerivationEngine(SeedContext(MNEMONICO, language="english"), ADDR_TYPE_P2WPKH)
+    backend, esperado = preparar_backend(motor, usadas, latencia)
+    print(f"Semilla simulada: recepción hasta {esperado[CHAIN_RECEIVE]}, cambio hasta "
+          f"{esperado[CHAIN_CHANGE]}, latencia {latencia * 1000:.0f} ms, límite de huecos {GAP_LIMIT}")
+
+    # Derivación ya en caché para medir solo la parte de red
+    for chain in (CHAIN_RECEIVE, CHAIN_CHANGE):
+        list(motor.derive_range(chain, 0, 1))
+
+    duracion, ultimo, resultados = descubrir(motor, backend)
+    assert ultimo == esperado, ultimo
+    saldo = sum(r.status.balance for lista in resultados.values() for r in lista)
+    print(f"Concurrente: {duracion:6.2f} s | {backend.requests} peticiones, "
+          f"{backend.queried} scripthashes | saldo {saldo / 1e8:.8f} BTC")
+
+    backend.requests = backend.queried = 0
+    duracion_serie, ultimo, _ = descubrir(motor, backend, batch_size=1, concurrency=1)
+    assert ultimo == esperado, ultimo
+    print(f"En serie:    {duracion_serie:6.2f} s | {backend.requests} peticiones | "
+          f"{duracion_serie / duracion:.1f}x más lento")
+
+
+if __name__ == "__main__":
+    main()
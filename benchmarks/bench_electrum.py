@@ -0,0 +1,109 @@
+"""
+Cliente Electrum: peticiones sueltas frente a lotes repartidos entre servidores.
+
+Arranca servidores Electrum locales (``MockElectrumServer``) con latencia
+simulada, comprueba un descubrimiento completo de extremo a extremo y mide
+las peticiones por segundo de ``blockchain.scripthash.get_balance``:
+
+- una petición por viaje de ida y vuelta en una sola conexión;
+- lotes en una sola conexión;
+- lotes repartidos entre el conjunto de servidores.
+
+Uso:
+    python benchmarks/bench_electrum.py [num_scripthashes] [latencia_ms] [num_servidores]
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+# Añadir el directorio raíz al path de Python
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from creador.seed import SeedContext
+from creador.derivation import DerivationEngine, CHAIN_RECEIVE
+from creador.encoding import ADDR_TYPE_P2WPKH
+from creador.discovery import DiscoveryEngine, record_scripthashes
+from creador.electrum import ElectrumHistoryBackend, ElectrumPool, ElectrumServer
+from creador.electrum_mock import MockElectrumServer
+
+MNEMONICO = "abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon about"
+
+
+async def arrancar_servidores(num_servidores, latencia, historiales, saldos):
+    servidores = [MockElectrumServer(historiales, saldos, latency=latencia) for _ in range(num_servidores)]
+    puertos = [await servidor.start() for servidor in servidores]
+    return servidores, [ElectrumServer('127.0.0.1', puerto, False) for puerto in puertos]
+
+
+async def comprobar_descubrimiento(latencia):
+    """Descubrimiento completo contra los servidores locales."""
+    motor = DerivationEngine(SeedContext(MNEMONICO, language="english"), ADDR_TYPE_P2WPKH)
+    usados = {3: 150_000, 17: 2_500, 30: 70_000}
+    historiales, saldos = {}, {}
+    for registro in motor.derive_range(CHAIN_RECEIVE, 0, 40):
+        if registro['indice'] in usados:
+            scripthash = record_scripthashes(registro)[0]
+            historiales[scripthash] = [{'tx_hash': '00' * 32, 'height': 800_000}]
+            saldos[scripthash] = (usados[registro['indice']], 0)
+
+    servidores, direcciones = await arrancar_servidores(2, latencia, historiales, saldos)
+    descubrimiento = DiscoveryEngine(motor, ElectrumHistoryBackend(ElectrumPool(direcciones)))
+    try:
+        resultados = await descubrimiento.discover()
+    finally:
+        await descubrimiento.backend.close()
+        for servidor in servidores:
+            await servidor.close()
+    saldos_encontrados = {r.index: r.status.balance for r in resultados[CHAIN_RECEIVE] if r.status.used}
+    assert saldos_encontrados == usados, saldos_encontrados
+    assert descubrimiento.last_used[CHAIN_RECEIVE] == 30
+    print(f"Descubrimiento de extremo a extremo: {len(saldos_encontrados)} direcciones con saldo")
+
+
+async def medir(num_scripthashes, latencia, num_servidores):
+    scripthashes = [os.urandom(32).hex() for _ in range(num_scripthashes)]
+    saldos = {scripthash: (i, 0) for i, scripthash in enumerate(scripthashes)}
+    servidores, direcciones = await arrancar_servidores(num_servidores, latencia, {}, saldos)
+    llamadas = [('blockchain.scripthash.get_balance', [scripthash]) for scripthash in scripthashes]
+    try:
+        # Sin lotes: una petición por viaje de ida y vuelta (muestra reducida)
+        pool = ElectrumPool(direcciones[:1])
+        await pool.connect()
+        muestra = llamadas[:max(1, min(len(llamadas), int(2 / max(latencia, 1e-3))))]
+        inicio = time.perf_counter()
+        for metodo, parametros in muestra:
+            await pool.request(metodo, parametros)
+        sueltas = len(muestra) / (time.perf_counter() - inicio)
+        await pool.close()
+
+        for etiqueta, conjunto in (("Lotes, 1 servidor", direcciones[:1]),
+                                   (f"Lotes, {num_servidores} servidores", direcciones)):
+            pool = ElectrumPool(conjunto)
+            await pool.connect()
+            inicio = time.perf_counter()
+            resultados = await pool.batch(llamadas)
+            duracion = time.perf_counter() - inicio
+            await pool.close()
+            assert [r['confirmed'] for r in resultados] == list(range(num_scripthashes))
+            print(f"{etiqueta:22}: {num_scripthashes / duracion:10,.0f} peticiones/s "
+                  f"({duracion:.2f} s)")
+        print(f"{'Sin lotes':22}: {sueltas:10,.0f} peticiones/s")
+    finally:
+        for servidor in servidores:
+            await servidor.close()
+
+
+def main():
+    num_scripthashes = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    latencia = (float(sys.argv[2]) if len(sys.argv) > 2 else 20.0) / 1000
+    num_servidores = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+
+    asyncio.run(comprobar_descubrimiento(latencia))
+    print(f"{num_scripthashes} scripthashes, latencia {latencia * 1000:.0f} ms")
+    asyncio.run(medir(num_scripthashes, latencia, num_servidores))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Derivación secuencial rápida frente a ``BIP32Key.ChildKey``.
+
+Mide ambos caminos sobre un rango contiguo de índices, con nodo privado y
+con nodo público. Los vectores de prueba de BIP-32 se comprueban en
+``tests/test_fast_derivation.py``.
+
+Uso:
+    python benchmarks/bench_fast_derivation.py [num_direcciones]
+"""
+
+import os
+import sys
+import time
+
+# Añadir el directorio raíz al path de Python
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bip32utils import BIP32Key
+
+from creador.fast_derivation import ChainDeriver
+from creador.secp256k1 import g_table
+
+H = 0x80000000
+
+def _public(node):
+    """Copia solo pública de un nodo de bip32utils."""
+    return BIP32Key.fromExtendedKey(node.ExtendedKey(private=False))
+
+
+def medir(nombre, funcion):
+    inicio = time.perf_counter()
+    resultado = funcion()
+    duracion = time.perf_counter() - inicio
+    return nombre, duracion, resultado
+
+
+def main():
+    num_direcciones = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+
+    inicio = time.perf_counter()
+    g_table()
+    print(f"Tabla de base fija: {time.perf_counter() - inicio:.3f} s (una vez por proceso)")
+
+    chain = BIP32Key.fromEntropy(bytes(range(32))).ChildKey(44 + H).ChildKey(H).ChildKey(H).ChildKey(0)
+    for etiqueta, node in (("privado", chain), ("público", _public(chain))):
+        _, t_ref, ref = medir("ChildKey", lambda: [node.ChildKey(i).PublicKey()
+                                                   for i in range(num_direcciones)])
+        deriver = ChainDeriver.from_bip32(node)
+        _, t_fast, fast = medir("Lotes", lambda: [pk for _, pk, _ in deriver.iter_range(0, num_direcciones)])
+        assert ref == fast, "Las claves derivadas no coinciden"
+        print(f"Nodo {etiqueta:8} {num_direcciones} índices: ChildKey {t_ref:7.3f} s | "
+              f"lotes {t_fast:7.3f} s | {t_ref / t_fast:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Cadena de cabeceras en un archivo proyectado en memoria.
+
+Genera cabeceras válidas de regtest y mide:
+
+- la validación de lotes de 2000 cabeceras en este proceso y con la prueba de
+  trabajo repartida entre procesos;
+- la reapertura del archivo (sin releer ni validar la cadena) y el acceso
+  por altura;
+- una reorganización con una rama más larga y el rechazo de una más corta.
+
+Uso:
+    python benchmarks/bench_headers.py [cabeceras] [procesos]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+# Añadir el directorio raíz al path de Python
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from creador.blocks import double_sha256
+from creador.headers import GENESIS_HEADER, HeaderStore, header_time
+
+from bench_spv import minar_cabecera
+
+LOTE = 2000
+
+
+def generar_rama(anterior, tiempo, cantidad):
+    """Cabeceras enlazadas a partir del hash ``anterior``."""
+    cabeceras = []
+    for i in range(cantidad):
+        cabecera = minar_cabecera(anterior, tiempo + (i + 1) * 600)
+        anterior = double_sha256(cabecera)
+        cabeceras.append(cabecera)
+    return cabeceras
+
+
+def conectar(almacen, cabeceras):
+    """Añade las cabeceras por lotes como las entrega un nodo."""
+    inicio = time.perf_counter()
+    for i in range(0, len(cabeceras), LOTE):
+        almacen.connect(cabeceras[i:i + LOTE])
+    return time.perf_counter() - inicio
+
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    procesos = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+
+    genesis = GENESIS_HEADER['regtest']
+    inicio = time.perf_counter()
+    cadena = generar_rama(double_sha256(genesis), header_time(genesis), cantidad)
+    print(f"Cadena: {cantidad:,} cabeceras generadas en {time.perf_counter() - inicio:.1f} s")
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, 'cabeceras.dat')
+        with HeaderStore(None, 'regtest') as almacen:
+            t_serie = conectar(almacen, cadena)
+        with HeaderStore(ruta, 'regtest', workers=procesos) as almacen:
+            t_paralelo = conectar(almacen, cadena)
+            assert almacen.tip_height == cantidad
+        print(f"Validación: {cantidad / t_serie:,.0f} cabeceras/s en este proceso | "
+              f"{cantidad / t_paralelo:,.0f} cabeceras/s con {procesos} procesos y archivo "
+              f"({t_serie / t_paralelo:.1f}x)")
+
+        # Reapertura: solo se mira el tamaño del archivo
+        inicio = time.perf_counter()
+        almacen = HeaderStore(ruta, 'regtest')
+        t_apertura = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        for altura in range(0, cantidad + 1, 7):
+            almacen.hash_at(altura)
+        t_acceso = (time.perf_counter() - inicio) / len(range(0, cantidad + 1, 7))
+        assert almacen.tip_hash == double_sha256(cadena[-1])
+        print(f"Reapertura: {t_apertura * 1000:.2f} ms para {almacen.tip_height:,} cabeceras "
+              f"({os.path.getsize(ruta) / 2**20:.1f} MiB) | hash por altura {t_acceso * 1e6:.1f} µs")
+
+        # Rama más corta desde 20 bloques atrás: menos trabajo, se descarta
+        base = cantidad - 20
+        corta = generar_rama(almacen.hash_at(base), header_time(almacen.header_at(base)) + 1, 5)
+        resultado = almacen.connect(corta)
+        assert resultado.connected == 0 and almacen.tip_hash == double_sha256(cadena[-1])
+
+        # Rama más larga desde 10 bloques atrás: reorganización (con el índice de hashes ya construido)
+        assert almacen.is_main_chain(double_sha256(cadena[-1]))
+        base = cantidad - 10
+        larga = generar_rama(almacen.hash_at(base), header_time(almacen.header_at(base)) + 1, 15)
+        inicio = time.perf_counter()
+        resultado = almacen.connect(larga)
+        t_reorg = time.perf_counter() - inicio
+        assert resultado == (15, base, 10), resultado
+        assert almacen.tip_height == base + 15 and almacen.tip_hash == double_sha256(larga[-1])
+        assert not almacen.is_main_chain(double_sha256(cadena[-1]))
+        assert almacen.is_main_chain(double_sha256(cadena[base - 1]))
+        almacen.close()
+
+        # El archivo reabierto refleja la rama nueva
+        with HeaderStore(ruta, 'regtest') as almacen:
+            assert almacen.tip_hash == double_sha256(larga[-1])
+        print(f"Reorganización de 10 bloques en {t_reorg * 1000:.1f} ms | rama más corta descartada | "
+              f"la reapertura parte de la rama nueva")
+
+
+if __name__ == "__main__":
+    main()
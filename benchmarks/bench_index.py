@@ -0,0 +1,91 @@
+"""
+Índice inverso de direcciones: construcción incremental y tiempo de consulta.
+
+Comprueba primero con direcciones reales derivadas que cada una se resuelve a
+su (cuenta, cadena, índice, tipo); después mide, con claves sintéticas, el
+volcado a disco y las consultas en memoria y sobre el archivo proyectado.
+
+Uso:
+    python benchmarks/bench_index.py [num_entradas] [num_consultas]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Añadir el directorio raíz al path de Python
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from creador.seed import SeedContext
+from creador.derivation import DerivationEngine, CHAIN_CHANGE, CHAIN_RECEIVE
+from creador.encoding import ADDR_TYPE_MULTI, ADDR_TYPES, script_pubkey, decode_address
+from creador.index import AddressIndex, TYPE_CODES
+
+MNEMONICO = "abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon about"
+
+
+def comprobar_direcciones(directorio):
+    """Indexa direcciones reales y comprueba que cada una se encuentra."""
+    motor = DerivationEngine(SeedContext(MNEMONICO, language="english"), ADDR_TYPE_MULTI)
+    ruta = os.path.join(directorio, 'comprobacion.idx')
+    registros = {chain: list(motor.derive_range(chain, 0, 50)) for chain in (CHAIN_RECEIVE, CHAIN_CHANGE)}
+
+    indice = AddressIndex(ruta)
+    indice.add_records(registros[CHAIN_RECEIVE], account=0, chain=CHAIN_RECEIVE)
+    indice.flush()  # Una parte en disco y otra pendiente en memoria
+    indice.add_records(registros[CHAIN_CHANGE], account=0, chain=CHAIN_CHANGE)
+
+    for chain, lista in registros.items():
+        for registro in lista:
+            for tipo, direccion in registro['direcciones'].items():
+                entrada = indice.lookup_address(direccion)
+                assert entrada == (0, chain, registro['indice'], tipo), direccion
+                assert indice.lookup_script(script_pubkey(decode_address(direccion)[1], tipo)) == entrada
+    assert indice.lookup_address("1BoatSLRHtKNngkdXEeobR76b53LETtpyT") is None
+    indice.close()
+    print(f"Direcciones reales: {2 * 50 * len(ADDR_TYPES)} encontradas (disco y memoria)")
+
+
+def medir_consultas(indice, claves, num_consultas):
+    muestra = [random.choice(claves) for _ in range(num_consultas)]
+    inicio = time.perf_counter()
+    for clave in muestra:
+        assert indice.lookup(clave) is not None
+    return (time.perf_counter() - inicio) / num_consultas * 1e6
+
+
+def main():
+    num_entradas = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    num_consultas = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+
+    with tempfile.TemporaryDirectory() as directorio:
+        comprobar_direcciones(directorio)
+
+        codigos = list(TYPE_CODES.values())
+        claves = [bytes((codigos[i % 3],)) + os.urandom(20) for i in range(num_entradas)]
+        ruta = os.path.join(directorio, 'sintetico.idx')
+        indice = AddressIndex(ruta, flush_threshold=None)
+
+        inicio = time.perf_counter()
+        for i, clave in enumerate(claves):
+            indice.add(clave, 0, 0, i)
+        print(f"Inserción en memoria de {num_entradas} entradas: {time.perf_counter() - inicio:.2f} s")
+        print(f"Consulta en memoria: {medir_consultas(indice, claves, num_consultas):.2f} µs")
+
+        inicio = time.perf_counter()
+        indice.flush()
+        print(f"Volcado ordenado a disco: {time.perf_counter() - inicio:.2f} s "
+              f"({os.path.getsize(ruta) / 2 ** 20:.1f} MiB)")
+        indice.close()
+
+        indice = AddressIndex(ruta)
+        print(f"Consulta sobre el archivo proyectado: {medir_consultas(indice, claves, num_consultas):.2f} µs")
+        fallos = sum(indice.lookup(b'\x02' + os.urandom(20)) is not None for _ in range(num_consultas))
+        print(f"Falsos positivos con claves aleatorias: {fallos}")
+        indice.close()
+
+
+if __name__ == "__main__":
+    main()
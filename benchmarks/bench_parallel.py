@@ -0,0 +1,57 @@
+"""
+Curva de escalado de la generación de direcciones en paralelo.
+
+Uso:
+    python benchmarks/bench_parallel.py [num_direcciones] [max_procesos] [tam_bloque]
+"""
+
+import os
+import sys
+import time
+
+# Añadir el directorio raíz al path de Python
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mnemonic import Mnemonic
+
+from creador.seed import SeedContext
+from creador.derivation import DerivationEngine, CHAIN_RECEIVE
+from creador.parallel import ParallelDeriver, DEFAULT_CHUNK_SIZE
+
+
+def main():
+    num_direcciones = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    max_procesos = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+    tam_bloque = int(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_CHUNK_SIZE
+
+    contexto = SeedContext(Mnemonic("spanish").generate(strength=256))
+    motor = DerivationEngine(contexto)
+    xkey = motor.chain_extended_key(CHAIN_RECEIVE)
+
+    procesos = []
+    n = 1
+    while n < max_procesos:
+        procesos.append(n)
+        n *= 2
+    procesos.append(max_procesos)
+
+    print(f"Direcciones: {num_direcciones}  Bloque: {tam_bloque}  CPUs: {os.cpu_count()}")
+    print(f"{'Procesos':>8} {'Tiempo (s)':>11} {'Dir/s':>10} {'Escalado':>9}")
+
+    base = None
+    ultima = None
+    for workers in procesos:
+        with ParallelDeriver(workers=workers, chunk_size=tam_bloque) as deriver:
+            inicio = time.perf_counter()
+            for registro in deriver.derive_range(xkey, motor.addr_type, 0, num_direcciones):
+                ultima = registro
+            duracion = time.perf_counter() - inicio
+
+        assert ultima['indice'] == num_direcciones - 1
+        velocidad = num_direcciones / duracion
+        base = base or velocidad
+        print(f"{workers:>8} {duracion:>11.2f} {velocidad:>10.0f} {velocidad / base:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Registro ``DerivedAddress`` frente al diccionario con las cadenas ya codificadas.
+
+Parte de las mismas claves ya derivadas (la aritmética de curva no se mide) y
+compara, por registro:
+
+- construcción: diccionario con dirección, WIF y clave pública en texto frente
+  a ``DerivedAddress`` con las claves en binario;
+- memoria retenida por una lista de registros (``tracemalloc``);
+- el bucle de generación de la aplicación: construir el registro, indexarlo en
+  el índice inverso y guardarlo en el almacén columnar;
+- lectura de campos: ``registro['indice']`` frente a ``registro.index``.
+
+Comprueba además que ambos registros son iguales y se serializan igual.
+
+Uso:
+    python benchmarks/bench_record.py [num_registros]
+"""
+
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+# Añadir el directorio raíz al path de Python
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from creador.columnar import AddressStore
+from creador.derivation import CHAIN_RECEIVE, DerivationEngine
+from creador.encoding import ADDR_TYPE_P2WPKH, ADDR_TYPES, encode_hash160, encode_wif, hash160
+from creador.fast_derivation import ChainDeriver
+from creador.index import AddressIndex
+from creador.record import DerivedAddress
+from creador.seed import SeedContext
+
+MNEMONICO = "abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon about"
+RED = 'mainnet'
+
+
+def diccionario(indice, publica, privada):
+    """Registro con el formato anterior de ``derive_from_chain_key``."""
+    return {
+        'indice': indice,
+        'direccion': encode_hash160(hash160(publica), ADDR_TYPE_P2WPKH, RED),
+        'clave_privada': encode_wif(privada, RED) if privada is not None else None,
+        'clave_publica': publica.hex(),
+        'tipo': ADDR_TYPE_P2WPKH,
+    }
+
+
+def derivado(indice, publica, privada):
+    return DerivedAddress(indice, ADDR_TYPE_P2WPKH, publica, privada, RED)
+
+
+def cronometrar(funcion):
+    inicio = time.perf_counter()
+    resultado = funcion()
+    return resultado, time.perf_counter() - inicio
+
+
+def memoria(funcion):
+    tracemalloc.start()
+    resultado = funcion()
+    retenida = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return resultado, retenida
+
+
+def generar(constructor, claves, motor):
+    """Bucle de generación: registro, índice inverso y almacén columnar."""
+    indice = AddressIndex()
+    almacen = AddressStore(RED, engine=motor)
+    almacen.extend(indice.feed((constructor(*clave) for clave in claves), 0, CHAIN_RECEIVE, ADDR_TYPES))
+    return almacen
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    motor = DerivationEngine(SeedContext(MNEMONICO, language="english"), ADDR_TYPE_P2WPKH, purpose=84)
+    inicio = time.perf_counter()
+    claves = ChainDeriver.for_node(motor.chain_key(CHAIN_RECEIVE)).derive_range(0, total)
+    print(f"{total:,} claves derivadas en {time.perf_counter() - inicio:.1f} s (no se incluyen en las medidas)")
+
+    # Los dos registros son intercambiables
+    for clave in claves[:100]:
+        anterior, nuevo = diccionario(*clave), derivado(*clave)
+        assert anterior == nuevo and nuevo == anterior
+        assert json.dumps(anterior) == json.dumps(nuevo, default=dict)
+
+    # Construcción
+    dicts, t_dicts = cronometrar(lambda: [diccionario(*clave) for clave in claves])
+    registros, t_registros = cronometrar(lambda: [derivado(*clave) for clave in claves])
+    print(f"Construcción: diccionario {t_dicts / total * 1e6:.2f} µs | DerivedAddress "
+          f"{t_registros / total * 1e6:.2f} µs ({t_dicts / t_registros:.1f}x)")
+
+    # Lectura de campos
+    _, t_clave = cronometrar(lambda: sum(registro['indice'] for registro in dicts))
+    _, t_atributo = cronometrar(lambda: sum(registro.index for registro in registros))
+    _, t_compat = cronometrar(lambda: sum(registro['indice'] for registro in registros))
+    print(f"Lectura del índice: dict['indice'] {t_clave / total * 1e9:.0f} ns | .index "
+          f"{t_atributo / total * 1e9:.0f} ns | DerivedAddress['indice'] {t_compat / total * 1e9:.0f} ns")
+    del dicts, registros
+
+    # Memoria retenida
+    _, m_dicts = memoria(lambda: [diccionario(*clave) for clave in claves])
+    _, m_registros = memoria(lambda: [derivado(*clave) for clave in claves])
+    print(f"Memoria: diccionario {m_dicts / total:.0f} bytes/registro | DerivedAddress "
+          f"{m_registros / total:.0f} bytes/registro ({m_dicts / m_registros:.1f}x)")
+
+    # Bucle de generación de la aplicación
+    almacen_dicts, t_dicts = cronometrar(lambda: generar(diccionario, claves, motor))
+    almacen, t_registros = cronometrar(lambda: generar(derivado, claves, motor))
+    assert almacen[total - 1] == almacen_dicts[total - 1] == diccionario(*claves[-1])
+    print(f"Generación (registro + índice + almacén): diccionario {total / t_dicts:,.0f} dir/s | "
+          f"DerivedAddress {total / t_registros:,.0f} dir/s ({t_dicts / t_registros:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Comparativa de tiempos: estiramiento PBKDF2 por dirección frente a un único
+contexto de semilla por sesión.
+
+Uso:
+    python benchmarks/bench_seed.py [num_direcciones]
+"""
+
+import os
+import sys
+import time
+
+# Añadir el directorio raíz al path de Python
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mnemonic import Mnemonic
+from bip32utils import BIP32Key
+
+from creador.seed import SeedContext
+
+HARDENED = 0x80000000
+
+
+def _derivar(root_key, indice):
+    """Recorre m/44'/0'/0'/0/indice y devuelve la clave pública comprimida."""
+    child_key = root_key.ChildKey(44 + HARDENED)
+    child_key = child_key.ChildKey(0 + HARDENED)
+    child_key = child_key.ChildKey(0 + HARDENED)
+    child_key = child_key.ChildKey(0)
+    return child_key.ChildKey(indice).PublicKey()
+
+
+def antes(semilla, num_direcciones):
+    """Comportamiento anterior: la semilla se estira para cada dirección."""
+    resultado = []
+    for i in range(num_direcciones):
+        seed_bytes = Mnemonic("spanish").to_seed(semilla)
+        resultado.append(_derivar(BIP32Key.fromEntropy(seed_bytes), i))
+    return resultado
+
+
+def despues(semilla, num_direcciones):
+    """Comportamiento actual: un único contexto de semilla por sesión."""
+    contexto = SeedContext(semilla)
+    return [_derivar(contexto.root, i) for i in range(num_direcciones)]
+
+
+def main():
+    num_direcciones = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    semilla = Mnemonic("spanish").generate(strength=256)
+
+    inicio = time.perf_counter()
+    claves_antes = antes(semilla, num_direcciones)
+    t_antes = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    claves_despues = despues(semilla, num_direcciones)
+    t_despues = time.perf_counter() - inicio
+
+    assert claves_antes == claves_despues, "Las claves derivadas no coinciden"
+
+    print(f"Direcciones:           {num_direcciones}")
+    print(f"PBKDF2 por dirección:  {t_antes:8.3f} s")
+    print(f"Contexto de semilla:   {t_despues:8.3f} s")
+    print(f"Aceleración:           {t_antes / t_despues:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Modo ligero (SPV) con filtros BIP-158 contra un nodo P2P local.
+
+Genera una cadena sintética con pagos a la cartera y gastos de esas salidas
+y la sirve con ``MockPeer``. Comprueba que el motor SPV obtiene el mismo saldo
+que el recorrido completo de la cadena descargando solo los bloques cuyos
+filtros coinciden, y compara el cruce por mezcla ordenada (un SipHash por
+script y filtro, un recorrido del filtro) con una consulta por script.
+
+Uso:
+    python benchmarks/bench_spv.py [bloques] [tx_por_bloque] [scripts_cartera] [latencia_ms]
+"""
+
+import asyncio
+import os
+import random
+import sys
+import time
+
+# Añadir el directorio raíz al path de Python
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from creador.blocks import double_sha256, encode_varint
+from creador.gcs import ItemSet, match_any
+from creador.headers import HeaderStore, bits_to_target
+from creador.index import AddressIndex, key_script_pubkey
+from creador.p2p import PeerAddress, PeerConnection
+from creador.p2p_mock import MockPeer
+from creador.spv import SpvEngine
+
+from bench_utxo import serializar_tx
+
+PROB_BLOQUE_CON_PAGO = 0.03
+PROB_BLOQUE_CON_GASTO = 0.02
+REGTEST_BITS = 0x207fffff
+
+
+def minar_cabecera(anterior, tiempo):
+    """Cabecera con prueba de trabajo válida para la dificultad mínima de regtest."""
+    objetivo = bits_to_target(REGTEST_BITS)
+    base = (1).to_bytes(4, 'little') + anterior + os.urandom(32) + tiempo.to_bytes(4, 'little') \
+        + REGTEST_BITS.to_bytes(4, 'little')
+    nonce = 0
+    while int.from_bytes(double_sha256(base + nonce.to_bytes(4, 'little')), 'little') > objetivo:
+        nonce += 1
+    return base + nonce.to_bytes(4, 'little')
+
+
+def generar_cadena(bloques, tx_por_bloque, claves, azar):
+    """Cadena enlazada de bloques y saldo esperado de la cartera."""
+    cadena = []
+    anterior = bytes(32)
+    esperados = {}
+    for altura in range(bloques):
+        txs = []
+        for i in range(tx_por_bloque):
+            entradas = [os.urandom(32) + bytes(4)]
+            salidas = [(azar.randrange(1_000, 10**8), b'\x00\x14' + os.urandom(20))]
+            if i == 1 and esperados and azar.random() < PROB_BLOQUE_CON_GASTO:
+                outpoint = azar.choice(list(esperados))
+                del esperados[outpoint]
+                entradas[0] = outpoint
+            if i == 2 and azar.random() < PROB_BLOQUE_CON_PAGO:
+                salidas.append((azar.randrange(1_000, 10**8), key_script_pubkey(azar.choice(claves))))
+            raw, txid = serializar_tx(entradas, salidas, segwit=True)
+            if len(salidas) == 2:
+                esperados[txid + (1).to_bytes(4, 'little')] = salidas[1][0]
+            txs.append(raw)
+        cabecera = minar_cabecera(anterior, altura * 600)
+        anterior = double_sha256(cabecera)
+        cadena.append(cabecera + encode_varint(len(txs)) + b''.join(txs))
+    return cadena, sum(esperados.values())
+
+
+async def sincronizar(nodo, cartera):
+    peer = PeerConnection(PeerAddress('127.0.0.1', nodo.port), 'regtest')
+    cabeceras = HeaderStore(None, 'regtest', genesis_header=nodo.blocks[0][:80])
+    motor = SpvEngine(peer, cartera, 'regtest', headers=cabeceras)
+    try:
+        stats = await motor.sync()
+        return motor, stats
+    finally:
+        await motor.close()
+
+
+def main():
+    bloques = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    tx_por_bloque = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    scripts_cartera = int(sys.argv[3]) if len(sys.argv) > 3 else 100
+    latencia = (float(sys.argv[4]) if len(sys.argv) > 4 else 20.0) / 1000
+
+    azar = random.Random(3)
+    claves = [b'\x02' + azar.randbytes(20) for _ in range(scripts_cartera)]
+    cartera = AddressIndex()
+    for i, clave in enumerate(claves):
+        cartera.add(clave, 0, 0, i)
+
+    inicio = time.perf_counter()
+    cadena, saldo_esperado = generar_cadena(bloques, tx_por_bloque, claves, azar)
+    nodo = MockPeer(cadena, latency=latencia)
+    tamano = sum(len(bloque) for bloque in cadena)
+    tamano_filtros = sum(len(filtro) for filtro in nodo.filters)
+    print(f"Cadena: {bloques} bloques ({tamano / 2**20:.1f} MiB, filtros {tamano_filtros / 2**20:.2f} MiB) "
+          f"generada en {time.perf_counter() - inicio:.1f} s")
+
+    async def escenario():
+        await nodo.start()
+        try:
+            return await sincronizar(nodo, cartera)
+        finally:
+            await nodo.close()
+
+    motor, stats = asyncio.run(escenario())
+    assert motor.balance() == saldo_esperado, (motor.balance(), saldo_esperado)
+    print(f"SPV: {stats.filters} filtros en {stats.seconds:.2f} s ({stats.filters / stats.seconds:,.0f} filtros/s) | "
+          f"{stats.matched} bloques descargados de {bloques} ({nodo.blocks_served}), "
+          f"{stats.false_positives} falsos positivos | {nodo.bytes_served / 2**20:.2f} MiB recibidos de "
+          f"{(tamano + tamano_filtros) / 2**20:.1f} MiB | saldo {motor.balance():,} sat correcto")
+
+    # Cruce por mezcla ordenada frente a una consulta por script (muestra de filtros)
+    muestra = list(zip(nodo.hashes, nodo.filters))[:max(1, min(bloques, 100))]
+    scripts = [key_script_pubkey(clave) for clave in claves]
+    conjunto = ItemSet(scripts)
+    inicio = time.perf_counter()
+    mezcla = [match_any(filtro, digest, conjunto) for digest, filtro in muestra]
+    t_mezcla = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    sueltas = [any(match_any(filtro, digest, [script]) for script in scripts) for digest, filtro in muestra]
+    t_sueltas = time.perf_counter() - inicio
+    assert mezcla == sueltas
+    print(f"Cruce de {len(scripts)} scripts con {len(muestra)} filtros: mezcla ordenada "
+          f"{t_mezcla / len(muestra) * 1000:.2f} ms/filtro | una consulta por script "
+          f"{t_sueltas / len(muestra) * 1000:.2f} ms/filtro ({t_sueltas / t_mezcla:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
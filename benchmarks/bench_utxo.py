@@ -0,0 +1,206 @@
+"""
+Índice de UTXO sobre archivos de bloques sintéticos con el formato de bitcoind.
+
+Genera archivos ``blk*.dat`` con transacciones legacy y segwit. Algunas
+salidas pagan a scripts de la cartera y algunas transacciones posteriores las
+gastan. En cada frontera entre archivos se coloca un bloque fuera de orden,
+como hace bitcoind al descargar bloques en paralelo: gasta una salida del
+archivo siguiente.
+
+Comprueba el conjunto de UTXO y mide:
+
+1. la indexación completa (MB/s y bloques/s);
+2. la reanudación tras añadir bloques al último archivo (solo se lee lo nuevo);
+3. la misma indexación sobre archivos ofuscados con ``xor.dat``.
+
+Uso:
+    python benchmarks/bench_utxo.py [archivos] [bloques_por_archivo] [tx_por_bloque] [procesos]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Añadir el directorio raíz al path de Python
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from creador.blocks import NETWORK_MAGIC, double_sha256, encode_varint
+from creador.index import AddressIndex, key_script_pubkey
+from creador.utxo import UtxoIndexer, deobfuscate
+
+MAGIC = NETWORK_MAGIC['mainnet']
+CLAVES_CARTERA = 2000
+PROB_SALIDA_CARTERA = 0.01
+PROB_GASTO = 0.3
+
+
+def serializar_tx(entradas, salidas, segwit):
+    """Serializa una transacción y devuelve (bytes, txid)."""
+    version = (2).to_bytes(4, 'little')
+    cuerpo = [encode_varint(len(entradas))]
+    for outpoint in entradas:
+        cuerpo.append(outpoint + b'\x00' + b'\xff\xff\xff\xff' if segwit
+                      else outpoint + b'\x6a' + os.urandom(106) + b'\xff\xff\xff\xff')
+    cuerpo.append(encode_varint(len(salidas)))
+    for importe, script in salidas:
+        cuerpo.append(importe.to_bytes(8, 'little') + encode_varint(len(script)) + script)
+    cuerpo = b''.join(cuerpo)
+    locktime = b'\x00\x00\x00\x00'
+    txid = double_sha256(version, cuerpo, locktime)
+    if segwit:
+        testigos = b''.join(b'\x02\x48' + os.urandom(72) + b'\x21' + os.urandom(33) for _ in entradas)
+        return version + b'\x00\x01' + cuerpo + testigos + locktime, txid
+    return version + cuerpo + locktime, txid
+
+
+class Generador:
+    """Genera bloques sintéticos y lleva la cuenta de los UTXO esperados."""
+
+    def __init__(self, claves, tx_por_bloque, semilla=1):
+        self.claves = claves
+        self.tx_por_bloque = tx_por_bloque
+        self.azar = random.Random(semilla)
+        self.esperados = {}        # outpoint -> importe
+        self.ultimas = []          # Salidas de la cartera del último bloque generado
+        self.punta = bytes(32)     # Hash del último bloque: cada bloque enlaza con el anterior
+
+    def bloque(self, gastar=(), pagos=True):
+        """Genera un bloque; ``gastar`` fuerza el gasto de esas salidas y ``pagos`` permite pagar a la cartera."""
+        txs = []
+        nuevas = []
+        gastar = [outpoint for outpoint in gastar if outpoint in self.esperados]
+        for i in range(self.tx_por_bloque):
+            entradas = [os.urandom(32) + self.azar.randrange(4).to_bytes(4, 'little') for _ in range(2)]
+            if gastar and i % 7 == 1:
+                entradas[0] = gastar.pop()
+                del self.esperados[entradas[0]]
+            elif self.esperados and self.azar.random() < PROB_GASTO * PROB_SALIDA_CARTERA:
+                outpoint = self.azar.choice(list(self.esperados))
+                entradas[0] = outpoint
+                del self.esperados[outpoint]
+            salidas = []
+            cartera = []
+            for vout in range(2):
+                importe = self.azar.randrange(1_000, 10_000_000)
+                if pagos and self.azar.random() < PROB_SALIDA_CARTERA:
+                    salidas.append((importe, key_script_pubkey(self.azar.choice(self.claves))))
+                    cartera.append((vout, importe))
+                else:
+                    salidas.append((importe, b'\x00\x14' + os.urandom(20)))
+            raw, txid = serializar_tx(entradas, salidas, segwit=i % 2 == 0)
+            for vout, importe in cartera:
+                outpoint = txid + vout.to_bytes(4, 'little')
+                self.esperados[outpoint] = importe
+                nuevas.append(outpoint)
+            txs.append(raw)
+        cabecera = (1).to_bytes(4, 'little') + self.punta + os.urandom(36) + (0x207fffff).to_bytes(4, 'little') \
+            + bytes(4)
+        self.punta = double_sha256(cabecera)
+        self.ultimas = nuevas
+        return cabecera + encode_varint(len(txs)) + b''.join(txs)
+
+
+def escribir_archivos(directorio, generador, archivos, bloques_por_archivo):
+    """Escribe los archivos con un bloque fuera de orden en cada frontera."""
+    contenido = [[] for _ in range(archivos)]
+    for numero in range(archivos):
+        for posicion in range(bloques_por_archivo):
+            if numero > 0 and posicion == 1:
+                # Gasta salidas del primer bloque de este archivo, pero se guarda en el anterior
+                bloque = generador.bloque(gastar=generador.ultimas[:2])
+                contenido[numero - 1].append(bloque)
+                continue
+            bloque = generador.bloque()
+            if posicion == 0 and numero > 0:
+                while not generador.ultimas:
+                    # Forzar salidas de la cartera en el primer bloque del archivo
+                    contenido[numero].append(bloque)
+                    bloque = generador.bloque()
+            contenido[numero].append(bloque)
+    for numero, bloques in enumerate(contenido):
+        with open(os.path.join(directorio, f"blk{numero:05d}.dat"), 'wb') as f:
+            for bloque in bloques:
+                f.write(MAGIC + len(bloque).to_bytes(4, 'little') + bloque)
+            f.write(b'\x00' * 4096)  # Relleno de la reserva previa de espacio
+
+
+def comprobar(indexador, generador):
+    obtenidos = {(utxo.txid, utxo.vout): utxo.value for utxo in indexador.utxos()}
+    esperados = {(outpoint[:32][::-1].hex(), int.from_bytes(outpoint[32:], 'little')): importe
+                 for outpoint, importe in generador.esperados.items()}
+    assert obtenidos == esperados, (len(obtenidos), len(esperados))
+    return len(obtenidos)
+
+
+def main():
+    archivos = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    bloques_por_archivo = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    tx_por_bloque = int(sys.argv[3]) if len(sys.argv) > 3 else 400
+    procesos = int(sys.argv[4]) if len(sys.argv) > 4 else os.cpu_count() or 1
+
+    azar = random.Random(7)
+    claves = [b'\x02' + azar.randbytes(20) for _ in range(CLAVES_CARTERA)]
+    cartera = AddressIndex()
+    for i, clave in enumerate(claves):
+        cartera.add(clave, 0, 0, i)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        bloques_dir = os.path.join(directorio, 'blocks')
+        os.makedirs(bloques_dir)
+        generador = Generador(claves, tx_por_bloque)
+        inicio = time.perf_counter()
+        escribir_archivos(bloques_dir, generador, archivos, bloques_por_archivo)
+        tamano = sum(os.path.getsize(os.path.join(bloques_dir, nombre)) for nombre in os.listdir(bloques_dir))
+        print(f"Archivos generados: {archivos} ({tamano / 2**20:.1f} MiB) en {time.perf_counter() - inicio:.1f} s")
+
+        estado = os.path.join(directorio, 'utxo.sqlite3')
+        with UtxoIndexer(bloques_dir, cartera, estado, workers=procesos) as indexador:
+            stats = indexador.update()
+            utxos = comprobar(indexador, generador)
+        print(f"Indexación completa ({procesos} procesos): {stats.blocks} bloques en {stats.seconds:.2f} s | "
+              f"{stats.bytes / 2**20 / stats.seconds:.1f} MiB/s | {stats.blocks / stats.seconds:,.0f} bloques/s | "
+              f"{stats.outputs} salidas y {stats.spends} gastos de la cartera | {utxos} UTXO")
+
+        # Reanudación: un archivo nuevo y bloques añadidos al final del anterior (sobre el relleno),
+        # uno de ellos fuera de orden gastando una salida del archivo nuevo
+        bloques_nuevos = [generador.bloque(pagos=False) for _ in range(4)]
+        primero = generador.bloque()
+        while not generador.ultimas:
+            bloques_nuevos.append(primero)
+            primero = generador.bloque()
+        bloques_nuevos.append(generador.bloque(gastar=generador.ultimas[:2], pagos=False))
+        ultimo = os.path.join(bloques_dir, f"blk{archivos - 1:05d}.dat")
+        with open(ultimo, 'r+b') as f:
+            f.seek(os.path.getsize(ultimo) - 4096)
+            for bloque in bloques_nuevos:
+                f.write(MAGIC + len(bloque).to_bytes(4, 'little') + bloque)
+            f.truncate()
+        with open(os.path.join(bloques_dir, f"blk{archivos:05d}.dat"), 'wb') as f:
+            f.write(MAGIC + len(primero).to_bytes(4, 'little') + primero)
+        with UtxoIndexer(bloques_dir, cartera, estado, workers=procesos) as indexador:
+            stats = indexador.update()
+            utxos = comprobar(indexador, generador)
+        print(f"Reanudación: {stats.blocks} bloques nuevos, {stats.bytes / 2**20:.2f} MiB leídos en "
+              f"{stats.seconds:.2f} s | {utxos} UTXO")
+
+        # Archivos ofuscados con xor.dat (bitcoind 28 o posterior)
+        clave_xor = os.urandom(8)
+        for nombre in os.listdir(bloques_dir):
+            ruta = os.path.join(bloques_dir, nombre)
+            with open(ruta, 'rb') as f:
+                datos = f.read()
+            with open(ruta, 'wb') as f:
+                f.write(deobfuscate(datos, clave_xor, 0))
+        with open(os.path.join(bloques_dir, 'xor.dat'), 'wb') as f:
+            f.write(clave_xor)
+        with UtxoIndexer(bloques_dir, cartera, workers=procesos) as indexador:
+            stats = indexador.update()
+            utxos = comprobar(indexador, generador)
+        print(f"Ofuscados con XOR: {stats.blocks} bloques en {stats.seconds:.2f} s | "
+              f"{stats.bytes / 2**20 / stats.seconds:.1f} MiB/s | {utxos} UTXO")
+
+
+if __name__ == "__main__":
+    main()
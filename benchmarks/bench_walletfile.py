@@ -0,0 +1,109 @@
+"""
+Cartera en flujo frente al formato JSON anterior.
+
+Compara, con registros del mismo tamaño que los de la aplicación:
+
+- guardar: ``json.dump(..., indent=4)`` de la cartera completa frente a la
+  escritura línea a línea con índice;
+- abrir y mostrar la primera página: ``json.load`` del archivo completo frente
+  a leer cabecera, índice y un bloque de registros;
+- añadir direcciones: reescribir el JSON completo frente a anexar las líneas.
+
+Uso:
+    python benchmarks/bench_walletfile.py [num_direcciones] [num_nuevas]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Añadir el directorio raíz al path de Python
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from creador.walletfile import WalletFile, write_wallet
+
+FILAS_POR_PAGINA = 40
+
+
+def registro(indice):
+    """Registro con campos de la misma longitud que los reales (P2WPKH)."""
+    return {
+        'indice': indice,
+        'direccion': f"bc1q{indice:038d}",
+        'clave_privada': f"L{indice:051d}",
+        'clave_publica': f"02{indice:064x}",
+        'tipo': 'p2wpkh',
+    }
+
+
+def medir(funcion, memoria=False):
+    """Tiempo y, si se pide, pico de memoria de una llamada (el seguimiento ralentiza la llamada)."""
+    if memoria:
+        tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = funcion()
+    segundos = time.perf_counter() - inicio
+    pico = tracemalloc.get_traced_memory()[1] if memoria else 0
+    if memoria:
+        tracemalloc.stop()
+    return resultado, segundos, pico
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    nuevas = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000
+    metadatos = {'version': '2.0', 'semilla': 'abandon ' * 11 + 'about', 'tipo': 'p2wpkh'}
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta_json = os.path.join(directorio, 'cartera.json')
+        ruta_flujo = os.path.join(directorio, 'cartera.cartera')
+
+        def guardar_json(cantidad):
+            with open(ruta_json, 'w', encoding='utf-8') as f:
+                json.dump(dict(metadatos, direcciones=[registro(i) for i in range(cantidad)]),
+                          f, indent=4, ensure_ascii=False)
+
+        _, t_json, _ = medir(lambda: guardar_json(total))
+        _, t_flujo, _ = medir(lambda: write_wallet(ruta_flujo, metadatos, map(registro, range(total))))
+        print(f"Guardar {total:,} direcciones: JSON {t_json:.2f} s "
+              f"({os.path.getsize(ruta_json) / 2**20:.0f} MiB en disco) | flujo {t_flujo:.2f} s "
+              f"({os.path.getsize(ruta_flujo) / 2**20:.0f} MiB en disco)")
+
+        def abrir_json():
+            with open(ruta_json, 'r', encoding='utf-8') as f:
+                direcciones = json.load(f)['direcciones']
+            return direcciones[:FILAS_POR_PAGINA]
+
+        def abrir_flujo():
+            cartera = WalletFile(ruta_flujo)
+            return cartera, cartera[:FILAS_POR_PAGINA]
+
+        pagina_json, t_json, m_json = medir(abrir_json, memoria=True)
+        (cartera, pagina_flujo), t_flujo, m_flujo = medir(abrir_flujo, memoria=True)
+        assert pagina_json == pagina_flujo and len(cartera) == total
+        print(f"Abrir y mostrar la primera página: JSON {t_json * 1000:.0f} ms ({m_json / 2**20:.0f} MiB) | "
+              f"flujo {t_flujo * 1000:.2f} ms ({m_flujo / 2**10:.0f} KiB) ({t_json / t_flujo:,.0f}x)")
+
+        # Acceso aleatorio a una página cualquiera
+        inicio = time.perf_counter()
+        pagina = cartera[total // 2:total // 2 + FILAS_POR_PAGINA]
+        t_pagina = time.perf_counter() - inicio
+        assert pagina[0] == registro(total // 2)
+
+        # Añadir direcciones
+        _, t_json, _ = medir(lambda: guardar_json(total + nuevas))
+        cartera.extend(registro(i) for i in range(total, total + nuevas))
+        _, t_flujo, _ = medir(cartera.flush)
+        cartera.close()
+        with WalletFile(ruta_flujo) as cartera:
+            assert len(cartera) == total + nuevas and cartera[-1] == registro(total + nuevas - 1)
+            assert cartera[total - 1] == registro(total - 1)
+        print(f"Página intermedia en {t_pagina * 1000:.2f} ms | añadir {nuevas:,} direcciones: "
+              f"JSON {t_json:.2f} s | flujo {t_flujo * 1000:.1f} ms ({t_json / t_flujo:,.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
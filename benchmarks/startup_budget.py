@@ -0,0 +1,82 @@
+"""
+Presupuesto de tiempo de arranque en frío.
+
+Lanza la aplicación en procesos nuevos con ``--salir-tras-arrancar`` (se
+cierra al dibujar la primera ventana) y compara la mediana del tiempo de
+reloj con el presupuesto. Sin pantalla no se puede crear la ventana y se
+mide solo el intérprete más la importación del programa, con su propio
+presupuesto.
+
+Si se supera el presupuesto, muestra el informe de ``--perfil-arranque`` (o
+las importaciones más lentas) y termina con código 1, de modo que puede
+usarse como comprobación de regresión en integración continua.
+
+Uso:
+    python benchmarks/startup_budget.py [presupuesto_ms] [repeticiones]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROGRAMA = os.path.join(RAIZ, 'CreadorCarterasBitcoinHD.py')
+
+# Presupuestos por defecto en milisegundos
+PRESUPUESTO_VENTANA_MS = 1000
+PRESUPUESTO_IMPORTACION_MS = 400
+
+
+def hay_pantalla():
+    return sys.platform in ('win32', 'darwin') or bool(os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY'))
+
+
+def orden(con_ventana, *opciones):
+    if con_ventana:
+        return [sys.executable, PROGRAMA, '--salir-tras-arrancar', *opciones]
+    # Sin ventana: importar el programa sin ejecutar main()
+    codigo = "import CreadorCarterasBitcoinHD as app\nif app.PERFIL_ARRANQUE is not None:\n" \
+             "    print(app.PERFIL_ARRANQUE.report())"
+    return [sys.executable, *opciones, '-c', codigo]
+
+
+def medir(argumentos):
+    """Segundos de reloj de un proceso nuevo (falla si el proceso falla)."""
+    inicio = time.perf_counter()
+    subprocess.run(argumentos, cwd=RAIZ, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    return time.perf_counter() - inicio
+
+
+def main():
+    con_ventana = hay_pantalla()
+    presupuesto = float(sys.argv[1]) if len(sys.argv) > 1 else (
+        PRESUPUESTO_VENTANA_MS if con_ventana else PRESUPUESTO_IMPORTACION_MS)
+    repeticiones = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    medida = "hasta la primera ventana" if con_ventana else "hasta importar el programa (sin pantalla)"
+
+    medir(orden(con_ventana))  # Primera ejecución: compila los .pyc
+    tiempos = [medir(orden(con_ventana)) * 1000 for _ in range(repeticiones)]
+    mediana = statistics.median(tiempos)
+    print(f"Arranque en frío {medida}: mediana {mediana:.0f} ms "
+          f"(mín {min(tiempos):.0f}, máx {max(tiempos):.0f}, {repeticiones} procesos) | "
+          f"presupuesto {presupuesto:.0f} ms")
+
+    if mediana <= presupuesto:
+        print("Dentro del presupuesto")
+        return 0
+
+    # Informe de la aplicación para localizar la regresión
+    if con_ventana:
+        informe = subprocess.run(orden(True, '--perfil-arranque'), cwd=RAIZ, capture_output=True, text=True).stderr
+    else:
+        informe = subprocess.run(orden(False), cwd=RAIZ, capture_output=True, text=True,
+                                 env=dict(os.environ, CREADOR_PERFIL_ARRANQUE='1')).stdout
+    print(informe.strip())
+    print(f"Presupuesto superado en {mediana - presupuesto:.0f} ms", file=sys.stderr)
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,3 @@
+"""
+Motor de derivación del Creador de Carteras Bitcoin HD, independiente de la interfaz.
+"""
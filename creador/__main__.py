@@ -0,0 +1,9 @@
+"""
+Punto de entrada de ``python -m creador`` (línea de órdenes sin interfaz gráfica).
+"""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
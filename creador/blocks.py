@@ -0,0 +1,180 @@
+"""
+Lectura de bloques y transacciones en formato binario de Bitcoin sin copias.
+
+Las funciones trabajan sobre cualquier objeto que admita el protocolo de
+búfer (``mmap``, ``memoryview``, ``bytes``) y devuelven posiciones dentro de
+él: los scripts y los identificadores solo se copian cuando el llamador los
+necesita.
+
+Formato de los archivos ``blk*.dat`` de bitcoind: una sucesión de registros
+``magic (4) | tamaño (uint32 LE) | bloque``; el final del archivo puede estar
+relleno de ceros por la reserva previa de espacio.
+"""
+
+import hashlib
+import struct
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+# Bytes mágicos de cada red al inicio de cada registro de bloque
+NETWORK_MAGIC = {
+    'mainnet': bytes.fromhex('f9beb4d9'),
+    'testnet': bytes.fromhex('0b110907'),
+    'testnet4': bytes.fromhex('1c163f28'),
+    'signet': bytes.fromhex('0a03cf40'),
+    'regtest': bytes.fromhex('fabfbfda'),
+}
+
+# Hash del bloque génesis de cada red (orden interno, el inverso del habitual)
+GENESIS_HASH = {
+    network: bytes.fromhex(display)[::-1] for network, display in {
+        'mainnet': '000000000019d6689c085ae165831e934ff763ae46a2a6c172b3f1b60a8ce26f',
+        'testnet': '000000000933ea01ad0ee984209779baaec3ced90fa3f408719526f8d77f4943',
+        'testnet4': '00000000da84f2bafbbc53dee25a72ae507ff4914b867c565be350b0da8bf043',
+        'signet': '00000008819873e925422c1ff0f99f7cc9bbb232af63a077a480a3633bee1ef6',
+        'regtest': '0f9188f13cb7b2c71f2a335e3a4fc328bf5beb436012afca590b1a11466e2206',
+    }.items()
+}
+
+HEADER_SIZE = 80
+
+_U32 = struct.Struct('<I')
+_U64 = struct.Struct('<Q')
+
+
+def double_sha256(*parts) -> bytes:
+    """SHA256(SHA256(partes concatenadas)) sin concatenarlas."""
+    inner = hashlib.sha256()
+    for part in parts:
+        inner.update(part)
+    return hashlib.sha256(inner.digest()).digest()
+
+
+def read_varint(buf, pos: int) -> Tuple[int, int]:
+    """Lee un entero de longitud variable (CompactSize).
+
+    Returns:
+        tuple: (valor, posición siguiente)
+    """
+    first = buf[pos]
+    if first < 0xfd:
+        return first, pos + 1
+    if first == 0xfd:
+        return buf[pos + 1] | buf[pos + 2] << 8, pos + 3
+    if first == 0xfe:
+        return _U32.unpack_from(buf, pos + 1)[0], pos + 5
+    return _U64.unpack_from(buf, pos + 1)[0], pos + 9
+
+
+def encode_varint(value: int) -> bytes:
+    """Codifica un entero como CompactSize."""
+    if value < 0xfd:
+        return bytes((value,))
+    if value <= 0xffff:
+        return b'\xfd' + value.to_bytes(2, 'little')
+    if value <= 0xffffffff:
+        return b'\xfe' + value.to_bytes(4, 'little')
+    return b'\xff' + value.to_bytes(8, 'little')
+
+
+class RawTransaction(NamedTuple):
+    """Posiciones de una transacción dentro del búfer."""
+    start: int
+    end: int
+    io_start: int        # Inicio de las entradas (tras versión y marcador segwit)
+    io_end: int          # Fin de las salidas (antes de los testigos)
+    locktime: int        # Posición de nLockTime
+    inputs: List[int]    # Posición del outpoint (txid 32 + vout 4) de cada entrada
+    outputs: List[Tuple[int, int, int]]  # (importe, inicio del script, fin del script)
+
+    def txid(self, buf) -> bytes:
+        """Identificador (orden interno) sin serializar la transacción sin testigos."""
+        view = memoryview(buf)
+        return double_sha256(view[self.start:self.start + 4], view[self.io_start:self.io_end],
+                             view[self.locktime:self.locktime + 4])
+
+
+def parse_transaction(buf, pos: int) -> RawTransaction:
+    """Analiza una transacción a partir de ``pos``."""
+    start = pos
+    pos += 4  # versión
+    segwit = buf[pos] == 0 and buf[pos + 1] != 0
+    if segwit:
+        pos += 2
+    io_start = pos
+
+    count, pos = read_varint(buf, pos)
+    inputs = []
+    for _ in range(count):
+        inputs.append(pos)
+        script_len, pos = read_varint(buf, pos + 36)
+        pos += script_len + 4
+
+    count, pos = read_varint(buf, pos)
+    outputs = []
+    for _ in range(count):
+        value = _U64.unpack_from(buf, pos)[0]
+        script_len, script_start = read_varint(buf, pos + 8)
+        pos = script_start + script_len
+        outputs.append((value, script_start, pos))
+    io_end = pos
+
+    if segwit:
+        for _ in range(len(inputs)):
+            items, pos = read_varint(buf, pos)
+            for _ in range(items):
+                size, pos = read_varint(buf, pos)
+                pos += size
+    return RawTransaction(start, pos + 4, io_start, io_end, pos, inputs, outputs)
+
+
+def iter_transactions(buf, block_start: int) -> Iterator[RawTransaction]:
+    """Itera sobre las transacciones de un bloque que empieza en ``block_start``."""
+    count, pos = read_varint(buf, block_start + HEADER_SIZE)
+    for _ in range(count):
+        tx = parse_transaction(buf, pos)
+        pos = tx.end
+        yield tx
+
+
+def block_hash(buf, block_start: int) -> bytes:
+    """Hash del bloque (orden interno) a partir de su cabecera."""
+    return double_sha256(memoryview(buf)[block_start:block_start + HEADER_SIZE])
+
+
+def iter_block_records(buf, start: int, end: int, magic: bytes) -> Iterator[Tuple[int, int]]:
+    """Itera sobre los registros completos de bloque de un archivo ``blk*.dat``.
+
+    Se detiene en el relleno de ceros o en un registro incompleto (archivo
+    que bitcoind sigue escribiendo).
+
+    Yields:
+        tuple: (inicio del bloque, fin del registro)
+    """
+    pos = start
+    while pos + 8 <= end:
+        if buf[pos:pos + 4] != magic:
+            break
+        size = _U32.unpack_from(buf, pos + 4)[0]
+        if pos + 8 + size > end:
+            break
+        yield pos + 8, pos + 8 + size
+        pos += 8 + size
+
+
+def script_key_at(buf, script_start: int, script_end: int) -> Optional[bytes]:
+    """Clave del índice de direcciones del script en el búfer (None si no es P2PKH/P2SH/P2WPKH).
+
+    Solo se copian los 20 bytes del hash cuando la forma del script coincide.
+    """
+    size = script_end - script_start
+    if size == 22:
+        if buf[script_start] == 0x00 and buf[script_start + 1] == 0x14:
+            return b'\x02' + bytes(buf[script_start + 2:script_end])
+    elif size == 25:
+        if (buf[script_start] == 0x76 and buf[script_start + 1] == 0xa9 and buf[script_start + 2] == 0x14
+                and buf[script_end - 2] == 0x88 and buf[script_end - 1] == 0xac):
+            return b'\x00' + bytes(buf[script_start + 3:script_start + 23])
+    elif size == 23:
+        if buf[script_start] == 0xa9 and buf[script_start + 1] == 0x14 and buf[script_end - 1] == 0x87:
+            return b'\x01' + bytes(buf[script_start + 2:script_start + 22])
+    return None
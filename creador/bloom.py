@@ -0,0 +1,195 @@
+"""
+Filtro de Bloom de los scripts de la cartera para escanear bloques y mempool.
+
+El filtro usa las mismas claves que el índice inverso (tipo + hash de 20 bytes
+del scriptPubKey). Como el hash ya es uniforme, las posiciones de los bits se
+toman directamente de sus bytes con doble hashing; no se vuelve a resumir
+nada por cada salida.
+
+Un positivo del filtro solo indica "posiblemente de la cartera": el
+``WalletScanner`` lo confirma contra el ``AddressIndex`` exacto.
+"""
+
+import math
+import struct
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from .index import AddressIndex, IndexEntry, record_keys, script_pubkey_key
+
+FILTER_MAGIC = b'CRBLM001'
+_HEADER = struct.Struct('<8sQIQd')
+
+# Tasa de falsos positivos por defecto
+DEFAULT_FP_RATE = 1e-4
+
+# Mezcla del código de tipo: P2PKH y P2WPKH de una misma clave comparten hash
+_TYPE_MIX = 0x9E3779B97F4A7C15
+_MASK64 = (1 << 64) - 1
+_TYPE_MIXES = [code * _TYPE_MIX & _MASK64 for code in range(256)]
+
+
+def optimal_parameters(capacity: int, fp_rate: float) -> Tuple[int, int]:
+    """Calcula el número de bits y de funciones hash de un filtro de Bloom.
+
+    Args:
+        capacity: Número de elementos previsto
+        fp_rate: Tasa de falsos positivos deseada (0 < fp_rate < 1)
+
+    Returns:
+        tuple: (bits, funciones hash)
+    """
+    if capacity < 1:
+        capacity = 1
+    if not 0.0 < fp_rate < 1.0:
+        raise ValueError("La tasa de falsos positivos debe estar entre 0 y 1")
+    bits = math.ceil(-capacity * math.log(fp_rate) / (math.log(2) ** 2))
+    hashes = max(1, round(bits / capacity * math.log(2)))
+    return bits, hashes
+
+
+class ScriptFilter:
+    """Filtro de Bloom de claves de script."""
+
+    def __init__(self, capacity: int, fp_rate: float = DEFAULT_FP_RATE):
+        """Inicializa un filtro vacío.
+
+        Args:
+            capacity: Número de scripts previsto (por encima crece la tasa real)
+            fp_rate: Tasa de falsos positivos deseada
+        """
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        self.num_bits, self.num_hashes = optimal_parameters(capacity, fp_rate)
+        self.count = 0
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def add(self, key: bytes) -> None:
+        """Añade una clave de script.
+
+        Las posiciones de bits salen de doble hashing sobre los bytes del hash:
+        ``h1, h1 + h2, ...``, reducidas módulo el número de bits.
+        """
+        bits = self._bits
+        m = self.num_bits
+        h1 = int.from_bytes(key[1:9], 'little') ^ _TYPE_MIXES[key[0]]
+        h2 = int.from_bytes(key[9:17], 'little') | 1
+        for _ in range(self.num_hashes):
+            position = h1 % m
+            bits[position >> 3] |= 1 << (position & 7)
+            h1 += h2
+        self.count += 1
+
+    def __contains__(self, key: bytes) -> bool:
+        # Las mismas posiciones que en ``add``, pero el segundo hash solo se
+        # calcula si el primer bit está puesto: casi todas las salidas de un
+        # bloque no son de la cartera y terminan en la primera comprobación
+        bits = self._bits
+        m = self.num_bits
+        h1 = int.from_bytes(key[1:9], 'little') ^ _TYPE_MIXES[key[0]]
+        position = h1 % m
+        if not bits[position >> 3] >> (position & 7) & 1:
+            return False
+        h2 = int.from_bytes(key[9:17], 'little') | 1
+        for _ in range(self.num_hashes - 1):
+            h1 += h2
+            position = h1 % m
+            if not bits[position >> 3] >> (position & 7) & 1:
+                return False
+        return True
+
+    def add_records(self, records: Iterable[Dict[str, Any]],
+                    addr_types: Optional[Iterable[str]] = None) -> None:
+        """Añade los scripts de registros de dirección ya derivados."""
+        for record in records:
+            for key, _ in record_keys(record, addr_types):
+                self.add(key)
+
+    def feed(self, records: Iterable[Dict[str, Any]],
+             addr_types: Optional[Iterable[str]] = None) -> Iterator[Dict[str, Any]]:
+        """Añade los scripts de los registros a medida que pasan y los devuelve sin cambios."""
+        for record in records:
+            for key, _ in record_keys(record, addr_types):
+                self.add(key)
+            yield record
+
+    def might_contain_script(self, script: bytes) -> bool:
+        """Indica si un scriptPubKey puede ser de la cartera."""
+        key = script_pubkey_key(script)
+        return key is not None and key in self
+
+    @property
+    def size_bytes(self) -> int:
+        """Memoria ocupada por el vector de bits."""
+        return len(self._bits)
+
+    def estimated_fp_rate(self) -> float:
+        """Tasa de falsos positivos esperada con el número actual de elementos."""
+        k, m, n = self.num_hashes, self.num_bits, self.count
+        return (1.0 - math.exp(-k * n / m)) ** k
+
+    def save(self, path: str) -> None:
+        """Guarda el filtro en disco."""
+        with open(path, 'wb') as f:
+            f.write(_HEADER.pack(FILTER_MAGIC, self.num_bits, self.num_hashes,
+                                 self.count, self.fp_rate))
+            f.write(self._bits)
+
+    @classmethod
+    def load(cls, path: str) -> 'ScriptFilter':
+        """Carga un filtro guardado con ``save``."""
+        with open(path, 'rb') as f:
+            header = f.read(_HEADER.size)
+            if len(header) != _HEADER.size:
+                raise ValueError("Archivo de filtro truncado")
+            magic, num_bits, num_hashes, count, fp_rate = _HEADER.unpack(header)
+            if magic != FILTER_MAGIC:
+                raise ValueError("El archivo no es un filtro de scripts")
+            bits = bytearray(f.read())
+        if len(bits) != (num_bits + 7) // 8:
+            raise ValueError("Archivo de filtro truncado")
+        instance = cls.__new__(cls)
+        instance.capacity = count
+        instance.fp_rate = fp_rate
+        instance.num_bits = num_bits
+        instance.num_hashes = num_hashes
+        instance.count = count
+        instance._bits = bits
+        return instance
+
+
+class WalletScanner:
+    """Detecta salidas de la cartera: filtro de Bloom y confirmación en el índice exacto."""
+
+    def __init__(self, script_filter: ScriptFilter, index: AddressIndex):
+        """Inicializa el escáner.
+
+        Args:
+            script_filter: Filtro de Bloom de los scripts de la cartera
+            index: Índice inverso exacto con las mismas direcciones
+        """
+        self.filter = script_filter
+        self.index = index
+        self.filter_hits = 0
+        self.false_positives = 0
+
+    def match(self, script: bytes) -> Optional[IndexEntry]:
+        """Devuelve el origen del scriptPubKey si es de la cartera."""
+        key = script_pubkey_key(script)
+        return self.match_key(key) if key is not None else None
+
+    def match_key(self, key: bytes) -> Optional[IndexEntry]:
+        """Devuelve el origen de una clave de script si es de la cartera."""
+        if key not in self.filter:
+            return None
+        self.filter_hits += 1
+        entry = self.index.lookup(key)
+        if entry is None:
+            self.false_positives += 1
+        return entry
+
+    def scan(self, scripts: Iterable[bytes]) -> Iterator[Tuple[int, IndexEntry]]:
+        """Recorre scripts de salida y devuelve (posición, origen) de los de la cartera."""
+        for position, script in enumerate(scripts):
+            entry = self.match(script)
+            if entry is not None:
+                yield position, entry
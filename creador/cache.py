@@ -0,0 +1,364 @@
+"""
+Caché de saldos e historial por scripthash.
+
+Las entradas caducan por tiempo (TTL) y además se invalidan:
+
+- cuando el backend avisa de un cambio en un scripthash suscrito (nueva
+  transacción en la mempool o en un bloque);
+- cuando llega un bloque nuevo, las que tienen fondos sin confirmar o
+  transacciones en la mempool, porque su estado cambia al confirmarse.
+
+Los avisos solo llegan mientras el backend está abierto (durante un
+descubrimiento); entre dos consultas las entradas valen hasta su TTL.
+
+La caché se guarda en una base de datos SQLite, de modo que al abrir una
+cartera los saldos conocidos se muestran al instante (aunque estén caducados)
+mientras se refrescan. En memoria solo se mantienen las entradas usadas más
+recientemente (LRU); las demás se vuelven a leer de la base de datos.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from .discovery import History, HistoryBackend, ScriptStatus
+
+# Validez por defecto de una entrada (segundos)
+DEFAULT_TTL = 600.0
+
+# Entradas que se mantienen en memoria por defecto
+DEFAULT_MAX_ENTRIES = 50_000
+
+# Momento de consulta que marca una entrada como invalidada
+_INVALIDATED = 0.0
+
+# Scripthashes por consulta ``IN (...)`` a SQLite (límite de parámetros: 999)
+_LOAD_CHUNK = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS saldos (
+    scripthash TEXT PRIMARY KEY,
+    tx_count INTEGER NOT NULL,
+    confirmed INTEGER NOT NULL,
+    unconfirmed INTEGER NOT NULL,
+    pending INTEGER NOT NULL,
+    fetched_at REAL NOT NULL,
+    history TEXT
+)
+"""
+
+
+class CacheEntry(NamedTuple):
+    """Estado en caché de un scripthash."""
+    status: ScriptStatus
+    history: Optional[History]
+    fetched_at: float
+
+    @property
+    def pending(self) -> bool:
+        """Indica si hay fondos o transacciones pendientes de confirmar."""
+        if self.status.unconfirmed:
+            return True
+        return any(height <= 0 for _, height in self.history or ())
+
+
+def default_cache_path() -> str:
+    """Ruta por defecto de la caché de saldos en el directorio del usuario."""
+    return os.path.join(os.path.expanduser('~'), '.creador_carteras', 'saldos.sqlite3')
+
+
+class BalanceCache:
+    """Caché persistente de saldos e historial por scripthash."""
+
+    def __init__(self, path: Optional[str] = None, ttl: float = DEFAULT_TTL,
+                 clock: Callable[[], float] = time.time, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """Inicializa la caché.
+
+        Args:
+            path: Base de datos SQLite; sin ruta la caché vive solo en memoria
+            ttl: Validez de una entrada en segundos
+            clock: Reloj (segundos), sustituible en pruebas
+            max_entries: Entradas en memoria; sin base de datos, las que salen se pierden
+        """
+        if max_entries < 1:
+            raise ValueError("La caché debe admitir al menos una entrada")
+        self.path = path
+        self.ttl = ttl
+        self.clock = clock
+        self.max_entries = max_entries
+        self.height: Optional[int] = None
+        self._entries: 'OrderedDict[str, CacheEntry]' = OrderedDict()
+        self._dirty: Set[str] = set()
+        self._lock = threading.RLock()
+        self._db: Optional[sqlite3.Connection] = None
+        if path is not None:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(_SCHEMA)
+            self._db.commit()
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        """Indica si una entrada sigue vigente."""
+        return entry.fetched_at != _INVALIDATED and self.clock() - entry.fetched_at < self.ttl
+
+    def get(self, scripthash: str, allow_stale: bool = False) -> Optional[CacheEntry]:
+        """Devuelve la entrada de un scripthash.
+
+        Args:
+            scripthash: Scripthash (formato Electrum)
+            allow_stale: Devolver también entradas caducadas o invalidadas
+
+        Returns:
+            CacheEntry: Entrada o None si no hay (o no está vigente)
+        """
+        with self._lock:
+            entry = self._entries.get(scripthash)
+            if entry is not None:
+                self._entries.move_to_end(scripthash)
+            elif self._db is not None:
+                entry = self._load(scripthash)
+                self._evict()
+        if entry is None or (not allow_stale and not self.is_fresh(entry)):
+            return None
+        return entry
+
+    def get_many(self, scripthashes: Iterable[str], allow_stale: bool = False) -> Dict[str, CacheEntry]:
+        """Devuelve las entradas de varios scripthashes con una sola consulta a la base de datos.
+
+        Args:
+            scripthashes: Scripthashes (formato Electrum)
+            allow_stale: Devolver también entradas caducadas o invalidadas
+
+        Returns:
+            dict: Entrada por scripthash (sin los que no hay o no están vigentes)
+        """
+        with self._lock:
+            found = {}
+            missing = []
+            for scripthash in scripthashes:
+                entry = self._entries.get(scripthash)
+                if entry is not None:
+                    self._entries.move_to_end(scripthash)
+                    found[scripthash] = entry
+                else:
+                    missing.append(scripthash)
+            if missing and self._db is not None:
+                for start in range(0, len(missing), _LOAD_CHUNK):
+                    found.update(self._load_many(missing[start:start + _LOAD_CHUNK]))
+                self._evict()
+        if allow_stale:
+            return found
+        return {scripthash: entry for scripthash, entry in found.items() if self.is_fresh(entry)}
+
+    def put(self, scripthash: str, status: ScriptStatus, history: Optional[History] = None,
+            fetched_at: Optional[float] = None) -> None:
+        """Guarda el estado de un scripthash."""
+        entry = CacheEntry(status, history, self.clock() if fetched_at is None else fetched_at)
+        with self._lock:
+            self._entries[scripthash] = entry
+            self._entries.move_to_end(scripthash)
+            self._dirty.add(scripthash)
+            self._evict()
+
+    def invalidate(self, scripthash: str) -> None:
+        """Invalida un scripthash (se conserva el último valor para mostrarlo)."""
+        with self._lock:
+            entry = self._entries.get(scripthash)
+            if entry is None and self._db is not None:
+                entry = self._load(scripthash)
+            if entry is not None:
+                self._entries[scripthash] = entry._replace(fetched_at=_INVALIDATED)
+                self._dirty.add(scripthash)
+                self._evict()
+
+    def on_block(self, height: int) -> int:
+        """Registra un bloque nuevo e invalida las entradas con movimientos pendientes.
+
+        Returns:
+            int: Número de entradas invalidadas
+        """
+        with self._lock:
+            if self.height is not None and height <= self.height:
+                return 0
+            self.height = height
+            self.flush()
+            invalidated = 0
+            for scripthash, entry in self._entries.items():
+                if entry.pending and entry.fetched_at != _INVALIDATED:
+                    self._entries[scripthash] = entry._replace(fetched_at=_INVALIDATED)
+                    invalidated += 1
+            if self._db is not None:
+                cursor = self._db.execute("UPDATE saldos SET fetched_at = ? WHERE pending = 1 AND fetched_at != ?",
+                                          (_INVALIDATED, _INVALIDATED))
+                self._db.commit()
+                invalidated = max(invalidated, cursor.rowcount)
+            return invalidated
+
+    def _evict(self) -> None:
+        """Saca de memoria las entradas usadas hace más tiempo si se supera el límite.
+
+        Se descarta de una vez una décima parte del límite, de modo que las
+        entradas modificadas se escriben en disco en lotes y no una a una.
+        """
+        if len(self._entries) <= self.max_entries:
+            return
+        self.flush()
+        target = self.max_entries - self.max_entries // 10
+        while len(self._entries) > target:
+            self._entries.popitem(last=False)
+
+    def _load(self, scripthash: str) -> Optional[CacheEntry]:
+        row = self._db.execute(
+            "SELECT tx_count, confirmed, unconfirmed, fetched_at, history FROM saldos WHERE scripthash = ?",
+            (scripthash,)).fetchone()
+        if row is None:
+            return None
+        tx_count, confirmed, unconfirmed, fetched_at, history = row
+        entry = CacheEntry(ScriptStatus(tx_count, confirmed, unconfirmed),
+                           [tuple(item) for item in json.loads(history)] if history else None,
+                           fetched_at)
+        self._entries[scripthash] = entry
+        return entry
+
+    def _load_many(self, scripthashes: Sequence[str]) -> Dict[str, CacheEntry]:
+        rows = self._db.execute(
+            "SELECT scripthash, tx_count, confirmed, unconfirmed, fetched_at, history FROM saldos "
+            f"WHERE scripthash IN ({', '.join('?' * len(scripthashes))})", scripthashes).fetchall()
+        loaded = {}
+        for scripthash, tx_count, confirmed, unconfirmed, fetched_at, history in rows:
+            entry = CacheEntry(ScriptStatus(tx_count, confirmed, unconfirmed),
+                               [tuple(item) for item in json.loads(history)] if history else None,
+                               fetched_at)
+            self._entries[scripthash] = loaded[scripthash] = entry
+        return loaded
+
+    def flush(self) -> None:
+        """Escribe en disco las entradas modificadas."""
+        with self._lock:
+            if self._db is None or not self._dirty:
+                self._dirty.clear()
+                return
+            rows = []
+            for scripthash in self._dirty:
+                entry = self._entries[scripthash]
+                history = json.dumps(entry.history) if entry.history is not None else None
+                rows.append((scripthash, entry.status.tx_count, entry.status.confirmed,
+                             entry.status.unconfirmed, int(entry.pending), entry.fetched_at, history))
+            self._db.executemany("INSERT OR REPLACE INTO saldos VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            self._db.commit()
+            self._dirty.clear()
+
+    def close(self) -> None:
+        """Guarda los cambios y cierra la base de datos."""
+        with self._lock:
+            self.flush()
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def __len__(self) -> int:
+        with self._lock:
+            if self._db is None:
+                return len(self._entries)
+            self.flush()
+            return self._db.execute("SELECT COUNT(*) FROM saldos").fetchone()[0]
+
+
+class CachingHistoryBackend(HistoryBackend):
+    """Backend que sirve desde la caché lo vigente y consulta al backend real el resto."""
+
+    def __init__(self, backend: HistoryBackend, cache: BalanceCache, subscribe: bool = True):
+        """Inicializa el backend.
+
+        Args:
+            backend: Backend real (p. ej. ``ElectrumHistoryBackend``)
+            cache: Caché de saldos
+            subscribe: Suscribirse a bloques y a los scripthashes consultados para invalidar
+        """
+        self.backend = backend
+        self.cache = cache
+        self.subscribe_changes = subscribe
+        self.hits = 0
+        self.misses = 0
+        self._headers_subscribed = False
+
+    async def get_statuses(self, scripthashes: Sequence[str]) -> List[ScriptStatus]:
+        return [status for status, _ in await self.get_entries(scripthashes)]
+
+    async def get_entries(self, scripthashes: Sequence[str]
+                          ) -> List[Tuple[ScriptStatus, Optional[History]]]:
+        if self.subscribe_changes and not self._headers_subscribed:
+            self._headers_subscribed = True
+            height = await self.backend.subscribe_headers(self.cache.on_block)
+            if height is not None:
+                self.cache.on_block(height)
+
+        results: List[Optional[Tuple[ScriptStatus, Optional[History]]]] = []
+        missing: List[int] = []
+        for position, scripthash in enumerate(scripthashes):
+            entry = self.cache.get(scripthash)
+            if entry is None:
+                missing.append(position)
+                results.append(None)
+            else:
+                results.append((entry.status, entry.history))
+        self.hits += len(scripthashes) - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            wanted = [scripthashes[position] for position in missing]
+            fetched = await self.backend.get_entries(wanted)
+            for position, scripthash, (status, history) in zip(missing, wanted, fetched):
+                self.cache.put(scripthash, status, history)
+                results[position] = (status, history)
+            if self.subscribe_changes:
+                await self.backend.subscribe(wanted, self.cache.invalidate)
+        return results
+
+    async def close(self) -> None:
+        self.cache.flush()
+        await self.backend.close()
+
+
+def cached_statuses(cache: BalanceCache, scripthashes: Iterable[str]) -> Optional[ScriptStatus]:
+    """Suma los estados en caché (vigentes o no) de los scripts de una clave.
+
+    Returns:
+        ScriptStatus: Estado combinado o None si alguno no está en caché
+    """
+    tx_count = confirmed = unconfirmed = 0
+    for scripthash in scripthashes:
+        entry = cache.get(scripthash, allow_stale=True)
+        if entry is None:
+            return None
+        tx_count += entry.status.tx_count
+        confirmed += entry.status.confirmed
+        unconfirmed += entry.status.unconfirmed
+    return ScriptStatus(tx_count, confirmed, unconfirmed)
+
+
+def cached_statuses_many(cache: BalanceCache, groups: Sequence[Sequence[str]]) -> List[Optional[ScriptStatus]]:
+    """``cached_statuses`` de varias claves con una sola consulta a la caché.
+
+    Args:
+        groups: Scripthashes de cada clave
+
+    Returns:
+        list: Estado combinado de cada clave, en el mismo orden (None si falta alguno)
+    """
+    entries = cache.get_many((scripthash for group in groups for scripthash in group), allow_stale=True)
+    statuses: List[Optional[ScriptStatus]] = []
+    for group in groups:
+        if not all(scripthash in entries for scripthash in group):
+            statuses.append(None)
+            continue
+        statuses.append(ScriptStatus(sum(entries[scripthash].status.tx_count for scripthash in group),
+                                     sum(entries[scripthash].status.confirmed for scripthash in group),
+                                     sum(entries[scripthash].status.unconfirmed for scripthash in group)))
+    return statuses
@@ -0,0 +1,233 @@
+"""
+Línea de órdenes sin interfaz gráfica.
+
+``python -m creador derive`` deriva direcciones con el mismo motor que la
+aplicación, sin Tk, para trabajos por lotes en servidores sin pantalla. La
+semilla se lee de un archivo o de la entrada estándar (nunca de los
+argumentos, que quedan a la vista en la lista de procesos); con ``--xpub`` se
+deriva en modo de solo lectura. Los registros se escriben a medida que se
+derivan, así que la memoria no depende de ``--count``, y al terminar se
+informa del rendimiento por stderr::
+
+    python -m creador derive --seed-file semilla.txt --type p2wpkh --count 100000 -o direcciones.csv
+    python -m creador derive --xpub zpub6r... --start 1000 --count 50 --format text
+    cat semilla.txt | python -m creador derive --seed-file - --format jsonl --no-private
+
+Como en la aplicación, la ruta por defecto es la BIP-44 (``m/44'/...``) para
+todos los tipos de dirección. ``--purpose`` fija otro propósito y
+``--standard-paths`` usa el estándar de cada tipo (44' para p2pkh, 49' para
+p2sh y 84' para p2wpkh), que es el que esperan la mayoría de carteras. Con
+``--xpub`` la red, la ruta y el tipo los fija la versión SLIP-132 de la clave,
+así que esas opciones se rechazan en lugar de ignorarse.
+
+Formatos:
+
+- ``csv``: indice, tipo, direccion (una columna por tipo en multiformato),
+  clave_privada, clave_publica;
+- ``jsonl``: un registro por línea, igual que los de las carteras en flujo;
+- ``text``: solo las direcciones (separadas por tabuladores en multiformato).
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from typing import Any, Callable, Iterable, Mapping, Optional, Sequence, TextIO
+
+from .derivation import CHAIN_CHANGE, CHAIN_RECEIVE, DerivationEngine
+from .encoding import ADDR_TYPE_MULTI, ADDR_TYPE_P2WPKH, ADDR_TYPES
+from .seed import COIN_TYPES, SeedContext
+from .xpub import WatchOnlyContext
+
+FORMATS = ('csv', 'jsonl', 'text')
+CSV_FIELDS = ['indice', 'tipo', 'direccion', 'clave_privada', 'clave_publica']
+CSV_FIELDS_MULTI = ['indice', 'tipo', *ADDR_TYPES, 'clave_privada', 'clave_publica']
+
+# Rango a partir del cual se reparte la derivación entre procesos si se piden
+PARALLEL_MIN_COUNT = 2000
+
+
+class CliError(Exception):
+    """Error de uso o de entrada que se informa sin traza."""
+
+
+def _read_secret(path: str) -> str:
+    """Contenido de un archivo ('-' para la entrada estándar) sin espacios sobrantes."""
+    if path == '-':
+        return sys.stdin.read().strip()
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read().strip()
+    except OSError as e:
+        raise CliError(f"No se pudo leer {path}: {e.strerror}") from e
+
+
+def _seed_context(mnemonic: str, language: Optional[str], network: str) -> SeedContext:
+    """Contexto de semilla tras comprobar la frase (idioma detectado si no se indica)."""
+    from mnemonic import Mnemonic
+
+    mnemonic = ' '.join(mnemonic.split())
+    if not mnemonic:
+        raise CliError("La semilla está vacía")
+    try:
+        language = language or Mnemonic.detect_language(mnemonic)
+    except Exception as e:
+        raise CliError(f"No se reconoce el idioma de la semilla: {e}") from e
+    if not Mnemonic(language).check(mnemonic):
+        raise CliError("Semilla mnemotécnica inválida")
+    return SeedContext(mnemonic, language=language, network=network)
+
+
+def _check_xpub_options(args: argparse.Namespace) -> None:
+    """Rechaza las opciones de semilla que no tienen efecto con ``--xpub``."""
+    ignored = [option for option, value in (('--network', args.network), ('--purpose', args.purpose),
+                                            ('--account', args.account), ('--language', args.language))
+               if value is not None]
+    if args.standard_paths:
+        ignored.append('--standard-paths')
+    if ignored:
+        raise CliError(f"{', '.join(ignored)} no se puede usar con --xpub: la red, la cuenta y la ruta "
+                       "las fija la clave")
+
+
+def build_engine(args: argparse.Namespace) -> DerivationEngine:
+    """Motor de derivación a partir de los argumentos de ``derive``."""
+    if args.xpub is not None:
+        _check_xpub_options(args)
+        xkey = _read_secret('-') if args.xpub == '-' else args.xpub
+        try:
+            context = WatchOnlyContext(xkey)
+        except ValueError as e:
+            raise CliError(str(e)) from e
+        if args.type not in (None, context.addr_type):
+            # La versión SLIP-132 (xpub/ypub/zpub) indica el tipo de las direcciones de la cuenta
+            raise CliError(f"La clave es de direcciones {context.addr_type}; no corresponde a --type {args.type}")
+        return DerivationEngine(context, context.addr_type)
+    context = _seed_context(_read_secret(args.seed_file), args.language, args.network or 'mainnet')
+    addr_type = args.type or ADDR_TYPE_P2WPKH
+    try:
+        return DerivationEngine(context, addr_type, purpose=args.purpose, account=args.account,
+                                watch_only=args.no_private, standard_paths=args.standard_paths)
+    except ValueError as e:
+        raise CliError(str(e)) from e
+
+
+def _records(engine: DerivationEngine, chain: int, start: int, count: int,
+             workers: int) -> Iterable[Mapping[str, Any]]:
+    """Registros del rango, repartidos entre procesos si se pide y compensa."""
+    if workers <= 1 or count < PARALLEL_MIN_COUNT:
+        yield from engine.derive_range(chain, start, count)
+        return
+    from .parallel import ParallelDeriver
+
+    with ParallelDeriver(workers) as deriver:
+        yield from deriver.derive_range(engine.chain_extended_key(chain), engine.addr_type, start, count)
+
+
+def _writer(out: TextIO, output_format: str, addr_type: str) -> Callable[[Mapping[str, Any]], None]:
+    """Función que escribe un registro en el formato pedido."""
+    multi = addr_type == ADDR_TYPE_MULTI
+    if output_format == 'jsonl':
+        def write(record):
+            out.write(json.dumps(dict(record), ensure_ascii=False, separators=(',', ':')))
+            out.write('\n')
+        return write
+    if output_format == 'text':
+        if multi:
+            return lambda record: out.write('\t'.join(record['direcciones'][t] for t in ADDR_TYPES) + '\n')
+        return lambda record: out.write(record['direccion'] + '\n')
+
+    rows = csv.writer(out, lineterminator='\n')
+    rows.writerow(CSV_FIELDS_MULTI if multi else CSV_FIELDS)
+    if multi:
+        return lambda record: rows.writerow([record['indice'], record['tipo'],
+                                             *(record['direcciones'][t] for t in ADDR_TYPES),
+                                             record['clave_privada'] or '', record['clave_publica']])
+    return lambda record: rows.writerow([record['indice'], record['tipo'], record['direccion'],
+                                         record['clave_privada'] or '', record['clave_publica']])
+
+
+def derive(args: argparse.Namespace) -> int:
+    """Orden ``derive``: escribe el rango pedido y devuelve el código de salida."""
+    if args.start < 0 or args.count < 0:
+        raise CliError("El índice inicial y el número de direcciones deben ser positivos")
+    engine = build_engine(args)
+    chain = CHAIN_CHANGE if args.change else CHAIN_RECEIVE
+
+    out = sys.stdout if args.output in (None, '-') else open(args.output, 'w', encoding='utf-8', newline='')
+    started = time.perf_counter()
+    written = 0
+    try:
+        write = _writer(out, args.format, engine.addr_type)
+        for record in _records(engine, chain, args.start, args.count, args.workers):
+            write(record)
+            written += 1
+        out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - started
+
+    if not args.quiet:
+        rate = written / elapsed if elapsed > 0 else 0.0
+        print(f"{written:,} direcciones {engine.addr_type} (cadena {chain}, desde el índice {args.start}) "
+              f"en {elapsed:.2f} s: {rate:,.0f} direcciones/s", file=sys.stderr)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='python -m creador',
+                                     description="Creador de Carteras Bitcoin HD sin interfaz gráfica")
+    commands = parser.add_subparsers(dest='command', metavar='orden')
+
+    sub = commands.add_parser('derive', help="Deriva un rango de direcciones",
+                              description="Deriva un rango de direcciones de una semilla o xpub.")
+    origin = sub.add_mutually_exclusive_group(required=True)
+    origin.add_argument('--seed-file', metavar='ARCHIVO',
+                        help="Archivo con la frase mnemotécnica ('-' para la entrada estándar)")
+    origin.add_argument('--xpub', metavar='CLAVE',
+                        help="xpub/ypub/zpub de la cuenta ('-' para leerla de la entrada estándar)")
+    sub.add_argument('--language', help="Idioma de la semilla (por defecto, se detecta)")
+    sub.add_argument('--network', choices=sorted(COIN_TYPES),
+                     help="Red de la semilla (por defecto, mainnet; con --xpub la fija la clave)")
+    sub.add_argument('--type', choices=[*ADDR_TYPES, ADDR_TYPE_MULTI],
+                     help="Tipo de dirección (por defecto, p2wpkh; con --xpub, el de la clave)")
+    paths = sub.add_mutually_exclusive_group()
+    paths.add_argument('--purpose', type=int, choices=(44, 49, 84),
+                       help="Propósito de la ruta (por defecto, 44 para todos los tipos, como la aplicación)")
+    paths.add_argument('--standard-paths', action='store_true',
+                       help="Propósito estándar de cada tipo: m/44' p2pkh, m/49' p2sh, m/84' p2wpkh")
+    sub.add_argument('--account', type=int, help="Número de cuenta (por defecto, 0)")
+    sub.add_argument('--change', action='store_true', help="Cadena de cambio en lugar de la de recepción")
+    sub.add_argument('--start', type=int, default=0, help="Primer índice")
+    sub.add_argument('--count', type=int, default=20, help="Número de direcciones")
+    sub.add_argument('--format', choices=FORMATS, default='csv', help="Formato de salida")
+    sub.add_argument('--no-private', action='store_true', help="No derivar ni escribir claves privadas")
+    sub.add_argument('-o', '--output', metavar='ARCHIVO', help="Archivo de salida (por defecto, stdout)")
+    sub.add_argument('--workers', type=int, default=1, help="Procesos de derivación")
+    sub.add_argument('-q', '--quiet', action='store_true', help="No informar del rendimiento")
+    sub.set_defaults(handler=derive)
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Punto de entrada de ``python -m creador``."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if getattr(args, 'handler', None) is None:
+        parser.print_help()
+        return 2
+    try:
+        return args.handler(args)
+    except CliError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    except BrokenPipeError:
+        # La salida se cerró antes de tiempo (por ejemplo, con ``| head``): se
+        # redirige a /dev/null para que el volcado final no vuelva a fallar
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    except KeyboardInterrupt:
+        return 130
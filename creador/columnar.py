@@ -0,0 +1,339 @@
+"""
+Almacén columnar de direcciones derivadas.
+
+Una lista de diccionarios con cadenas hexadecimales y WIF cuesta unos 530
+bytes por dirección. Este almacén guarda cada campo en su propia columna:
+
+- índice (``array('I')``) y código de tipo (``array('B')``);
+- claves públicas comprimidas (33 bytes) en un búfer ``bytearray`` contiguo;
+- hash160 (20 bytes) en otro búfer, solo con ``with_hashes``. Es útil a
+  quien recorra los hashes de todas las filas. Para mostrar una fila basta
+  con calcularlo desde la clave pública (un microsegundo);
+- claves privadas (32 bytes) en otra columna, solo si no hay motor de
+  derivación. Con motor no se guardan y el WIF se vuelve a derivar por
+  bloques de índices para las filas que se muestran.
+
+Las direcciones y los WIF no se guardan como cadenas. Cada fila se devuelve
+como un ``DerivedAddress``, que las codifica al pedirlas y se comporta como
+el diccionario habitual, así que la tabla, el índice inverso y el guardado
+siguen funcionando igual.
+
+Con ``path`` las columnas viven en un archivo proyectado en memoria, con
+espacio reservado para ``capacity`` filas. Al llenarse, el archivo duplica
+su capacidad y las columnas se desplazan dentro de él. Formato del archivo::
+
+    cabecera:  magic (8 bytes) | filas (uint64 LE) | capacidad (uint64 LE) |
+               columnas opcionales (uint8: 1 claves privadas, 2 hash160) | relleno (7 bytes)
+    columnas:  índices (uint32 nativo) | tipos (uint8) | claves públicas (33 bytes) |
+               hash160 (20 bytes, opcional) | claves privadas (32 bytes, opcional),
+               cada una con ``capacidad`` huecos
+"""
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections import OrderedDict
+from collections.abc import Sequence
+from typing import Any, Iterable, List, Mapping, Optional
+
+from .derivation import CHAIN_RECEIVE, DerivationEngine
+from .encoding import (
+    ADDR_TYPE_MULTI, ADDR_TYPE_P2PKH, base58check_decode, encode_hash160, encode_wif, hash160
+)
+from .index import TYPE_CODES
+from .record import DerivedAddress
+
+STORE_MAGIC = b'CRCOL001'
+_HEADER = struct.Struct('<8sQQB7x')
+
+# Código de tipo de las filas multiformato (los demás son los del índice inverso)
+MULTI_CODE = 3
+_TYPES_BY_CODE = {code: addr_type for addr_type, code in TYPE_CODES.items()}
+_TYPES_BY_CODE[MULTI_CODE] = ADDR_TYPE_MULTI
+_CODES = {addr_type: code for code, addr_type in _TYPES_BY_CODE.items()}
+
+PUBKEY_SIZE = 33
+HASH_SIZE = 20
+PRIVKEY_SIZE = 32
+
+# Columnas opcionales
+WITH_PRIVATE = 1
+WITH_HASHES = 2
+
+# Índices derivados de una vez al pedir un WIF que no está en caché
+WIF_BLOCK = 64
+
+
+class _MemoryColumns:
+    """Columnas en memoria."""
+
+    def __init__(self, flags: int):
+        self.indices = array('I')
+        self.types = array('B')
+        self.pubkeys = bytearray()
+        self.hashes = bytearray() if flags & WITH_HASHES else None
+        self.privates = bytearray() if flags & WITH_PRIVATE else None
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def append(self, index: int, code: int, public_key: bytes, h160: bytes,
+               private_key: Optional[bytes]) -> None:
+        self.indices.append(index)
+        self.types.append(code)
+        self.pubkeys += public_key
+        if self.hashes is not None:
+            self.hashes += h160 or hash160(public_key)
+        if self.privates is not None:
+            self.privates += private_key or bytes(PRIVKEY_SIZE)
+
+    @property
+    def nbytes(self) -> int:
+        buffers = [buffer for buffer in (self.pubkeys, self.hashes, self.privates) if buffer is not None]
+        return (self.indices.buffer_info()[1] * self.indices.itemsize + len(self.types)
+                + sum(sys.getsizeof(buffer) for buffer in buffers))
+
+    def close(self) -> None:
+        pass
+
+
+class _MappedColumns:
+    """Columnas en un archivo proyectado en memoria."""
+
+    def __init__(self, path: str, flags: int, capacity: int):
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        self._file = open(path, 'r+b' if exists else 'w+b')
+        if exists:
+            header = self._file.read(_HEADER.size)
+            magic, self._count, self._capacity, self.flags = _HEADER.unpack(header)
+            if magic != STORE_MAGIC:
+                self._file.close()
+                raise ValueError("El archivo no es un almacén de direcciones")
+        else:
+            self._count, self._capacity, self.flags = 0, max(1, capacity), flags
+            self._file.truncate(self._size(self._capacity))
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        self._views()
+        self._write_header()
+
+    def _widths(self) -> List[int]:
+        widths = [4, 1, PUBKEY_SIZE]
+        if self.flags & WITH_HASHES:
+            widths.append(HASH_SIZE)
+        if self.flags & WITH_PRIVATE:
+            widths.append(PRIVKEY_SIZE)
+        return widths
+
+    def _size(self, capacity: int) -> int:
+        return _HEADER.size + capacity * sum(self._widths())
+
+    def _offsets(self, capacity: int) -> List[int]:
+        offsets, position = [], _HEADER.size
+        for width in self._widths():
+            offsets.append(position)
+            position += capacity * width
+        return offsets
+
+    def _views(self) -> None:
+        view = memoryview(self._map)
+        columns = [view[offset:offset + self._capacity * width]
+                   for offset, width in zip(self._offsets(self._capacity), self._widths())]
+        self.indices = columns[0].cast('I')
+        self.types = columns[1]
+        self.pubkeys = columns[2]
+        optional = iter(columns[3:])
+        self.hashes = next(optional) if self.flags & WITH_HASHES else None
+        self.privates = next(optional) if self.flags & WITH_PRIVATE else None
+        self._all_views = [view] + columns + [self.indices]
+
+    def _release(self) -> None:
+        for view in reversed(self._all_views):
+            view.release()
+        self._all_views = []
+
+    def _write_header(self) -> None:
+        self._map[:_HEADER.size] = _HEADER.pack(STORE_MAGIC, self._count, self._capacity, self.flags)
+
+    def _grow(self) -> None:
+        """Duplica la capacidad desplazando las columnas de la última a la primera."""
+        old_offsets, capacity = self._offsets(self._capacity), self._capacity * 2
+        self._release()
+        self._map.resize(self._size(capacity))
+        for old, new, width in reversed(list(zip(old_offsets, self._offsets(capacity), self._widths()))):
+            self._map.move(new, old, self._count * width)
+        self._capacity = capacity
+        self._views()
+        self._write_header()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, index: int, code: int, public_key: bytes, h160: bytes,
+               private_key: Optional[bytes]) -> None:
+        if self._count == self._capacity:
+            self._grow()
+        row = self._count
+        self.indices[row] = index
+        self.types[row] = code
+        self.pubkeys[row * PUBKEY_SIZE:(row + 1) * PUBKEY_SIZE] = public_key
+        if self.hashes is not None:
+            self.hashes[row * HASH_SIZE:(row + 1) * HASH_SIZE] = h160 or hash160(public_key)
+        if self.privates is not None:
+            self.privates[row * PRIVKEY_SIZE:(row + 1) * PRIVKEY_SIZE] = private_key or bytes(PRIVKEY_SIZE)
+        self._count += 1
+        struct.pack_into('<Q', self._map, 8, self._count)
+
+    @property
+    def nbytes(self) -> int:
+        return 0  # Las páginas del archivo las gestiona el sistema operativo
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._release()
+            self._map.flush()
+            self._map.close()
+            self._file.close()
+            self._map = None
+
+
+class AddressStore(Sequence):
+    """Secuencia de registros de dirección guardada por columnas."""
+
+    def __init__(self, network: Optional[str] = None, engine: Optional[DerivationEngine] = None,
+                 chain: int = CHAIN_RECEIVE, path: Optional[str] = None, capacity: int = 1 << 16,
+                 with_hashes: bool = False, wif_cache_blocks: int = 16):
+        """Inicializa el almacén.
+
+        Args:
+            network: Red de las direcciones; por defecto, la del motor o 'mainnet'
+            engine: Motor que derivó las direcciones; con él no se guardan las claves privadas
+            chain: Cadena de las direcciones (para volver a derivar los WIF)
+            path: Archivo donde proyectar las columnas; sin ruta viven en memoria
+            capacity: Filas reservadas al crear el archivo
+            with_hashes: Guardar también la columna de hash160
+            wif_cache_blocks: Bloques de ``WIF_BLOCK`` claves privadas rederivadas en caché
+        """
+        if network is None:
+            network = engine.context.network if engine is not None else 'mainnet'
+        self.network = network
+        self.engine = engine
+        self.chain = chain
+        flags = (WITH_PRIVATE if engine is None else 0) | (WITH_HASHES if with_hashes else 0)
+        if path is None:
+            self._columns = _MemoryColumns(flags)
+        else:
+            self._columns = _MappedColumns(path, flags, capacity)
+        self._private_keys: 'OrderedDict[int, List[Optional[bytes]]]' = OrderedDict()
+        self._wif_cache_blocks = wif_cache_blocks
+
+    def __len__(self) -> int:
+        return len(self._columns)
+
+    @property
+    def nbytes(self) -> int:
+        """Memoria ocupada por las columnas en memoria (0 si están en un archivo)."""
+        return self._columns.nbytes
+
+    # ------------------------------------------------------------------
+    # Escritura
+    # ------------------------------------------------------------------
+
+    def append_raw(self, index: int, addr_type: str, public_key: bytes,
+                   private_key: Optional[bytes] = None, h160: Optional[bytes] = None) -> None:
+        """Añade una dirección a partir de sus claves en binario."""
+        if len(public_key) != PUBKEY_SIZE:
+            raise ValueError("Se esperaba una clave pública comprimida de 33 bytes")
+        self._columns.append(index, _CODES[addr_type], public_key, h160, private_key)
+
+    def append(self, record: Mapping[str, Any]) -> None:
+        """Añade un registro de dirección (de ``derive_range`` o leído de un archivo)."""
+        if isinstance(record, DerivedAddress):
+            private_key = record.private_key if self.engine is None else None
+            h160 = record.hash160 if self._columns.hashes is not None else None
+            self.append_raw(record.index, record.addr_type, record.public_key, private_key, h160)
+            return
+        private_key = None
+        if self.engine is None and record.get('clave_privada'):
+            private_key = base58check_decode(record['clave_privada'])[1:1 + PRIVKEY_SIZE]
+        self.append_raw(record['indice'], record['tipo'], bytes.fromhex(record['clave_publica']), private_key)
+
+    def extend(self, records: Iterable[Mapping[str, Any]]) -> None:
+        for record in records:
+            self.append(record)
+
+    # ------------------------------------------------------------------
+    # Lectura
+    # ------------------------------------------------------------------
+
+    def index_at(self, position: int) -> int:
+        return self._columns.indices[position]
+
+    def type_at(self, position: int) -> str:
+        return _TYPES_BY_CODE[self._columns.types[position]]
+
+    def public_key_at(self, position: int) -> bytes:
+        return bytes(self._columns.pubkeys[position * PUBKEY_SIZE:(position + 1) * PUBKEY_SIZE])
+
+    def hash160_at(self, position: int) -> bytes:
+        hashes = self._columns.hashes
+        if hashes is None:
+            return hash160(self.public_key_at(position))
+        return bytes(hashes[position * HASH_SIZE:(position + 1) * HASH_SIZE])
+
+    def address_at(self, position: int, addr_type: Optional[str] = None) -> str:
+        """Dirección de una fila, codificada al pedirla (Legacy en las filas multiformato)."""
+        addr_type = addr_type or self.type_at(position)
+        if addr_type == ADDR_TYPE_MULTI:
+            addr_type = ADDR_TYPE_P2PKH
+        return encode_hash160(self.hash160_at(position), addr_type, self.network)
+
+    def private_key_at(self, position: int) -> Optional[bytes]:
+        """Clave privada de una fila (None en carteras de solo lectura)."""
+        privates = self._columns.privates
+        if privates is not None:
+            private_key = bytes(privates[position * PRIVKEY_SIZE:(position + 1) * PRIVKEY_SIZE])
+            return private_key if any(private_key) else None
+        if self.engine.watch_only:
+            return None
+        index = self.index_at(position)
+        block, offset = divmod(index, WIF_BLOCK)
+        keys = self._private_keys.get(block)
+        if keys is None:
+            keys = [record.private_key for record in
+                    self.engine.derive_range(self.chain, block * WIF_BLOCK, WIF_BLOCK)]
+            self._private_keys[block] = keys
+            if len(self._private_keys) > self._wif_cache_blocks:
+                self._private_keys.popitem(last=False)
+        else:
+            self._private_keys.move_to_end(block)
+        return keys[offset]
+
+    def wif_at(self, position: int) -> Optional[str]:
+        """Clave privada en WIF de una fila (None en carteras de solo lectura)."""
+        private_key = self.private_key_at(position)
+        return encode_wif(private_key, self.network) if private_key is not None else None
+
+    def __getitem__(self, position):
+        """Registro de una fila con el formato de ``derive_range``."""
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(len(self)))]
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError("Índice de dirección fuera de rango")
+        hashes = self._columns.hashes
+        return DerivedAddress(self.index_at(position), self.type_at(position), self.public_key_at(position),
+                              self.private_key_at(position), self.network,
+                              self.hash160_at(position) if hashes is not None else None)
+
+    def close(self) -> None:
+        """Cierra el archivo de columnas, si lo hay."""
+        self._columns.close()
+
+    def __enter__(self) -> 'AddressStore':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
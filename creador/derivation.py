@@ -0,0 +1,271 @@
+"""
+Motor de derivación de direcciones independiente de la interfaz gráfica.
+
+Las direcciones se producen de forma perezosa con ``derive_range``: los
+consumidores (tabla, exportadores, escáneres) pueden recorrer millones de
+direcciones con memoria constante. Cada registro es un ``DerivedAddress``,
+que guarda las claves en binario y codifica dirección y WIF al pedirlos.
+"""
+
+from collections import OrderedDict
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, Any, Dict, Iterator, Mapping, Optional, Union
+
+from .seed import SeedContext, PURPOSE_BIP44, PURPOSE_BIP49, PURPOSE_BIP84
+from .xpub import WatchOnlyContext
+from .encoding import (
+    ADDR_TYPES, ADDR_TYPE_MULTI, ADDR_TYPE_P2PKH, ADDR_TYPE_P2SH_P2WPKH, ADDR_TYPE_P2WPKH,
+    encode_all, encode_hash160
+)
+from .fast_derivation import ChainDeriver
+from .record import DerivedAddress, record_hash160
+
+if TYPE_CHECKING:
+    from bip32utils import BIP32Key
+
+# Cadenas BIP-44
+CHAIN_RECEIVE = 0
+CHAIN_CHANGE = 1
+
+# Propósito estándar de la ruta para cada tipo de dirección (BIP-44/49/84)
+PURPOSE_BY_TYPE = {
+    ADDR_TYPE_P2PKH: PURPOSE_BIP44,
+    ADDR_TYPE_P2SH_P2WPKH: PURPOSE_BIP49,
+    ADDR_TYPE_P2WPKH: PURPOSE_BIP84,
+}
+TYPE_BY_PURPOSE = {purpose: addr_type for addr_type, purpose in PURPOSE_BY_TYPE.items()}
+
+
+def derive_from_chain_key(chain_key: 'BIP32Key', addr_type: str, start: int,
+                          count: int) -> Iterator[DerivedAddress]:
+    """Genera registros de direcciones a partir de un nodo de cadena.
+
+    Los hijos se derivan por lotes con ``ChainDeriver`` (tabla de base fija e
+    inversión por lotes). Si el nodo es solo público, ``clave_privada`` se deja
+    en ``None``.
+
+    Con ``ADDR_TYPE_MULTI`` cada clave se resume con hash160 una sola vez y el
+    registro incluye ``direcciones`` con los tres formatos; ``direccion`` es
+    entonces la Legacy.
+
+    Args:
+        chain_key: Nodo de cadena (m/purpose'/coin'/account'/chain)
+        addr_type: Tipo de dirección (ADDR_TYPE_* o ADDR_TYPE_MULTI)
+        start: Primer índice
+        count: Número de direcciones
+
+    Yields:
+        DerivedAddress: Registro con la información de cada dirección
+    """
+    if start < 0 or count < 0:
+        raise ValueError("El índice inicial y el número de direcciones deben ser positivos")
+
+    network = 'testnet' if chain_key.testnet else 'mainnet'
+    deriver = ChainDeriver.for_node(chain_key)
+    for index, public_key, private_key in deriver.iter_range(start, count):
+        yield DerivedAddress(index, addr_type, public_key, private_key, network)
+
+
+def record_addresses(record: Mapping[str, Any], addr_type: str,
+                     network: str = 'mainnet') -> Dict[str, str]:
+    """Direcciones de un registro en el tipo indicado.
+
+    Si el registro ya está en ese tipo se devuelven sus direcciones; si no, se
+    recodifican a partir de ``clave_publica`` (un hash160 y una codificación,
+    sin derivar ni estirar la semilla).
+
+    Args:
+        record: Registro de dirección
+        addr_type: Tipo de dirección (ADDR_TYPE_* o ADDR_TYPE_MULTI)
+        network: Red ('mainnet' o 'testnet')
+
+    Returns:
+        dict: Dirección por tipo (los tres tipos en modo multiformato)
+    """
+    if isinstance(record, DerivedAddress):
+        record = record.with_type(addr_type)
+        return record.addresses or {addr_type: record.address}
+    formats = record.get('direcciones')
+    if record.get('tipo') == addr_type:
+        return formats if formats else {addr_type: record['direccion']}
+    if formats and addr_type != ADDR_TYPE_MULTI:
+        return {addr_type: formats[addr_type]}
+
+    h160 = record_hash160(record)
+    if addr_type == ADDR_TYPE_MULTI:
+        return encode_all(h160, network)
+    return {addr_type: encode_hash160(h160, addr_type, network)}
+
+
+def reencode_record(record: Mapping[str, Any], addr_type: str,
+                    network: str = 'mainnet') -> Mapping[str, Any]:
+    """Devuelve una copia del registro codificada en otro tipo de dirección.
+
+    Args:
+        record: Registro de dirección
+        addr_type: Tipo de dirección (ADDR_TYPE_* o ADDR_TYPE_MULTI)
+        network: Red ('mainnet' o 'testnet')
+
+    Returns:
+        dict: Registro con ``direccion``, ``tipo`` y, en modo multiformato, ``direcciones``
+    """
+    if record.get('tipo') == addr_type:
+        return record
+    if isinstance(record, DerivedAddress):
+        return record.with_type(addr_type)
+    addresses = record_addresses(record, addr_type, network)
+    result = {key: value for key, value in record.items() if key != 'direcciones'}
+    result['tipo'] = addr_type
+    if addr_type == ADDR_TYPE_MULTI:
+        result['direccion'] = addresses[ADDR_TYPE_P2PKH]
+        result['direcciones'] = addresses
+    else:
+        result['direccion'] = addresses[addr_type]
+    return result
+
+
+class DerivationEngine:
+    """Deriva registros de direcciones a partir de un contexto de semilla."""
+
+    def __init__(self, context: Union[SeedContext, WatchOnlyContext],
+                 addr_type: str = ADDR_TYPE_P2WPKH, purpose: Optional[int] = None,
+                 account: Optional[int] = None, watch_only: bool = False,
+                 standard_paths: bool = False):
+        """Inicializa el motor de derivación.
+
+        Args:
+            context: Contexto de semilla o de solo lectura (xpub)
+            addr_type: Tipo de dirección (ADDR_TYPE_* o ADDR_TYPE_MULTI)
+            purpose: Propósito de la ruta (44, 49, 84); por defecto, el del contexto
+            account: Número de cuenta; por defecto, el del contexto o 0
+            watch_only: Derivar solo claves públicas aunque haya semilla
+            standard_paths: Usar el propósito estándar del tipo (BIP-44/49/84)
+        """
+        if addr_type not in ADDR_TYPES and addr_type != ADDR_TYPE_MULTI:
+            raise ValueError(f"Tipo de dirección no soportado: {addr_type}")
+        if standard_paths and purpose is None and not context.watch_only:
+            if addr_type == ADDR_TYPE_MULTI:
+                # Una sola pasada comparte la clave: no hay una ruta estándar común
+                raise ValueError("En modo multiformato debe elegirse un propósito de ruta concreto")
+            purpose = PURPOSE_BY_TYPE[addr_type]
+        self.context = context
+        self.addr_type = addr_type
+        self.purpose = purpose if purpose is not None else context.default_purpose
+        self.account = account if account is not None else getattr(context, 'account', 0)
+        self.watch_only = watch_only or context.watch_only
+
+    def derive(self, chain: int, index: int) -> DerivedAddress:
+        """Deriva un único registro de dirección.
+
+        Args:
+            chain: Cadena (CHAIN_RECEIVE o CHAIN_CHANGE)
+            index: Índice de la dirección
+
+        Returns:
+            DerivedAddress: Registro con la información de la dirección
+        """
+        return next(self.derive_range(chain, index, 1))
+
+    def derive_range(self, chain: int, start: int, count: int) -> Iterator[DerivedAddress]:
+        """Genera de forma perezosa ``count`` registros a partir de ``start``.
+
+        Args:
+            chain: Cadena (CHAIN_RECEIVE o CHAIN_CHANGE)
+            start: Primer índice
+            count: Número de direcciones
+
+        Yields:
+            DerivedAddress: Registro con la información de cada dirección
+        """
+        return derive_from_chain_key(self.chain_key(chain), self.addr_type, start, count)
+
+    def chain_key(self, chain: int):
+        """Nodo de cadena (solo público en modo de solo lectura)."""
+        return self.context.chain_node(self.purpose, self.account, chain, public=self.watch_only)
+
+    def chain_extended_key(self, chain: int, private: bool = True) -> str:
+        """Devuelve la clave extendida (xprv/xpub) del nodo de cadena.
+
+        Args:
+            chain: Cadena (CHAIN_RECEIVE o CHAIN_CHANGE)
+            private: Si es False se exporta solo la parte pública
+
+        Returns:
+            str: Clave extendida codificada en Base58Check (xpub en modo de solo lectura)
+        """
+        chain_key = self.chain_key(chain)
+        return chain_key.ExtendedKey(private=private and not chain_key.public, encoded=True)
+
+
+class AddressRange(Sequence):
+    """Secuencia perezosa de registros de una cadena, derivados bajo demanda.
+
+    Solo se conservan en memoria los últimos ``cache_size`` registros pedidos,
+    de modo que una tabla virtualizada puede recorrer un millón de direcciones
+    sin materializarlas. Cada fallo de caché deriva el bloque alineado de
+    ``block_size`` registros que contiene la posición: derivar un rango
+    comparte la inversión por lotes y sale mucho más barato que derivar las
+    filas de una página una a una.
+    """
+
+    def __init__(self, engine: DerivationEngine, chain: int, start: int, count: int,
+                 cache_size: int = 2048, block_size: int = 64):
+        """Inicializa la secuencia.
+
+        Args:
+            engine: Motor de derivación
+            chain: Cadena (CHAIN_RECEIVE o CHAIN_CHANGE)
+            start: Primer índice
+            count: Número de direcciones
+            cache_size: Número máximo de registros en caché
+            block_size: Registros derivados de una vez en cada fallo de caché
+        """
+        if start < 0 or count < 0:
+            raise ValueError("El índice inicial y el número de direcciones deben ser positivos")
+        self.engine = engine
+        self.chain = chain
+        self.start = start
+        self.count = count
+        self._cache: 'OrderedDict[int, Dict[str, Any]]' = OrderedDict()
+        self._cache_size = max(cache_size, block_size)
+        self._block_size = max(1, block_size)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(self.count))]
+        if position < 0:
+            position += self.count
+        if not 0 <= position < self.count:
+            raise IndexError("Índice de dirección fuera de rango")
+
+        record = self._cache.get(position)
+        if record is not None:
+            self._cache.move_to_end(position)
+            return record
+        first = position - position % self._block_size
+        size = min(self._block_size, self.count - first)
+        for offset, derived in enumerate(self.engine.derive_range(self.chain, self.start + first, size)):
+            self._cache[first + offset] = derived
+            self._cache.move_to_end(first + offset)
+        while len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return self._cache[position]
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return self.engine.derive_range(self.chain, self.start, self.count)
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """Alarga la secuencia con el siguiente registro de la cadena ya derivado.
+
+        Raises:
+            ValueError: Si el registro no es el del índice siguiente
+        """
+        if record['indice'] != self.start + self.count:
+            raise ValueError("Solo se puede añadir el registro del índice siguiente de la cadena")
+        self._cache[self.count] = record
+        self.count += 1
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
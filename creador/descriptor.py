@@ -0,0 +1,95 @@
+"""
+Descripción de una cartera por su origen de derivación.
+
+Las direcciones de una cartera HD quedan determinadas por la semilla (o la
+xpub), el tipo de dirección y la ruta. En lugar de guardar cada dirección con
+sus claves, el archivo de cartera guarda:
+
+- el descriptor de la cuenta (tipo, propósito y cuenta) y la ruta de cada cadena;
+- cuántas direcciones se generaron en cada cadena;
+- el último índice usado de cada cadena (marca de nivel máximo).
+
+Al abrir la cartera, los registros se vuelven a derivar bajo demanda con
+``AddressRange``, que conserva en caché los bloques pedidos. El archivo ocupa
+lo mismo con diez direcciones que con un millón.
+
+El descriptor va en los metadatos de la cabecera de una cartera en flujo
+(``walletfile``), sin registros::
+
+    {"formato": "CRWAL001", "semilla": "...", "tipo": "p2wpkh",
+     "descriptor": {"tipo": "p2wpkh", "proposito": 84, "cuenta": 0,
+                    "cadenas": [{"cadena": 0, "ruta": "m/84'/0'/0'/0",
+                                 "generadas": 1000000, "ultima_usada": 17}]}}
+"""
+
+from typing import Any, Dict, NamedTuple, Tuple, Union
+
+from .derivation import AddressRange, CHAIN_RECEIVE, DerivationEngine
+from .seed import COIN_TYPES, SeedContext
+from .xpub import WatchOnlyContext
+
+
+class WalletDescriptor(NamedTuple):
+    """Origen de derivación de las direcciones de una cuenta."""
+    addr_type: str
+    purpose: int
+    account: int
+
+    @classmethod
+    def from_engine(cls, engine: DerivationEngine) -> 'WalletDescriptor':
+        """Descriptor de las direcciones que produce un motor de derivación."""
+        return cls(engine.addr_type, engine.purpose, engine.account)
+
+    def engine(self, context: Union[SeedContext, WatchOnlyContext]) -> DerivationEngine:
+        """Motor de derivación que vuelve a producir las direcciones descritas."""
+        return DerivationEngine(context, self.addr_type, purpose=self.purpose, account=self.account)
+
+    def path(self, chain: int, network: str = 'mainnet') -> str:
+        """Ruta BIP-32 de una cadena (por ejemplo, ``m/84'/0'/0'/0``)."""
+        return f"m/{self.purpose}'/{COIN_TYPES[network]}'/{self.account}'/{chain}"
+
+    def addresses(self, context: Union[SeedContext, WatchOnlyContext], count: int,
+                  chain: int = CHAIN_RECEIVE, cache_size: int = 2048) -> AddressRange:
+        """Secuencia perezosa de las ``count`` primeras direcciones de una cadena."""
+        return AddressRange(self.engine(context), chain, 0, count, cache_size=cache_size)
+
+    def to_dict(self, generated: Dict[int, int], used: Dict[int, int],
+                network: str = 'mainnet') -> Dict[str, Any]:
+        """Forma serializable del descriptor con el estado de sus cadenas.
+
+        Args:
+            generated: Direcciones generadas por cadena
+            used: Último índice usado por cadena
+            network: Red (determina el tipo de moneda de las rutas)
+        """
+        chains = sorted(set(generated) | set(used))
+        return {
+            'tipo': self.addr_type,
+            'proposito': self.purpose,
+            'cuenta': self.account,
+            'cadenas': [{'cadena': chain, 'ruta': self.path(chain, network),
+                         'generadas': generated.get(chain, 0), 'ultima_usada': used.get(chain)}
+                        for chain in chains],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> Tuple['WalletDescriptor', Dict[int, int], Dict[int, int]]:
+        """Descriptor y estado de sus cadenas a partir de ``to_dict``.
+
+        Returns:
+            tuple: (descriptor, direcciones generadas por cadena, último índice usado por cadena)
+
+        Raises:
+            ValueError: Si falta algún campo
+        """
+        try:
+            descriptor = cls(data['tipo'], int(data['proposito']), int(data['cuenta']))
+            generated, used = {}, {}
+            for entry in data['cadenas']:
+                chain = int(entry['cadena'])
+                generated[chain] = int(entry.get('generadas', 0))
+                if entry.get('ultima_usada') is not None:
+                    used[chain] = int(entry['ultima_usada'])
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Descriptor de cartera inválido: {e}") from e
+        return descriptor, generated, used
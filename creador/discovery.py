@@ -0,0 +1,379 @@
+"""
+Descubrimiento de cuentas con límite de huecos (gap limit) y consulta de saldos.
+
+Cada cadena (recepción y cambio) se recorre por ventanas de direcciones. Las
+consultas de una ventana se reparten en lotes que se envían de forma
+concurrente al backend de historial. La ventana empieza en el límite de
+huecos y se duplica mientras siga habiendo direcciones usadas, de modo que
+una semilla muy usada se recupera en pocas rondas. Una cadena termina cuando
+sus ``gap_limit`` últimas direcciones consultadas no tienen historial. Las
+ventanas se derivan en un hilo aparte, y la siguiente se adelanta mientras se
+consulta la actual, de modo que la derivación no detiene la red.
+
+Las direcciones que no se pueden volver a derivar (las cargadas de una
+cartera antigua) se consultan tal cual con ``check``, sin recorrer cadenas.
+
+El backend es intercambiable: cualquier clase que implemente
+``HistoryBackend.get_statuses`` (servidor Electrum, nodo propio o el
+``LocalHistoryBackend`` de pruebas).
+"""
+
+import abc
+import asyncio
+import itertools
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import (
+    Any, Awaitable, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+)
+
+from .derivation import CHAIN_CHANGE, CHAIN_RECEIVE, DerivationEngine
+from .encoding import (
+    ADDR_TYPE_MULTI, ADDR_TYPES, electrum_scripthash, script_payload, script_pubkey
+)
+from .record import record_hash160
+
+# Direcciones consecutivas sin uso tras las que se da por terminada una cadena
+DEFAULT_GAP_LIMIT = 20
+
+# Scripthashes por petición al backend
+DEFAULT_BATCH_SIZE = 100
+
+# Peticiones simultáneas como máximo
+DEFAULT_CONCURRENCY = 8
+
+# Tamaño máximo de la ventana de direcciones derivadas por ronda
+MAX_WINDOW = 4096
+
+
+class ScriptStatus(NamedTuple):
+    """Estado de un script en la cadena de bloques (importes en satoshis)."""
+    tx_count: int
+    confirmed: int
+    unconfirmed: int
+
+    @property
+    def used(self) -> bool:
+        """Indica si el script tiene historial."""
+        return self.tx_count > 0
+
+    @property
+    def balance(self) -> int:
+        """Saldo total (confirmado más sin confirmar)."""
+        return self.confirmed + self.unconfirmed
+
+
+UNUSED = ScriptStatus(0, 0, 0)
+
+
+class DiscoveryResult(NamedTuple):
+    """Resultado del descubrimiento para una dirección."""
+    chain: int
+    index: int
+    record: Dict[str, Any]
+    status: ScriptStatus
+
+
+# Historial de un script: (hash de la transacción, altura; 0 o menos en la mempool)
+History = List[Tuple[str, int]]
+
+
+class HistoryBackend(abc.ABC):
+    """Fuente de historial y saldos por scripthash (formato Electrum)."""
+
+    @abc.abstractmethod
+    async def get_statuses(self, scripthashes: Sequence[str]) -> List[ScriptStatus]:
+        """Devuelve el estado de cada scripthash, en el mismo orden."""
+
+    async def get_entries(self, scripthashes: Sequence[str]
+                          ) -> List[Tuple[ScriptStatus, Optional[History]]]:
+        """Devuelve estado e historial (None si el backend no lo ofrece) de cada scripthash."""
+        return [(status, None) for status in await self.get_statuses(scripthashes)]
+
+    async def subscribe(self, scripthashes: Sequence[str],
+                        on_change: Callable[[str], None]) -> None:
+        """Pide avisos de cambios (mempool o bloques) de los scripthashes, si el backend los ofrece."""
+
+    async def subscribe_headers(self, on_block: Callable[[int], None]) -> Optional[int]:
+        """Pide avisos de bloques nuevos y devuelve la altura actual (None si no se ofrecen)."""
+        return None
+
+    async def close(self) -> None:
+        """Libera las conexiones del backend."""
+
+
+class LocalHistoryBackend(HistoryBackend):
+    """Backend en memoria con latencia simulada, para pruebas y mediciones."""
+
+    def __init__(self, statuses: Optional[Dict[str, ScriptStatus]] = None, latency: float = 0.0):
+        """Inicializa el backend.
+
+        Args:
+            statuses: Estado por scripthash (el resto se consideran sin uso)
+            latency: Retardo en segundos de cada petición (ida y vuelta)
+        """
+        self.statuses = dict(statuses or {})
+        self.latency = latency
+        self.requests = 0
+        self.queried = 0
+
+    async def get_statuses(self, scripthashes: Sequence[str]) -> List[ScriptStatus]:
+        self.requests += 1
+        self.queried += len(scripthashes)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return [self.statuses.get(scripthash, UNUSED) for scripthash in scripthashes]
+
+
+def record_scripthashes(record: Dict[str, Any]) -> List[str]:
+    """Scripthashes de un registro (los tres tipos en modo multiformato)."""
+    addr_types = ADDR_TYPES if record['tipo'] == ADDR_TYPE_MULTI else (record['tipo'],)
+    h160 = record_hash160(record)
+    return [electrum_scripthash(script_pubkey(script_payload(h160, addr_type), addr_type))
+            for addr_type in addr_types]
+
+
+# Registro con los scripthashes que se consultan por él
+Prepared = Tuple[Dict[str, Any], List[str]]
+
+
+class _Deriver(ThreadPoolExecutor):
+    """Hilo único de derivación del descubrimiento.
+
+    La aritmética de curva no bloquea el bucle de eventos y las cadenas se
+    derivan de una en una, sin compartir el motor entre hilos. Al salir no se
+    espera a la ventana adelantada que ya no se vaya a usar.
+    """
+
+    def __init__(self):
+        super().__init__(max_workers=1, thread_name_prefix='DiscoveryDerive')
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown(wait=False, cancel_futures=True)
+        return False
+
+
+def _combine(statuses: Iterable[ScriptStatus]) -> ScriptStatus:
+    """Suma los estados de los scripts de una misma clave."""
+    tx_count = confirmed = unconfirmed = 0
+    for status in statuses:
+        tx_count += status.tx_count
+        confirmed += status.confirmed
+        unconfirmed += status.unconfirmed
+    return ScriptStatus(tx_count, confirmed, unconfirmed)
+
+
+class DiscoveryEngine:
+    """Recorre las cadenas de una cuenta hasta el límite de huecos consultando el backend."""
+
+    def __init__(self, engine: DerivationEngine, backend: HistoryBackend,
+                 gap_limit: int = DEFAULT_GAP_LIMIT, batch_size: int = DEFAULT_BATCH_SIZE,
+                 concurrency: int = DEFAULT_CONCURRENCY,
+                 chains: Sequence[int] = (CHAIN_RECEIVE, CHAIN_CHANGE)):
+        """Inicializa el motor de descubrimiento.
+
+        Args:
+            engine: Motor de derivación de la cuenta
+            backend: Backend de historial
+            gap_limit: Direcciones consecutivas sin uso que cierran una cadena
+            batch_size: Direcciones por petición al backend
+            concurrency: Peticiones simultáneas como máximo
+            chains: Cadenas a recorrer
+        """
+        if gap_limit < 1 or batch_size < 1 or concurrency < 1:
+            raise ValueError("El límite de huecos, el lote y la concurrencia deben ser positivos")
+        self.engine = engine
+        self.backend = backend
+        self.gap_limit = gap_limit
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.chains = tuple(chains)
+        self.last_used: Dict[int, int] = {chain: -1 for chain in self.chains}
+        self._cancel = threading.Event()
+
+    def cancel(self) -> None:
+        """Solicita detener el descubrimiento tras las peticiones en curso."""
+        self._cancel.set()
+
+    async def discover(self, on_result: Optional[Callable[[DiscoveryResult], None]] = None
+                       ) -> Dict[int, List[DiscoveryResult]]:
+        """Descubre las direcciones usadas de todas las cadenas.
+
+        Args:
+            on_result: Función llamada con cada resultado en cuanto llega
+
+        Returns:
+            dict: Resultados por cadena, ordenados por índice
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        with _Deriver() as deriver:
+            results = await asyncio.gather(*(self._discover_chain(chain, semaphore, deriver, on_result)
+                                             for chain in self.chains))
+        return dict(zip(self.chains, results))
+
+    async def _discover_chain(self, chain: int, semaphore: asyncio.Semaphore, deriver: '_Deriver',
+                              on_result: Optional[Callable[[DiscoveryResult], None]]
+                              ) -> List[DiscoveryResult]:
+        """Recorre una cadena por ventanas crecientes.
+
+        La derivación se hace fuera del bucle de eventos, y la ventana
+        siguiente se empieza a derivar mientras se consulta la actual.
+        """
+        found: List[DiscoveryResult] = []
+        next_index = 0
+        window = self.gap_limit
+        prefetched: Optional[Tuple[int, 'Future[List[Prepared]]']] = None
+        while next_index < self.last_used[chain] + 1 + self.gap_limit and not self._cancel.is_set():
+            # Siempre al menos hasta el final del hueco; más si la cadena sigue en uso
+            end = max(self.last_used[chain] + 1 + self.gap_limit, next_index + window)
+            prepared: List[Prepared] = []
+            if prefetched is not None and prefetched[0] == next_index:
+                prepared = (await asyncio.wrap_future(prefetched[1]))[:end - next_index]
+            if len(prepared) < end - next_index:
+                prepared += await asyncio.wrap_future(
+                    deriver.submit(self._derive, chain, next_index + len(prepared),
+                                   end - next_index - len(prepared)))
+            batches = [prepared[i:i + self.batch_size] for i in range(0, len(prepared), self.batch_size)]
+            queries = asyncio.as_completed([self._query(batch, semaphore) for batch in batches])
+            # Si la cadena sigue, la próxima ronda empieza donde acaba esta
+            prefetched = (end, deriver.submit(self._derive, chain, end, window))
+            used_before = self.last_used[chain]
+
+            for completed in queries:
+                for record, status in await completed:
+                    result = DiscoveryResult(chain, record['indice'], record, status)
+                    found.append(result)
+                    if status.used and record['indice'] > self.last_used[chain]:
+                        self.last_used[chain] = record['indice']
+                    if on_result is not None:
+                        on_result(result)
+
+            next_index = end
+            if self.last_used[chain] > used_before:
+                window = min(window * 2, MAX_WINDOW)
+
+        found.sort(key=lambda result: result.index)
+        return found
+
+    def _derive(self, chain: int, start: int, count: int) -> List['Prepared']:
+        """Deriva un tramo de la cadena con sus scripthashes (en el hilo de derivación)."""
+        return [(record, record_scripthashes(record)) for record in self.engine.derive_range(chain, start, count)]
+
+    async def check(self, records: Iterable[Dict[str, Any]], chain: int = CHAIN_RECEIVE,
+                    on_result: Optional[Callable[[DiscoveryResult], None]] = None) -> List[DiscoveryResult]:
+        """Consulta el estado de registros ya conocidos, sin recorrer la cadena.
+
+        Cada resultado lleva el índice del propio registro. Los registros se
+        consultan por ventanas de ``MAX_WINDOW``, así que pueden llegar de una
+        secuencia perezosa sin cargarla entera; cada ventana se lee fuera del
+        bucle de eventos mientras se consulta la anterior.
+
+        Args:
+            records: Registros a consultar (se usan su tipo y su clave pública)
+            chain: Cadena a la que pertenecen
+            on_result: Función llamada con cada resultado en cuanto llega
+
+        Returns:
+            list: Resultados ordenados por índice
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        found: List[DiscoveryResult] = []
+        records = iter(records)
+
+        def read_window() -> List[Prepared]:
+            return [(record, record_scripthashes(record)) for record in itertools.islice(records, MAX_WINDOW)]
+
+        with _Deriver() as deriver:
+            pending = deriver.submit(read_window)
+            while not self._cancel.is_set():
+                window = await asyncio.wrap_future(pending)
+                if not window:
+                    break
+                batches = [window[i:i + self.batch_size] for i in range(0, len(window), self.batch_size)]
+                queries = asyncio.as_completed([self._query(batch, semaphore) for batch in batches])
+                pending = deriver.submit(read_window)
+                for completed in queries:
+                    for record, status in await completed:
+                        result = DiscoveryResult(chain, record['indice'], record, status)
+                        found.append(result)
+                        if status.used and record['indice'] > self.last_used.get(chain, -1):
+                            self.last_used[chain] = record['indice']
+                        if on_result is not None:
+                            on_result(result)
+        found.sort(key=lambda result: result.index)
+        return found
+
+    async def _query(self, prepared: List['Prepared'],
+                     semaphore: asyncio.Semaphore) -> List[Tuple[Dict[str, Any], ScriptStatus]]:
+        """Consulta un lote de registros (con sus scripthashes ya calculados) al backend."""
+        flat = [scripthash for _, group in prepared for scripthash in group]
+        async with semaphore:
+            statuses = await self.backend.get_statuses(flat)
+        paired = []
+        position = 0
+        for record, group in prepared:
+            paired.append((record, _combine(statuses[position:position + len(group)])))
+            position += len(group)
+        return paired
+
+    def _run(self, task: Awaitable[Any]) -> Any:
+        """Ejecuta una corrutina en un bucle de eventos propio y cierra el backend."""
+        async def main():
+            try:
+                return await task
+            finally:
+                await self.backend.close()
+        return asyncio.run(main())
+
+    def run(self, on_result: Optional[Callable[[DiscoveryResult], None]] = None
+            ) -> Dict[int, List[DiscoveryResult]]:
+        """Ejecuta ``discover`` en un bucle de eventos propio y cierra el backend."""
+        return self._run(self.discover(on_result))
+
+    def run_check(self, records: Iterable[Dict[str, Any]], chain: int = CHAIN_RECEIVE,
+                  on_result: Optional[Callable[[DiscoveryResult], None]] = None) -> List[DiscoveryResult]:
+        """Ejecuta ``check`` en un bucle de eventos propio y cierra el backend."""
+        return self._run(self.check(records, chain, on_result))
+
+    def iter_results(self, records: Optional[Iterable[Dict[str, Any]]] = None,
+                     chain: int = CHAIN_RECEIVE) -> Iterator[DiscoveryResult]:
+        """Itera sobre los resultados a medida que llegan.
+
+        El bucle de eventos se ejecuta en un hilo propio; al cerrar el
+        iterador se cancela el descubrimiento. Sirve como fuente de un
+        ``DerivationJob`` para volcar los saldos en la interfaz.
+
+        Args:
+            records: Si se indican, solo se consultan estos registros de
+                ``chain`` (``check``) en lugar de recorrer las cadenas
+            chain: Cadena de ``records``
+        """
+        results: 'queue.Queue[Any]' = queue.Queue()
+        finished = object()
+        errors: List[BaseException] = []
+
+        def worker():
+            try:
+                if records is None:
+                    self.run(results.put)
+                else:
+                    self.run_check(records, chain, results.put)
+            except BaseException as e:
+                errors.append(e)
+            finally:
+                results.put(finished)
+
+        thread = threading.Thread(target=worker, name='DiscoveryEngine', daemon=True)
+        thread.start()
+        try:
+            while True:
+                item = results.get()
+                if item is finished:
+                    break
+                yield item
+        finally:
+            self.cancel()
+            thread.join()
+        if errors:
+            raise errors[0]
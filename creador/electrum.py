@@ -0,0 +1,379 @@
+"""
+Cliente asyncio del protocolo Electrum (JSON-RPC sobre TCP/TLS).
+
+- ``ElectrumConnection``: una conexión persistente. Las peticiones de un lote
+  se escriben de una vez (una línea JSON por petición) y las respuestas se
+  reparten por ``id``, así que un lote de cientos de consultas cuesta un solo
+  viaje de ida y vuelta. Las notificaciones de suscripción se entregan a los
+  manejadores registrados.
+- ``ElectrumPool``: conexiones con todos los servidores configurados; reparte
+  los lotes entre ellas y reintenta en otro servidor si una conexión cae.
+- ``ElectrumHistoryBackend``: backend de historial para el descubrimiento.
+"""
+
+import asyncio
+import itertools
+import json
+import ssl
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from .discovery import History, HistoryBackend, ScriptStatus
+
+PROTOCOL_VERSION = '1.4'
+CLIENT_NAME = 'CreadorCarterasHD'
+
+# Peticiones por lote enviado a una conexión
+DEFAULT_BATCH_SIZE = 100
+
+# Tiempo máximo de espera de una respuesta (segundos)
+DEFAULT_TIMEOUT = 30.0
+
+# Límite de línea de las respuestas (las historias largas ocupan varios MB)
+_STREAM_LIMIT = 64 * 1024 * 1024
+
+# Puertos en los que se usa TLS por convención si el servidor no lo indica
+SSL_PORTS = (50002, 60002, 443)
+
+
+class ElectrumServer(NamedTuple):
+    """Servidor Electrum."""
+    host: str
+    port: int
+    use_ssl: bool
+
+    def __str__(self) -> str:
+        return f"{self.host}:{self.port}{' (TLS)' if self.use_ssl else ''}"
+
+
+# Servidores públicos usados en modo automático
+DEFAULT_SERVERS = {
+    'mainnet': [
+        ElectrumServer('electrum.blockstream.info', 50002, True),
+        ElectrumServer('electrum.emzy.de', 50002, True),
+        ElectrumServer('bitcoin.aranguren.org', 50002, True),
+    ],
+    'testnet': [
+        ElectrumServer('electrum.blockstream.info', 60002, True),
+    ],
+}
+
+# Servidor Electrum local (electrs/Fulcrum) junto a un nodo completo
+LOCAL_NODE_SERVER = ElectrumServer('127.0.0.1', 50001, False)
+
+
+class ElectrumError(Exception):
+    """Error devuelto por el servidor en una respuesta JSON-RPC."""
+
+
+def servers_from_settings(settings: Dict[str, Any], network: str = 'mainnet') -> List[ElectrumServer]:
+    """Servidores a usar según la configuración de red de la aplicación.
+
+    Args:
+        settings: Configuración del diálogo de red ('mode', 'use_custom_servers', 'servers')
+        network: Red ('mainnet' o 'testnet')
+
+    Returns:
+        list: Servidores Electrum
+    """
+    if settings.get('use_custom_servers') and settings.get('servers'):
+        return [ElectrumServer(entry['host'], int(entry['port']),
+                               entry.get('ssl', int(entry['port']) in SSL_PORTS))
+                for entry in settings['servers']]
+    if settings.get('mode') == 'full':
+        return [LOCAL_NODE_SERVER]
+    return list(DEFAULT_SERVERS[network])
+
+
+class ElectrumConnection:
+    """Conexión persistente con un servidor Electrum."""
+
+    def __init__(self, server: ElectrumServer, timeout: float = DEFAULT_TIMEOUT):
+        """Inicializa la conexión (se abre con ``connect``).
+
+        Args:
+            server: Servidor Electrum
+            timeout: Tiempo máximo de espera de cada respuesta
+        """
+        self.server = server
+        self.timeout = timeout
+        self.server_version: Optional[Sequence[str]] = None
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+        self._handlers: Dict[str, List[Callable[[List[Any]], None]]] = {}
+        self._closed = False
+
+    @property
+    def connected(self) -> bool:
+        """Indica si la conexión está abierta."""
+        return self._writer is not None and not self._closed
+
+    async def connect(self) -> None:
+        """Abre la conexión y negocia la versión del protocolo."""
+        context = ssl.create_default_context() if self.server.use_ssl else None
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.server.host, self.server.port, ssl=context,
+                                    limit=_STREAM_LIMIT),
+            self.timeout)
+        self._reader_task = asyncio.create_task(self._read_loop())
+        self.server_version = await self.request('server.version', [CLIENT_NAME, PROTOCOL_VERSION])
+
+    def on_notification(self, method: str, handler: Callable[[List[Any]], None]) -> None:
+        """Registra un manejador para las notificaciones de ``method``."""
+        self._handlers.setdefault(method, []).append(handler)
+
+    async def request(self, method: str, params: Sequence[Any] = ()) -> Any:
+        """Envía una petición y espera su resultado."""
+        return (await self.batch([(method, params)]))[0]
+
+    async def batch(self, calls: Sequence[Tuple[str, Sequence[Any]]]) -> List[Any]:
+        """Envía varias peticiones en una sola escritura y devuelve sus resultados en orden.
+
+        Raises:
+            ElectrumError: Si el servidor devuelve un error en alguna petición
+            ConnectionError: Si la conexión se pierde
+        """
+        if not self.connected:
+            raise ConnectionError(f"Conexión cerrada con {self.server}")
+        loop = asyncio.get_running_loop()
+        futures = []
+        lines = []
+        for method, params in calls:
+            request_id = next(self._ids)
+            future = loop.create_future()
+            self._pending[request_id] = future
+            futures.append(future)
+            lines.append(json.dumps({'jsonrpc': '2.0', 'id': request_id,
+                                     'method': method, 'params': list(params)}))
+        self._writer.write(('\n'.join(lines) + '\n').encode())
+        try:
+            await self._writer.drain()
+            return await asyncio.wait_for(asyncio.gather(*futures), self.timeout)
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+    async def _read_loop(self) -> None:
+        """Reparte las respuestas y notificaciones recibidas."""
+        error: BaseException = ConnectionError(f"Conexión cerrada por {self.server}")
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                message = json.loads(line)
+                for item in message if isinstance(message, list) else (message,):
+                    self._dispatch(item)
+        except asyncio.CancelledError:
+            error = ConnectionError(f"Conexión cerrada con {self.server}")
+        except Exception as e:
+            error = ConnectionError(f"Error de lectura de {self.server}: {e}")
+        finally:
+            self._closed = True
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(error)
+            self._pending.clear()
+
+    def _dispatch(self, item: Dict[str, Any]) -> None:
+        request_id = item.get('id')
+        if request_id is None:
+            for handler in self._handlers.get(item.get('method'), ()):
+                handler(item.get('params', []))
+            return
+        future = self._pending.pop(request_id, None)
+        if future is None or future.done():
+            return
+        if item.get('error') is not None:
+            error = item['error']
+            message = error.get('message', error) if isinstance(error, dict) else error
+            future.set_exception(ElectrumError(f"{self.server}: {message}"))
+        else:
+            future.set_result(item.get('result'))
+
+    async def close(self) -> None:
+        """Cierra la conexión."""
+        self._closed = True
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            try:
+                await self._reader_task
+            except asyncio.CancelledError:
+                pass
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except (ConnectionError, ssl.SSLError):
+                pass
+
+
+class ElectrumPool:
+    """Conjunto de conexiones con los servidores configurados."""
+
+    def __init__(self, servers: Sequence[ElectrumServer], connections_per_server: int = 1,
+                 batch_size: int = DEFAULT_BATCH_SIZE, timeout: float = DEFAULT_TIMEOUT):
+        """Inicializa el conjunto (las conexiones se abren en la primera petición).
+
+        Args:
+            servers: Servidores Electrum
+            connections_per_server: Conexiones persistentes por servidor
+            batch_size: Peticiones por lote enviado a una conexión
+            timeout: Tiempo máximo de espera de cada respuesta
+        """
+        if not servers:
+            raise ValueError("No hay servidores Electrum configurados")
+        self.servers = list(servers)
+        self.connections_per_server = connections_per_server
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.errors: Dict[ElectrumServer, BaseException] = {}
+        self._connections: List[ElectrumConnection] = []
+        self._connect_lock: Optional[asyncio.Lock] = None
+        self._next = 0
+        self._handlers: List[Tuple[str, Callable[[List[Any]], None]]] = []
+
+    @property
+    def connections(self) -> List[ElectrumConnection]:
+        """Conexiones abiertas."""
+        return [connection for connection in self._connections if connection.connected]
+
+    def on_notification(self, method: str, handler: Callable[[List[Any]], None]) -> None:
+        """Registra un manejador de notificaciones en todas las conexiones (también futuras)."""
+        self._handlers.append((method, handler))
+        for connection in self._connections:
+            connection.on_notification(method, handler)
+
+    async def connect(self) -> None:
+        """Abre las conexiones que falten; falla solo si no se puede abrir ninguna."""
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            self._connections = self.connections
+            missing = []
+            for server in self.servers:
+                open_count = sum(1 for c in self._connections if c.server == server)
+                missing.extend(ElectrumConnection(server, self.timeout)
+                               for _ in range(self.connections_per_server - open_count))
+            if missing:
+                results = await asyncio.gather(*(c.connect() for c in missing), return_exceptions=True)
+                for connection, result in zip(missing, results):
+                    if isinstance(result, BaseException):
+                        self.errors[connection.server] = result
+                        await connection.close()
+                    else:
+                        for method, handler in self._handlers:
+                            connection.on_notification(method, handler)
+                        self._connections.append(connection)
+            if not self._connections:
+                detail = "; ".join(f"{server}: {error}" for server, error in self.errors.items())
+                raise ConnectionError(f"No se pudo conectar con ningún servidor Electrum ({detail})")
+
+    def _pick(self, exclude: Sequence[ElectrumConnection] = ()) -> Optional[ElectrumConnection]:
+        """Elige la siguiente conexión abierta en turno rotatorio."""
+        candidates = [c for c in self._connections if c.connected and c not in exclude]
+        if not candidates:
+            return None
+        self._next = (self._next + 1) % len(candidates)
+        return candidates[self._next]
+
+    async def _send(self, calls: Sequence[Tuple[str, Sequence[Any]]]) -> List[Any]:
+        """Envía un lote a una conexión y lo reintenta en otra si la conexión cae."""
+        tried: List[ElectrumConnection] = []
+        while True:
+            if not self.connections:
+                await self.connect()
+            connection = self._pick(tried)
+            if connection is None:
+                raise ConnectionError("Todas las conexiones con servidores Electrum han fallado")
+            try:
+                return await connection.batch(calls)
+            except (ConnectionError, asyncio.TimeoutError, OSError) as e:
+                self.errors[connection.server] = e
+                tried.append(connection)
+                await connection.close()
+
+    async def request(self, method: str, params: Sequence[Any] = ()) -> Any:
+        """Envía una petición a cualquiera de los servidores."""
+        return (await self._send([(method, params)]))[0]
+
+    async def batch(self, calls: Sequence[Tuple[str, Sequence[Any]]]) -> List[Any]:
+        """Reparte las peticiones en lotes entre las conexiones y devuelve los resultados en orden."""
+        if not self.connections:
+            await self.connect()
+        chunks = [calls[i:i + self.batch_size] for i in range(0, len(calls), self.batch_size)]
+        results = await asyncio.gather(*(self._send(chunk) for chunk in chunks))
+        return [result for chunk in results for result in chunk]
+
+    async def close(self) -> None:
+        """Cierra todas las conexiones."""
+        connections, self._connections = self._connections, []
+        await asyncio.gather(*(c.close() for c in connections), return_exceptions=True)
+
+
+class ElectrumHistoryBackend(HistoryBackend):
+    """Backend de historial que consulta un ``ElectrumPool``.
+
+    Las suscripciones viven en las conexiones del pool: los avisos de cambios
+    y de bloques solo llegan mientras el backend está abierto, es decir,
+    durante un descubrimiento (``DiscoveryEngine.run`` lo cierra al acabar).
+    Entre dos consultas, la vigencia de la caché depende de su TTL; la
+    consulta siguiente vuelve a suscribir los scripthashes que pide al servidor.
+    """
+
+    def __init__(self, pool: ElectrumPool):
+        self.pool = pool
+        # Cada función se registra una sola vez aunque se suscriba en varios lotes
+        self._change_callbacks: Dict[Callable[[str], None], None] = {}
+        self._block_callbacks: Dict[Callable[[int], None], None] = {}
+        self._scripthash_handler_set = False
+        self._headers_handler_set = False
+
+    async def get_statuses(self, scripthashes: Sequence[str]) -> List[ScriptStatus]:
+        return [status for status, _ in await self.get_entries(scripthashes)]
+
+    async def get_entries(self, scripthashes: Sequence[str]
+                          ) -> List[Tuple[ScriptStatus, Optional[History]]]:
+        calls: List[Tuple[str, Sequence[Any]]] = []
+        for scripthash in scripthashes:
+            calls.append(('blockchain.scripthash.get_history', [scripthash]))
+            calls.append(('blockchain.scripthash.get_balance', [scripthash]))
+        results = await self.pool.batch(calls)
+        entries = []
+        for history, balance in zip(results[::2], results[1::2]):
+            items = [(item['tx_hash'], item['height']) for item in history or ()]
+            entries.append((ScriptStatus(len(items), balance['confirmed'], balance['unconfirmed']), items))
+        return entries
+
+    async def subscribe(self, scripthashes: Sequence[str],
+                        on_change: Callable[[str], None]) -> None:
+        if not self._scripthash_handler_set:
+            self.pool.on_notification('blockchain.scripthash.subscribe',
+                                      lambda params: self._on_change(params[0]))
+            self._scripthash_handler_set = True
+        self._change_callbacks[on_change] = None
+        await self.pool.batch([('blockchain.scripthash.subscribe', [scripthash])
+                               for scripthash in scripthashes])
+
+    async def subscribe_headers(self, on_block: Callable[[int], None]) -> Optional[int]:
+        if not self._headers_handler_set:
+            self.pool.on_notification('blockchain.headers.subscribe',
+                                      lambda params: self._on_block(params[0]['height']))
+            self._headers_handler_set = True
+        self._block_callbacks[on_block] = None
+        tip = await self.pool.request('blockchain.headers.subscribe')
+        return tip['height']
+
+    def _on_change(self, scripthash: str) -> None:
+        for callback in list(self._change_callbacks):
+            callback(scripthash)
+
+    def _on_block(self, height: int) -> None:
+        for callback in list(self._block_callbacks):
+            callback(height)
+
+    async def close(self) -> None:
+        await self.pool.close()
@@ -0,0 +1,145 @@
+"""
+Servidor Electrum local en memoria para pruebas y mediciones.
+
+Implementa el subconjunto del protocolo que usa el cliente (versión, ping,
+historial, saldo, suscripciones a scripthash y cabeceras) con una latencia
+simulada por petición. Las peticiones se atienden en paralelo, de modo que
+un lote enviado de una vez paga la latencia una sola vez, como en la red.
+"""
+
+import asyncio
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+# Cabecera ficticia de 80 bytes para ``blockchain.headers.subscribe``
+_DUMMY_HEADER = bytes(80).hex()
+
+
+class MockElectrumServer:
+    """Servidor Electrum de pruebas."""
+
+    def __init__(self, histories: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+                 balances: Optional[Dict[str, Tuple[int, int]]] = None, latency: float = 0.0):
+        """Inicializa el servidor.
+
+        Args:
+            histories: Historial por scripthash (lista de {'tx_hash', 'height'})
+            balances: (confirmado, sin confirmar) por scripthash, en satoshis
+            latency: Retardo en segundos aplicado a cada petición
+        """
+        self.histories = dict(histories or {})
+        self.balances = dict(balances or {})
+        self.latency = latency
+        self.height = 0
+        self.header = _DUMMY_HEADER
+        self.requests = 0
+        self.port: Optional[int] = None
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._clients: Set[asyncio.StreamWriter] = set()
+        self._scripthash_subscribers: Dict[str, Set[asyncio.StreamWriter]] = {}
+        self._header_subscribers: Set[asyncio.StreamWriter] = set()
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> int:
+        """Arranca el servidor y devuelve el puerto de escucha."""
+        self._server = await asyncio.start_server(self._handle_client, host, port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def close(self) -> None:
+        """Detiene el servidor y cierra las conexiones de los clientes."""
+        for writer in list(self._clients):
+            writer.close()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    def status_hash(self, scripthash: str) -> Optional[str]:
+        """Estado del scripthash según el protocolo (hash del historial o None)."""
+        history = self.histories.get(scripthash)
+        if not history:
+            return None
+        text = ''.join(f"{item['tx_hash']}:{item['height']}:" for item in history)
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def notify_scripthash(self, scripthash: str) -> None:
+        """Notifica un cambio del scripthash a los clientes suscritos."""
+        self._notify(self._scripthash_subscribers.get(scripthash, ()),
+                     'blockchain.scripthash.subscribe', [scripthash, self.status_hash(scripthash)])
+
+    def notify_header(self, height: int, header_hex: Optional[str] = None) -> None:
+        """Anuncia un nuevo bloque a los clientes suscritos a cabeceras."""
+        self.height = height
+        self.header = header_hex or _DUMMY_HEADER
+        self._notify(self._header_subscribers, 'blockchain.headers.subscribe',
+                     [{'height': self.height, 'hex': self.header}])
+
+    def _notify(self, writers, method: str, params: List[Any]) -> None:
+        line = (json.dumps({'jsonrpc': '2.0', 'method': method, 'params': params}) + '\n').encode()
+        for writer in list(writers):
+            if not writer.is_closing():
+                writer.write(line)
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._clients.add(writer)
+        tasks: Set[asyncio.Task] = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                message = json.loads(line)
+                task = asyncio.create_task(self._respond(message, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (ConnectionError, json.JSONDecodeError):
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            self._clients.discard(writer)
+            self._header_subscribers.discard(writer)
+            for subscribers in self._scripthash_subscribers.values():
+                subscribers.discard(writer)
+            writer.close()
+
+    async def _respond(self, message: Any, writer: asyncio.StreamWriter) -> None:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if isinstance(message, list):
+            response: Any = [self._call(item, writer) for item in message]
+        else:
+            response = self._call(message, writer)
+        if not writer.is_closing():
+            writer.write((json.dumps(response) + '\n').encode())
+
+    def _call(self, request: Dict[str, Any], writer: asyncio.StreamWriter) -> Dict[str, Any]:
+        self.requests += 1
+        method = request.get('method')
+        params = request.get('params', [])
+        reply: Dict[str, Any] = {'jsonrpc': '2.0', 'id': request.get('id')}
+        try:
+            reply['result'] = self._dispatch(method, params, writer)
+        except (KeyError, IndexError, TypeError, ValueError) as e:
+            reply['error'] = {'code': -32602, 'message': f"Parámetros inválidos: {e}"}
+        except NotImplementedError:
+            reply['error'] = {'code': -32601, 'message': f"Método desconocido: {method}"}
+        return reply
+
+    def _dispatch(self, method: str, params: List[Any], writer: asyncio.StreamWriter) -> Any:
+        if method == 'server.version':
+            return ['MockElectrum 1.0', '1.4']
+        if method == 'server.ping':
+            return None
+        if method == 'blockchain.scripthash.get_history':
+            return self.histories.get(params[0], [])
+        if method == 'blockchain.scripthash.get_balance':
+            confirmed, unconfirmed = self.balances.get(params[0], (0, 0))
+            return {'confirmed': confirmed, 'unconfirmed': unconfirmed}
+        if method == 'blockchain.scripthash.subscribe':
+            self._scripthash_subscribers.setdefault(params[0], set()).add(writer)
+            return self.status_hash(params[0])
+        if method == 'blockchain.headers.subscribe':
+            self._header_subscribers.add(writer)
+            return {'height': self.height, 'hex': self.header}
+        raise NotImplementedError(method)
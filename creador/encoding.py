@@ -0,0 +1,329 @@
+"""
+Codificación de direcciones Bitcoin a partir de claves públicas comprimidas.
+
+Trabaja directamente sobre los 33 bytes de la clave: calcula hash160 una sola
+vez y construye P2PKH (Base58Check), P2SH-P2WPKH (Base58Check) y P2WPKH
+(bech32) sin pasar por representaciones hexadecimales ni objetos intermedios.
+La red se indica en cada llamada; el módulo no guarda ningún estado global.
+"""
+
+import hashlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Constantes para tipos de direcciones
+ADDR_TYPE_P2PKH = 'p2pkh'        # Legacy (1...)
+ADDR_TYPE_P2SH_P2WPKH = 'p2sh'  # Nested SegWit (3...)
+ADDR_TYPE_P2WPKH = 'p2wpkh'      # Native SegWit (bc1...)
+
+ADDR_TYPES = (ADDR_TYPE_P2PKH, ADDR_TYPE_P2SH_P2WPKH, ADDR_TYPE_P2WPKH)
+
+# Modo multiformato: los tres tipos a partir de la misma clave pública
+ADDR_TYPE_MULTI = 'multi'
+
+# Prefijos por red
+NETWORKS = {
+    'mainnet': {'p2pkh': b'\x00', 'p2sh': b'\x05', 'wif': b'\x80', 'hrp': 'bc'},
+    'testnet': {'p2pkh': b'\x6f', 'p2sh': b'\xc4', 'wif': b'\xef', 'hrp': 'tb'},
+}
+
+# RIPEMD-160: OpenSSL 3 puede no ofrecerlo; en ese caso se usa la
+# implementación en Python puro incluida en bitcoin-utils
+try:
+    hashlib.new('ripemd160')
+
+    def _ripemd160(data: bytes) -> bytes:
+        return hashlib.new('ripemd160', data).digest()
+except ValueError:
+    from bitcoinutils.ripemd160 import ripemd160 as _ripemd160
+
+_sha256 = hashlib.sha256
+
+BASE58_ALPHABET = '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'
+_BASE58_INDEX = {c: i for i, c in enumerate(BASE58_ALPHABET)}
+
+BECH32_CHARSET = 'qpzry9x8gf2tvdw0s3jn54khce6mua7l'
+_BECH32_INDEX = {c: i for i, c in enumerate(BECH32_CHARSET)}
+_BECH32_GENERATOR = (0x3b6a57b2, 0x26508e6d, 0x1ea119fa, 0x3d4233dd, 0x2a1462b3)
+# XOR de los generadores para cada valor de los 5 bits superiores del polinomio
+_BECH32_TABLE = tuple(
+    _BECH32_GENERATOR[0] * (top & 1) ^ _BECH32_GENERATOR[1] * (top >> 1 & 1)
+    ^ _BECH32_GENERATOR[2] * (top >> 2 & 1) ^ _BECH32_GENERATOR[3] * (top >> 3 & 1)
+    ^ _BECH32_GENERATOR[4] * (top >> 4 & 1)
+    for top in range(32)
+)
+
+
+def network_prefixes(network: str) -> Dict[str, object]:
+    """Prefijos de una red ('mainnet' o 'testnet')."""
+    try:
+        return NETWORKS[network]
+    except KeyError:
+        raise ValueError(f"Red no soportada: {network}")
+
+
+def hash160(data: bytes) -> bytes:
+    """RIPEMD160(SHA256(data))."""
+    return _ripemd160(_sha256(data).digest())
+
+
+# ---------------------------------------------------------------------------
+# Base58Check
+# ---------------------------------------------------------------------------
+
+def base58_encode(data: bytes) -> str:
+    """Codifica bytes en Base58."""
+    value = int.from_bytes(data, 'big')
+    chars = []
+    while value:
+        value, mod = divmod(value, 58)
+        chars.append(BASE58_ALPHABET[mod])
+    pad = len(data) - len(data.lstrip(b'\0'))
+    return '1' * pad + ''.join(reversed(chars))
+
+
+def base58_decode(text: str) -> bytes:
+    """Decodifica una cadena Base58."""
+    value = 0
+    for c in text:
+        try:
+            value = value * 58 + _BASE58_INDEX[c]
+        except KeyError:
+            raise ValueError(f"Carácter Base58 inválido: {c!r}")
+    pad = len(text) - len(text.lstrip('1'))
+    body = value.to_bytes((value.bit_length() + 7) // 8, 'big') if value else b''
+    return b'\0' * pad + body
+
+
+def base58check_encode(payload: bytes) -> str:
+    """Codifica bytes en Base58Check (suma de verificación de 4 bytes)."""
+    checksum = _sha256(_sha256(payload).digest()).digest()[:4]
+    return base58_encode(payload + checksum)
+
+
+def base58check_decode(text: str) -> bytes:
+    """Decodifica Base58Check comprobando la suma de verificación."""
+    raw = base58_decode(text)
+    if len(raw) < 4:
+        raise ValueError("Cadena Base58Check demasiado corta")
+    payload, checksum = raw[:-4], raw[-4:]
+    if _sha256(_sha256(payload).digest()).digest()[:4] != checksum:
+        raise ValueError("Suma de verificación Base58Check incorrecta")
+    return payload
+
+
+# ---------------------------------------------------------------------------
+# Bech32 (BIP-173, testigo versión 0)
+# ---------------------------------------------------------------------------
+
+def _bech32_polymod(values: Iterable[int]) -> int:
+    chk = 1
+    table = _BECH32_TABLE
+    for value in values:
+        chk = (chk & 0x1ffffff) << 5 ^ value ^ table[chk >> 25]
+    return chk
+
+
+def _bech32_hrp_expand(hrp: str) -> List[int]:
+    return [ord(c) >> 5 for c in hrp] + [0] + [ord(c) & 31 for c in hrp]
+
+
+def _convertbits(data: Iterable[int], frombits: int, tobits: int, pad: bool = True) -> List[int]:
+    acc = 0
+    bits = 0
+    ret = []
+    maxv = (1 << tobits) - 1
+    for value in data:
+        acc = (acc << frombits) | value
+        bits += frombits
+        while bits >= tobits:
+            bits -= tobits
+            ret.append((acc >> bits) & maxv)
+    if pad:
+        if bits:
+            ret.append((acc << (tobits - bits)) & maxv)
+    elif bits >= frombits or ((acc << (tobits - bits)) & maxv):
+        raise ValueError("Relleno bech32 inválido")
+    return ret
+
+
+def segwit_encode(hrp: str, witness_version: int, program: bytes) -> str:
+    """Codifica un programa de testigo v0 en bech32."""
+    data = [witness_version] + _convertbits(program, 8, 5)
+    values = _bech32_hrp_expand(hrp) + data
+    polymod = _bech32_polymod(values + [0, 0, 0, 0, 0, 0]) ^ 1
+    checksum = [(polymod >> 5 * (5 - i)) & 31 for i in range(6)]
+    return hrp + '1' + ''.join(BECH32_CHARSET[d] for d in data + checksum)
+
+
+def segwit_decode(hrp: str, address: str) -> Tuple[int, bytes]:
+    """Decodifica una dirección bech32 v0 y devuelve (versión, programa)."""
+    if address.lower() != address and address.upper() != address:
+        raise ValueError("Dirección bech32 con mayúsculas y minúsculas mezcladas")
+    address = address.lower()
+    pos = address.rfind('1')
+    if pos < 1 or pos + 7 > len(address) or address[:pos] != hrp:
+        raise ValueError("Prefijo bech32 inválido")
+    try:
+        data = [_BECH32_INDEX[c] for c in address[pos + 1:]]
+    except KeyError:
+        raise ValueError("Carácter bech32 inválido")
+    if _bech32_polymod(_bech32_hrp_expand(hrp) + data) != 1:
+        raise ValueError("Suma de verificación bech32 incorrecta")
+    witness_version = data[0]
+    program = bytes(_convertbits(data[1:-6], 5, 8, pad=False))
+    if witness_version != 0 or len(program) not in (20, 32):
+        raise ValueError("Programa de testigo no soportado")
+    return witness_version, program
+
+
+# ---------------------------------------------------------------------------
+# Direcciones
+# ---------------------------------------------------------------------------
+
+def p2pkh_address(h160: bytes, network: str = 'mainnet') -> str:
+    """Dirección P2PKH (Legacy) a partir del hash160 de la clave pública."""
+    return base58check_encode(network_prefixes(network)['p2pkh'] + h160)
+
+
+def p2sh_p2wpkh_address(h160: bytes, network: str = 'mainnet') -> str:
+    """Dirección P2SH-P2WPKH (Nested SegWit) a partir del hash160 de la clave pública."""
+    redeem_script = b'\x00\x14' + h160
+    return base58check_encode(network_prefixes(network)['p2sh'] + hash160(redeem_script))
+
+
+def p2wpkh_address(h160: bytes, network: str = 'mainnet') -> str:
+    """Dirección P2WPKH (Native SegWit) a partir del hash160 de la clave pública."""
+    return segwit_encode(network_prefixes(network)['hrp'], 0, h160)
+
+
+_ENCODERS = {
+    ADDR_TYPE_P2PKH: p2pkh_address,
+    ADDR_TYPE_P2SH_P2WPKH: p2sh_p2wpkh_address,
+    ADDR_TYPE_P2WPKH: p2wpkh_address,
+}
+
+
+def encode_hash160(h160: bytes, addr_type: str, network: str = 'mainnet') -> str:
+    """Codifica una dirección del tipo indicado a partir del hash160 de la clave pública."""
+    try:
+        encoder = _ENCODERS[addr_type]
+    except KeyError:
+        raise ValueError(f"Tipo de dirección no soportado: {addr_type}")
+    return encoder(h160, network)
+
+
+def encode_all(h160: bytes, network: str = 'mainnet') -> Dict[str, str]:
+    """Codifica las direcciones de los tres tipos a partir de un único hash160.
+
+    Returns:
+        dict: Dirección por tipo (Legacy, Nested SegWit, Native SegWit)
+    """
+    return {addr_type: encoder(h160, network) for addr_type, encoder in _ENCODERS.items()}
+
+
+def encode_address(public_key: bytes, addr_type: str, network: str = 'mainnet') -> str:
+    """Codifica una dirección del tipo indicado a partir de una clave pública.
+
+    Args:
+        public_key: Clave pública comprimida (33 bytes)
+        addr_type: Tipo de dirección (ADDR_TYPE_*)
+        network: Red ('mainnet' o 'testnet'); 'mainnet' por defecto
+
+    Returns:
+        str: Dirección Bitcoin
+    """
+    if len(public_key) != 33 or public_key[0] not in (2, 3):
+        raise ValueError("Se requiere una clave pública comprimida de 33 bytes")
+    return encode_hash160(hash160(public_key), addr_type, network)
+
+
+def encode_addresses(public_keys: Iterable[bytes], addr_type: str,
+                     network: str = 'mainnet') -> List[str]:
+    """Codifica un lote de claves públicas comprimidas del mismo tipo y red."""
+    try:
+        encoder = _ENCODERS[addr_type]
+    except KeyError:
+        raise ValueError(f"Tipo de dirección no soportado: {addr_type}")
+    return [encoder(hash160(public_key), network) for public_key in public_keys]
+
+
+# ---------------------------------------------------------------------------
+# Scripts de salida (scriptPubKey)
+# ---------------------------------------------------------------------------
+
+def script_payload(h160: bytes, addr_type: str) -> bytes:
+    """Hash de 20 bytes que aparece en el scriptPubKey del tipo indicado.
+
+    Para P2PKH y P2WPKH es el hash160 de la clave pública; para P2SH-P2WPKH,
+    el hash160 del script de canje ``OP_0 <hash160>``.
+    """
+    if addr_type == ADDR_TYPE_P2SH_P2WPKH:
+        return hash160(b'\x00\x14' + h160)
+    if addr_type in (ADDR_TYPE_P2PKH, ADDR_TYPE_P2WPKH):
+        return h160
+    raise ValueError(f"Tipo de dirección no soportado: {addr_type}")
+
+
+def script_pubkey(payload: bytes, addr_type: str) -> bytes:
+    """Construye el scriptPubKey a partir del hash de 20 bytes del script."""
+    if addr_type == ADDR_TYPE_P2PKH:
+        return b'\x76\xa9\x14' + payload + b'\x88\xac'
+    if addr_type == ADDR_TYPE_P2SH_P2WPKH:
+        return b'\xa9\x14' + payload + b'\x87'
+    if addr_type == ADDR_TYPE_P2WPKH:
+        return b'\x00\x14' + payload
+    raise ValueError(f"Tipo de dirección no soportado: {addr_type}")
+
+
+def electrum_scripthash(script: bytes) -> str:
+    """Identificador de script del protocolo Electrum: SHA256 del script, invertido, en hex."""
+    return _sha256(script).digest()[::-1].hex()
+
+
+def parse_script_pubkey(script: bytes) -> Optional[Tuple[str, bytes]]:
+    """Reconoce un scriptPubKey P2PKH, P2SH o P2WPKH.
+
+    Returns:
+        tuple: (tipo de dirección, hash de 20 bytes) o None si no es de esos tipos
+    """
+    size = len(script)
+    if size == 25 and script[:3] == b'\x76\xa9\x14' and script[23:] == b'\x88\xac':
+        return ADDR_TYPE_P2PKH, bytes(script[3:23])
+    if size == 23 and script[:2] == b'\xa9\x14' and script[22] == 0x87:
+        return ADDR_TYPE_P2SH_P2WPKH, bytes(script[2:22])
+    if size == 22 and script[:2] == b'\x00\x14':
+        return ADDR_TYPE_P2WPKH, bytes(script[2:])
+    return None
+
+
+def decode_address(address: str, network: str = 'mainnet') -> Tuple[str, bytes]:
+    """Decodifica una dirección P2PKH, P2SH o P2WPKH.
+
+    Args:
+        address: Dirección Bitcoin
+        network: Red ('mainnet' o 'testnet'); 'mainnet' por defecto
+
+    Returns:
+        tuple: (tipo de dirección, hash de 20 bytes del scriptPubKey)
+    """
+    prefixes = network_prefixes(network)
+    address = address.strip()
+    if address.lower().startswith(prefixes['hrp'] + '1'):
+        _, program = segwit_decode(prefixes['hrp'], address)
+        if len(program) != 20:
+            raise ValueError("Solo se admiten direcciones P2WPKH")
+        return ADDR_TYPE_P2WPKH, program
+
+    payload = base58check_decode(address)
+    if len(payload) != 21:
+        raise ValueError("Longitud de dirección incorrecta")
+    if payload[:1] == prefixes['p2pkh']:
+        return ADDR_TYPE_P2PKH, payload[1:]
+    if payload[:1] == prefixes['p2sh']:
+        return ADDR_TYPE_P2SH_P2WPKH, payload[1:]
+    raise ValueError("Prefijo de dirección desconocido para la red")
+
+
+def encode_wif(private_key: bytes, network: str = 'mainnet') -> str:
+    """Codifica una clave privada en WIF (clave pública comprimida)."""
+    return base58check_encode(network_prefixes(network)['wif'] + private_key + b'\x01')
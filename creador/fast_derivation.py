@@ -0,0 +1,128 @@
+"""
+Derivación rápida de rangos contiguos de hijos no endurecidos (BIP-32).
+
+Para un nodo de cadena (K_par, c_par) el hijo i es ``point(IL_i) + K_par``,
+con ``IL_i`` la mitad izquierda de HMAC-SHA512(c_par, serP(K_par) || i).
+En lugar de la multiplicación escalar genérica que hacen ``bip32utils`` y
+``ecdsa`` para cada índice, aquí ``point(IL_i)`` se obtiene con la tabla de
+base fija del generador y todo el lote se pasa a coordenadas afines con una
+única inversión modular. El resultado es idéntico bit a bit al de ``ChildKey``.
+"""
+
+import hashlib
+import hmac
+import threading
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from .secp256k1 import (
+    N, batch_to_affine, compress, decompress, jacobian_add_affine, multiply_g
+)
+
+if TYPE_CHECKING:
+    from bip32utils import BIP32Key
+
+# Tamaño de lote por defecto (comparte el coste de la inversión modular)
+DEFAULT_BATCH = 256
+
+# Índice mínimo de los hijos endurecidos
+_HARDENED = 0x80000000
+
+# Derivadores ya preparados por nodo (clave pública, código de cadena, privado)
+_DERIVER_CACHE: Dict[Tuple[bytes, bytes, bool], 'ChainDeriver'] = {}
+_DERIVER_CACHE_SIZE = 16
+_DERIVER_CACHE_LOCK = threading.Lock()
+
+
+def clear_cache() -> None:
+    """Descarta los derivadores preparados (contienen material de claves privadas)."""
+    with _DERIVER_CACHE_LOCK:
+        _DERIVER_CACHE.clear()
+
+
+class ChainDeriver:
+    """Deriva lotes de hijos no endurecidos consecutivos de un nodo de cadena."""
+
+    def __init__(self, public_key: bytes, chain_code: bytes,
+                 private_key: Optional[bytes] = None):
+        """Inicializa el derivador.
+
+        Args:
+            public_key: Clave pública comprimida del nodo (33 bytes)
+            chain_code: Código de cadena del nodo (32 bytes)
+            private_key: Clave privada del nodo (32 bytes) o None si es solo público
+        """
+        self.public_key = public_key
+        self.chain_code = chain_code
+        self._parent_point = decompress(public_key)
+        self._parent_secret = int.from_bytes(private_key, 'big') if private_key else None
+        # Estado HMAC con la clave y serP(K_par) ya absorbidos
+        self._hmac = hmac.new(chain_code, public_key, hashlib.sha512)
+
+    @classmethod
+    def from_bip32(cls, node: 'BIP32Key') -> 'ChainDeriver':
+        """Crea un derivador a partir de un nodo de ``bip32utils``."""
+        private_key = None if node.public else node.PrivateKey()
+        return cls(node.PublicKey(), node.ChainCode(), private_key)
+
+    @classmethod
+    def for_node(cls, node: 'BIP32Key') -> 'ChainDeriver':
+        """Devuelve un derivador para el nodo reutilizando uno ya preparado si existe."""
+        key = (node.PublicKey(), node.ChainCode(), not node.public)
+        with _DERIVER_CACHE_LOCK:
+            deriver = _DERIVER_CACHE.get(key)
+            if deriver is None:
+                if len(_DERIVER_CACHE) >= _DERIVER_CACHE_SIZE:
+                    _DERIVER_CACHE.pop(next(iter(_DERIVER_CACHE)))
+                deriver = cls.from_bip32(node)
+                _DERIVER_CACHE[key] = deriver
+        return deriver
+
+    @property
+    def is_private(self) -> bool:
+        """Indica si el derivador produce también claves privadas."""
+        return self._parent_secret is not None
+
+    def derive_range(self, start: int, count: int) -> List[Tuple[int, bytes, Optional[bytes]]]:
+        """Deriva los hijos ``start .. start + count - 1``.
+
+        Args:
+            start: Primer índice
+            count: Número de hijos
+
+        Returns:
+            list: Tuplas (índice, clave pública comprimida, clave privada o None)
+        """
+        if start < 0 or count < 0 or start + count > _HARDENED:
+            raise ValueError("Rango de índices no endurecidos inválido")
+
+        parent_point = self._parent_point
+        parent_secret = self._parent_secret
+        base_hmac = self._hmac
+
+        points = []
+        secrets = []
+        for index in range(start, start + count):
+            mac = base_hmac.copy()
+            mac.update(index.to_bytes(4, 'big'))
+            il = int.from_bytes(mac.digest()[:32], 'big')
+            if il >= N:
+                raise ValueError(f"Índice de derivación inválido: {index}")
+            point = jacobian_add_affine(multiply_g(il), parent_point)
+            if point is None:
+                raise ValueError(f"Índice de derivación inválido: {index}")
+            points.append(point)
+            if parent_secret is not None:
+                secrets.append(((il + parent_secret) % N).to_bytes(32, 'big'))
+
+        affine = batch_to_affine(points)
+        if parent_secret is None:
+            return [(start + i, compress(p), None) for i, p in enumerate(affine)]
+        return [(start + i, compress(p), secrets[i]) for i, p in enumerate(affine)]
+
+    def iter_range(self, start: int, count: int, batch: int = DEFAULT_BATCH):
+        """Itera sobre los hijos de un rango derivándolos por lotes."""
+        end = start + count
+        while start < end:
+            size = min(batch, end - start)
+            yield from self.derive_range(start, size)
+            start += size
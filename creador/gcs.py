@@ -0,0 +1,204 @@
+"""
+Filtros compactos de bloque de BIP-158 (conjuntos codificados con Golomb-Rice).
+
+El filtro básico de un bloque contiene los scriptPubKey de sus salidas y los
+de las salidas que gastan sus entradas. Cada elemento se reduce con
+SipHash-2-4 (clave: los 16 primeros bytes del hash del bloque) al rango
+``[0, N * M)``. Los valores ordenados se guardan como diferencias
+codificadas con Golomb-Rice de parámetro P.
+
+Para comprobar una cartera contra un filtro, los scripts de la cartera se
+reducen una sola vez con la clave del bloque, se ordenan, y se recorren a la
+vez que se decodifica el filtro (intersección por mezcla de listas
+ordenadas). Así no se decodifica el filtro una vez por script.
+"""
+
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple, Union
+
+from .blocks import encode_varint, iter_transactions, read_varint
+
+# Parámetros del filtro básico (tipo 0)
+BASIC_FILTER_TYPE = 0
+BASIC_P = 19
+BASIC_M = 784931
+
+_MASK = 0xffffffffffffffff
+
+
+def sip_words(data: bytes) -> List[int]:
+    """Palabras de 64 bits del mensaje para SipHash (incluye la de longitud).
+
+    Se pueden calcular una vez por elemento y reutilizar con cualquier clave.
+    """
+    size = len(data)
+    full = size - size % 8
+    words = [int.from_bytes(data[i:i + 8], 'little') for i in range(0, full, 8)]
+    words.append(int.from_bytes(data[full:], 'little') | (size & 0xff) << 56)
+    return words
+
+
+def siphash24_words(k0: int, k1: int, words: Sequence[int]) -> int:
+    """SipHash-2-4 de 64 bits de un mensaje ya dividido en palabras (``sip_words``)."""
+    v0 = k0 ^ 0x736f6d6570736575
+    v1 = k1 ^ 0x646f72616e646f6d
+    v2 = k0 ^ 0x6c7967656e657261
+    v3 = k1 ^ 0x7465646279746573
+    mask = _MASK
+    for m in words:
+        v3 ^= m
+        # Dos rondas de compresión
+        v0 = (v0 + v1) & mask
+        v1 = ((v1 << 13) | (v1 >> 51)) & mask ^ v0
+        v0 = ((v0 << 32) | (v0 >> 32)) & mask
+        v2 = (v2 + v3) & mask
+        v3 = ((v3 << 16) | (v3 >> 48)) & mask ^ v2
+        v0 = (v0 + v3) & mask
+        v3 = ((v3 << 21) | (v3 >> 43)) & mask ^ v0
+        v2 = (v2 + v1) & mask
+        v1 = ((v1 << 17) | (v1 >> 47)) & mask ^ v2
+        v2 = ((v2 << 32) | (v2 >> 32)) & mask
+        v0 = (v0 + v1) & mask
+        v1 = ((v1 << 13) | (v1 >> 51)) & mask ^ v0
+        v0 = ((v0 << 32) | (v0 >> 32)) & mask
+        v2 = (v2 + v3) & mask
+        v3 = ((v3 << 16) | (v3 >> 48)) & mask ^ v2
+        v0 = (v0 + v3) & mask
+        v3 = ((v3 << 21) | (v3 >> 43)) & mask ^ v0
+        v2 = (v2 + v1) & mask
+        v1 = ((v1 << 17) | (v1 >> 47)) & mask ^ v2
+        v2 = ((v2 << 32) | (v2 >> 32)) & mask
+        v0 ^= m
+
+    v2 ^= 0xff
+    for _ in range(4):
+        v0 = (v0 + v1) & mask
+        v1 = ((v1 << 13) | (v1 >> 51)) & mask ^ v0
+        v0 = ((v0 << 32) | (v0 >> 32)) & mask
+        v2 = (v2 + v3) & mask
+        v3 = ((v3 << 16) | (v3 >> 48)) & mask ^ v2
+        v0 = (v0 + v3) & mask
+        v3 = ((v3 << 21) | (v3 >> 43)) & mask ^ v0
+        v2 = (v2 + v1) & mask
+        v1 = ((v1 << 17) | (v1 >> 47)) & mask ^ v2
+        v2 = ((v2 << 32) | (v2 >> 32)) & mask
+    return v0 ^ v1 ^ v2 ^ v3
+
+
+def siphash24(k0: int, k1: int, data: bytes) -> int:
+    """SipHash-2-4 de 64 bits con la clave (k0, k1)."""
+    return siphash24_words(k0, k1, sip_words(data))
+
+
+def filter_key(block_hash: bytes) -> Tuple[int, int]:
+    """Clave SipHash del filtro: los 16 primeros bytes del hash del bloque (orden interno)."""
+    return int.from_bytes(block_hash[:8], 'little'), int.from_bytes(block_hash[8:16], 'little')
+
+
+class ItemSet:
+    """Elementos preparados para cruzarlos con muchos filtros.
+
+    Las palabras de SipHash de cada elemento se calculan una sola vez. En cada
+    filtro solo se repiten las rondas con la clave de su bloque.
+    """
+
+    __slots__ = ('items', 'words')
+
+    def __init__(self, items: Iterable[bytes]):
+        self.items = sorted(set(items))
+        self.words = [sip_words(item) for item in self.items]
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def hashed(self, block_hash: bytes, n: int, m: int = BASIC_M) -> List[int]:
+        """Valores ordenados y sin repetir en el rango de un filtro de ``n`` elementos."""
+        k0, k1 = filter_key(block_hash)
+        f = n * m
+        return sorted({(siphash24_words(k0, k1, words) * f) >> 64 for words in self.words})
+
+
+def hashed_set(items: Iterable[bytes], block_hash: bytes, n: int, m: int = BASIC_M) -> List[int]:
+    """Valores ordenados y sin repetir de los elementos en el rango de un filtro de ``n`` elementos."""
+    return ItemSet(items).hashed(block_hash, n, m)
+
+
+def build_filter(items: Iterable[bytes], block_hash: bytes,
+                 p: int = BASIC_P, m: int = BASIC_M) -> bytes:
+    """Construye un filtro GCS serializado (número de elementos + flujo de bits)."""
+    unique = set(items)
+    n = len(unique)
+    if n == 0:
+        return encode_varint(0)
+    bits = []
+    previous = 0
+    for value in hashed_set(unique, block_hash, n, m):
+        delta = value - previous
+        previous = value
+        bits.append('1' * (delta >> p) + '0' + format(delta & ((1 << p) - 1), f'0{p}b'))
+    stream = ''.join(bits)
+    stream += '0' * (-len(stream) % 8)
+    return encode_varint(n) + int(stream, 2).to_bytes(len(stream) // 8, 'big')
+
+
+def match_any(filter_bytes: bytes, block_hash: bytes, items: Union[ItemSet, Iterable[bytes]],
+              p: int = BASIC_P, m: int = BASIC_M) -> bool:
+    """Indica si alguno de los elementos puede estar en el filtro.
+
+    Los elementos se reducen una vez con la clave del bloque y se cruzan con
+    el filtro en un solo recorrido ordenado.
+
+    Args:
+        filter_bytes: Filtro serializado
+        block_hash: Hash del bloque (orden interno)
+        items: Elementos a buscar; un ``ItemSet`` evita prepararlos en cada filtro
+    """
+    if not isinstance(items, ItemSet):
+        items = ItemSet(items)
+    n, pos = read_varint(filter_bytes, 0)
+    if n == 0 or not items:
+        return False
+    wanted = items.hashed(block_hash, n, m)
+    data = filter_bytes[pos:]
+    bits = format(int.from_bytes(data, 'big'), f'0{len(data) * 8}b')
+    position = 0
+    value = 0
+    i = 0
+    last = len(wanted)
+    for _ in range(n):
+        end = bits.find('0', position)
+        if end < 0:
+            raise ValueError("Filtro GCS truncado")
+        quotient = end - position
+        position = end + 1 + p
+        value += (quotient << p) | int(bits[end + 1:position], 2)
+        while wanted[i] < value:
+            i += 1
+            if i == last:
+                return False
+        if wanted[i] == value:
+            return True
+    return False
+
+
+def block_filter_items(block: bytes, prev_script: Callable[[bytes], Optional[bytes]]) -> List[bytes]:
+    """Elementos del filtro básico de un bloque.
+
+    Args:
+        block: Bloque serializado
+        prev_script: Devuelve el scriptPubKey de un outpoint gastado (None si se desconoce)
+
+    Returns:
+        list: scriptPubKey de las salidas (salvo vacíos y OP_RETURN) y de las salidas gastadas
+    """
+    items = []
+    for n, tx in enumerate(iter_transactions(block, 0)):
+        for _, start, end in tx.outputs:
+            if end > start and block[start] != 0x6a:
+                items.append(bytes(block[start:end]))
+        if n == 0:
+            continue  # La coinbase no gasta salidas
+        for pos in tx.inputs:
+            script = prev_script(bytes(block[pos:pos + 36]))
+            if script:
+                items.append(script)
+    return items
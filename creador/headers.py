@@ -0,0 +1,458 @@
+"""
+Almacén de la cadena de cabeceras de bloque.
+
+Las cabeceras se guardan en un archivo de registros de 80 bytes, sin
+cabecera propia: la de altura ``h`` empieza en ``h * 80``. El archivo se
+proyecta con ``mmap``, así que el acceso por altura es O(1). Al arrancar solo
+se mira el tamaño del archivo. Únicamente se escriben cabeceras ya validadas,
+por lo que no hay que volver a leer ni validar la cadena.
+
+Validación de cada lote de cabeceras:
+
+- la prueba de trabajo (doble SHA256 frente al objetivo de ``nBits``) se
+  calcula en paralelo en un ``ProcessPoolExecutor``;
+- las reglas que dependen de las cabeceras anteriores (enlace, dificultad
+  esperada, mediana de los 11 tiempos anteriores) se comprueban en orden en
+  este proceso.
+
+Si un lote enlaza por debajo de la punta y acumula más trabajo que el tramo
+al que sustituye, se produce una reorganización: el archivo se trunca en el
+punto de bifurcación y se añade la rama nueva. Las ramas con menos trabajo se
+descartan; si más adelante la superan, el nodo las reenviará enteras desde la
+bifurcación al pedir cabeceras con el localizador.
+"""
+
+import mmap
+import os
+import struct
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from .blocks import GENESIS_HASH, HEADER_SIZE, double_sha256
+
+# Reajuste de dificultad
+RETARGET_INTERVAL = 2016
+TARGET_SPACING = 600
+TARGET_TIMESPAN = RETARGET_INTERVAL * TARGET_SPACING
+
+# Profundidad máxima buscada al localizar un hash sin el índice completo
+MAX_REORG_DEPTH = 10_000
+
+# Cabeceras como mínimo por tarea enviada a un proceso
+MIN_CHUNK = 500
+
+_U32 = struct.Struct('<I')
+
+
+class ChainParams(NamedTuple):
+    """Reglas de dificultad de una red."""
+    pow_limit_bits: int
+    allow_min_difficulty: bool   # Bloques de dificultad mínima tras 20 minutos (testnet)
+    no_retargeting: bool         # Dificultad constante (regtest)
+    bip94: bool                  # El reajuste parte del primer bloque del periodo (testnet4)
+
+
+CHAIN_PARAMS = {
+    'mainnet': ChainParams(0x1d00ffff, False, False, False),
+    'testnet': ChainParams(0x1d00ffff, True, False, False),
+    'testnet4': ChainParams(0x1d00ffff, True, False, True),
+    'signet': ChainParams(0x1e0377ae, False, False, False),
+    'regtest': ChainParams(0x207fffff, True, True, False),
+}
+
+_MERKLE_ROOT = bytes.fromhex('4a5e1e4baab89f3a32518a88c31bc87f618f76673e2cc77ab2127b7afdeda33b')[::-1]
+
+
+def _genesis(time_: int, bits: int, nonce: int, merkle_root: bytes = _MERKLE_ROOT) -> bytes:
+    return _U32.pack(1) + bytes(32) + merkle_root + struct.pack('<III', time_, bits, nonce)
+
+
+# Cabecera del bloque génesis de cada red
+GENESIS_HEADER = {
+    'mainnet': _genesis(1231006505, 0x1d00ffff, 2083236893),
+    'testnet': _genesis(1296688602, 0x1d00ffff, 414098458),
+    'testnet4': _genesis(1714777860, 0x1d00ffff, 393743547, bytes.fromhex(
+        '7aa0a7ae1e223414cb807e40cd57e667b718e42aaf9306db9102fe28912b7b4e')[::-1]),
+    'signet': _genesis(1598918400, 0x1e0377ae, 52613770),
+    'regtest': _genesis(1296688602, 0x207fffff, 2),
+}
+
+
+class HeaderError(ValueError):
+    """Cabecera inválida o que no enlaza con la cadena."""
+
+
+class ConnectResult(NamedTuple):
+    """Resultado de añadir un lote de cabeceras."""
+    connected: int                 # Cabeceras añadidas
+    fork_height: Optional[int]     # Altura de la bifurcación si hubo reorganización
+    disconnected: int              # Cabeceras retiradas de la cadena principal
+
+
+def default_headers_path(network: str = 'mainnet') -> str:
+    """Ruta por defecto del archivo de cabeceras en el directorio del usuario."""
+    return os.path.join(os.path.expanduser('~'), '.creador_carteras', f'cabeceras-{network}.dat')
+
+
+def bits_to_target(bits: int) -> int:
+    """Objetivo a partir de su forma compacta (``nBits``)."""
+    size = bits >> 24
+    mantissa = bits & 0x007fffff
+    if bits & 0x00800000:
+        raise HeaderError("Objetivo de dificultad negativo")
+    if size <= 3:
+        return mantissa >> 8 * (3 - size)
+    return mantissa << 8 * (size - 3)
+
+
+def target_to_bits(target: int) -> int:
+    """Forma compacta (``nBits``) de un objetivo."""
+    size = (target.bit_length() + 7) // 8
+    if size <= 3:
+        compact = target << 8 * (3 - size)
+    else:
+        compact = target >> 8 * (size - 3)
+    if compact & 0x00800000:
+        compact >>= 8
+        size += 1
+    return compact | size << 24
+
+
+def header_work(bits: int) -> int:
+    """Trabajo esperado para encontrar un bloque con ese objetivo."""
+    return (1 << 256) // (bits_to_target(bits) + 1)
+
+
+def header_time(header: bytes) -> int:
+    return _U32.unpack_from(header, 68)[0]
+
+
+def header_bits(header: bytes) -> int:
+    return _U32.unpack_from(header, 72)[0]
+
+
+def _hash_headers(blob: bytes, pow_limit: int) -> Tuple[bytes, int]:
+    """Calcula los hashes de cabeceras consecutivas y comprueba su prueba de trabajo.
+
+    Returns:
+        tuple: (hashes concatenados, posición de la primera cabecera inválida o -1)
+    """
+    hashes = []
+    for position, offset in enumerate(range(0, len(blob), HEADER_SIZE)):
+        header = blob[offset:offset + HEADER_SIZE]
+        digest = double_sha256(header)
+        hashes.append(digest)
+        bits = _U32.unpack_from(header, 72)[0]
+        try:
+            target = bits_to_target(bits)
+        except HeaderError:
+            return b''.join(hashes), position
+        if target == 0 or target > pow_limit or int.from_bytes(digest, 'little') > target:
+            return b''.join(hashes), position
+    return b''.join(hashes), -1
+
+
+class HeaderStore:
+    """Cadena de cabeceras validadas en un archivo de registros de 80 bytes."""
+
+    def __init__(self, path: Optional[str] = None, network: str = 'mainnet',
+                 genesis_header: Optional[bytes] = None, workers: int = 1):
+        """Abre (o crea) el almacén.
+
+        Args:
+            path: Archivo de cabeceras; sin ruta la cadena vive solo en memoria
+            network: Red (reglas de dificultad y bloque génesis)
+            genesis_header: Cabecera génesis propia (cadenas de prueba)
+            workers: Procesos para comprobar la prueba de trabajo; 1 la comprueba en este proceso
+        """
+        if network not in CHAIN_PARAMS:
+            raise ValueError(f"Red no soportada: {network}")
+        self.path = path
+        self.params = CHAIN_PARAMS[network]
+        self.pow_limit = bits_to_target(self.params.pow_limit_bits)
+        self.workers = max(1, workers)
+        self.genesis_header = genesis_header or GENESIS_HEADER[network]
+        self._lock = threading.RLock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._index: Optional[Dict[bytes, int]] = None
+        self._file = None
+        self._map: Optional[mmap.mmap] = None
+        self._buffer = bytearray()
+
+        if path is None:
+            self._buffer += self.genesis_header
+            return
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'r+b' if os.path.exists(path) else 'w+b')
+        size = os.fstat(self._file.fileno()).st_size
+        if size % HEADER_SIZE:
+            # Registro incompleto de una escritura interrumpida
+            size -= size % HEADER_SIZE
+            self._file.truncate(size)
+        if size == 0:
+            self._file.write(self.genesis_header)
+            self._file.flush()
+        self._remap()
+        if self._data[:HEADER_SIZE] != self.genesis_header:
+            self.close()
+            raise ValueError("El archivo de cabeceras es de otra red")
+
+    # ------------------------------------------------------------------
+    # Acceso
+    # ------------------------------------------------------------------
+
+    @property
+    def _data(self):
+        return self._map if self._file is not None else self._buffer
+
+    def __len__(self) -> int:
+        return len(self._data) // HEADER_SIZE
+
+    @property
+    def tip_height(self) -> int:
+        """Altura de la punta de la cadena."""
+        return len(self) - 1
+
+    @property
+    def tip_hash(self) -> bytes:
+        """Hash (orden interno) de la punta de la cadena."""
+        return self.hash_at(self.tip_height)
+
+    def header_at(self, height: int) -> bytes:
+        """Cabecera de una altura."""
+        if not 0 <= height < len(self):
+            raise IndexError(f"Altura fuera de la cadena: {height}")
+        offset = height * HEADER_SIZE
+        return bytes(self._data[offset:offset + HEADER_SIZE])
+
+    def hash_at(self, height: int) -> bytes:
+        """Hash (orden interno) del bloque de una altura."""
+        return double_sha256(self.header_at(height))
+
+    def height_of(self, block_hash: bytes) -> Optional[int]:
+        """Altura de un bloque de la cadena principal (None si no está).
+
+        Sin el índice completo (``is_main_chain``) solo se buscan los
+        ``MAX_REORG_DEPTH`` bloques más recientes.
+        """
+        with self._lock:
+            if self._index is not None:
+                return self._index.get(block_hash)
+            for height in range(self.tip_height, max(-1, self.tip_height - MAX_REORG_DEPTH), -1):
+                if self.hash_at(height) == block_hash:
+                    return height
+            if block_hash == double_sha256(self.genesis_header):
+                return 0
+        return None
+
+    def is_main_chain(self, block_hash: bytes) -> bool:
+        """Indica si un bloque está en la cadena principal.
+
+        La primera llamada construye el índice de hashes de toda la cadena,
+        que después se mantiene al añadir o retirar cabeceras.
+        """
+        with self._lock:
+            if self._index is None:
+                data = self._data
+                self._index = {double_sha256(data[offset:offset + HEADER_SIZE]): height
+                               for height, offset in enumerate(range(0, len(data), HEADER_SIZE))}
+            return block_hash in self._index
+
+    def locator(self) -> List[bytes]:
+        """Localizador de bloques: los 10 últimos hashes y después a saltos crecientes hasta el génesis."""
+        hashes = []
+        height = self.tip_height
+        step = 1
+        while height > 0:
+            hashes.append(self.hash_at(height))
+            if len(hashes) >= 10:
+                step *= 2
+            height -= step
+        hashes.append(self.hash_at(0))
+        return hashes
+
+    # ------------------------------------------------------------------
+    # Validación
+    # ------------------------------------------------------------------
+
+    def _hash_batch(self, blob: bytes) -> Tuple[List[bytes], int]:
+        """Hashes y primera prueba de trabajo inválida de un lote (en paralelo si compensa)."""
+        count = len(blob) // HEADER_SIZE
+        chunk = max(MIN_CHUNK, -(-count // self.workers))
+        if self.workers == 1 or count <= chunk:
+            joined, bad = _hash_headers(blob, self.pow_limit)
+        else:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            step = chunk * HEADER_SIZE
+            parts = list(self._executor.map(_hash_headers, (blob[i:i + step] for i in range(0, len(blob), step)),
+                                            [self.pow_limit] * -(-len(blob) // step)))
+            joined = b''.join(hashes for hashes, _ in parts)
+            bad = next((index * chunk + position for index, (_, position) in enumerate(parts)
+                        if position >= 0), -1)
+        return [joined[i:i + 32] for i in range(0, len(joined), 32)], bad
+
+    def expected_bits(self, height: int, time_: int, get: Callable[[int], bytes],
+                      memo: Optional[Dict[int, int]] = None) -> int:
+        """Dificultad (``nBits``) exigida a la cabecera de ``height``.
+
+        Args:
+            height: Altura de la cabecera nueva
+            time_: Marca de tiempo de la cabecera nueva
+            get: Devuelve la cabecera de una altura anterior
+            memo: Resultados de la búsqueda hacia atrás de las redes de prueba, compartidos
+                entre cabeceras consecutivas para no recorrer el periodo en cada una
+        """
+        params = self.params
+        prev = get(height - 1)
+        if height % RETARGET_INTERVAL:
+            if params.allow_min_difficulty:
+                if time_ > header_time(prev) + 2 * TARGET_SPACING:
+                    return params.pow_limit_bits
+                # Dificultad del último bloque que no fue de dificultad mínima
+                h = height - 1
+                while h > 0 and h % RETARGET_INTERVAL and header_bits(get(h)) == params.pow_limit_bits:
+                    if memo is not None and h - 1 in memo:
+                        bits = memo[h - 1]
+                        break
+                    h -= 1
+                else:
+                    bits = header_bits(get(h))
+                if memo is not None:
+                    memo[height - 1] = bits
+                return bits
+            return header_bits(prev)
+        if params.no_retargeting:
+            return header_bits(prev)
+
+        first = get(height - RETARGET_INTERVAL)
+        timespan = header_time(prev) - header_time(first)
+        timespan = min(max(timespan, TARGET_TIMESPAN // 4), TARGET_TIMESPAN * 4)
+        base = header_bits(first) if params.bip94 else header_bits(prev)
+        target = min(bits_to_target(base) * timespan // TARGET_TIMESPAN, self.pow_limit)
+        return target_to_bits(target)
+
+    def _check_context(self, header: bytes, height: int, get: Callable[[int], bytes], now: float,
+                       memo: Dict[int, int]) -> None:
+        """Reglas que dependen de las cabeceras anteriores."""
+        time_ = header_time(header)
+        times = sorted(header_time(get(h)) for h in range(max(0, height - 11), height))
+        if time_ <= times[len(times) // 2]:
+            raise HeaderError(f"Marca de tiempo anterior a la mediana en la altura {height}")
+        if time_ > now + 2 * 60 * 60:
+            raise HeaderError(f"Marca de tiempo en el futuro en la altura {height}")
+        if header_bits(header) != self.expected_bits(height, time_, get, memo):
+            raise HeaderError(f"Dificultad inesperada en la altura {height}")
+
+    # ------------------------------------------------------------------
+    # Actualización
+    # ------------------------------------------------------------------
+
+    def connect(self, headers: Sequence[bytes]) -> ConnectResult:
+        """Valida y añade cabeceras consecutivas.
+
+        El lote puede empezar en cualquier punto de la cadena principal; si
+        enlaza por debajo de la punta solo se aplica cuando acumula más
+        trabajo que el tramo al que sustituye.
+
+        Raises:
+            HeaderError: Si alguna cabecera es inválida o el lote no enlaza con la cadena
+        """
+        if not headers:
+            return ConnectResult(0, None, 0)
+        if any(len(header) != HEADER_SIZE for header in headers):
+            raise HeaderError("Las cabeceras deben tener 80 bytes")
+        with self._lock:
+            hashes, bad = self._hash_batch(b''.join(headers))
+            if bad >= 0:
+                raise HeaderError(f"Prueba de trabajo inválida en la cabecera {bad} del lote")
+            fork = self.height_of(headers[0][4:36])
+            if fork is None:
+                raise HeaderError("Las cabeceras no enlazan con la cadena conocida")
+
+            # Saltar las cabeceras que ya están en la cadena
+            skip = 0
+            while skip < len(headers) and fork + 1 <= self.tip_height and self.hash_at(fork + 1) == hashes[skip]:
+                fork += 1
+                skip += 1
+            headers, hashes = list(headers[skip:]), hashes[skip:]
+            if not headers:
+                return ConnectResult(0, None, 0)
+
+            def get(height: int) -> bytes:
+                return headers[height - fork - 1] if height > fork else self.header_at(height)
+
+            now = time.time()
+            memo: Dict[int, int] = {}
+            previous = self.hash_at(fork)
+            for position, header in enumerate(headers):
+                if header[4:36] != previous:
+                    raise HeaderError(f"Cabecera sin enlace en la altura {fork + 1 + position}")
+                self._check_context(header, fork + 1 + position, get, now, memo)
+                previous = hashes[position]
+
+            disconnected = self.tip_height - fork
+            if disconnected:
+                old_work = sum(header_work(header_bits(self.header_at(h)))
+                               for h in range(fork + 1, self.tip_height + 1))
+                new_work = sum(header_work(header_bits(header)) for header in headers)
+                if new_work <= old_work:
+                    return ConnectResult(0, None, 0)
+                self._truncate(fork + 1)
+            self._append(b''.join(headers), hashes)
+            return ConnectResult(len(headers), fork if disconnected else None, disconnected)
+
+    def _append(self, blob: bytes, hashes: Sequence[bytes]) -> None:
+        start = len(self)
+        if self._file is None:
+            self._buffer += blob
+        else:
+            self._file.seek(0, os.SEEK_END)
+            self._file.write(blob)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._remap()
+        if self._index is not None:
+            for height, digest in enumerate(hashes, start):
+                self._index[digest] = height
+
+    def _truncate(self, count: int) -> None:
+        """Deja en la cadena las ``count`` primeras cabeceras."""
+        if self._index is not None:
+            for height in range(count, len(self)):
+                self._index.pop(self.hash_at(height), None)
+        if self._file is None:
+            del self._buffer[count * HEADER_SIZE:]
+        else:
+            self._map.close()
+            self._map = None
+            self._file.truncate(count * HEADER_SIZE)
+            self._remap()
+
+    def _remap(self) -> None:
+        if self._map is not None:
+            self._map.close()
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self) -> None:
+        """Cierra el archivo y detiene los procesos trabajadores."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(cancel_futures=True)
+                self._executor = None
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self) -> 'HeaderStore':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
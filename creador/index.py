@@ -0,0 +1,332 @@
+"""
+Índice inverso dirección -> (cuenta, cadena, índice, tipo).
+
+Cada entrada se identifica por el hash de 20 bytes de su scriptPubKey más un
+byte con el tipo, de modo que la clave se obtiene tanto de una dirección como
+de un script de salida sin ambigüedad.
+
+- Las entradas nuevas se guardan en un diccionario en memoria.
+- ``flush()`` las mezcla, en un único recorrido, con el archivo ordenado de
+  registros de tamaño fijo.
+- El archivo se consulta mediante ``mmap`` con búsqueda binaria, sin cargarlo.
+
+Formato del archivo::
+
+    cabecera:  magic (8 bytes) | número de registros (uint64 LE)
+    registro:  clave (21 bytes) | cuenta (uint32) | cadena (uint8) | índice (uint32)
+"""
+
+import heapq
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+import threading
+import weakref
+from typing import Any, Dict, Iterable, Iterator, NamedTuple, Optional, Tuple
+
+from .encoding import (
+    ADDR_TYPE_MULTI, ADDR_TYPE_P2PKH, ADDR_TYPE_P2SH_P2WPKH, ADDR_TYPE_P2WPKH, ADDR_TYPES,
+    decode_address, hash160, parse_script_pubkey, script_payload, script_pubkey
+)
+from .record import record_hash160
+
+INDEX_MAGIC = b'CRIDX001'
+_HEADER = struct.Struct('<8sQ')
+_RECORD = struct.Struct('<21sIBI')
+KEY_SIZE = 21
+
+# Código de tipo almacenado en el primer byte de la clave
+TYPE_CODES = {ADDR_TYPE_P2PKH: 0, ADDR_TYPE_P2SH_P2WPKH: 1, ADDR_TYPE_P2WPKH: 2}
+_TYPES_BY_CODE = {code: addr_type for addr_type, code in TYPE_CODES.items()}
+
+# Entradas pendientes a partir de las cuales se vuelca automáticamente a disco
+DEFAULT_FLUSH_THRESHOLD = 500_000
+
+# Umbral de los índices temporales: acota la memoria de las entradas pendientes
+# (unos 200 bytes cada una) mientras se generan direcciones
+TEMPORARY_FLUSH_THRESHOLD = 100_000
+
+
+class IndexEntry(NamedTuple):
+    """Origen de una dirección de la cartera."""
+    account: int
+    chain: int
+    index: int
+    addr_type: str
+
+
+def script_key(payload: bytes, addr_type: str) -> bytes:
+    """Clave del índice: código de tipo + hash de 20 bytes del scriptPubKey."""
+    return bytes((TYPE_CODES[addr_type],)) + payload
+
+
+def address_key(address: str, network: str = 'mainnet') -> bytes:
+    """Clave del índice a partir de una dirección."""
+    addr_type, payload = decode_address(address, network)
+    return script_key(payload, addr_type)
+
+
+def script_pubkey_key(script: bytes) -> Optional[bytes]:
+    """Clave del índice a partir de un scriptPubKey (None si no es de un tipo soportado)."""
+    parsed = parse_script_pubkey(script)
+    if parsed is None:
+        return None
+    addr_type, payload = parsed
+    return script_key(payload, addr_type)
+
+
+def key_script_pubkey(key: bytes) -> bytes:
+    """scriptPubKey correspondiente a una clave del índice."""
+    return script_pubkey(key[1:], _TYPES_BY_CODE[key[0]])
+
+
+def record_keys(record: Dict[str, Any],
+                addr_types: Optional[Iterable[str]] = None) -> Iterator[Tuple[bytes, str]]:
+    """Claves del índice de un registro de dirección.
+
+    Args:
+        record: Registro producido por el motor de derivación
+        addr_types: Tipos a indexar; por defecto, el del registro (los tres en multiformato)
+
+    Yields:
+        tuple: (clave, tipo de dirección)
+    """
+    if addr_types is None:
+        addr_types = ADDR_TYPES if record['tipo'] == ADDR_TYPE_MULTI else (record['tipo'],)
+    h160 = record_hash160(record)
+    for addr_type in addr_types:
+        yield script_key(script_payload(h160, addr_type), addr_type), addr_type
+
+
+class AddressIndex:
+    """Índice inverso persistente de las direcciones de una cartera."""
+
+    def __init__(self, path: Optional[str] = None,
+                 flush_threshold: Optional[int] = DEFAULT_FLUSH_THRESHOLD):
+        """Inicializa el índice.
+
+        Args:
+            path: Archivo del índice; si existe se abre con mmap. Sin ruta, el
+                índice vive solo en memoria.
+            flush_threshold: Entradas pendientes que provocan un volcado
+                automático (solo con ruta); None lo desactiva
+        """
+        self.path = path
+        self.flush_threshold = flush_threshold
+        self._pending: Dict[bytes, Tuple[int, int, int]] = {}
+        self._lock = threading.RLock()
+        self._file = None
+        self._map: Optional[mmap.mmap] = None
+        self._count = 0
+        self._cleanup: Optional[weakref.finalize] = None
+        if path is not None and os.path.exists(path):
+            self._open(path)
+
+    @classmethod
+    def temporary(cls, flush_threshold: int = TEMPORARY_FLUSH_THRESHOLD) -> 'AddressIndex':
+        """Índice respaldado por un archivo temporal.
+
+        Las entradas pendientes se vuelcan al archivo al llegar al umbral, así
+        que la memoria no crece con el número de direcciones. El archivo se
+        borra al liberar el índice o al volcarlo con ``flush(path)`` a su ruta
+        definitiva.
+        """
+        directory = tempfile.mkdtemp(prefix='creador-idx-')
+        index = cls(os.path.join(directory, 'direcciones.idx'), flush_threshold)
+        index._cleanup = weakref.finalize(index, shutil.rmtree, directory, ignore_errors=True)
+        return index
+
+    # ------------------------------------------------------------------
+    # Construcción
+    # ------------------------------------------------------------------
+
+    def add(self, key: bytes, account: int, chain: int, index: int) -> None:
+        """Añade (o sustituye) una entrada a partir de su clave."""
+        if len(key) != KEY_SIZE:
+            raise ValueError("Clave de índice inválida")
+        with self._lock:
+            self._pending[key] = (account, chain, index)
+            if (self.path is not None and self.flush_threshold is not None
+                    and len(self._pending) >= self.flush_threshold):
+                self.flush()
+
+    def add_public_key(self, public_key: bytes, account: int, chain: int, index: int,
+                       addr_types: Iterable[str] = ADDR_TYPES) -> None:
+        """Indexa las direcciones de una clave pública comprimida."""
+        h160 = hash160(public_key)
+        for addr_type in addr_types:
+            self.add(script_key(script_payload(h160, addr_type), addr_type), account, chain, index)
+
+    def add_records(self, records: Iterable[Dict[str, Any]], account: int, chain: int,
+                    addr_types: Optional[Iterable[str]] = None) -> None:
+        """Indexa registros de dirección ya derivados."""
+        for record in records:
+            for key, _ in record_keys(record, addr_types):
+                self.add(key, account, chain, record['indice'])
+
+    def feed(self, records: Iterable[Dict[str, Any]], account: int, chain: int,
+             addr_types: Optional[Iterable[str]] = None) -> Iterator[Dict[str, Any]]:
+        """Indexa los registros a medida que pasan y los devuelve sin cambios.
+
+        Permite construir el índice de forma incremental dentro del mismo
+        recorrido que genera las direcciones.
+        """
+        for record in records:
+            for key, _ in record_keys(record, addr_types):
+                self.add(key, account, chain, record['indice'])
+            yield record
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    def lookup(self, key: bytes) -> Optional[IndexEntry]:
+        """Busca una clave del índice."""
+        with self._lock:
+            value = self._pending.get(key)
+            if value is None:
+                value = self._search(key)
+        if value is None:
+            return None
+        account, chain, index = value
+        return IndexEntry(account, chain, index, _TYPES_BY_CODE[key[0]])
+
+    def lookup_address(self, address: str, network: str = 'mainnet') -> Optional[IndexEntry]:
+        """Busca una dirección (None si no es de la cartera o no es válida)."""
+        try:
+            key = address_key(address, network)
+        except ValueError:
+            return None
+        return self.lookup(key)
+
+    def lookup_script(self, script: bytes) -> Optional[IndexEntry]:
+        """Busca un scriptPubKey."""
+        key = script_pubkey_key(script)
+        return self.lookup(key) if key is not None else None
+
+    def __contains__(self, key: bytes) -> bool:
+        return self.lookup(key) is not None
+
+    def keys(self) -> Iterator[bytes]:
+        """Itera sobre las claves del índice (pendientes y en disco, sin repetir)."""
+        with self._lock:
+            pending = list(self._pending)
+            on_disk = [entry[0] for entry in self._disk_entries()]
+        yield from pending
+        seen = set(pending)
+        for key in on_disk:
+            if key not in seen:
+                yield key
+
+    def __len__(self) -> int:
+        """Número de entradas (las pendientes que sustituyen a otras del disco cuentan doble)."""
+        return self._count + len(self._pending)
+
+    def _search(self, key: bytes) -> Optional[Tuple[int, int, int]]:
+        """Búsqueda binaria en el archivo ordenado."""
+        data = self._map
+        if data is None:
+            return None
+        size = _RECORD.size
+        base = _HEADER.size
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) >> 1
+            offset = base + mid * size
+            probe = data[offset:offset + KEY_SIZE]
+            if probe < key:
+                lo = mid + 1
+            elif probe > key:
+                hi = mid
+            else:
+                return _RECORD.unpack_from(data, offset)[1:]
+        return None
+
+    # ------------------------------------------------------------------
+    # Persistencia
+    # ------------------------------------------------------------------
+
+    def _open(self, path: str) -> None:
+        """Abre y proyecta en memoria el archivo del índice."""
+        self._file = open(path, 'rb')
+        if os.fstat(self._file.fileno()).st_size < _HEADER.size:
+            self._file.close()
+            self._file = None
+            raise ValueError("Archivo de índice truncado")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count = _HEADER.unpack_from(self._map, 0)
+        if magic != INDEX_MAGIC:
+            self.close()
+            raise ValueError("El archivo no es un índice de direcciones")
+        if len(self._map) < _HEADER.size + count * _RECORD.size:
+            self.close()
+            raise ValueError("Archivo de índice truncado")
+        self._count = count
+
+    def _disk_entries(self) -> Iterator[Tuple[bytes, int, int, int]]:
+        data = self._map
+        if data is None:
+            return
+        for offset in range(_HEADER.size, _HEADER.size + self._count * _RECORD.size, _RECORD.size):
+            yield _RECORD.unpack_from(data, offset)
+
+    def flush(self, path: Optional[str] = None) -> None:
+        """Mezcla las entradas pendientes con el archivo y lo sustituye de forma atómica.
+
+        Args:
+            path: Ruta de destino; por defecto, la del índice
+        """
+        with self._lock:
+            path = path or self.path
+            if path is None:
+                raise ValueError("El índice no tiene archivo asociado")
+            pending = sorted((key, *value) for key, value in self._pending.items())
+
+            tmp_path = path + '.tmp'
+            count = 0
+            with open(tmp_path, 'wb') as f:
+                f.write(_HEADER.pack(INDEX_MAGIC, 0))
+                previous = None
+                # En claves repetidas prevalece la entrada pendiente (va primero)
+                merged = heapq.merge(
+                    ((entry[0], 0, entry) for entry in pending),
+                    ((entry[0], 1, entry) for entry in self._disk_entries()),
+                )
+                for key, _, entry in merged:
+                    if key == previous:
+                        continue
+                    previous = key
+                    f.write(_RECORD.pack(*entry))
+                    count += 1
+                f.seek(0)
+                f.write(_HEADER.pack(INDEX_MAGIC, count))
+                f.flush()
+                os.fsync(f.fileno())
+
+            self.close()
+            os.replace(tmp_path, path)
+            if self._cleanup is not None and path != self.path:
+                self._cleanup()  # Ya no se necesita el archivo temporal
+                self._cleanup = None
+            self.path = path
+            self._pending.clear()
+            self._open(path)
+
+    def close(self) -> None:
+        """Libera la proyección en memoria del archivo (las entradas pendientes se conservan)."""
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self._count = 0
+
+    def __enter__(self) -> 'AddressIndex':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
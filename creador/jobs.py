@@ -0,0 +1,135 @@
+"""
+Trabajos de derivación en segundo plano.
+
+Un ``DerivationJob`` consume un iterador de registros en un hilo trabajador y
+los entrega por lotes a través de una cola acotada. La interfaz drena la cola
+periódicamente (por ejemplo con ``after()``) sin bloquear el bucle de eventos.
+"""
+
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# Registros por lote enviado a la cola
+DEFAULT_BATCH_SIZE = 500
+
+# Lotes máximos pendientes en la cola (contrapresión sobre el trabajador)
+DEFAULT_MAX_BATCHES = 64
+
+# Intervalo máximo en segundos entre envíos de lotes incompletos
+FLUSH_INTERVAL = 0.1
+
+
+class DerivationJob:
+    """Deriva registros en un hilo trabajador y los entrega por lotes."""
+
+    def __init__(self, source: Callable[[], Iterable[Dict[str, Any]]], total: int,
+                 batch_size: int = DEFAULT_BATCH_SIZE,
+                 max_batches: int = DEFAULT_MAX_BATCHES):
+        """Inicializa el trabajo.
+
+        Args:
+            source: Función que devuelve el iterador de registros (se invoca en el hilo)
+            total: Número total de registros esperados
+            batch_size: Registros por lote
+            max_batches: Lotes máximos pendientes en la cola
+        """
+        self.total = total
+        self.batch_size = batch_size
+        self.produced = 0
+        self.consumed = 0
+        self.error: Optional[BaseException] = None
+        self._source = source
+        self._queue: 'queue.Queue[List[Dict[str, Any]]]' = queue.Queue(maxsize=max_batches)
+        self._cancel = threading.Event()
+        self._finished = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='DerivationJob', daemon=True)
+        self._started_at: Optional[float] = None
+        self._ended_at: Optional[float] = None
+
+    def start(self) -> None:
+        """Inicia el hilo trabajador."""
+        self._started_at = time.perf_counter()
+        self._thread.start()
+
+    def cancel(self) -> None:
+        """Solicita la cancelación del trabajo."""
+        self._cancel.set()
+
+    @property
+    def cancelled(self) -> bool:
+        """Indica si se ha solicitado la cancelación."""
+        return self._cancel.is_set()
+
+    @property
+    def done(self) -> bool:
+        """Indica si el trabajador terminó y la cola ya fue drenada."""
+        return self._finished.is_set() and self._queue.empty()
+
+    @property
+    def rate(self) -> float:
+        """Registros entregados por segundo."""
+        if self._started_at is None:
+            return 0.0
+        elapsed = (self._ended_at or time.perf_counter()) - self._started_at
+        return self.consumed / elapsed if elapsed > 0 else 0.0
+
+    def _put(self, batch: List[Dict[str, Any]]) -> bool:
+        """Encola un lote esperando mientras haya contrapresión; False si se canceló."""
+        while not self._cancel.is_set():
+            try:
+                self._queue.put(batch, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self) -> None:
+        """Bucle del hilo trabajador."""
+        batch: List[Dict[str, Any]] = []
+        records = None
+        last_flush = time.perf_counter()
+        try:
+            records = iter(self._source())
+            for record in records:
+                if self._cancel.is_set():
+                    break
+                batch.append(record)
+                if (len(batch) >= self.batch_size
+                        or time.perf_counter() - last_flush >= FLUSH_INTERVAL):
+                    if not self._put(batch):
+                        break
+                    self.produced += len(batch)
+                    batch = []
+                    last_flush = time.perf_counter()
+            if batch and not self._cancel.is_set() and self._put(batch):
+                self.produced += len(batch)
+        except BaseException as e:
+            self.error = e
+        finally:
+            # Cerrar la fuente libera sus recursos (p. ej. procesos trabajadores)
+            close = getattr(records, 'close', None)
+            if close is not None:
+                close()
+            self._ended_at = time.perf_counter()
+            self._finished.set()
+
+    def drain(self, time_budget: float = 0.015) -> List[Dict[str, Any]]:
+        """Recoge los lotes disponibles sin bloquear.
+
+        Args:
+            time_budget: Tiempo máximo en segundos dedicado a drenar la cola
+
+        Returns:
+            list: Registros recogidos (puede estar vacía)
+        """
+        records: List[Dict[str, Any]] = []
+        deadline = time.perf_counter() + time_budget
+        while time.perf_counter() < deadline:
+            try:
+                records.extend(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        self.consumed += len(records)
+        return records
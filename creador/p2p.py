@@ -0,0 +1,268 @@
+"""
+Cliente asyncio mínimo del protocolo P2P de Bitcoin para el modo ligero (SPV).
+
+Implementa lo necesario para un cliente de filtros compactos (BIP-157):
+negociación de versión, cabeceras (``getheaders``), filtros de bloque
+(``getcfilters``) y bloques completos (``getdata``). Solo se conecta a nodos
+que anuncian el servicio ``NODE_COMPACT_FILTERS`` (Bitcoin Core con
+``peerblockfilters=1``).
+
+Formato de un mensaje::
+
+    magic (4) | orden (12, rellena con ceros) | longitud (uint32 LE) |
+    suma de control (4 primeros bytes de SHA256d) | carga
+"""
+
+import asyncio
+import os
+import struct
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from .blocks import HEADER_SIZE, NETWORK_MAGIC, double_sha256, encode_varint, read_varint
+
+PROTOCOL_VERSION = 70016
+USER_AGENT = b'/CreadorCarterasHD:1.0/'
+
+# Servicios anunciados por los nodos
+NODE_NETWORK = 1
+NODE_WITNESS = 1 << 3
+NODE_COMPACT_FILTERS = 1 << 6
+
+# Tipo de inventario para pedir bloques con sus testigos
+MSG_WITNESS_BLOCK = 0x40000002
+
+# Límites del protocolo por petición
+MAX_HEADERS_PER_MESSAGE = 2000
+MAX_FILTERS_PER_REQUEST = 1000
+
+# Tiempo máximo de espera de una respuesta (segundos)
+DEFAULT_TIMEOUT = 30.0
+
+# Puerto P2P por defecto de cada red
+DEFAULT_P2P_PORTS = {
+    'mainnet': 8333,
+    'testnet': 18333,
+    'testnet4': 48333,
+    'signet': 38333,
+    'regtest': 18444,
+}
+
+_HEADER = struct.Struct('<4s12sI4s')
+
+
+class P2PError(Exception):
+    """Error del protocolo o del nodo remoto."""
+
+
+class PeerAddress(NamedTuple):
+    """Nodo remoto."""
+    host: str
+    port: int
+
+    def __str__(self) -> str:
+        return f"{self.host}:{self.port}"
+
+
+def peers_from_settings(settings: Dict[str, Any], network: str = 'mainnet') -> List[PeerAddress]:
+    """Nodos a usar en modo ligero según la configuración de red de la aplicación.
+
+    Sin servidores personalizados se usa un nodo local con filtros activados.
+    """
+    if settings.get('use_custom_servers') and settings.get('servers'):
+        return [PeerAddress(entry['host'], int(entry['port'])) for entry in settings['servers']]
+    return [PeerAddress('127.0.0.1', DEFAULT_P2P_PORTS.get(network, 8333))]
+
+
+def pack_message(magic: bytes, command: str, payload: bytes = b'') -> bytes:
+    """Serializa un mensaje P2P."""
+    return _HEADER.pack(magic, command.encode('ascii'), len(payload),
+                        double_sha256(payload)[:4]) + payload
+
+
+async def read_message(reader: asyncio.StreamReader, magic: bytes) -> Tuple[str, bytes]:
+    """Lee un mensaje P2P completo.
+
+    Returns:
+        tuple: (orden, carga)
+    """
+    header = await reader.readexactly(_HEADER.size)
+    msg_magic, command, length, checksum = _HEADER.unpack(header)
+    if msg_magic != magic:
+        raise P2PError("Bytes mágicos de red inesperados")
+    payload = await reader.readexactly(length)
+    if double_sha256(payload)[:4] != checksum:
+        raise P2PError("Suma de control inválida")
+    return command.rstrip(b'\x00').decode('ascii'), payload
+
+
+def _net_address(services: int, host: str = '0.0.0.0', port: int = 0) -> bytes:
+    """Dirección de red sin marca de tiempo (mensaje ``version``)."""
+    ipv4 = bytes(int(part) for part in host.split('.')) if host.count('.') == 3 else bytes(4)
+    return struct.pack('<Q', services) + bytes(10) + b'\xff\xff' + ipv4 + struct.pack('>H', port)
+
+
+def version_payload(services: int, start_height: int = 0, relay: bool = False) -> bytes:
+    """Carga del mensaje ``version``."""
+    return (struct.pack('<iQq', PROTOCOL_VERSION, services, int(time.time()))
+            + _net_address(0) + _net_address(services)
+            + os.urandom(8) + encode_varint(len(USER_AGENT)) + USER_AGENT
+            + struct.pack('<i?', start_height, relay))
+
+
+def parse_version(payload: bytes) -> Tuple[int, int, int]:
+    """Versión, servicios y altura anunciados en un mensaje ``version``."""
+    version, services = struct.unpack_from('<iQ', payload, 0)
+    agent_len, pos = read_varint(payload, 80)
+    start_height = struct.unpack_from('<i', payload, pos + agent_len)[0]
+    return version, services, start_height
+
+
+class PeerConnection:
+    """Conexión con un nodo que sirve filtros compactos de bloque."""
+
+    def __init__(self, peer: PeerAddress, network: str = 'mainnet', timeout: float = DEFAULT_TIMEOUT):
+        """Inicializa la conexión (se abre con ``connect``).
+
+        Args:
+            peer: Nodo remoto
+            network: Red (determina los bytes mágicos)
+            timeout: Tiempo máximo de espera de cada respuesta
+        """
+        if network not in NETWORK_MAGIC:
+            raise ValueError(f"Red no soportada: {network}")
+        self.peer = peer
+        self.magic = NETWORK_MAGIC[network]
+        self.timeout = timeout
+        self.services = 0
+        self.start_height = 0
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._inbox: Dict[str, asyncio.Queue] = {}
+        self._request_lock = asyncio.Lock()
+        self._error: Optional[BaseException] = None
+
+    @property
+    def connected(self) -> bool:
+        """Indica si la conexión está abierta."""
+        return self._writer is not None and self._error is None
+
+    async def connect(self) -> None:
+        """Abre la conexión y completa la negociación de versión.
+
+        Raises:
+            P2PError: Si el nodo no ofrece filtros compactos
+        """
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.peer.host, self.peer.port), self.timeout)
+        self._reader_task = asyncio.create_task(self._read_loop())
+        self._send('version', version_payload(NODE_WITNESS))
+        _, self.services, self.start_height = parse_version(await self._expect('version'))
+        self._send('verack')
+        await self._expect('verack')
+        if not self.services & NODE_COMPACT_FILTERS:
+            await self.close()
+            raise P2PError(f"{self.peer} no ofrece filtros compactos de bloque (BIP-157)")
+
+    def _send(self, command: str, payload: bytes = b'') -> None:
+        if not self.connected:
+            raise ConnectionError(f"Conexión cerrada con {self.peer}")
+        self._writer.write(pack_message(self.magic, command, payload))
+
+    def _queue(self, command: str) -> asyncio.Queue:
+        queue = self._inbox.get(command)
+        if queue is None:
+            queue = self._inbox[command] = asyncio.Queue()
+        return queue
+
+    async def _expect(self, command: str) -> bytes:
+        """Espera el siguiente mensaje ``command``."""
+        if self._error is not None:
+            raise self._error
+        getter = asyncio.ensure_future(self._queue(command).get())
+        done, _ = await asyncio.wait({getter, self._reader_task}, timeout=self.timeout,
+                                     return_when=asyncio.FIRST_COMPLETED)
+        if getter in done:
+            return getter.result()
+        getter.cancel()
+        if self._error is not None:
+            raise self._error
+        raise asyncio.TimeoutError(f"{self.peer} no respondió ({command})")
+
+    async def _read_loop(self) -> None:
+        """Reparte los mensajes recibidos y responde a los ``ping``."""
+        try:
+            while True:
+                command, payload = await read_message(self._reader, self.magic)
+                if command == 'ping':
+                    self._send('pong', payload)
+                elif command == 'notfound':
+                    raise P2PError(f"{self.peer} no tiene los datos pedidos")
+                else:
+                    self._queue(command).put_nowait(payload)
+        except asyncio.CancelledError:
+            self._error = ConnectionError(f"Conexión cerrada con {self.peer}")
+        except asyncio.IncompleteReadError:
+            self._error = ConnectionError(f"Conexión cerrada por {self.peer}")
+        except Exception as e:
+            self._error = e if isinstance(e, P2PError) else ConnectionError(f"Error de lectura de {self.peer}: {e}")
+
+    async def get_headers(self, locator: Sequence[bytes], stop: bytes = bytes(32)) -> List[bytes]:
+        """Pide las cabeceras que siguen al primer hash conocido del localizador.
+
+        Returns:
+            list: Cabeceras de 80 bytes (como mucho ``MAX_HEADERS_PER_MESSAGE``)
+        """
+        async with self._request_lock:
+            self._send('getheaders', struct.pack('<I', PROTOCOL_VERSION) + encode_varint(len(locator))
+                       + b''.join(locator) + stop)
+            payload = await self._expect('headers')
+        count, pos = read_varint(payload, 0)
+        headers = []
+        for _ in range(count):
+            headers.append(payload[pos:pos + HEADER_SIZE])
+            _, pos = read_varint(payload, pos + HEADER_SIZE)  # Número de transacciones (siempre 0)
+        return headers
+
+    async def get_filters(self, start_height: int, stop_hash: bytes, count: int,
+                          filter_type: int = 0) -> List[Tuple[bytes, bytes]]:
+        """Pide los filtros de ``count`` bloques desde ``start_height`` hasta ``stop_hash``.
+
+        Returns:
+            list: (hash del bloque, filtro serializado) en orden de altura
+        """
+        if count > MAX_FILTERS_PER_REQUEST:
+            raise ValueError(f"Como mucho {MAX_FILTERS_PER_REQUEST} filtros por petición")
+        async with self._request_lock:
+            self._send('getcfilters', struct.pack('<BI', filter_type, start_height) + stop_hash)
+            filters = []
+            for _ in range(count):
+                payload = await self._expect('cfilter')
+                size, pos = read_varint(payload, 33)
+                filters.append((payload[1:33], payload[pos:pos + size]))
+        return filters
+
+    async def get_blocks(self, hashes: Sequence[bytes]) -> List[bytes]:
+        """Pide bloques completos (con testigos) y los devuelve en el mismo orden."""
+        if not hashes:
+            return []
+        async with self._request_lock:
+            self._send('getdata', encode_varint(len(hashes))
+                       + b''.join(struct.pack('<I', MSG_WITNESS_BLOCK) + block_hash for block_hash in hashes))
+            return [await self._expect('block') for _ in hashes]
+
+    async def close(self) -> None:
+        """Cierra la conexión."""
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            try:
+                await self._reader_task
+            except asyncio.CancelledError:
+                pass
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except ConnectionError:
+                pass
@@ -0,0 +1,150 @@
+"""
+Nodo P2P local en memoria que sirve cabeceras, filtros compactos y bloques.
+
+Sirve como par de pruebas para el modo ligero (SPV): se le da una cadena de
+bloques serializados (el primero hace de génesis) y calcula sus filtros
+básicos de BIP-158. Cada petición se atiende tras una latencia simulada.
+"""
+
+import asyncio
+import struct
+from typing import Dict, List, Optional, Set
+
+from .blocks import HEADER_SIZE, NETWORK_MAGIC, block_hash, encode_varint, iter_transactions, read_varint
+from .gcs import build_filter, block_filter_items
+from .p2p import (
+    NODE_COMPACT_FILTERS, NODE_NETWORK, NODE_WITNESS, pack_message, read_message, version_payload
+)
+
+
+class MockPeer:
+    """Nodo P2P de pruebas con filtros compactos de bloque."""
+
+    def __init__(self, blocks: List[bytes], network: str = 'regtest', latency: float = 0.0,
+                 services: int = NODE_NETWORK | NODE_WITNESS | NODE_COMPACT_FILTERS):
+        """Inicializa el nodo.
+
+        Args:
+            blocks: Bloques serializados en orden de altura (el primero es el génesis)
+            network: Red (determina los bytes mágicos)
+            latency: Retardo en segundos aplicado a cada petición
+            services: Servicios anunciados
+        """
+        self.magic = NETWORK_MAGIC[network]
+        self.latency = latency
+        self.services = services
+        self.blocks: List[bytes] = []
+        self.hashes: List[bytes] = []
+        self.filters: List[bytes] = []
+        self.heights: Dict[bytes, int] = {}
+        self._scripts: Dict[bytes, bytes] = {}
+        self.filters_served = 0
+        self.blocks_served = 0
+        self.bytes_served = 0
+        self.port: Optional[int] = None
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._clients: Set[asyncio.StreamWriter] = set()
+        self._handlers: Set[asyncio.Task] = set()
+        for block in blocks:
+            self.add_block(block)
+
+    @property
+    def genesis(self) -> bytes:
+        """Hash del primer bloque de la cadena."""
+        return self.hashes[0]
+
+    def add_block(self, block: bytes) -> bytes:
+        """Añade un bloque a la cadena y calcula su filtro.
+
+        Returns:
+            bytes: Hash del bloque
+        """
+        digest = block_hash(block, 0)
+        items = block_filter_items(block, self._scripts.get)
+        # Registrar las salidas del bloque para los filtros de los siguientes
+        for tx in iter_transactions(block, 0):
+            txid = tx.txid(block)
+            for vout, (_, start, end) in enumerate(tx.outputs):
+                self._scripts[txid + vout.to_bytes(4, 'little')] = bytes(block[start:end])
+        self.heights[digest] = len(self.blocks)
+        self.blocks.append(block)
+        self.hashes.append(digest)
+        self.filters.append(build_filter(items, digest))
+        return digest
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> int:
+        """Arranca el nodo y devuelve el puerto de escucha."""
+        self._server = await asyncio.start_server(self._handle_client, host, port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def close(self) -> None:
+        """Detiene el nodo y cierra las conexiones de los clientes."""
+        for writer in list(self._clients):
+            writer.close()
+        if self._handlers:
+            # Al cerrarse el transporte cada manejador termina por fin de datos
+            await asyncio.wait(self._handlers)
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._clients.add(writer)
+        handler = asyncio.current_task()
+        self._handlers.add(handler)
+        try:
+            while True:
+                command, payload = await read_message(reader, self.magic)
+                if command == 'version':
+                    self._send(writer, 'version', version_payload(self.services, len(self.blocks) - 1))
+                    self._send(writer, 'verack')
+                    continue
+                if command in ('verack', 'pong'):
+                    continue
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                self._answer(writer, command, payload)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._clients.discard(writer)
+            self._handlers.discard(handler)
+            writer.close()
+
+    def _send(self, writer: asyncio.StreamWriter, command: str, payload: bytes = b'') -> None:
+        writer.write(pack_message(self.magic, command, payload))
+
+    def _answer(self, writer: asyncio.StreamWriter, command: str, payload: bytes) -> None:
+        if command == 'getheaders':
+            count, pos = read_varint(payload, 4)
+            locator = [payload[pos + 32 * i:pos + 32 * (i + 1)] for i in range(count)]
+            start = next((self.heights[h] + 1 for h in locator if h in self.heights), 1)
+            headers = [block[:HEADER_SIZE] + b'\x00' for block in self.blocks[start:start + 2000]]
+            self._send(writer, 'headers', encode_varint(len(headers)) + b''.join(headers))
+        elif command == 'getcfilters':
+            filter_type, start = struct.unpack_from('<BI', payload, 0)
+            stop = self.heights.get(payload[5:37])
+            if stop is None or filter_type != 0:
+                return
+            for height in range(start, stop + 1):
+                data = self.filters[height]
+                self._send(writer, 'cfilter', bytes((filter_type,)) + self.hashes[height]
+                           + encode_varint(len(data)) + data)
+                self.filters_served += 1
+                self.bytes_served += len(data)
+        elif command == 'getdata':
+            count, pos = read_varint(payload, 0)
+            missing = []
+            for i in range(count):
+                entry = payload[pos + 36 * i:pos + 36 * (i + 1)]
+                height = self.heights.get(entry[4:])
+                if height is None:
+                    missing.append(entry)
+                    continue
+                self._send(writer, 'block', self.blocks[height])
+                self.blocks_served += 1
+                self.bytes_served += len(self.blocks[height])
+            if missing:
+                self._send(writer, 'notfound', encode_varint(len(missing)) + b''.join(missing))
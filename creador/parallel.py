@@ -0,0 +1,102 @@
+"""
+Generación de direcciones en paralelo con un ``ProcessPoolExecutor``.
+
+La derivación con ``bip32utils`` es aritmética de curva elíptica en Python
+puro y está limitada a un núcleo. Aquí el rango de índices se reparte en
+bloques entre varios procesos; cada proceso recibe únicamente la clave
+extendida del nodo de cadena (xprv o xpub), nunca la frase mnemotécnica, y
+los resultados se devuelven en orden de índice.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional
+
+from bip32utils import BIP32Key
+
+from .derivation import derive_from_chain_key
+
+# Tamaño de bloque por defecto (direcciones por tarea)
+DEFAULT_CHUNK_SIZE = 2000
+
+# Claves de cadena ya decodificadas en el proceso trabajador
+_worker_keys: Dict[str, BIP32Key] = {}
+
+
+def _derive_chunk(chain_xkey: str, addr_type: str, start: int, count: int) -> List[Dict[str, Any]]:
+    """Deriva un bloque de direcciones dentro de un proceso trabajador."""
+    chain_key = _worker_keys.get(chain_xkey)
+    if chain_key is None:
+        chain_key = BIP32Key.fromExtendedKey(chain_xkey)
+        _worker_keys[chain_xkey] = chain_key
+    return list(derive_from_chain_key(chain_key, addr_type, start, count))
+
+
+class ParallelDeriver:
+    """Reparte la derivación de un rango de índices entre varios procesos."""
+
+    def __init__(self, workers: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """Inicializa el derivador paralelo.
+
+        La red de los registros sale de la clave extendida de cada cadena
+        (xprv/xpub o tprv/tpub).
+
+        Args:
+            workers: Número de procesos (por defecto, el número de CPUs)
+            chunk_size: Direcciones por tarea enviada a un proceso
+        """
+        if chunk_size < 1:
+            raise ValueError("El tamaño de bloque debe ser mayor que cero")
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self) -> 'ParallelDeriver':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def close(self) -> None:
+        """Detiene los procesos trabajadores."""
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def derive_range(self, chain_xkey: str, addr_type: str, start: int,
+                     count: int) -> Iterator[Dict[str, Any]]:
+        """Genera ``count`` registros a partir de ``start`` en orden de índice.
+
+        Solo se mantienen en vuelo ``2 * workers`` bloques, de modo que la
+        memoria no crece con el tamaño del rango aunque el consumidor sea lento.
+
+        Args:
+            chain_xkey: Clave extendida del nodo de cadena (xprv o xpub)
+            addr_type: Tipo de dirección (ADDR_TYPE_*)
+            start: Primer índice
+            count: Número de direcciones
+
+        Yields:
+            dict: Registro con la información de cada dirección
+        """
+        if start < 0 or count < 0:
+            raise ValueError("El índice inicial y el número de direcciones deben ser positivos")
+
+        executor = self._get_executor()
+        end = start + count
+        next_start = start
+        pending = deque()
+        max_pending = 2 * self.workers
+
+        while next_start < end or pending:
+            while next_start < end and len(pending) < max_pending:
+                size = min(self.chunk_size, end - next_start)
+                pending.append(executor.submit(_derive_chunk, chain_xkey, addr_type, next_start, size))
+                next_start += size
+            yield from pending.popleft().result()
@@ -0,0 +1,131 @@
+"""
+Registro de dirección derivada.
+
+El motor de derivación producía un diccionario por dirección con la
+dirección, el WIF y la clave pública ya convertidos a texto, aunque la
+mayoría de los registros solo se indexan y nunca se muestran. ``DerivedAddress``
+guarda las claves en binario en una clase con ``__slots__`` y codifica cada
+cadena la primera vez que se pide.
+
+Para no cambiar a los consumidores, el registro se comporta como el
+diccionario anterior: es un ``Mapping`` de solo lectura con las mismas
+claves (``indice``, ``direccion``, ``direcciones`` en multiformato,
+``clave_privada``, ``clave_publica`` y ``tipo``), en el mismo orden, que se
+compara igual que él y se serializa a JSON con ``dict(registro)``.
+"""
+
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Optional
+
+from .encoding import ADDR_TYPE_MULTI, ADDR_TYPE_P2PKH, encode_all, encode_hash160, encode_wif, hash160
+
+_KEYS = ('indice', 'direccion', 'clave_privada', 'clave_publica', 'tipo')
+_MULTI_KEYS = ('indice', 'direccion', 'direcciones', 'clave_privada', 'clave_publica', 'tipo')
+
+
+class DerivedAddress(Mapping):
+    """Dirección derivada con sus claves en binario y sus cadenas calculadas bajo demanda."""
+
+    __slots__ = ('index', 'addr_type', 'public_key', 'private_key', 'network', '_h160', '_address', '_addresses')
+
+    def __init__(self, index: int, addr_type: str, public_key: bytes,
+                 private_key: Optional[bytes] = None, network: str = 'mainnet',
+                 h160: Optional[bytes] = None):
+        """Inicializa el registro.
+
+        Args:
+            index: Índice de la dirección en su cadena
+            addr_type: Tipo de dirección (ADDR_TYPE_* o ADDR_TYPE_MULTI)
+            public_key: Clave pública comprimida (33 bytes)
+            private_key: Clave privada (32 bytes); None en carteras de solo lectura
+            network: Red ('mainnet' o 'testnet')
+            h160: hash160 de la clave pública, si ya se conoce
+        """
+        self.index = index
+        self.addr_type = addr_type
+        self.public_key = public_key
+        self.private_key = private_key
+        self.network = network
+        self._h160 = h160
+        self._address = None
+        self._addresses = None
+
+    # ------------------------------------------------------------------
+    # Campos calculados
+    # ------------------------------------------------------------------
+
+    @property
+    def hash160(self) -> bytes:
+        if self._h160 is None:
+            self._h160 = hash160(self.public_key)
+        return self._h160
+
+    @property
+    def address(self) -> str:
+        """Dirección del registro (la Legacy en multiformato)."""
+        if self._address is None:
+            if self.addr_type == ADDR_TYPE_MULTI:
+                self._address = self.addresses[ADDR_TYPE_P2PKH]
+            else:
+                self._address = encode_hash160(self.hash160, self.addr_type, self.network)
+        return self._address
+
+    @property
+    def addresses(self) -> Optional[Dict[str, str]]:
+        """Dirección por tipo en multiformato (None en los demás tipos)."""
+        if self._addresses is None and self.addr_type == ADDR_TYPE_MULTI:
+            self._addresses = encode_all(self.hash160, self.network)
+        return self._addresses
+
+    @property
+    def wif(self) -> Optional[str]:
+        return encode_wif(self.private_key, self.network) if self.private_key is not None else None
+
+    @property
+    def public_key_hex(self) -> str:
+        return self.public_key.hex()
+
+    def with_type(self, addr_type: str) -> 'DerivedAddress':
+        """El mismo registro en otro tipo de dirección (comparte claves y hash160)."""
+        if addr_type == self.addr_type:
+            return self
+        return DerivedAddress(self.index, addr_type, self.public_key, self.private_key,
+                              self.network, self._h160)
+
+    # ------------------------------------------------------------------
+    # Compatibilidad con el registro en diccionario
+    # ------------------------------------------------------------------
+
+    def __getitem__(self, key: str) -> Any:
+        if key == 'indice':
+            return self.index
+        if key == 'direccion':
+            return self.address
+        if key == 'clave_privada':
+            return self.wif
+        if key == 'clave_publica':
+            return self.public_key.hex()
+        if key == 'tipo':
+            return self.addr_type
+        if key == 'direcciones' and self.addr_type == ADDR_TYPE_MULTI:
+            return self.addresses
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(_MULTI_KEYS if self.addr_type == ADDR_TYPE_MULTI else _KEYS)
+
+    def __len__(self) -> int:
+        return len(_MULTI_KEYS) if self.addr_type == ADDR_TYPE_MULTI else len(_KEYS)
+
+    def __contains__(self, key: object) -> bool:
+        return key in (_MULTI_KEYS if self.addr_type == ADDR_TYPE_MULTI else _KEYS)
+
+    def __repr__(self) -> str:
+        return f"DerivedAddress({dict(self)!r})"
+
+
+def record_hash160(record: Mapping) -> bytes:
+    """hash160 de la clave pública de un registro (sin decodificar el hexadecimal si es binario)."""
+    if isinstance(record, DerivedAddress):
+        return record.hash160
+    return hash160(bytes.fromhex(record['clave_publica']))
@@ -0,0 +1,157 @@
+"""
+Aritmética de la curva secp256k1 especializada para derivación por lotes.
+
+- Multiplicación por el generador con una tabla precalculada de base fija
+  (ventanas de 8 bits: 32 sumas mixtas por escalar, sin duplicaciones).
+- Puntos en coordenadas jacobianas y normalización a afines de un lote
+  completo con una única inversión (truco de inversión por lotes de Montgomery).
+"""
+
+from typing import List, Optional, Tuple
+
+# Parámetros de la curva y^2 = x^3 + 7 sobre F_p
+P = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEFFFFFC2F
+N = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+GX = 0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798
+GY = 0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8
+
+# Bits por ventana de la tabla de base fija
+WINDOW_BITS = 8
+_WINDOWS = 256 // WINDOW_BITS
+_WINDOW_MASK = (1 << WINDOW_BITS) - 1
+
+Affine = Tuple[int, int]
+Jacobian = Tuple[int, int, int]
+
+# Tabla de base fija: _G_TABLE[j][d - 1] = d * 2^(8j) * G (afín); se construye bajo demanda
+_G_TABLE: Optional[List[List[Affine]]] = None
+
+
+def jacobian_double(point: Optional[Jacobian]) -> Optional[Jacobian]:
+    """Duplica un punto en coordenadas jacobianas (None es el punto en el infinito)."""
+    if point is None:
+        return None
+    x, y, z = point
+    if y == 0:
+        return None
+    yy = y * y % P
+    s = 4 * x * yy % P
+    m = 3 * x * x % P
+    x3 = (m * m - 2 * s) % P
+    y3 = (m * (s - x3) - 8 * yy * yy) % P
+    z3 = 2 * y * z % P
+    return x3, y3, z3
+
+
+def jacobian_add_affine(point: Optional[Jacobian], other: Affine) -> Optional[Jacobian]:
+    """Suma mixta: punto jacobiano + punto afín."""
+    x2, y2 = other
+    if point is None:
+        return x2, y2, 1
+    x1, y1, z1 = point
+    z1z1 = z1 * z1 % P
+    u2 = x2 * z1z1 % P
+    s2 = y2 * z1 * z1z1 % P
+    h = (u2 - x1) % P
+    r = (s2 - y1) % P
+    if h == 0:
+        if r == 0:
+            return jacobian_double(point)
+        return None
+    hh = h * h % P
+    hhh = h * hh % P
+    v = x1 * hh % P
+    x3 = (r * r - hhh - 2 * v) % P
+    y3 = (r * (v - x3) - y1 * hhh) % P
+    z3 = z1 * h % P
+    return x3, y3, z3
+
+
+def batch_to_affine(points: List[Optional[Jacobian]]) -> List[Optional[Affine]]:
+    """Convierte un lote de puntos jacobianos a afines con una sola inversión modular.
+
+    Args:
+        points: Puntos jacobianos (None para el infinito)
+
+    Returns:
+        list: Puntos afines en el mismo orden (None para el infinito)
+    """
+    # Productos prefijos de las coordenadas Z
+    prefix = []
+    acc = 1
+    for point in points:
+        if point is not None:
+            acc = acc * point[2] % P
+        prefix.append(acc)
+
+    inv = pow(acc, -1, P)
+    result: List[Optional[Affine]] = [None] * len(points)
+    for i in range(len(points) - 1, -1, -1):
+        point = points[i]
+        if point is None:
+            continue
+        # inv es el inverso del producto de Z[0..i]; se obtiene 1/Z[i]
+        z_inv = inv * (prefix[i - 1] if i > 0 else 1) % P
+        inv = inv * point[2] % P
+        z_inv2 = z_inv * z_inv % P
+        result[i] = (point[0] * z_inv2 % P, point[1] * z_inv2 * z_inv % P)
+    return result
+
+
+def _build_g_table() -> List[List[Affine]]:
+    """Precalcula d * 2^(8j) * G para todas las ventanas."""
+    table = []
+    base: Affine = (GX, GY)
+    for _ in range(_WINDOWS):
+        row: List[Optional[Jacobian]] = []
+        acc: Optional[Jacobian] = None
+        for _ in range(_WINDOW_MASK):
+            acc = jacobian_add_affine(acc, base)
+            row.append(acc)
+        # La siguiente base es 2^8 veces la actual: 255 * base + base
+        row.append(jacobian_add_affine(acc, base))
+        affine_row = batch_to_affine(row)
+        table.append(affine_row[:-1])
+        base = affine_row[-1]
+    return table
+
+
+def g_table() -> List[List[Affine]]:
+    """Devuelve la tabla de base fija del generador, construyéndola si hace falta."""
+    global _G_TABLE
+    if _G_TABLE is None:
+        _G_TABLE = _build_g_table()
+    return _G_TABLE
+
+
+def multiply_g(k: int) -> Optional[Jacobian]:
+    """Calcula k * G en coordenadas jacobianas usando la tabla de base fija."""
+    table = g_table()
+    acc: Optional[Jacobian] = None
+    j = 0
+    while k:
+        digit = k & _WINDOW_MASK
+        if digit:
+            acc = jacobian_add_affine(acc, table[j][digit - 1])
+        k >>= WINDOW_BITS
+        j += 1
+    return acc
+
+
+def decompress(public_key: bytes) -> Affine:
+    """Descomprime una clave pública SEC de 33 bytes."""
+    if len(public_key) != 33 or public_key[0] not in (2, 3):
+        raise ValueError("Clave pública comprimida inválida")
+    x = int.from_bytes(public_key[1:], 'big')
+    y = pow((pow(x, 3, P) + 7) % P, (P + 1) // 4, P)
+    if (y * y - x * x * x - 7) % P != 0:
+        raise ValueError("El punto no pertenece a la curva secp256k1")
+    if y & 1 != public_key[0] & 1:
+        y = P - y
+    return x, y
+
+
+def compress(point: Affine) -> bytes:
+    """Comprime un punto afín en formato SEC de 33 bytes."""
+    x, y = point
+    return bytes((2 + (y & 1),)) + x.to_bytes(32, 'big')
@@ -0,0 +1,171 @@
+"""
+Contexto de semilla BIP-39 / clave raíz BIP-32.
+
+El estiramiento PBKDF2-HMAC-SHA512 (2048 rondas) de la frase mnemotécnica se
+ejecuta una única vez al crear el contexto; todas las derivaciones posteriores
+parten de la clave raíz que se conserva durante la sesión.
+
+Los nodos intermedios (cuenta, cadena) se guardan en una caché indexada por
+prefijo de ruta, de modo que derivar el índice N de una cadena ya visitada
+cuesta un único ``ChildKey(N)``.
+"""
+
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+from . import fast_derivation
+
+# mnemonic y bip32utils (que carga ecdsa) se importan al crear el primer
+# contexto: no forman parte del arranque de la interfaz
+if TYPE_CHECKING:
+    from bip32utils import BIP32Key
+
+# Desplazamiento de los índices endurecidos (BIP-32)
+HARDENED = 0x80000000
+
+# Propósitos de ruta soportados
+PURPOSE_BIP44 = 44
+PURPOSE_BIP49 = 49
+PURPOSE_BIP84 = 84
+
+# Tipo de moneda (BIP-44) por red
+COIN_TYPES = {
+    'mainnet': 0,
+    'testnet': 1,
+}
+
+
+class SeedContext:
+    """Mantiene la semilla binaria y la clave raíz BIP-32 de una frase mnemotécnica."""
+
+    watch_only = False
+    default_purpose = PURPOSE_BIP44
+
+    def __init__(self, mnemonic: str, passphrase: str = "", language: str = "spanish",
+                 network: str = 'mainnet'):
+        """Inicializa el contexto ejecutando el estiramiento de la semilla.
+
+        Args:
+            mnemonic: Frase mnemotécnica BIP-39
+            passphrase: Frase de contraseña opcional (BIP-39)
+            language: Idioma de la lista de palabras
+            network: Red ('mainnet' o 'testnet')
+        """
+        from mnemonic import Mnemonic
+        from bip32utils import BIP32Key
+
+        if network not in COIN_TYPES:
+            raise ValueError(f"Red no soportada: {network}")
+        self.mnemonic = mnemonic
+        self.language = language
+        self.network = network
+        self._seed: Optional[bytes] = Mnemonic(language).to_seed(mnemonic, passphrase)
+        self._root: Optional['BIP32Key'] = BIP32Key.fromEntropy(
+            self._seed, testnet=(network == 'testnet'))
+        self._nodes: Dict[Tuple[int, ...], 'BIP32Key'] = {}
+        self._public_nodes: Dict[Tuple[int, ...], 'BIP32Key'] = {}
+
+    @property
+    def seed(self) -> bytes:
+        """Semilla binaria de 64 bytes."""
+        if self._seed is None:
+            raise ValueError("El contexto de semilla ha sido descartado")
+        return self._seed
+
+    @property
+    def root(self) -> 'BIP32Key':
+        """Clave raíz BIP-32 (m)."""
+        if self._root is None:
+            raise ValueError("El contexto de semilla ha sido descartado")
+        return self._root
+
+    @property
+    def coin_type(self) -> int:
+        """Tipo de moneda BIP-44 correspondiente a la red actual."""
+        return COIN_TYPES[self.network]
+
+    def set_network(self, network: str) -> None:
+        """Cambia la red del contexto e invalida la caché de nodos.
+
+        Args:
+            network: Red ('mainnet' o 'testnet')
+        """
+        if network not in COIN_TYPES:
+            raise ValueError(f"Red no soportada: {network}")
+        if network == self.network:
+            return
+        from bip32utils import BIP32Key
+
+        self.network = network
+        self._root = BIP32Key.fromEntropy(self.seed, testnet=(network == 'testnet'))
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """Vacía la caché de nodos de derivación."""
+        self._nodes.clear()
+        self._public_nodes.clear()
+
+    def derive_path(self, path: Tuple[int, ...]) -> 'BIP32Key':
+        """Devuelve el nodo de la ruta indicada reutilizando el prefijo más largo en caché.
+
+        Args:
+            path: Índices de la ruta desde la raíz (los endurecidos incluyen HARDENED)
+
+        Returns:
+            BIP32Key: Nodo derivado
+        """
+        path = tuple(path)
+        node = self._nodes.get(path)
+        if node is not None:
+            return node
+
+        # Buscar el prefijo más largo ya derivado
+        depth = len(path)
+        node = self.root
+        while depth > 0:
+            cached = self._nodes.get(path[:depth])
+            if cached is not None:
+                node = cached
+                break
+            depth -= 1
+
+        for i in range(depth, len(path)):
+            node = node.ChildKey(path[i])
+            if node is None:
+                raise ValueError(f"Índice de derivación inválido en la ruta: {path[:i + 1]}")
+            self._nodes[path[:i + 1]] = node
+        return node
+
+    def account_node(self, purpose: int = PURPOSE_BIP44, account: int = 0) -> 'BIP32Key':
+        """Nodo de cuenta m/purpose'/coin'/account'."""
+        return self.derive_path((purpose + HARDENED, self.coin_type + HARDENED, account + HARDENED))
+
+    def chain_node(self, purpose: int = PURPOSE_BIP44, account: int = 0, chain: int = 0,
+                   public: bool = False) -> 'BIP32Key':
+        """Nodo de cadena m/purpose'/coin'/account'/chain (0 recepción, 1 cambio).
+
+        Con ``public=True`` se devuelve una copia solo pública del nodo, de modo
+        que la derivación de los índices no toca claves privadas.
+        """
+        path = (purpose + HARDENED, self.coin_type + HARDENED, account + HARDENED, chain)
+        if not public:
+            return self.derive_path(path)
+        node = self._public_nodes.get(path)
+        if node is None:
+            from bip32utils import BIP32Key
+
+            xpub = self.derive_path(path).ExtendedKey(private=False, encoded=True)
+            node = BIP32Key.fromExtendedKey(xpub)
+            self._public_nodes[path] = node
+        return node
+
+    @property
+    def is_cleared(self) -> bool:
+        """Indica si el contexto ya fue descartado."""
+        return self._root is None
+
+    def clear(self) -> None:
+        """Descarta la semilla y la clave raíz de la sesión."""
+        self._seed = None
+        self._root = None
+        self.invalidate()
+        fast_derivation.clear_cache()
@@ -0,0 +1,397 @@
+"""
+Modo ligero (SPV) con filtros compactos de bloque (BIP-157/158).
+
+El motor descarga las cabeceras y los filtros básicos de un nodo y cruza cada
+filtro con los scriptPubKey de la cartera. Solo descarga los bloques cuyos
+filtros coinciden y en ellos busca las salidas de la cartera y sus gastos.
+Los filtros incluyen también los scripts de las salidas gastadas, así que un
+gasto de la cartera hace coincidir el filtro del bloque que lo contiene.
+
+- Los scripts de la cartera se preparan una sola vez (``ItemSet``). En cada
+  filtro solo se calculan sus SipHash con la clave del bloque, y se cruzan
+  con el filtro en un único recorrido ordenado.
+- Los lotes de filtros se cruzan en otro hilo o en un ``ProcessPoolExecutor``
+  mientras se descarga el siguiente lote.
+- En los bloques descargados, las salidas se comprueban con el filtro de
+  Bloom de la cartera (``WalletScanner``) y solo sus positivos se buscan en
+  el índice exacto.
+
+Las cabeceras se validan y guardan en un ``HeaderStore``. Con un archivo de
+cabeceras la sincronización se reanuda desde la última punta guardada. Si el
+nodo reorganiza la cadena, se descartan los movimientos por encima de la
+bifurcación y se vuelven a comprobar esos filtros.
+
+Con un archivo de estado (SQLite), la altura comprobada y los movimientos
+de la cartera se guardan tras cada lote de filtros, de modo que la
+siguiente sincronización solo descarga los filtros nuevos. El estado se
+descarta si cambian las claves de la cartera o la altura de nacimiento, o
+si la cadena de cabeceras ya no contiene el último bloque comprobado. Una
+cartera sin claves no se sincroniza.
+
+Los filtros se aceptan tal como los entrega el nodo. No se comprueban contra
+la cadena de cabeceras de filtros (``cfheaders``), así que conviene usar un
+nodo de confianza.
+"""
+
+import asyncio
+import hashlib
+import os
+import sqlite3
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from .bloom import DEFAULT_FP_RATE, ScriptFilter, WalletScanner
+from .blocks import block_hash, iter_transactions, script_key_at
+from .discovery import UNUSED, HistoryBackend, ScriptStatus
+from .encoding import electrum_scripthash
+from .gcs import ItemSet, match_any
+from .headers import HeaderStore
+from .index import AddressIndex, key_script_pubkey
+from .p2p import MAX_FILTERS_PER_REQUEST, MAX_HEADERS_PER_MESSAGE, P2PError, PeerConnection
+
+# Bloques pedidos en cada ``getdata``
+DEFAULT_BLOCK_BATCH = 16
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS estado (
+    name TEXT PRIMARY KEY,
+    value NOT NULL
+);
+CREATE TABLE IF NOT EXISTS salidas (
+    outpoint BLOB PRIMARY KEY,
+    value INTEGER NOT NULL,
+    key BLOB NOT NULL,
+    height INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS gastos (
+    outpoint BLOB PRIMARY KEY,
+    txid BLOB NOT NULL,
+    height INTEGER NOT NULL
+);
+"""
+
+
+def default_state_path(network: str = 'mainnet') -> str:
+    """Ruta por defecto del estado del modo ligero en el directorio del usuario."""
+    return os.path.join(os.path.expanduser('~'), '.creador_carteras', f'spv-{network}.sqlite3')
+
+
+class SpvStats(NamedTuple):
+    """Resumen de una sincronización."""
+    headers: int
+    filters: int
+    matched: int         # Bloques cuyo filtro coincidió (y se descargaron)
+    relevant: int        # Bloques con movimientos de la cartera
+    seconds: float
+
+    @property
+    def false_positives(self) -> int:
+        """Bloques descargados sin movimientos de la cartera."""
+        return self.matched - self.relevant
+
+
+# Scripts de la cartera en cada proceso trabajador (se fijan en el inicializador)
+_worker_items: Optional[ItemSet] = None
+
+
+def _init_worker(scripts: Sequence[bytes]) -> None:
+    """Prepara los scripts de la cartera en un proceso trabajador."""
+    global _worker_items
+    _worker_items = ItemSet(scripts)
+
+
+def _match_batch(filters: Sequence[Tuple[bytes, bytes]]) -> List[int]:
+    """Posiciones de los filtros del lote que coinciden con la cartera."""
+    return [position for position, (digest, data) in enumerate(filters)
+            if match_any(data, digest, _worker_items)]
+
+
+class SpvEngine:
+    """Sincroniza el estado de la cartera con filtros compactos de un nodo."""
+
+    def __init__(self, peer: PeerConnection, wallet: AddressIndex, network: str = 'mainnet',
+                 start_height: int = 0, headers: Optional[HeaderStore] = None, workers: int = 1,
+                 block_batch: int = DEFAULT_BLOCK_BATCH, fp_rate: float = DEFAULT_FP_RATE,
+                 state_path: Optional[str] = None):
+        """Inicializa el motor.
+
+        Args:
+            peer: Conexión con el nodo (se abre al sincronizar si no lo está)
+            wallet: Índice de direcciones de la cartera (scripts a buscar)
+            network: Red
+            start_height: Primera altura a comprobar (nacimiento de la cartera)
+            headers: Cadena de cabeceras; por defecto, una en memoria desde el génesis de la red
+            workers: Procesos para cruzar filtros; 1 los cruza en un hilo de este proceso
+            block_batch: Bloques por petición ``getdata``
+            fp_rate: Tasa de falsos positivos del filtro de Bloom de las salidas
+            state_path: Base de datos SQLite del estado; sin ruta vive solo en memoria
+        """
+        self.peer = peer
+        self.wallet = wallet
+        self.start_height = start_height
+        self.workers = max(1, workers)
+        self.block_batch = block_batch
+        self.fp_rate = fp_rate
+        self.headers = headers if headers is not None else HeaderStore(None, network)
+        self.scanner: Optional[WalletScanner] = None
+        self._wallet_digest = b''
+        self.outputs: Dict[bytes, Tuple[int, bytes, int]] = {}     # outpoint -> (importe, clave, altura)
+        self.spends: Dict[bytes, Tuple[bytes, int]] = {}            # outpoint -> (txid, altura)
+        self.scanned_height = start_height - 1
+        self._scanned_hash = b''
+        self._executor: Optional[Executor] = None
+        if state_path is not None:
+            directory = os.path.dirname(state_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(state_path or ':memory:', check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        self._load_state()
+
+    # ------------------------------------------------------------------
+    # Estado
+    # ------------------------------------------------------------------
+
+    def _load_state(self) -> None:
+        """Recupera el recorrido anterior si es de la misma altura de nacimiento."""
+        state = dict(self._db.execute("SELECT name, value FROM estado"))
+        if state.get('start_height') != self.start_height or 'wallet' not in state:
+            return
+        self._wallet_digest = state['wallet']
+        self.scanned_height = state['scanned_height']
+        self._scanned_hash = state['scanned_hash']
+        self.outputs = {outpoint: (value, key, height) for outpoint, value, key, height
+                        in self._db.execute("SELECT outpoint, value, key, height FROM salidas")}
+        self.spends = {outpoint: (txid, height) for outpoint, txid, height
+                       in self._db.execute("SELECT outpoint, txid, height FROM gastos")}
+
+    def _save_progress(self) -> None:
+        """Guarda la altura comprobada junto con los movimientos registrados hasta ella."""
+        self._db.executemany("INSERT OR REPLACE INTO estado VALUES (?, ?)", (
+            ('wallet', self._wallet_digest), ('start_height', self.start_height),
+            ('scanned_height', self.scanned_height), ('scanned_hash', self._scanned_hash)))
+        self._db.commit()
+
+    def _reset(self, digest: bytes) -> None:
+        """Empieza un recorrido nuevo desde el nacimiento."""
+        self._wallet_digest = digest
+        self.scanned_height = self.start_height - 1
+        self._scanned_hash = b''
+        self.outputs.clear()
+        self.spends.clear()
+        self._db.execute("DELETE FROM salidas")
+        self._db.execute("DELETE FROM gastos")
+        self._save_progress()
+
+    @property
+    def tip_height(self) -> int:
+        """Altura de la última cabecera conocida."""
+        return self.headers.tip_height
+
+    async def sync(self, on_progress: Optional[Callable[[int, int], None]] = None) -> SpvStats:
+        """Descarga las cabeceras nuevas y comprueba sus filtros.
+
+        Args:
+            on_progress: Función llamada con (altura comprobada, altura final)
+
+        Returns:
+            SpvStats: Resumen de la sincronización
+        """
+        begin = time.perf_counter()
+        keys = sorted(self.wallet.keys())
+        if not keys:
+            return SpvStats(0, 0, 0, 0, time.perf_counter() - begin)
+        if not self.peer.connected:
+            await self.peer.connect()
+        headers = await self._sync_headers()
+
+        digest = hashlib.sha256(b''.join(keys)).digest()
+        if digest != self._wallet_digest:
+            # Cartera nueva o ampliada: se vuelve a comprobar desde el nacimiento
+            self._reset(digest)
+            self.scanner = None
+        elif self.scanned_height >= 0 and (self.scanned_height > self.tip_height or
+                                           self.headers.hash_at(self.scanned_height) != self._scanned_hash):
+            # El recorrido guardado es de otra cadena de cabeceras
+            self._reset(digest)
+        if self.scanner is None:
+            script_filter = ScriptFilter(len(keys), self.fp_rate)
+            for key in keys:
+                script_filter.add(key)
+            self.scanner = WalletScanner(script_filter, self.wallet)
+            self._close_executor()
+        scripts = [key_script_pubkey(key) for key in keys]
+        loop = asyncio.get_running_loop()
+        if self._executor is None:
+            if self.workers > 1:
+                self._executor = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                                     initargs=(scripts,))
+            else:
+                _init_worker(scripts)
+
+        filters = matched = relevant = 0
+        start = max(self.scanned_height + 1, 0)
+        batches = [(height, min(height + MAX_FILTERS_PER_REQUEST, self.tip_height + 1))
+                   for height in range(start, self.tip_height + 1, MAX_FILTERS_PER_REQUEST)]
+        # El siguiente lote se descarga mientras se cruza el actual
+        fetch = asyncio.ensure_future(self._fetch_filters(*batches[0])) if batches else None
+        for position, (first, end) in enumerate(batches):
+            batch = await fetch
+            if position + 1 < len(batches):
+                fetch = asyncio.ensure_future(self._fetch_filters(*batches[position + 1]))
+            hits = await self._match(loop, batch)
+            filters += len(batch)
+            heights = [first + hit for hit in hits]
+            for i in range(0, len(heights), self.block_batch):
+                chunk = heights[i:i + self.block_batch]
+                blocks = await self.peer.get_blocks([self.headers.hash_at(height) for height in chunk])
+                by_hash = {block_hash(block, 0): block for block in blocks}
+                for height in chunk:
+                    block = by_hash.get(self.headers.hash_at(height))
+                    if block is None:
+                        raise P2PError(f"El nodo no envió el bloque de altura {height}")
+                    relevant += self._process_block(block, height)
+            matched += len(heights)
+            self.scanned_height = end - 1
+            self._scanned_hash = self.headers.hash_at(self.scanned_height)
+            self._save_progress()
+            if on_progress is not None:
+                on_progress(self.scanned_height, self.tip_height)
+        return SpvStats(headers, filters, matched, relevant, time.perf_counter() - begin)
+
+    async def _sync_headers(self) -> int:
+        """Descarga las cabeceras que siguen a la última conocida.
+
+        Returns:
+            int: Número de cabeceras nuevas
+        """
+        added = 0
+        loop = asyncio.get_running_loop()
+        while True:
+            headers = await self.peer.get_headers(self.headers.locator())
+            # La validación (prueba de trabajo en paralelo) no bloquea el bucle de eventos
+            result = await loop.run_in_executor(None, self.headers.connect, headers)
+            if result.fork_height is not None:
+                self._rollback(result.fork_height)
+            added += result.connected
+            if len(headers) < MAX_HEADERS_PER_MESSAGE:
+                return added
+
+    def _rollback(self, fork_height: int) -> None:
+        """Descarta los movimientos de los bloques retirados por una reorganización."""
+        self.outputs = {outpoint: entry for outpoint, entry in self.outputs.items() if entry[2] <= fork_height}
+        self.spends = {outpoint: entry for outpoint, entry in self.spends.items() if entry[1] <= fork_height}
+        self._db.execute("DELETE FROM salidas WHERE height > ?", (fork_height,))
+        self._db.execute("DELETE FROM gastos WHERE height > ?", (fork_height,))
+        if self.scanned_height > fork_height:
+            self.scanned_height = fork_height
+            self._scanned_hash = self.headers.hash_at(fork_height)
+        self._save_progress()
+
+    async def _fetch_filters(self, first: int, end: int) -> List[Tuple[bytes, bytes]]:
+        """Descarga los filtros de las alturas ``first`` a ``end - 1`` y comprueba sus hashes."""
+        filters = await self.peer.get_filters(first, self.headers.hash_at(end - 1), end - first)
+        for height, (digest, _) in enumerate(filters, first):
+            if digest != self.headers.hash_at(height):
+                raise P2PError(f"Filtro de un bloque inesperado a la altura {height}")
+        return filters
+
+    async def _match(self, loop: asyncio.AbstractEventLoop,
+                     batch: List[Tuple[bytes, bytes]]) -> List[int]:
+        """Cruza un lote de filtros con la cartera fuera del bucle de eventos."""
+        if self._executor is None:
+            return await loop.run_in_executor(None, _match_batch, batch)
+        size = -(-len(batch) // self.workers)
+        parts = [batch[i:i + size] for i in range(0, len(batch), size)]
+        results = await asyncio.gather(*(loop.run_in_executor(self._executor, _match_batch, part)
+                                         for part in parts))
+        return [offset * size + hit for offset, hits in enumerate(results) for hit in hits]
+
+    def _process_block(self, block: bytes, height: int) -> bool:
+        """Registra las salidas de la cartera del bloque y los gastos de salidas conocidas.
+
+        Returns:
+            bool: Si el bloque tiene movimientos de la cartera
+        """
+        found = False
+        for tx in iter_transactions(block, 0):
+            txid = None
+            for pos in tx.inputs:
+                outpoint = bytes(block[pos:pos + 36])
+                if outpoint in self.outputs:
+                    txid = txid or tx.txid(block)
+                    self.spends[outpoint] = (txid, height)
+                    self._db.execute("INSERT OR REPLACE INTO gastos VALUES (?, ?, ?)", (outpoint, txid, height))
+                    found = True
+            for vout, (value, start, end) in enumerate(tx.outputs):
+                key = script_key_at(block, start, end)
+                if key is not None and self.scanner.match_key(key) is not None:
+                    txid = txid or tx.txid(block)
+                    outpoint = txid + vout.to_bytes(4, 'little')
+                    self.outputs[outpoint] = (value, key, height)
+                    self._db.execute("INSERT OR REPLACE INTO salidas VALUES (?, ?, ?, ?)",
+                                     (outpoint, value, key, height))
+                    found = True
+        return found
+
+    def statuses(self) -> Dict[bytes, ScriptStatus]:
+        """Estado (transacciones y saldo confirmado) de cada script de la cartera con historial."""
+        txids: Dict[bytes, Set[bytes]] = {}
+        balances: Dict[bytes, int] = {}
+        for outpoint, (value, key, _) in self.outputs.items():
+            txids.setdefault(key, set()).add(outpoint[:32])
+            spend = self.spends.get(outpoint)
+            if spend is None:
+                balances[key] = balances.get(key, 0) + value
+            else:
+                txids[key].add(spend[0])
+        return {key: ScriptStatus(len(txs), balances.get(key, 0), 0) for key, txs in txids.items()}
+
+    def balance(self) -> int:
+        """Saldo total de la cartera en satoshis."""
+        return sum(value for outpoint, (value, _, _) in self.outputs.items() if outpoint not in self.spends)
+
+    def _close_executor(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    async def close(self) -> None:
+        """Cierra la conexión, el almacén de cabeceras, el estado y los procesos trabajadores."""
+        self._close_executor()
+        self.headers.close()
+        self._db.close()
+        await self.peer.close()
+
+
+class SpvHistoryBackend(HistoryBackend):
+    """Backend de historial del modo ligero sobre ``SpvEngine``.
+
+    En la primera consulta sincroniza con el nodo. Solo conoce los scripts
+    presentes en el índice de direcciones de la cartera. El resto se
+    consideran sin uso.
+    """
+
+    def __init__(self, engine: SpvEngine):
+        self.engine = engine
+        self._statuses: Optional[Dict[str, ScriptStatus]] = None
+        self._loading: Optional[asyncio.Lock] = None
+
+    async def _load(self) -> Dict[str, ScriptStatus]:
+        """Sincroniza una sola vez aunque lleguen varias consultas a la vez."""
+        if self._loading is None:
+            self._loading = asyncio.Lock()
+        async with self._loading:
+            if self._statuses is None:
+                await self.engine.sync()
+                self._statuses = {electrum_scripthash(key_script_pubkey(key)): status
+                                  for key, status in self.engine.statuses().items()}
+        return self._statuses
+
+    async def get_statuses(self, scripthashes: Sequence[str]) -> List[ScriptStatus]:
+        statuses = await self._load()
+        return [statuses.get(scripthash, UNUSED) for scripthash in scripthashes]
+
+    async def close(self) -> None:
+        await self.engine.close()
@@ -0,0 +1,137 @@
+"""
+Informe del tiempo de arranque de la aplicación.
+
+Con ``--perfil-arranque`` en la línea de órdenes (o la variable de entorno
+``CREADOR_PERFIL_ARRANQUE=1``), ``StartupProfile`` mide cada módulo que se
+importa por primera vez, igual que ``python -X importtime``: el tiempo
+propio y el acumulado con sus dependencias. Anota además los hitos del
+arranque hasta la primera ventana. El informe sale por stderr::
+
+    Arranque: 212.4 ms hasta «primera ventana»
+      módulos importados      121.3 ms
+      ventana construida      187.9 ms
+      primera ventana         212.4 ms
+    Importaciones: 143 módulos en 118.6 ms (los 15 de mayor tiempo acumulado)
+      propio [ms] | acumulado [ms] | módulo
+             5.74 |          22.68 | tkinter
+             ...
+
+Las importaciones se miden sustituyendo ``builtins.__import__`` en el hilo
+principal mientras dura el arranque. Las que ya están en ``sys.modules``
+pasan sin medirse, y tras ``uninstall`` no queda ningún coste.
+
+Con ``--salir-tras-arrancar`` la aplicación se cierra al mostrar la primera
+ventana (lo usa ``benchmarks/startup_budget.py``).
+"""
+
+import builtins
+import importlib.util
+import os
+import sys
+import threading
+import time
+from typing import Callable, List, NamedTuple, Optional, Sequence, Tuple
+
+PROFILE_FLAG = '--perfil-arranque'
+EXIT_FLAG = '--salir-tras-arrancar'
+PROFILE_ENV = 'CREADOR_PERFIL_ARRANQUE'
+
+
+def profile_requested(argv: Optional[Sequence[str]] = None) -> bool:
+    """Indica si se ha pedido el informe de arranque."""
+    argv = sys.argv if argv is None else argv
+    return PROFILE_FLAG in argv or os.environ.get(PROFILE_ENV, '') not in ('', '0')
+
+
+class ImportTiming(NamedTuple):
+    """Tiempo de importación de un módulo."""
+    name: str
+    self_time: float    # Segundos sin contar las importaciones anidadas
+    cumulative: float   # Segundos incluidas las importaciones anidadas
+    depth: int          # Nivel de anidamiento (0 = importado desde el programa)
+
+
+class StartupProfile:
+    """Mide las importaciones y los hitos del arranque."""
+
+    def __init__(self, start: Optional[float] = None, clock: Callable[[], float] = time.perf_counter):
+        """Inicializa el perfil.
+
+        Args:
+            start: Instante de arranque según ``clock``; por defecto, ahora
+            clock: Reloj en segundos
+        """
+        self._clock = clock
+        self.start = clock() if start is None else start
+        self.marks: List[Tuple[str, float]] = []
+        self.imports: List[ImportTiming] = []
+        self._stack: List[float] = []  # Tiempo de las importaciones anidadas de cada nivel abierto
+        self._original = None
+        self._thread = None
+
+    def install(self) -> None:
+        """Empieza a medir las importaciones del hilo actual."""
+        if self._original is None:
+            self._original = builtins.__import__
+            self._thread = threading.get_ident()
+            builtins.__import__ = self._import
+
+    def uninstall(self) -> None:
+        """Deja de medir y restaura la importación original."""
+        if self._original is not None:
+            if builtins.__import__ is self._import:
+                builtins.__import__ = self._original
+            self._original = None
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        original = self._original or builtins.__import__
+        module = name
+        if level:
+            try:
+                module = importlib.util.resolve_name('.' * level + name, (globals or {}).get('__package__'))
+            except (ImportError, ValueError):
+                pass
+        if module in sys.modules or threading.get_ident() != self._thread:
+            return original(name, globals, locals, fromlist, level)
+
+        started = self._clock()
+        self._stack.append(0.0)
+        try:
+            return original(name, globals, locals, fromlist, level)
+        finally:
+            nested = self._stack.pop()
+            elapsed = self._clock() - started
+            if self._stack:
+                self._stack[-1] += elapsed
+            self.imports.append(ImportTiming(module, elapsed - nested, elapsed, len(self._stack)))
+
+    def mark(self, label: str) -> float:
+        """Anota un hito y devuelve los segundos transcurridos desde el arranque."""
+        elapsed = self._clock() - self.start
+        self.marks.append((label, elapsed))
+        return elapsed
+
+    @property
+    def import_time(self) -> float:
+        """Segundos dedicados a importar (solo las importaciones de nivel superior)."""
+        return sum(timing.cumulative for timing in self.imports if timing.depth == 0)
+
+    def report(self, top: int = 15) -> str:
+        """Informe legible de hitos e importaciones.
+
+        Args:
+            top: Número de módulos con mayor tiempo acumulado que se listan
+        """
+        lines = []
+        if self.marks:
+            label, elapsed = self.marks[-1]
+            lines.append(f"Arranque: {elapsed * 1000:.1f} ms hasta «{label}»")
+            width = max(len(label) for label, _ in self.marks)
+            lines.extend(f"  {label:<{width}}  {elapsed * 1000:8.1f} ms" for label, elapsed in self.marks)
+        slowest = sorted(self.imports, key=lambda timing: timing.cumulative, reverse=True)[:top]
+        lines.append(f"Importaciones: {len(self.imports)} módulos en {self.import_time * 1000:.1f} ms "
+                     f"(los {len(slowest)} de mayor tiempo acumulado)")
+        lines.append("  propio [ms] | acumulado [ms] | módulo")
+        lines.extend(f"  {timing.self_time * 1000:11.2f} | {timing.cumulative * 1000:14.2f} | "
+                     f"{'  ' * timing.depth}{timing.name}" for timing in slowest)
+        return "\n".join(lines)
@@ -0,0 +1,652 @@
+"""
+Índice local de UTXO de la cartera a partir de los archivos de bloques de bitcoind.
+
+Es el backend del modo "Nodo completo": lee directamente los ``blk*.dat`` del
+directorio de bloques del nodo, sin RPC ni servidor Electrum.
+
+- Cada archivo se proyecta con ``mmap`` y se analiza sin copiar los bloques;
+  solo se extraen las salidas cuyo script es de la cartera.
+- Los procesos reciben un filtro de Bloom de las claves (``ScriptFilter``),
+  no el conjunto exacto. Sus positivos se confirman en este proceso contra
+  las claves guardadas en SQLite, así que la memoria por clave se queda en
+  unos pocos bytes.
+- Los archivos se reparten entre procesos (``ProcessPoolExecutor``).
+- El progreso se guarda en SQLite por archivo y posición, de modo que una
+  nueva ejecución continúa donde se quedó la anterior y solo lee los bloques
+  añadidos desde entonces.
+
+El recorrido se hace en dos pasadas:
+
+1. Salidas de la cartera en los bloques nuevos, más los gastos de las salidas
+   ya conocidas.
+2. Gastos de las salidas encontradas en la pasada 1, buscados desde el archivo
+   anterior al de la salida. bitcoind descarga los bloques fuera de orden
+   dentro de una ventana, así que un gasto puede caer en el archivo anterior
+   al de su salida, pero no antes.
+
+Los bloques huérfanos también están en los archivos. Por eso cada salida y
+cada gasto guarda el hash de su bloque, y las consultas solo cuentan los de
+la cadena principal. Esta se reconstruye a partir de las cabeceras leídas
+(la rama con más trabajo acumulado), salvo que se indique otra fuente, como
+``HeaderStore.is_main_chain``.
+
+Con un motor de derivación, ``UtxoHistoryBackend`` amplía la cartera del
+indexador por las dos cadenas hasta el límite de huecos antes de responder,
+de modo que las direcciones de cambio y las posteriores a las generadas
+también se encuentran.
+"""
+
+import asyncio
+import glob
+import mmap
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import (
+    Callable, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+)
+
+from .bloom import DEFAULT_FP_RATE, ScriptFilter
+from .blocks import NETWORK_MAGIC, block_hash, iter_block_records, iter_transactions, script_key_at
+from .derivation import CHAIN_CHANGE, CHAIN_RECEIVE, DerivationEngine
+from .discovery import DEFAULT_GAP_LIMIT, UNUSED, HistoryBackend, ScriptStatus
+from .encoding import electrum_scripthash
+from .headers import header_work
+from .index import AddressIndex, key_script_pubkey
+
+# Tamaño de los trozos al deshacer la ofuscación XOR de los archivos
+_XOR_CHUNK = 1 << 22
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS archivos (
+    name TEXT PRIMARY KEY,
+    offset INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS claves (
+    key BLOB PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS salidas (
+    outpoint BLOB NOT NULL,
+    block BLOB NOT NULL,
+    value INTEGER NOT NULL,
+    key BLOB NOT NULL,
+    file INTEGER NOT NULL,
+    spends_checked INTEGER NOT NULL,
+    PRIMARY KEY (outpoint, block)
+);
+CREATE TABLE IF NOT EXISTS gastos (
+    outpoint BLOB NOT NULL,
+    txid BLOB NOT NULL,
+    block BLOB NOT NULL,
+    PRIMARY KEY (outpoint, txid, block)
+);
+CREATE TABLE IF NOT EXISTS bloques (
+    hash BLOB PRIMARY KEY,
+    prev BLOB NOT NULL,
+    bits INTEGER NOT NULL
+);
+"""
+
+# Claves de la cartera sin registrar todavía (solo durante una actualización)
+_TEMP_SCHEMA = """
+CREATE TEMP TABLE IF NOT EXISTS nuevas (
+    key BLOB PRIMARY KEY
+);
+"""
+
+_BLK_NAME = re.compile(r'blk(\d+)\.dat$')
+
+
+class Utxo(NamedTuple):
+    """Salida no gastada de la cartera."""
+    txid: str        # Hex en el orden habitual (invertido)
+    vout: int
+    value: int       # Satoshis
+    key: bytes       # Clave del índice de direcciones
+    block: str       # Hash del bloque, hex en el orden habitual
+
+
+class ScanResult(NamedTuple):
+    """Resultado del análisis de un tramo de un archivo de bloques."""
+    file: int
+    end: int                                             # Posición tras el último bloque completo
+    blocks: int
+    outputs: List[Tuple[bytes, bytes, int, bytes]]       # (outpoint, bloque, importe, clave)
+    spends: List[Tuple[bytes, bytes, bytes]]             # (outpoint, txid, bloque)
+    headers: List[Tuple[bytes, bytes, int]]              # (hash, hash anterior, bits) de cada bloque
+
+
+class UpdateStats(NamedTuple):
+    """Resumen de una actualización del índice."""
+    files: int       # Archivos con bloques nuevos
+    bytes: int       # Bytes de bloques nuevos
+    blocks: int      # Bloques nuevos
+    outputs: int
+    spends: int
+    seconds: float
+
+
+def default_blocks_dir(network: str = 'mainnet') -> str:
+    """Directorio de bloques por defecto de Bitcoin Core en Linux."""
+    base = os.path.join(os.path.expanduser('~'), '.bitcoin')
+    subdir = {'testnet': 'testnet3', 'testnet4': 'testnet4', 'signet': 'signet', 'regtest': 'regtest'}
+    if network in subdir:
+        base = os.path.join(base, subdir[network])
+    return os.path.join(base, 'blocks')
+
+
+def default_state_path(network: str = 'mainnet') -> str:
+    """Ruta por defecto del estado del índice de UTXO en el directorio del usuario."""
+    return os.path.join(os.path.expanduser('~'), '.creador_carteras', f'utxo-{network}.sqlite3')
+
+
+def read_xor_key(blocks_dir: str) -> Optional[bytes]:
+    """Clave de ofuscación de los archivos de bloques (``xor.dat``), o None si no se usa."""
+    path = os.path.join(blocks_dir, 'xor.dat')
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        key = f.read()
+    return key if any(key) else None
+
+
+def deobfuscate(data: bytes, key: bytes, offset: int) -> bytes:
+    """Deshace la ofuscación XOR de un tramo que empieza en ``offset`` del archivo."""
+    size = len(key)
+    shift = offset % size
+    rotated = key[shift:] + key[:shift]
+    out = bytearray()
+    for start in range(0, len(data), _XOR_CHUNK):
+        chunk = data[start:start + _XOR_CHUNK]
+        pattern = (rotated * (len(chunk) // size + 1))[:len(chunk)]
+        value = int.from_bytes(chunk, 'little') ^ int.from_bytes(pattern, 'little')
+        out += value.to_bytes(len(chunk), 'little')
+    return bytes(out)
+
+
+def _display_hex(value: bytes) -> str:
+    return value[::-1].hex()
+
+
+# Estado de cada proceso trabajador (se fija en el inicializador)
+_worker_state: Dict[str, object] = {}
+
+
+def _init_worker(magic: bytes, xor_key: Optional[bytes], keys: Optional[ScriptFilter],
+                 outpoints: FrozenSet[bytes]) -> None:
+    """Inicializa un proceso trabajador con el filtro de claves y los outpoints a buscar."""
+    _worker_state.update(magic=magic, xor_key=xor_key, keys=keys, outpoints=outpoints)
+
+
+def _scan_range(file: int, path: str, start: int, end: int) -> ScanResult:
+    """Analiza los bloques completos de ``path`` entre ``start`` y ``end``."""
+    magic = _worker_state['magic']
+    xor_key = _worker_state['xor_key']
+    keys = _worker_state['keys']
+    outpoints = _worker_state['outpoints']
+    outputs: List[Tuple[bytes, bytes, int, bytes]] = []
+    spends: List[Tuple[bytes, bytes, bytes]] = []
+    headers: List[Tuple[bytes, bytes, int]] = []
+    blocks = 0
+    last = start
+
+    with open(path, 'rb') as f:
+        end = min(end, os.fstat(f.fileno()).st_size)
+        if end <= start:
+            return ScanResult(file, start, 0, outputs, spends, headers)
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if xor_key is not None:
+                buf, base, lo, hi = deobfuscate(data[start:end], xor_key, start), start, 0, end - start
+            else:
+                buf, base, lo, hi = data, 0, start, end
+            view = memoryview(buf)
+            try:
+                for block_start, block_end in iter_block_records(view, lo, hi, magic):
+                    block = block_hash(view, block_start)
+                    headers.append((block, bytes(view[block_start + 4:block_start + 36]),
+                                    int.from_bytes(view[block_start + 72:block_start + 76], 'little')))
+                    for tx in iter_transactions(view, block_start):
+                        txid = None
+                        if outpoints:
+                            for pos in tx.inputs:
+                                prevout = bytes(view[pos:pos + 36])
+                                if prevout in outpoints:
+                                    txid = txid or tx.txid(view)
+                                    spends.append((prevout, txid, block))
+                        if keys is not None:
+                            for vout, (value, script_start, script_end) in enumerate(tx.outputs):
+                                key = script_key_at(view, script_start, script_end)
+                                if key is not None and key in keys:
+                                    txid = txid or tx.txid(view)
+                                    outputs.append((txid + vout.to_bytes(4, 'little'), block, value, key))
+                    blocks += 1
+                    last = block_end
+            finally:
+                view.release()
+        finally:
+            data.close()
+    return ScanResult(file, base + last if blocks else start, blocks, outputs, spends, headers)
+
+
+class UtxoIndexer:
+    """Mantiene las salidas (y sus gastos) de la cartera leyendo los archivos de bloques."""
+
+    def __init__(self, blocks_dir: str, wallet: AddressIndex, state_path: Optional[str] = None,
+                 network: str = 'mainnet', workers: Optional[int] = None, fp_rate: float = DEFAULT_FP_RATE,
+                 main_chain: Optional[Callable[[bytes], bool]] = None):
+        """Inicializa el indexador.
+
+        Args:
+            blocks_dir: Directorio ``blocks`` del nodo
+            wallet: Índice de direcciones de la cartera (scripts a buscar)
+            state_path: Base de datos SQLite del estado; sin ruta vive solo en memoria
+            network: Red (determina los bytes mágicos de los bloques)
+            workers: Número de procesos (por defecto, el número de CPUs); 1 analiza en este proceso
+            fp_rate: Tasa de falsos positivos del filtro de claves que reciben los procesos
+            main_chain: Indica si un bloque (hash en orden interno) es de la cadena
+                principal; por defecto se usa la cadena de las cabeceras leídas
+        """
+        if network not in NETWORK_MAGIC:
+            raise ValueError(f"Red no soportada: {network}")
+        self.blocks_dir = blocks_dir
+        self.wallet = wallet
+        self.network = network
+        self.magic = NETWORK_MAGIC[network]
+        self.workers = workers or os.cpu_count() or 1
+        self.fp_rate = fp_rate
+        self.main_chain = main_chain
+        self._best_chain: Optional[FrozenSet[bytes]] = None
+        self._cancel = threading.Event()
+        self._lock = threading.RLock()
+        if state_path is not None:
+            directory = os.path.dirname(state_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(state_path or ':memory:', check_same_thread=False)
+        self._db.executescript(_SCHEMA + _TEMP_SCHEMA)
+        self._db.commit()
+
+    def cancel(self) -> None:
+        """Solicita detener la actualización tras los archivos en curso (el progreso se conserva)."""
+        self._cancel.set()
+
+    @property
+    def cancelled(self) -> bool:
+        """Indica si se ha solicitado detener la actualización."""
+        return self._cancel.is_set()
+
+    # ------------------------------------------------------------------
+    # Actualización
+    # ------------------------------------------------------------------
+
+    def block_files(self) -> List[Tuple[int, str]]:
+        """Archivos de bloques del directorio, por número."""
+        files = []
+        for path in glob.glob(os.path.join(self.blocks_dir, 'blk*.dat')):
+            match = _BLK_NAME.search(os.path.basename(path))
+            if match:
+                files.append((int(match.group(1)), path))
+        return sorted(files)
+
+    def update(self, on_progress: Optional[Callable[[int, int], None]] = None) -> UpdateStats:
+        """Lee los bloques nuevos y actualiza las salidas y gastos de la cartera.
+
+        Args:
+            on_progress: Función llamada con (tramos terminados, tramos totales) en cada pasada
+
+        Returns:
+            UpdateStats: Resumen de lo leído
+        """
+        with self._lock:
+            self._cancel.clear()
+            begin = time.perf_counter()
+            files = self.block_files()
+            offsets = self._offsets(files)
+            xor_key = read_xor_key(self.blocks_dir)
+            totals = [0, 0, 0, 0]  # bytes, bloques, salidas, gastos
+
+            self._best_chain = None
+            # Las claves nuevas se separan en SQLite, sin un conjunto en memoria
+            with self._db:
+                self._db.execute("DELETE FROM nuevas")
+                self._db.executemany("INSERT OR IGNORE INTO nuevas VALUES (?)",
+                                     ((key,) for key in self.wallet.keys()))
+                self._db.execute("DELETE FROM nuevas WHERE key IN (SELECT key FROM claves)")
+
+            # Claves añadidas a la cartera: buscar sus salidas en lo ya leído
+            if self._db.execute("SELECT 1 FROM nuevas LIMIT 1").fetchone() and any(offsets.values()):
+                ranges = [(number, path, 0, offsets[number]) for number, path in files if offsets[number]]
+                self._run_pass(ranges, xor_key, 'nuevas', frozenset(), totals, on_progress)
+                if self._cancel.is_set():
+                    return self._stats(begin, 0, totals)
+            with self._db:
+                self._db.execute("INSERT OR IGNORE INTO claves SELECT key FROM nuevas")
+                self._db.execute("DELETE FROM nuevas")
+
+            # Pasada 1: bloques nuevos. Se buscan todas las claves registradas, también
+            # las que ya no están en la cartera, para que sigan al día si se vuelven a añadir
+            checked = frozenset(row[0] for row in self._db.execute(
+                "SELECT outpoint FROM salidas WHERE spends_checked = 1"))
+            ranges = []
+            for number, path in files:
+                size = os.path.getsize(path)
+                if size > offsets[number]:
+                    ranges.append((number, path, offsets[number], size))
+            self._run_pass(ranges, xor_key, 'claves', checked, totals, on_progress, save_offsets=True)
+            files_read = len(ranges)
+            if self._cancel.is_set():
+                return self._stats(begin, files_read, totals)
+
+            # Pasada 2: gastos de las salidas nuevas
+            unchecked = self._db.execute(
+                "SELECT outpoint, MIN(file) FROM salidas WHERE spends_checked = 0 GROUP BY outpoint").fetchall()
+            if unchecked:
+                first_file = min(file for _, file in unchecked)
+                offsets = self._offsets(files)
+                numbers = [number for number, _ in files]
+                earliest = numbers[max(0, numbers.index(first_file) - 1)] if first_file in numbers else first_file
+                ranges = [(number, path, 0, offsets[number]) for number, path in files
+                          if number >= earliest and offsets[number]]
+                outpoints = frozenset(outpoint for outpoint, _ in unchecked)
+                self._run_pass(ranges, xor_key, None, outpoints, totals, on_progress)
+                if not self._cancel.is_set():
+                    self._db.executemany("UPDATE salidas SET spends_checked = 1 WHERE outpoint = ?",
+                                         ((outpoint,) for outpoint in outpoints))
+                    self._db.commit()
+            return self._stats(begin, files_read, totals)
+
+    def _offsets(self, files: Sequence[Tuple[int, str]]) -> Dict[int, int]:
+        """Posición ya procesada de cada archivo.
+
+        Reinicia el estado si el nodo reindexó o si el estado es de una versión
+        que no guardaba las cabeceras.
+        """
+        stored = dict(self._db.execute("SELECT name, offset FROM archivos"))
+        names = {os.path.basename(path): path for _, path in files}
+        without_headers = any(stored.values()) and self._db.execute(
+            "SELECT 1 FROM bloques LIMIT 1").fetchone() is None
+        if without_headers or any(name not in names or os.path.getsize(names[name]) < offset
+                                  for name, offset in stored.items()):
+            self._db.executescript("DELETE FROM archivos; DELETE FROM salidas; DELETE FROM gastos; "
+                                   "DELETE FROM bloques;")
+            self._db.commit()
+            stored = {}
+        return {number: stored.get(os.path.basename(path), 0) for number, path in files}
+
+    def _key_filter(self, table: str) -> ScriptFilter:
+        """Filtro de Bloom de las claves de una tabla (``claves`` o ``nuevas``)."""
+        count = self._db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        script_filter = ScriptFilter(count, self.fp_rate)
+        for (key,) in self._db.execute(f"SELECT key FROM {table}"):
+            script_filter.add(key)
+        return script_filter
+
+    def _confirm(self, result: ScanResult, table: str) -> ScanResult:
+        """Descarta las salidas que solo coincidían con el filtro de Bloom."""
+        if not result.outputs:
+            return result
+        candidates = {key for _, _, _, key in result.outputs}
+        confirmed = {key for key in candidates
+                     if self._db.execute(f"SELECT 1 FROM {table} WHERE key = ?", (key,)).fetchone()}
+        if len(confirmed) == len(candidates):
+            return result
+        return result._replace(outputs=[output for output in result.outputs if output[3] in confirmed])
+
+    def _run_pass(self, ranges: List[Tuple[int, str, int, int]], xor_key: Optional[bytes],
+                  keys: Optional[str], outpoints: FrozenSet[bytes], totals: List[int],
+                  on_progress: Optional[Callable[[int, int], None]], save_offsets: bool = False) -> None:
+        """Analiza los tramos (en paralelo si hay varios procesos) y guarda cada resultado.
+
+        Args:
+            keys: Tabla de las claves a buscar (None para buscar solo gastos)
+        """
+        if not ranges:
+            return
+        done = 0
+
+        def store(result: ScanResult, start: int) -> None:
+            nonlocal done
+            if keys is not None:
+                result = self._confirm(result, keys)
+            self._store(result, save_offsets)
+            if save_offsets:
+                # Solo cuenta como leído lo nuevo; las búsquedas de gastos releen tramos ya procesados
+                totals[0] += result.end - start
+                totals[1] += result.blocks
+            totals[2] += len(result.outputs)
+            totals[3] += len(result.spends)
+            done += 1
+            if on_progress is not None:
+                on_progress(done, len(ranges))
+
+        initargs = (self.magic, xor_key, self._key_filter(keys) if keys is not None else None, outpoints)
+        if self.workers == 1 or len(ranges) == 1:
+            _init_worker(*initargs)
+            for number, path, start, end in ranges:
+                if self._cancel.is_set():
+                    break
+                store(_scan_range(number, path, start, end), start)
+            return
+
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(ranges)),
+                                 initializer=_init_worker, initargs=initargs) as executor:
+            pending = {executor.submit(_scan_range, *item): item[2] for item in ranges}
+            while pending:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    store(future.result(), pending.pop(future))
+                if self._cancel.is_set():
+                    for future in pending:
+                        future.cancel()
+                    break
+
+    def _store(self, result: ScanResult, save_offset: bool) -> None:
+        """Guarda el resultado de un tramo en una sola transacción."""
+        with self._db:
+            self._db.executemany(
+                "INSERT OR IGNORE INTO salidas VALUES (?, ?, ?, ?, ?, 0)",
+                ((outpoint, block, value, key, result.file) for outpoint, block, value, key in result.outputs))
+            self._db.executemany("INSERT OR IGNORE INTO gastos VALUES (?, ?, ?)", result.spends)
+            if save_offset:
+                self._db.executemany("INSERT OR IGNORE INTO bloques VALUES (?, ?, ?)", result.headers)
+                self._db.execute("INSERT OR REPLACE INTO archivos VALUES (?, ?)",
+                                 (f"blk{result.file:05d}.dat", result.end))
+
+    @staticmethod
+    def _stats(begin: float, files: int, totals: List[int]) -> UpdateStats:
+        return UpdateStats(files, totals[0], totals[1], totals[2], totals[3], time.perf_counter() - begin)
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    def best_chain(self) -> FrozenSet[bytes]:
+        """Hashes de los bloques de la rama con más trabajo acumulado entre los leídos.
+
+        Un bloque cuyo anterior no se ha leído cuenta como raíz. A igualdad de
+        trabajo gana la rama leída primero, como hace el nodo.
+        """
+        with self._lock:
+            if self._best_chain is not None:
+                return self._best_chain
+            parents = {digest: (prev, bits) for digest, prev, bits in self._db.execute(
+                "SELECT hash, prev, bits FROM bloques ORDER BY rowid")}
+            work: Dict[bytes, int] = {}
+            for digest in parents:
+                path = []
+                while digest in parents and digest not in work:
+                    path.append(digest)
+                    digest = parents[digest][0]
+                total = work.get(digest, 0)
+                for digest in reversed(path):
+                    total += header_work(parents[digest][1])
+                    work[digest] = total
+            best = set()
+            digest = max(work, key=work.__getitem__) if work else None
+            while digest in parents:
+                best.add(digest)
+                digest = parents[digest][0]
+            self._best_chain = frozenset(best)
+            return self._best_chain
+
+    def is_main_chain(self, block_hash: bytes) -> bool:
+        """Indica si un bloque (hash en orden interno) es de la cadena principal."""
+        if self.main_chain is not None:
+            return self.main_chain(block_hash)
+        return block_hash in self.best_chain()
+
+    def _spent(self, is_main_chain: Optional[Callable[[bytes], bool]]) -> Dict[bytes, Set[bytes]]:
+        """Transacciones que gastan cada outpoint (solo en bloques de la cadena principal)."""
+        is_main_chain = is_main_chain or self.is_main_chain
+        spent: Dict[bytes, Set[bytes]] = {}
+        with self._lock:
+            rows = self._db.execute("SELECT outpoint, txid, block FROM gastos").fetchall()
+        for outpoint, txid, block in rows:
+            if is_main_chain(block):
+                spent.setdefault(outpoint, set()).add(txid)
+        return spent
+
+    def _outputs(self, is_main_chain: Optional[Callable[[bytes], bool]]
+                 ) -> Iterable[Tuple[bytes, bytes, int, bytes]]:
+        is_main_chain = is_main_chain or self.is_main_chain
+        with self._lock:
+            rows = self._db.execute("SELECT outpoint, block, value, key FROM salidas").fetchall()
+        seen = set()
+        for outpoint, block, value, key in rows:
+            # Una misma transacción puede estar en un bloque huérfano y en la cadena principal
+            if outpoint in seen or not is_main_chain(block):
+                continue
+            seen.add(outpoint)
+            yield outpoint, block, value, key
+
+    def utxos(self, is_main_chain: Optional[Callable[[bytes], bool]] = None) -> List[Utxo]:
+        """Salidas no gastadas de la cartera.
+
+        Args:
+            is_main_chain: Indica si un bloque (hash en orden interno) es de la
+                cadena principal; por defecto, ``self.is_main_chain``
+        """
+        spent = self._spent(is_main_chain)
+        return [Utxo(_display_hex(outpoint[:32]), int.from_bytes(outpoint[32:], 'little'), value, key,
+                     _display_hex(block))
+                for outpoint, block, value, key in self._outputs(is_main_chain) if outpoint not in spent]
+
+    def statuses(self, is_main_chain: Optional[Callable[[bytes], bool]] = None) -> Dict[bytes, ScriptStatus]:
+        """Estado (transacciones y saldo confirmado) de cada script de la cartera con historial."""
+        spent = self._spent(is_main_chain)
+        txids: Dict[bytes, Set[bytes]] = {}
+        balances: Dict[bytes, int] = {}
+        for outpoint, _, value, key in self._outputs(is_main_chain):
+            txids.setdefault(key, set()).add(outpoint[:32])
+            txids[key].update(spent.get(outpoint, ()))
+            if outpoint not in spent:
+                balances[key] = balances.get(key, 0) + value
+        return {key: ScriptStatus(len(txs), balances.get(key, 0), 0) for key, txs in txids.items()}
+
+    def balance(self, is_main_chain: Optional[Callable[[bytes], bool]] = None) -> int:
+        """Saldo total de la cartera en satoshis."""
+        return sum(utxo.value for utxo in self.utxos(is_main_chain))
+
+    def close(self) -> None:
+        """Cierra la base de datos del estado."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def __enter__(self) -> 'UtxoIndexer':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+class UtxoHistoryBackend(HistoryBackend):
+    """Backend de historial del modo nodo completo sobre ``UtxoIndexer``.
+
+    En la primera consulta actualiza el índice con los bloques nuevos. Con un
+    motor de derivación, antes amplía la cartera del indexador por cada
+    cadena hasta que las ``gap_limit`` últimas direcciones no tienen
+    historial; sin motor solo conoce los scripts que ya tenga la cartera. El
+    resto se consideran sin uso.
+    """
+
+    def __init__(self, indexer: UtxoIndexer, is_main_chain: Optional[Callable[[bytes], bool]] = None,
+                 engine: Optional[DerivationEngine] = None, gap_limit: int = DEFAULT_GAP_LIMIT,
+                 chains: Sequence[int] = (CHAIN_RECEIVE, CHAIN_CHANGE)):
+        """Inicializa el backend.
+
+        Args:
+            indexer: Indexador de los archivos de bloques
+            is_main_chain: Indica si un bloque es de la cadena principal; por
+                defecto, el criterio del indexador
+            engine: Motor de derivación con el que ampliar la cartera del indexador
+            gap_limit: Direcciones consecutivas sin uso tras las que termina una cadena
+            chains: Cadenas que se amplían
+        """
+        if gap_limit < 1:
+            raise ValueError("El límite de huecos debe ser positivo")
+        self.indexer = indexer
+        self.is_main_chain = is_main_chain
+        self.engine = engine
+        self.gap_limit = gap_limit
+        self.chains = tuple(chains)
+        self._statuses: Optional[Dict[str, ScriptStatus]] = None
+        self._loading: Optional[asyncio.Lock] = None
+
+    def _sync(self) -> Dict[bytes, ScriptStatus]:
+        """Actualiza el índice, ampliando antes la cartera hasta el límite de huecos si hay motor.
+
+        Cada ampliación obliga a releer los bloques ya leídos en busca de las
+        claves nuevas, así que la ventana al menos se duplica en cada ronda.
+        """
+        wallet = self.indexer.wallet
+        derived = {chain: 0 for chain in self.chains}
+        wanted = {chain: self.gap_limit if self.engine is not None else 0 for chain in self.chains}
+        while True:
+            for chain in self.chains:
+                if wanted[chain] > derived[chain]:
+                    wallet.add_records(self.engine.derive_range(chain, derived[chain],
+                                                                wanted[chain] - derived[chain]),
+                                       self.engine.account, chain)
+                    derived[chain] = wanted[chain]
+            self.indexer.update()
+            statuses = self.indexer.statuses(self.is_main_chain)
+            if self.engine is None:
+                return statuses
+            last_used = {chain: -1 for chain in self.chains}
+            for key, status in statuses.items():
+                entry = wallet.lookup(key)
+                if status.used and entry is not None and entry.chain in last_used:
+                    last_used[entry.chain] = max(last_used[entry.chain], entry.index)
+            grow = False
+            for chain in self.chains:
+                needed = last_used[chain] + 1 + self.gap_limit
+                if needed > derived[chain]:
+                    wanted[chain] = max(needed, 2 * derived[chain])
+                    grow = True
+            if not grow or self.indexer.cancelled:
+                return statuses
+
+    async def _load(self) -> Dict[str, ScriptStatus]:
+        """Actualiza el índice una sola vez aunque lleguen varias consultas a la vez."""
+        if self._loading is None:
+            self._loading = asyncio.Lock()
+        async with self._loading:
+            if self._statuses is None:
+                statuses = await asyncio.get_running_loop().run_in_executor(None, self._sync)
+                self._statuses = {electrum_scripthash(key_script_pubkey(key)): status
+                                  for key, status in statuses.items()}
+        return self._statuses
+
+    async def get_statuses(self, scripthashes: Sequence[str]) -> List[ScriptStatus]:
+        statuses = await self._load()
+        return [statuses.get(scripthash, UNUSED) for scripthash in scripthashes]
+
+    async def close(self) -> None:
+        self.indexer.cancel()
+        self.indexer.close()
@@ -0,0 +1,330 @@
+"""
+Archivo de cartera en flujo: cabecera, registros JSON Lines e índice.
+
+El formato JSON anterior obligaba a cargar y volver a escribir la cartera
+completa. En este formato cada dirección es una línea JSON independiente:
+
+- Al abrir solo se leen la cabecera, el pie y el índice.
+- Los registros se decodifican por bloques cuando se piden (por ejemplo, la
+  página visible de la tabla).
+- Añadir direcciones escribe solo las líneas nuevas y vuelve a escribir el
+  índice, sin tocar los registros existentes.
+
+Formato del archivo::
+
+    cabecera:  una línea JSON con los metadatos ({"formato": "CRWAL001", ...})
+    registros: un objeto JSON por línea (JSON Lines)
+    índice:    magic (8 bytes) | paso (uint32 LE) | número de entradas (uint64 LE) |
+               desplazamiento (uint64 LE) de uno de cada ``paso`` registros
+    pie:       desplazamiento del índice (uint64 LE) | número de registros (uint64 LE) |
+               magic (8 bytes)
+
+Si una escritura se interrumpe, el pie falta o no cuadra. Al abrir, los
+registros completos se recuperan recorriendo las líneas, y la siguiente
+escritura vuelve a generar el índice.
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections import OrderedDict
+from collections.abc import Sequence
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional
+
+WALLET_FORMAT = 'CRWAL001'
+INDEX_MAGIC = b'CRWIDX01'
+FOOTER_MAGIC = b'CRWEND01'
+_INDEX_HEADER = struct.Struct('<8sIQ')
+_FOOTER = struct.Struct('<QQ8s')
+
+# Registros entre dos entradas del índice (y tamaño del bloque que se decodifica de una vez)
+INDEX_STEP = 256
+
+
+def _encode(record: Mapping[str, Any]) -> bytes:
+    # Los registros derivados (DerivedAddress) se serializan con sus claves de diccionario
+    return json.dumps(record, ensure_ascii=False, separators=(',', ':'), default=dict).encode('utf-8') + b'\n'
+
+
+def _offsets_bytes(offsets: array) -> bytes:
+    if sys.byteorder == 'big':
+        offsets = array('Q', offsets)
+        offsets.byteswap()
+    return offsets.tobytes()
+
+
+def is_wallet_stream(path: str) -> bool:
+    """Indica si el archivo es una cartera en flujo (y no del formato JSON anterior)."""
+    with open(path, 'rb') as f:
+        line = f.readline(1 << 20)
+    try:
+        return json.loads(line).get('formato') == WALLET_FORMAT
+    except (ValueError, AttributeError):
+        return False
+
+
+def write_wallet(path: str, metadata: Dict[str, Any], records: Iterable[Dict[str, Any]],
+                 step: int = INDEX_STEP) -> int:
+    """Escribe una cartera completa recorriendo los registros una sola vez.
+
+    Se escribe en un archivo temporal que después sustituye al destino. Para
+    reescribir una cartera abierta leyendo de ella misma se usa
+    ``WalletFile.rewrite``.
+
+    Args:
+        path: Archivo de destino
+        metadata: Metadatos de la cabecera (semilla o xpub, tipo, fecha...)
+        records: Registros de dirección
+        step: Registros entre dos entradas del índice
+
+    Returns:
+        int: Número de registros escritos
+    """
+    temp = path + '.tmp'
+    count = _write_file(temp, metadata, records, step)
+    os.replace(temp, path)
+    return count
+
+
+def _write_file(path: str, metadata: Dict[str, Any], records: Iterable[Dict[str, Any]], step: int) -> int:
+    offsets = array('Q')
+    with open(path, 'wb') as f:
+        f.write(_encode(dict(metadata, formato=WALLET_FORMAT)))
+        end, count = _write_records(f, records, offsets, f.tell(), 0, step)
+        _write_index(f, offsets, end, count, step)
+        os.fsync(f.fileno())
+    return count
+
+
+def _write_records(f, records: Iterable[Dict[str, Any]], offsets: array, position: int,
+                   count: int, step: int):
+    """Añade registros en ``position`` y devuelve (fin de los registros, número de registros)."""
+    for record in records:
+        if count % step == 0:
+            offsets.append(position)
+        line = _encode(record)
+        f.write(line)
+        position += len(line)
+        count += 1
+    return position, count
+
+
+def _write_index(f, offsets: array, index_offset: int, count: int, step: int) -> None:
+    f.write(_INDEX_HEADER.pack(INDEX_MAGIC, step, len(offsets)))
+    f.write(_offsets_bytes(offsets))
+    f.write(_FOOTER.pack(index_offset, count, FOOTER_MAGIC))
+    f.flush()
+
+
+class WalletFile(Sequence):
+    """Cartera en flujo abierta: secuencia perezosa de registros con escritura por anexión.
+
+    Los registros añadidos con ``append``/``extend`` quedan pendientes en
+    memoria hasta ``flush()``.
+    """
+
+    def __init__(self, path: str, cache_blocks: int = 16):
+        """Abre la cartera.
+
+        Args:
+            path: Archivo de cartera
+            cache_blocks: Bloques de ``INDEX_STEP`` registros decodificados que se conservan
+
+        Raises:
+            ValueError: Si el archivo no es una cartera en flujo
+        """
+        self.path = path
+        self._cache_blocks = cache_blocks
+        self._map: Optional[mmap.mmap] = None
+        self._file = None
+        self._open()
+
+    def _open(self) -> None:
+        if os.path.getsize(self.path) == 0:
+            raise ValueError("Formato de archivo de cartera inválido")
+        self._file = open(self.path, 'rb')
+        self._remap()
+        data = self._map
+        header_end = data.find(b'\n') + 1
+        try:
+            self.metadata: Dict[str, Any] = json.loads(data[:header_end])
+        except ValueError:
+            self.metadata = {}
+        if header_end == 0 or self.metadata.get('formato') != WALLET_FORMAT:
+            self.close()
+            raise ValueError("Formato de archivo de cartera inválido")
+        self._header_end = header_end
+        self._pending: List[Dict[str, Any]] = []
+        self._cache: 'OrderedDict[int, List[Dict[str, Any]]]' = OrderedDict()
+        self._indexed = self._read_index()
+        if not self._indexed:
+            self._recover()
+
+    def _remap(self) -> None:
+        if self._map is not None:
+            self._map.close()
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _read_index(self) -> bool:
+        """Lee el pie y el índice; False si faltan o no cuadran."""
+        data = self._map
+        size = len(data)
+        if size < self._header_end + _INDEX_HEADER.size + _FOOTER.size:
+            return False
+        index_offset, count, magic = _FOOTER.unpack_from(data, size - _FOOTER.size)
+        if magic != FOOTER_MAGIC or not (self._header_end <= index_offset
+                                         <= size - _FOOTER.size - _INDEX_HEADER.size):
+            return False
+        magic, step, entries = _INDEX_HEADER.unpack_from(data, index_offset)
+        start = index_offset + _INDEX_HEADER.size
+        if (magic != INDEX_MAGIC or step == 0 or entries != -(-count // step)
+                or start + 8 * entries != size - _FOOTER.size):
+            return False
+        self._offsets = array('Q')
+        self._offsets.frombytes(data[start:start + 8 * entries])
+        if sys.byteorder == 'big':
+            self._offsets.byteswap()
+        self._step = step
+        self._count = count
+        self._data_end = index_offset
+        return True
+
+    def _recover(self) -> None:
+        """Reconstruye el índice recorriendo las líneas completas tras una escritura interrumpida."""
+        data = self._map
+        self._step = INDEX_STEP
+        self._offsets = array('Q')
+        position, count = self._header_end, 0
+        while data[position:position + 1] == b'{':
+            end = data.find(b'\n', position)
+            if end < 0:
+                break
+            if count % self._step == 0:
+                self._offsets.append(position)
+            position = end + 1
+            count += 1
+        self._count = count
+        self._data_end = position
+
+    # ------------------------------------------------------------------
+    # Lectura
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return self._count + len(self._pending)
+
+    @property
+    def stored(self) -> int:
+        """Registros ya escritos en el archivo."""
+        return self._count
+
+    def _block(self, block: int) -> List[Dict[str, Any]]:
+        records = self._cache.get(block)
+        if records is not None:
+            self._cache.move_to_end(block)
+            return records
+        start = self._offsets[block]
+        end = self._offsets[block + 1] if block + 1 < len(self._offsets) else self._data_end
+        records = [json.loads(line) for line in self._map[start:end].split(b'\n')[:-1]]
+        self._cache[block] = records
+        if len(self._cache) > self._cache_blocks:
+            self._cache.popitem(last=False)
+        return records
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(len(self)))]
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError("Índice de dirección fuera de rango")
+        if position >= self._count:
+            return self._pending[position - self._count]
+        block, offset = divmod(position, self._step)
+        return self._block(block)[offset]
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Recorre los registros en orden sin llenar la caché de bloques."""
+        data = self._map
+        position = self._header_end
+        for _ in range(self._count):
+            end = data.find(b'\n', position)
+            yield json.loads(data[position:end])
+            position = end + 1
+        yield from list(self._pending)
+
+    # ------------------------------------------------------------------
+    # Escritura
+    # ------------------------------------------------------------------
+
+    @property
+    def pending(self) -> int:
+        """Registros añadidos que aún no se han escrito."""
+        return len(self._pending)
+
+    def append(self, record: Dict[str, Any]) -> None:
+        self._pending.append(record)
+
+    def extend(self, records: Iterable[Dict[str, Any]]) -> None:
+        self._pending.extend(records)
+
+    def flush(self) -> int:
+        """Escribe los registros pendientes al final del archivo.
+
+        Solo se reescriben el índice y el pie; los registros existentes no se tocan.
+
+        Returns:
+            int: Número de registros escritos
+        """
+        if not self._pending and self._indexed:
+            return 0
+        written = len(self._pending)
+        last_block = (self._count - 1) // self._step
+        with open(self.path, 'r+b') as f:
+            f.truncate(self._data_end)
+            f.seek(self._data_end)
+            end, count = _write_records(f, self._pending, self._offsets, self._data_end, self._count,
+                                        self._step)
+            _write_index(f, self._offsets, end, count, self._step)
+            os.fsync(f.fileno())
+        self._data_end, self._count = end, count
+        self._indexed = True
+        self._pending.clear()
+        self._cache.pop(last_block, None)  # El último bloque puede haber crecido
+        self._remap()
+        return written
+
+    def rewrite(self, metadata: Dict[str, Any], records: Iterable[Dict[str, Any]]) -> int:
+        """Sustituye la cartera por otra escrita en un único recorrido de ``records``.
+
+        ``records`` puede leer de esta misma cartera (por ejemplo, para
+        recodificar sus direcciones): el archivo nuevo se escribe aparte y
+        reemplaza al actual después de cerrarlo.
+
+        Returns:
+            int: Número de registros escritos
+        """
+        temp = self.path + '.tmp'
+        count = _write_file(temp, metadata, records, self._step)
+        self.close()
+        os.replace(temp, self.path)
+        self._open()
+        return count
+
+    def close(self) -> None:
+        """Cierra el archivo (los registros pendientes no escritos se descartan)."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> 'WalletFile':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
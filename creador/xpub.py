@@ -0,0 +1,176 @@
+"""
+Claves extendidas públicas de cuenta (xpub/ypub/zpub) y modo de solo lectura.
+
+Un ``WatchOnlyContext`` deriva las cadenas de recepción y cambio a partir de
+la clave pública de una cuenta usando solo derivación pública no endurecida:
+no necesita la semilla, no hace trabajo con claves privadas y no codifica WIF.
+"""
+
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+from .seed import SeedContext, HARDENED, PURPOSE_BIP44, PURPOSE_BIP49, PURPOSE_BIP84
+from .encoding import ADDR_TYPE_P2PKH, ADDR_TYPE_P2SH_P2WPKH, ADDR_TYPE_P2WPKH
+
+# bip32utils (que carga ecdsa) se importa al decodificar la primera clave
+if TYPE_CHECKING:
+    from bip32utils import BIP32Key
+
+# Versiones SLIP-132 de claves extendidas públicas: versión -> (red, tipo, propósito)
+PUBLIC_VERSIONS: Dict[bytes, Tuple[str, str, int]] = {
+    bytes.fromhex('0488b21e'): ('mainnet', ADDR_TYPE_P2PKH, PURPOSE_BIP44),        # xpub
+    bytes.fromhex('049d7cb2'): ('mainnet', ADDR_TYPE_P2SH_P2WPKH, PURPOSE_BIP49),  # ypub
+    bytes.fromhex('04b24746'): ('mainnet', ADDR_TYPE_P2WPKH, PURPOSE_BIP84),       # zpub
+    bytes.fromhex('043587cf'): ('testnet', ADDR_TYPE_P2PKH, PURPOSE_BIP44),        # tpub
+    bytes.fromhex('044a5262'): ('testnet', ADDR_TYPE_P2SH_P2WPKH, PURPOSE_BIP49),  # upub
+    bytes.fromhex('045f1cf6'): ('testnet', ADDR_TYPE_P2WPKH, PURPOSE_BIP84),       # vpub
+}
+
+# Versión SLIP-132 por (red, tipo de dirección)
+VERSION_BY_TYPE: Dict[Tuple[str, str], bytes] = {
+    (network, addr_type): version
+    for version, (network, addr_type, _) in PUBLIC_VERSIONS.items()
+}
+
+# Tipo de dirección de cada propósito de ruta según SLIP-132
+TYPE_BY_PURPOSE: Dict[int, str] = {
+    purpose: addr_type for network, addr_type, purpose in PUBLIC_VERSIONS.values() if network == 'mainnet'
+}
+
+# Versiones que entiende bip32utils (xpub/tpub)
+_BIP32UTILS_VERSIONS = {
+    'mainnet': bytes.fromhex('0488b21e'),
+    'testnet': bytes.fromhex('043587cf'),
+}
+
+
+def parse_extended_public_key(xkey: str) -> Tuple['BIP32Key', str, str, int]:
+    """Decodifica una clave xpub/ypub/zpub (o sus variantes de testnet).
+
+    Args:
+        xkey: Clave extendida pública en Base58Check
+
+    Returns:
+        tuple: (nodo público, red, tipo de dirección, propósito)
+    """
+    from bip32utils import BIP32Key, Base58
+
+    try:
+        raw = Base58.check_decode(xkey.strip())
+    except Exception as e:
+        raise ValueError(f"Clave extendida inválida: {str(e)}")
+    if len(raw) != 78:
+        raise ValueError("Longitud de clave extendida incorrecta")
+
+    version = raw[:4]
+    if version not in PUBLIC_VERSIONS:
+        raise ValueError("Versión de clave extendida pública no soportada")
+    if raw[45] not in (2, 3):
+        raise ValueError("La clave extendida no contiene una clave pública comprimida")
+
+    network, addr_type, purpose = PUBLIC_VERSIONS[version]
+    normalized = Base58.check_encode(_BIP32UTILS_VERSIONS[network] + raw[4:])
+    return BIP32Key.fromExtendedKey(normalized), network, addr_type, purpose
+
+
+def serialize_extended_public_key(node: 'BIP32Key', network: str, addr_type: str) -> str:
+    """Serializa un nodo como clave extendida pública con la versión SLIP-132 del tipo.
+
+    Args:
+        node: Nodo BIP-32 (privado o público)
+        network: Red ('mainnet' o 'testnet')
+        addr_type: Tipo de dirección (ADDR_TYPE_*)
+
+    Returns:
+        str: Clave xpub/ypub/zpub en Base58Check
+    """
+    from bip32utils import Base58
+
+    raw = node.ExtendedKey(private=False, encoded=False)
+    return Base58.check_encode(VERSION_BY_TYPE[(network, addr_type)] + raw[4:])
+
+
+def export_account_xpub(context: SeedContext, addr_type: Optional[str] = None,
+                        purpose: int = PURPOSE_BIP44, account: int = 0) -> str:
+    """Exporta la clave extendida pública de una cuenta a partir de la semilla.
+
+    SLIP-132 asocia cada prefijo a una ruta: xpub a m/44', ypub a m/49' y zpub
+    a m/84'. Un tipo de dirección que no corresponde al propósito produciría
+    una clave que otras carteras derivarían por la ruta equivocada.
+
+    Args:
+        context: Contexto de semilla
+        addr_type: Tipo de dirección (determina el prefijo); por defecto, el del propósito
+        purpose: Propósito de la ruta (44, 49 u 84)
+        account: Número de cuenta
+
+    Returns:
+        str: Clave extendida pública de m/purpose'/coin'/account'
+
+    Raises:
+        ValueError: Si el propósito no tiene prefijo SLIP-132 o no corresponde al tipo
+    """
+    if purpose not in TYPE_BY_PURPOSE:
+        raise ValueError(f"El propósito {purpose}' no tiene prefijo SLIP-132")
+    if addr_type is None:
+        addr_type = TYPE_BY_PURPOSE[purpose]
+    elif addr_type != TYPE_BY_PURPOSE[purpose]:
+        raise ValueError(f"Las direcciones {addr_type} no usan la ruta m/{purpose}' (SLIP-132)")
+    node = context.account_node(purpose, account)
+    return serialize_extended_public_key(node, context.network, addr_type)
+
+
+class WatchOnlyContext:
+    """Contexto de solo lectura construido a partir de la xpub de una cuenta."""
+
+    watch_only = True
+
+    def __init__(self, xkey: str):
+        """Inicializa el contexto decodificando la clave extendida pública.
+
+        Args:
+            xkey: Clave xpub/ypub/zpub de la cuenta (m/purpose'/coin'/account')
+        """
+        node, network, addr_type, purpose = parse_extended_public_key(xkey)
+        self.xpub = xkey.strip()
+        self.network = network
+        self.addr_type = addr_type
+        self.default_purpose = purpose
+        self.account = node.index & ~HARDENED
+        self._account_node = node
+        self._nodes: Dict[int, 'BIP32Key'] = {}
+
+    def account_node(self, purpose: Optional[int] = None, account: Optional[int] = None) -> 'BIP32Key':
+        """Nodo público de la cuenta."""
+        self._check_account(purpose, account)
+        return self._account_node
+
+    def chain_node(self, purpose: Optional[int] = None, account: Optional[int] = None,
+                   chain: int = 0, public: bool = True) -> 'BIP32Key':
+        """Nodo público de cadena (0 recepción, 1 cambio), en caché."""
+        self._check_account(purpose, account)
+        node = self._nodes.get(chain)
+        if node is None:
+            node = self._account_node.ChildKey(chain)
+            self._nodes[chain] = node
+        return node
+
+    def _check_account(self, purpose, account) -> None:
+        """Comprueba que la ruta pedida corresponde a la cuenta importada."""
+        if purpose is not None and purpose != self.default_purpose:
+            raise ValueError("La xpub importada no corresponde al propósito solicitado")
+        if account is not None and account != self.account:
+            raise ValueError("La xpub importada no corresponde a la cuenta solicitada")
+
+    def invalidate(self) -> None:
+        """Vacía la caché de nodos de cadena."""
+        self._nodes.clear()
+
+    @property
+    def is_cleared(self) -> bool:
+        """Indica si el contexto ya fue descartado."""
+        return self._account_node is None
+
+    def clear(self) -> None:
+        """Descarta el nodo de cuenta y la caché."""
+        self._account_node = None
+        self._nodes.clear()
@@ -3,7 +3,7 @@ Módulo que contiene el diálogo de configuración de red.
 """
 
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 from typing import Dict, Any, Optional, List, Tuple
 
 # Importar utilidades de la interfaz de usuario
@@ -93,7 +93,7 @@ class NetworkSettingsDialog(tk.Toplevel):
         self.result = None
         
         self.title("Configuración de Red")
-        self.geometry("500x400")
+        self.geometry("500x490")
         self.resizable(False, False)
         
         # Configurar el estilo
@@ -106,7 +106,7 @@ class NetworkSettingsDialog(tk.Toplevel):
         self.focus_set()
         
         # Centrar el diálogo en la pantalla
-        center_window(self, 500, 400)
+        center_window(self, 500, 490)
     
     def _setup_styles(self):
         """Configura los estilos para el diálogo."""
@@ -149,20 +149,56 @@ class NetworkSettingsDialog(tk.Toplevel):
             command=self._update_ui_state
         ).grid(row=2, column=0, columnspan=2, sticky=tk.W, padx=20, pady=2)
         
+        # Altura de nacimiento de la cartera (modo ligero)
+        birthday_frame = ttk.Frame(main_frame)
+        birthday_frame.grid(row=3, column=0, columnspan=2, sticky=tk.EW, padx=40, pady=2)
+        
+        ttk.Label(birthday_frame, text="Altura de nacimiento:").pack(side=tk.LEFT)
+        
+        self.birthday_height_var = tk.StringVar(
+            value=str(self.current_settings.get('birthday_height', 0)))
+        
+        self.birthday_height_entry = ttk.Entry(birthday_frame, textvariable=self.birthday_height_var, width=10)
+        self.birthday_height_entry.pack(side=tk.LEFT, padx=5)
+        create_tooltip(self.birthday_height_entry,
+                       "Primer bloque que puede tener movimientos de la cartera: los filtros "
+                       "anteriores no se descargan (0: desde el bloque génesis)")
+        
         ttk.Radiobutton(
             main_frame,
             text="Nodo completo - Mayor seguridad y privacidad",
             variable=self.mode_var,
             value='full',
             command=self._update_ui_state
-        ).grid(row=3, column=0, columnspan=2, sticky=tk.W, padx=20, pady=2)
+        ).grid(row=4, column=0, columnspan=2, sticky=tk.W, padx=20, pady=2)
+        
+        # Directorio de bloques del nodo (modo nodo completo)
+        blocks_frame = ttk.Frame(main_frame)
+        blocks_frame.grid(row=5, column=0, columnspan=2, sticky=tk.EW, padx=40, pady=2)
+        
+        ttk.Label(blocks_frame, text="Bloques:").pack(side=tk.LEFT)
+        
+        self.blocks_dir_var = tk.StringVar(
+            value=self.current_settings.get('blocks_dir', ''))
+        
+        self.blocks_dir_entry = ttk.Entry(blocks_frame, textvariable=self.blocks_dir_var, width=40)
+        self.blocks_dir_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        create_tooltip(self.blocks_dir_entry,
+                       "Directorio 'blocks' de Bitcoin Core (vacío: el directorio por defecto)")
+        
+        self.blocks_dir_button = ttk.Button(
+            blocks_frame,
+            text="Examinar...",
+            command=self._on_browse_blocks_dir
+        )
+        self.blocks_dir_button.pack(side=tk.LEFT)
         
         # Servidores personalizados
         ttk.Label(
             main_frame,
             text="Servidores personalizados:",
             font=('Arial', 10, 'bold')
-        ).grid(row=4, column=0, columnspan=2, sticky=tk.W, pady=(15, 5))
+        ).grid(row=6, column=0, columnspan=2, sticky=tk.W, pady=(15, 5))
         
         self.custom_servers_var = tk.BooleanVar(
             value=self.current_settings.get('use_custom_servers', False))
@@ -173,7 +209,7 @@ class NetworkSettingsDialog(tk.Toplevel):
             variable=self.custom_servers_var,
             command=self._update_ui_state
         )
-        self.custom_servers_cb.grid(row=5, column=0, columnspan=2, sticky=tk.W, padx=20, pady=2)
+        self.custom_servers_cb.grid(row=7, column=0, columnspan=2, sticky=tk.W, padx=20, pady=2)
         
         # Frame para la lista de servidores
         servers_frame = ttk.LabelFrame(
@@ -181,7 +217,7 @@ class NetworkSettingsDialog(tk.Toplevel):
             text="Servidores",
             padding=5
         )
-        servers_frame.grid(row=6, column=0, columnspan=2, sticky=tk.NSEW, padx=10, pady=5)
+        servers_frame.grid(row=8, column=0, columnspan=2, sticky=tk.NSEW, padx=10, pady=5)
         
         # Lista de servidores
         self.servers_listbox = tk.Listbox(
@@ -199,7 +235,7 @@ class NetworkSettingsDialog(tk.Toplevel):
         
         # Botones para gestionar servidores
         buttons_frame = ttk.Frame(main_frame)
-        buttons_frame.grid(row=7, column=0, columnspan=2, pady=10)
+        buttons_frame.grid(row=9, column=0, columnspan=2, pady=10)
         
         ttk.Button(
             buttons_frame,
@@ -221,7 +257,7 @@ class NetworkSettingsDialog(tk.Toplevel):
         
         # Botones de acción
         action_frame = ttk.Frame(main_frame)
-        action_frame.grid(row=8, column=0, columnspan=2, pady=(10, 0))
+        action_frame.grid(row=10, column=0, columnspan=2, pady=(10, 0))
         
         ttk.Button(
             action_frame,
@@ -267,6 +303,24 @@ class NetworkSettingsDialog(tk.Toplevel):
         
         for widget in [self.servers_listbox]:
             widget.config(state=state)
+        
+        # La altura de nacimiento solo se usa en modo ligero
+        self.birthday_height_entry.state(['!disabled' if mode == 'spv' else 'disabled'])
+        
+        # El directorio de bloques solo se usa en modo nodo completo
+        blocks_state = '!disabled' if mode == 'full' else 'disabled'
+        for widget in [self.blocks_dir_entry, self.blocks_dir_button]:
+            widget.state([blocks_state])
+    
+    def _on_browse_blocks_dir(self):
+        """Permite elegir el directorio de bloques del nodo."""
+        directory = filedialog.askdirectory(
+            parent=self,
+            title="Directorio de bloques de Bitcoin Core",
+            initialdir=self.blocks_dir_var.get() or None
+        )
+        if directory:
+            self.blocks_dir_var.set(directory)
     
     def _on_add_server(self):
         """Maneja el evento de agregar un nuevo servidor."""
@@ -337,11 +391,21 @@ class NetworkSettingsDialog(tk.Toplevel):
             show_error("Debe agregar al menos un servidor cuando usa servidores personalizados.", parent=self)
             return
         
+        try:
+            birthday_height = int(self.birthday_height_var.get().strip() or 0)
+            if birthday_height < 0:
+                raise ValueError("Altura negativa")
+        except ValueError:
+            show_error("La altura de nacimiento debe ser un número entero positivo.", parent=self)
+            return
+        
         # Guardar la configuración
         self.result = {
             'mode': mode,
             'use_custom_servers': use_custom_servers,
-            'servers': servers
+            'servers': servers,
+            'blocks_dir': self.blocks_dir_var.get().strip(),
+            'birthday_height': birthday_height
         }
         
         self.destroy()
@@ -0,0 +1,83 @@
+"""Pruebas del filtro de Bloom de scripts y de su confirmación en el índice exacto."""
+
+import random
+
+import pytest
+
+from creador.bloom import ScriptFilter, WalletScanner, optimal_parameters
+from creador.derivation import CHAIN_RECEIVE, DerivationEngine
+from creador.encoding import ADDR_TYPE_P2WPKH, hash160, script_pubkey
+from creador.index import AddressIndex
+from creador.seed import SeedContext
+
+MNEMONICO = "abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon about"
+
+
+def claves(cantidad, semilla, tipo=2):
+    azar = random.Random(semilla)
+    return [bytes([tipo]) + azar.randbytes(20) for _ in range(cantidad)]
+
+
+def test_tasa_de_falsos_positivos():
+    filtro = ScriptFilter(20_000, 1e-3)
+    miembros = claves(20_000, 1)
+    for clave in miembros:
+        filtro.add(clave)
+    assert all(clave in filtro for clave in miembros)
+
+    ajenas = claves(100_000, 2)
+    tasa = sum(clave in filtro for clave in ajenas) / len(ajenas)
+    assert tasa < 2e-3
+    assert filtro.estimated_fp_rate() == pytest.approx(1e-3, rel=0.1)
+    # El código de tipo cuenta: el mismo hash en otro tipo no es de la cartera
+    assert sum(bytes([0]) + clave[1:] in filtro for clave in miembros) < 100
+
+
+def test_parametros_del_filtro():
+    bits, funciones = optimal_parameters(1_000_000, 1e-4)
+    assert 19_000_000 < bits < 19_500_000 and funciones == 13
+    with pytest.raises(ValueError):
+        optimal_parameters(10, 1.5)
+
+
+def test_guardar_y_cargar(tmp_path):
+    ruta = str(tmp_path / 'scripts.bloom')
+    filtro = ScriptFilter(1_000, 1e-4)
+    for clave in claves(1_000, 3):
+        filtro.add(clave)
+    filtro.save(ruta)
+
+    cargado = ScriptFilter.load(ruta)
+    assert (cargado.num_bits, cargado.num_hashes, cargado.count, cargado.fp_rate) == \
+        (filtro.num_bits, filtro.num_hashes, 1_000, 1e-4)
+    assert all(clave in cargado for clave in claves(1_000, 3))
+    ajenas = claves(10_000, 4)
+    assert [clave in cargado for clave in ajenas] == [clave in filtro for clave in ajenas]
+
+    with open(ruta, 'r+b') as f:
+        f.truncate(100)
+    with pytest.raises(ValueError, match="truncado"):
+        ScriptFilter.load(ruta)
+    (tmp_path / 'otro').write_bytes(b'\x00' * 64)
+    with pytest.raises(ValueError):
+        ScriptFilter.load(str(tmp_path / 'otro'))
+
+
+def test_escaner_confirma_en_el_indice():
+    motor = DerivationEngine(SeedContext(MNEMONICO, language="english"), ADDR_TYPE_P2WPKH, purpose=84)
+    indice = AddressIndex()
+    filtro = ScriptFilter(50)
+    registros = list(filtro.feed(indice.feed(motor.derive_range(CHAIN_RECEIVE, 0, 50), 0, CHAIN_RECEIVE)))
+
+    azar = random.Random(5)
+    salidas = [script_pubkey(azar.randbytes(20), ADDR_TYPE_P2WPKH) for _ in range(2_000)]
+    propias = {120: 7, 1500: 49}
+    for posicion, indice_direccion in propias.items():
+        salidas[posicion] = script_pubkey(hash160(bytes.fromhex(registros[indice_direccion]['clave_publica'])),
+                                          ADDR_TYPE_P2WPKH)
+
+    escaner = WalletScanner(filtro, indice)
+    encontradas = {posicion: entrada.index for posicion, entrada in escaner.scan(salidas)}
+    assert encontradas == propias
+    assert escaner.filter_hits == len(propias) + escaner.false_positives
+    assert escaner.match(b'\x6a\x04test') is None  # Script sin clave de índice
@@ -0,0 +1,153 @@
+"""Pruebas de la caché de saldos: aciertos, caducidad e invalidación."""
+
+import asyncio
+
+from creador.cache import BalanceCache, CachingHistoryBackend, cached_statuses, cached_statuses_many
+from creador.discovery import LocalHistoryBackend, ScriptStatus
+from creador.electrum import ElectrumHistoryBackend, ElectrumPool, ElectrumServer
+from creador.electrum_mock import MockElectrumServer
+
+CONFIRMADO = ScriptStatus(1, 5_000, 0)
+PENDIENTE = ScriptStatus(2, 5_000, 300)
+
+
+class Reloj:
+    def __init__(self):
+        self.ahora = 1_000.0
+
+    def __call__(self):
+        return self.ahora
+
+
+def scripthash(i):
+    return f"{i:064x}"
+
+
+def test_entrada_vigente_hasta_el_ttl():
+    reloj = Reloj()
+    cache = BalanceCache(ttl=60, clock=reloj)
+    cache.put('a', CONFIRMADO)
+    assert cache.get('a').status == CONFIRMADO
+    reloj.ahora += 59
+    assert cache.get('a') is not None
+    reloj.ahora += 2
+    assert cache.get('a') is None
+    # Caducada, pero se sigue pudiendo mostrar
+    assert cache.get('a', allow_stale=True).status == CONFIRMADO
+
+
+def test_invalidacion_por_aviso_y_por_bloque():
+    cache = BalanceCache()
+    cache.put('confirmada', CONFIRMADO)
+    cache.put('pendiente', PENDIENTE)
+    cache.put('avisada', CONFIRMADO)
+
+    cache.invalidate('avisada')
+    assert cache.get('avisada') is None
+    assert cache.get('avisada', allow_stale=True).status == CONFIRMADO
+
+    assert cache.on_block(100) == 1  # Solo la que tenía fondos sin confirmar
+    assert cache.get('pendiente') is None
+    assert cache.get('confirmada') is not None
+    assert cache.on_block(100) == 0  # El mismo bloque no vuelve a invalidar
+
+
+def test_la_cache_persiste_al_reabrir(tmp_path):
+    ruta = str(tmp_path / 'saldos.sqlite3')
+    cache = BalanceCache(ruta)
+    cache.put('a', CONFIRMADO, [('ab' * 32, 100)])
+    cache.put('b', PENDIENTE)
+    cache.close()
+
+    cache = BalanceCache(ruta, ttl=0)
+    entrada = cache.get('a', allow_stale=True)
+    assert entrada.status == CONFIRMADO and entrada.history == [('ab' * 32, 100)]
+    assert cached_statuses(cache, ['a', 'b']) == ScriptStatus(3, 10_000, 300)
+    assert cached_statuses(cache, ['a', 'desconocida']) is None
+    assert len(cache) == 2
+    cache.close()
+
+
+def test_lectura_por_lotes_igual_que_una_a_una(tmp_path):
+    ruta = str(tmp_path / 'saldos.sqlite3')
+    cache = BalanceCache(ruta)
+    for i in range(1200):
+        cache.put(scripthash(i), ScriptStatus(1, i, 0))
+    cache.close()
+
+    cache = BalanceCache(ruta)
+    grupos = [[scripthash(i)] for i in range(0, 1300, 7)] + [[scripthash(1), scripthash(2)]]
+    por_lotes = cached_statuses_many(cache, grupos)
+    assert por_lotes == [cached_statuses(cache, grupo) for grupo in grupos]
+    assert por_lotes[-1] == ScriptStatus(2, 3, 0)
+    assert por_lotes[-2] is None  # scripthash(1295) no está en la caché
+    cache.close()
+
+
+def test_memoria_acotada_con_lru(tmp_path):
+    cache = BalanceCache(str(tmp_path / 'saldos.sqlite3'), max_entries=10)
+    for i in range(100):
+        cache.put(scripthash(i), ScriptStatus(1, i, 0))
+        cache.get(scripthash(0))  # La más usada no sale de memoria
+    assert len(cache._entries) <= 10
+    assert scripthash(0) in cache._entries and scripthash(1) not in cache._entries
+
+    # Las que salieron de memoria se leen de la base de datos
+    assert len(cache) == 100
+    assert cache.get(scripthash(1)).status == ScriptStatus(1, 1, 0)
+    estados = cached_statuses_many(cache, [[scripthash(i)] for i in range(100)])
+    assert estados == [ScriptStatus(1, i, 0) for i in range(100)]
+    assert len(cache._entries) <= 10
+    cache.close()
+
+
+def test_backend_sirve_los_aciertos_sin_consultar():
+    red = LocalHistoryBackend({scripthash(1): CONFIRMADO})
+    backend = CachingHistoryBackend(red, BalanceCache())
+    consulta = [scripthash(i) for i in range(10)]
+
+    primera = asyncio.run(backend.get_statuses(consulta))
+    assert backend.misses == 10 and red.queried == 10
+    segunda = asyncio.run(backend.get_statuses(consulta))
+    assert segunda == primera and primera[1] == CONFIRMADO
+    assert backend.hits == 10 and red.queried == 10
+
+    backend.cache.invalidate(scripthash(1))
+    asyncio.run(backend.get_statuses(consulta))
+    assert red.queried == 11
+
+
+def test_avisos_del_servidor_invalidan_la_cache():
+    async def escenario():
+        servidor = MockElectrumServer()
+        for i in range(5):
+            servidor.histories[scripthash(i)] = [{'tx_hash': f"{i:064x}", 'height': 100}]
+            servidor.balances[scripthash(i)] = (1_000 * i, 0)
+        servidor.height = 100
+        await servidor.start()
+        pool = ElectrumPool([ElectrumServer('127.0.0.1', servidor.port, False)])
+        backend = CachingHistoryBackend(ElectrumHistoryBackend(pool), BalanceCache())
+        consulta = [scripthash(i) for i in range(5)]
+        try:
+            await backend.get_statuses(consulta)
+            await backend.get_statuses(consulta)
+            assert (backend.misses, backend.hits) == (5, 5)
+
+            # Nueva transacción en la mempool para el scripthash 3
+            servidor.balances[scripthash(3)] = (3_000, 700)
+            servidor.histories[scripthash(3)].append({'tx_hash': 'ee' * 32, 'height': 0})
+            servidor.notify_scripthash(scripthash(3))
+            for _ in range(100):
+                if backend.cache.get(scripthash(3)) is None:
+                    break
+                await asyncio.sleep(0.01)
+
+            backend.hits = backend.misses = 0
+            estados = await backend.get_statuses(consulta)
+            assert (backend.misses, backend.hits) == (1, 4)
+            assert estados[3] == ScriptStatus(2, 3_000, 700)
+        finally:
+            await backend.close()
+            await servidor.close()
+
+    asyncio.run(escenario())
@@ -0,0 +1,73 @@
+"""Pruebas de la orden ``derive`` de la línea de órdenes."""
+
+import csv
+import io
+import json
+
+import pytest
+
+from creador.cli import main
+
+MNEMONICO = "abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon about"
+ZPUB = 'zpub6rFR7y4Q2AijBEqTUquhVz398htDFrtymD9xYYfG1m4wAcvPhXNfE3EfH1r1ADqtfSdVCToUG868RvUUkgDKf31mGDtKsAYz2oz2AGutZYs'
+
+# Vectores de BIP-84: m/84'/0'/0'/0/0 y m/84'/0'/0'/0/1
+BIP84 = ['bc1qcr8te4kr609gcawutmrza0j4xv80jy8z306fyu', 'bc1qnjg0jd8228aq7egyzacy8cys3knf9xvrerkf9g']
+WIF_BIP84 = 'KyZpNDKnfs94vbrwhJneDi77V6jF64PWPF8x5cdJb8ifgg2DUc9d'
+
+
+def derivar(monkeypatch, capsys, *argumentos, entrada=MNEMONICO):
+    """Ejecuta ``derive`` con ``entrada`` por stdin y devuelve (código, salida, errores)."""
+    monkeypatch.setattr('sys.stdin', io.StringIO(entrada))
+    codigo = main(['derive', '--count', '2', '-q', *argumentos])
+    salida = capsys.readouterr()
+    return codigo, salida.out, salida.err
+
+
+def test_formato_csv(monkeypatch, capsys):
+    codigo, salida, _ = derivar(monkeypatch, capsys, '--seed-file', '-', '--standard-paths')
+    filas = list(csv.reader(io.StringIO(salida)))
+    assert codigo == 0
+    assert filas[0] == ['indice', 'tipo', 'direccion', 'clave_privada', 'clave_publica']
+    assert [fila[2] for fila in filas[1:]] == BIP84
+    assert filas[1][:2] == ['0', 'p2wpkh'] and filas[1][3] == WIF_BIP84
+
+
+def test_formato_jsonl(monkeypatch, capsys):
+    codigo, salida, _ = derivar(monkeypatch, capsys, '--seed-file', '-', '--purpose', '84',
+                                '--format', 'jsonl', '--no-private')
+    registros = [json.loads(linea) for linea in salida.splitlines()]
+    assert codigo == 0
+    assert [registro['direccion'] for registro in registros] == BIP84
+    assert [registro['indice'] for registro in registros] == [0, 1]
+    assert all(registro['clave_privada'] is None for registro in registros)
+
+
+def test_formato_texto(monkeypatch, capsys):
+    codigo, salida, _ = derivar(monkeypatch, capsys, '--seed-file', '-', '--standard-paths', '--format', 'text')
+    assert (codigo, salida.splitlines()) == (0, BIP84)
+
+    # La misma cuenta desde su zpub, también por stdin
+    codigo, salida, _ = derivar(monkeypatch, capsys, '--xpub', '-', '--format', 'text', entrada=ZPUB)
+    assert (codigo, salida.splitlines()) == (0, BIP84)
+
+
+def test_ruta_por_defecto_bip44(monkeypatch, capsys):
+    # Como en la aplicación, sin --purpose ni --standard-paths la ruta es m/44'
+    _, salida, _ = derivar(monkeypatch, capsys, '--seed-file', '-', '--format', 'text', '--count', '1')
+    assert salida.splitlines() == ['bc1qmxrw6qdh5g3ztfcwm0et5l8mvws4eva24kmp8m']
+
+
+@pytest.mark.parametrize('opciones', [
+    ['--purpose', '84'], ['--standard-paths'], ['--account', '0'], ['--network', 'mainnet'],
+    ['--language', 'english'], ['--type', 'p2pkh'], ['--type', 'multi'],
+])
+def test_opciones_incompatibles_con_xpub(monkeypatch, capsys, opciones):
+    codigo, salida, errores = derivar(monkeypatch, capsys, '--xpub', ZPUB, *opciones)
+    assert (codigo, salida) == (1, '')
+    assert errores.startswith('error:')
+
+
+def test_el_tipo_de_la_xpub_se_acepta(monkeypatch, capsys):
+    codigo, salida, _ = derivar(monkeypatch, capsys, '--xpub', ZPUB, '--type', 'p2wpkh', '--format', 'text')
+    assert (codigo, salida.splitlines()) == (0, BIP84)
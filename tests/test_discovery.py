@@ -0,0 +1,88 @@
+"""Pruebas del descubrimiento con límite de huecos."""
+
+import asyncio
+
+import pytest
+
+from creador.derivation import CHAIN_CHANGE, CHAIN_RECEIVE, DerivationEngine
+from creador.discovery import DiscoveryEngine, LocalHistoryBackend, ScriptStatus, record_scripthashes
+from creador.encoding import ADDR_TYPE_P2WPKH
+from creador.seed import SeedContext
+
+MNEMONICO = "abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon about"
+LIMITE = 20
+
+
+@pytest.fixture(scope='module')
+def motor():
+    return DerivationEngine(SeedContext(MNEMONICO, language="english"), ADDR_TYPE_P2WPKH, purpose=84)
+
+
+def backend_con_uso(motor, indices, cadena=CHAIN_RECEIVE):
+    """Backend local en el que tienen historial las direcciones de ``indices``."""
+    estados = {}
+    for indice in indices:
+        registro = motor.derive(cadena, indice)
+        estados[record_scripthashes(registro)[0]] = ScriptStatus(1, 1_000 + indice, 0)
+    return LocalHistoryBackend(estados)
+
+
+def test_cadena_sin_uso_se_detiene_en_el_limite(motor):
+    backend = LocalHistoryBackend()
+    descubrimiento = DiscoveryEngine(motor, backend, gap_limit=LIMITE)
+    resultados = asyncio.run(descubrimiento.discover())
+
+    for cadena in (CHAIN_RECEIVE, CHAIN_CHANGE):
+        assert [r.index for r in resultados[cadena]] == list(range(LIMITE))
+        assert descubrimiento.last_used[cadena] == -1
+    assert backend.queried == 2 * LIMITE
+
+
+def test_se_detiene_tras_el_hueco_sin_ver_usos_posteriores(motor):
+    # La dirección 100 queda más allá de 20 sin uso tras la 30: no se descubre
+    backend = backend_con_uso(motor, [0, 5, 30, 100])
+    descubrimiento = DiscoveryEngine(motor, backend, gap_limit=LIMITE, chains=(CHAIN_RECEIVE,))
+    resultados = asyncio.run(descubrimiento.discover())[CHAIN_RECEIVE]
+
+    usadas = [r.index for r in resultados if r.status.used]
+    assert usadas == [0, 5, 30]
+    assert descubrimiento.last_used[CHAIN_RECEIVE] == 30
+    indices = [r.index for r in resultados]
+    assert indices == list(range(len(indices)))
+    # Al menos el hueco completo tras la última usada, y sin llegar a la 100
+    assert 30 + LIMITE < len(indices) <= 100
+    assert not any(r.status.used for r in resultados[31:])
+
+
+def test_saldos_de_cada_direccion(motor):
+    backend = backend_con_uso(motor, [3, 7])
+    resultados = asyncio.run(DiscoveryEngine(motor, backend, chains=(CHAIN_RECEIVE,)).discover())
+    por_indice = {r.index: r.status for r in resultados[CHAIN_RECEIVE]}
+    assert por_indice[3].confirmed == 1_003 and por_indice[7].confirmed == 1_007
+    assert not por_indice[4].used
+
+
+def test_lotes_concurrentes(motor):
+    backend = backend_con_uso(motor, range(0, 200, 10))
+    descubrimiento = DiscoveryEngine(motor, backend, batch_size=25, chains=(CHAIN_RECEIVE,))
+    resultados = asyncio.run(descubrimiento.discover())[CHAIN_RECEIVE]
+    assert descubrimiento.last_used[CHAIN_RECEIVE] == 190
+    # Cada dirección se consulta una vez, en lotes de hasta 25 por petición
+    assert backend.queried == len(resultados)
+    assert len(resultados) / 25 <= backend.requests < len(resultados) / 10
+
+
+def test_check_consulta_los_registros_dados_por_su_indice(motor):
+    registros = list(motor.derive_range(CHAIN_RECEIVE, 50, 10))
+    backend = backend_con_uso(motor, [53])
+    descubrimiento = DiscoveryEngine(motor, backend, chains=(CHAIN_RECEIVE,))
+    resultados = list(descubrimiento.iter_results(iter(registros)))
+
+    assert sorted(r.index for r in resultados) == list(range(50, 60))
+    assert [r.index for r in resultados if r.status.used] == [53]
+    assert backend.queried == 10
+
+
+def test_parametros_invalidos(motor):
+    with pytest.raises(ValueError):
+        DiscoveryEngine(motor, LocalHistoryBackend(), gap_limit=0)
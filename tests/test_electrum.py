@@ -0,0 +1,152 @@
+"""Pruebas del cliente Electrum contra el servidor local de pruebas."""
+
+import asyncio
+import socket
+
+import pytest
+
+from creador.discovery import ScriptStatus
+from creador.electrum import (
+    ElectrumConnection, ElectrumHistoryBackend, ElectrumPool, ElectrumServer, servers_from_settings
+)
+from creador.electrum_mock import MockElectrumServer
+
+
+def scripthash(i):
+    return f"{i:064x}"
+
+
+def servidor_con_saldos(cantidad, latencia=0.0):
+    servidor = MockElectrumServer(latency=latencia)
+    for i in range(cantidad):
+        servidor.histories[scripthash(i)] = [{'tx_hash': f"{i:064x}", 'height': 100 + i}]
+        servidor.balances[scripthash(i)] = (1_000 * i, i % 3)
+    return servidor
+
+
+def local(servidor):
+    return ElectrumServer('127.0.0.1', servidor.port, False)
+
+
+def puerto_libre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def test_conexion_negocia_version_y_responde_en_orden():
+    async def escenario():
+        servidor = servidor_con_saldos(5)
+        await servidor.start()
+        conexion = ElectrumConnection(local(servidor))
+        try:
+            await conexion.connect()
+            assert conexion.server_version == ['MockElectrum 1.0', '1.4']
+            saldos = await conexion.batch([('blockchain.scripthash.get_balance', [scripthash(i)])
+                                           for i in (4, 1, 3)])
+            assert [s['confirmed'] for s in saldos] == [4_000, 1_000, 3_000]
+        finally:
+            await conexion.close()
+            await servidor.close()
+
+    asyncio.run(escenario())
+
+
+def test_estados_por_lotes_repartidos_entre_servidores():
+    async def escenario():
+        servidores = [servidor_con_saldos(300), servidor_con_saldos(300)]
+        for servidor in servidores:
+            await servidor.start()
+        pool = ElectrumPool([local(s) for s in servidores], batch_size=100)
+        backend = ElectrumHistoryBackend(pool)
+        try:
+            estados = await backend.get_statuses([scripthash(i) for i in range(300)])
+            assert estados[7] == ScriptStatus(1, 7_000, 1)
+            assert estados[299] == ScriptStatus(1, 299_000, 2)
+            # Dos peticiones por scripthash (historial y saldo) más la versión de cada conexión,
+            # repartidas entre los dos servidores
+            assert sum(s.requests for s in servidores) == 600 + 2
+            assert all(s.requests > 1 for s in servidores)
+        finally:
+            await backend.close()
+            for servidor in servidores:
+                await servidor.close()
+
+    asyncio.run(escenario())
+
+
+def test_lote_con_latencia_paga_una_ida_y_vuelta_por_lote():
+    async def escenario():
+        servidor = servidor_con_saldos(200, latencia=0.05)
+        await servidor.start()
+        backend = ElectrumHistoryBackend(ElectrumPool([local(servidor)], batch_size=400))
+        try:
+            await backend.pool.connect()
+            inicio = asyncio.get_running_loop().time()
+            await backend.get_statuses([scripthash(i) for i in range(200)])
+            # 400 peticiones en un lote: del orden de una latencia, no de 400
+            assert asyncio.get_running_loop().time() - inicio < 2.0
+        finally:
+            await backend.close()
+            await servidor.close()
+
+    asyncio.run(escenario())
+
+
+def test_servidor_caido_se_sustituye_por_otro():
+    async def escenario():
+        servidor = servidor_con_saldos(10)
+        await servidor.start()
+        caido = ElectrumServer('127.0.0.1', puerto_libre(), False)
+        pool = ElectrumPool([caido, local(servidor)], timeout=2.0)
+        try:
+            saldo = await pool.request('blockchain.scripthash.get_balance', [scripthash(9)])
+            assert saldo['confirmed'] == 9_000
+            assert caido in pool.errors
+        finally:
+            await pool.close()
+            await servidor.close()
+
+    asyncio.run(escenario())
+
+
+def test_sin_servidores_accesibles():
+    async def escenario():
+        pool = ElectrumPool([ElectrumServer('127.0.0.1', puerto_libre(), False)], timeout=2.0)
+        with pytest.raises(ConnectionError):
+            await pool.request('server.ping')
+        await pool.close()
+
+    asyncio.run(escenario())
+
+
+def test_suscripcion_avisa_una_vez_por_cambio():
+    async def escenario():
+        servidor = servidor_con_saldos(3)
+        await servidor.start()
+        backend = ElectrumHistoryBackend(ElectrumPool([local(servidor)]))
+        avisos = []
+        try:
+            # La misma función suscrita en varios lotes se registra una sola vez
+            await backend.subscribe([scripthash(0)], avisos.append)
+            await backend.subscribe([scripthash(1)], avisos.append)
+            servidor.notify_scripthash(scripthash(1))
+            for _ in range(50):
+                if avisos:
+                    break
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0.05)
+            assert avisos == [scripthash(1)]
+        finally:
+            await backend.close()
+            await servidor.close()
+
+    asyncio.run(escenario())
+
+
+def test_servidores_de_la_configuracion():
+    ajustes = {'mode': 'auto', 'use_custom_servers': True,
+               'servers': [{'host': '127.0.0.1', 'port': 50001}, {'host': 'ejemplo.org', 'port': 50002}]}
+    assert servers_from_settings(ajustes) == [ElectrumServer('127.0.0.1', 50001, False),
+                                              ElectrumServer('ejemplo.org', 50002, True)]
+    assert servers_from_settings({'mode': 'full'}) == [ElectrumServer('127.0.0.1', 50001, False)]
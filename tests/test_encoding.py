@@ -0,0 +1,89 @@
+"""Pruebas de la codificación de direcciones con los vectores de BIP-173, BIP-44, BIP-49 y BIP-84."""
+
+import pytest
+
+from creador.derivation import CHAIN_CHANGE, CHAIN_RECEIVE, DerivationEngine
+from creador.encoding import (
+    ADDR_TYPE_P2PKH, ADDR_TYPE_P2SH_P2WPKH, ADDR_TYPE_P2WPKH, decode_address, encode_address,
+    encode_all, hash160, script_payload, segwit_decode, segwit_encode
+)
+from creador.seed import SeedContext
+
+MNEMONICO = "abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon about"
+
+# Clave pública del generador, usada en los ejemplos de BIP-173
+CLAVE_G = bytes.fromhex('0279be667ef9dcbbac55a06295ce870b07029bfcdb2dce28d959f2815b16f81798')
+
+# (red, tipo, propósito, cadena, índice, dirección esperada)
+VECTORES_RUTAS = [
+    ('mainnet', ADDR_TYPE_P2WPKH, 84, CHAIN_RECEIVE, 0, 'bc1qcr8te4kr609gcawutmrza0j4xv80jy8z306fyu'),
+    ('mainnet', ADDR_TYPE_P2WPKH, 84, CHAIN_RECEIVE, 1, 'bc1qnjg0jd8228aq7egyzacy8cys3knf9xvrerkf9g'),
+    ('mainnet', ADDR_TYPE_P2WPKH, 84, CHAIN_CHANGE, 0, 'bc1q8c6fshw2dlwun7ekn9qwf37cu2rn755upcp6el'),
+    ('mainnet', ADDR_TYPE_P2SH_P2WPKH, 49, CHAIN_RECEIVE, 0, '37VucYSaXLCAsxYyAPfbSi9eh4iEcbShgf'),
+    ('testnet', ADDR_TYPE_P2SH_P2WPKH, 49, CHAIN_RECEIVE, 0, '2Mww8dCYPUpKHofjgcXcBCEGmniw9CoaiD2'),
+    ('mainnet', ADDR_TYPE_P2PKH, 44, CHAIN_RECEIVE, 0, '1LqBGSKuX5yYUonjxT5qGfpUsXKYYWeabA'),
+]
+
+
+@pytest.fixture(scope='module')
+def contextos():
+    return {red: SeedContext(MNEMONICO, language="english", network=red) for red in ('mainnet', 'testnet')}
+
+
+def test_vectores_bip173():
+    assert encode_address(CLAVE_G, ADDR_TYPE_P2WPKH, 'mainnet') == 'bc1qw508d6qejxtdg4y5r3zarvary0c5xw7kv8f3t4'
+    assert encode_address(CLAVE_G, ADDR_TYPE_P2WPKH, 'testnet') == 'tb1qw508d6qejxtdg4y5r3zarvary0c5xw7kxpjzsx'
+    assert segwit_decode('bc', 'BC1QW508D6QEJXTDG4Y5R3ZARVARY0C5XW7KV8F3T4') == (0, hash160(CLAVE_G))
+
+    programa = bytes.fromhex('1863143c14c5166804bd19203356da136c985678cd4d27a1b8c6329604903262')
+    direccion = 'tb1qrp33g0q5c5txsp9arysrx4k6zdkfs4nce4xj0gdcccefvpysxf3q0sl5k7'
+    assert segwit_encode('tb', 0, programa) == direccion
+    assert segwit_decode('tb', direccion) == (0, programa)
+
+
+@pytest.mark.parametrize('hrp, direccion', [
+    ('bc', 'tc1qw508d6qejxtdg4y5r3zarvary0c5xw7kg3g4ty'),               # Prefijo de otra red
+    ('bc', 'bc1qw508d6qejxtdg4y5r3zarvary0c5xw7kv8f3t5'),               # Suma de verificación
+    ('bc', 'BC13W508D6QEJXTDG4Y5R3ZARVARY0C5XW7KN40WF2'),               # Versión de testigo
+    ('bc', 'bc1rw5uspcuh'),                                             # Programa demasiado corto
+    ('tb', 'tb1qrp33g0q5c5txsp9arysrx4k6zdkfs4nce4xj0gdcccefvpysxf3q0sL5k7'),  # Mayúsculas mezcladas
+    ('bc', 'bc1zw508d6qejxtdg4y5r3zarvary0c5xw7kv8f3t4'),               # Relleno inválido
+])
+def test_direcciones_bech32_invalidas(hrp, direccion):
+    with pytest.raises(ValueError):
+        segwit_decode(hrp, direccion)
+
+
+@pytest.mark.parametrize('red, tipo, proposito, cadena, indice, esperada', VECTORES_RUTAS)
+def test_vectores_de_rutas(contextos, red, tipo, proposito, cadena, indice, esperada):
+    registro = DerivationEngine(contextos[red], tipo, purpose=proposito).derive(cadena, indice)
+    assert registro.address == esperada
+    assert decode_address(esperada, red) == (tipo, script_payload(registro.hash160, tipo))
+    assert encode_address(registro.public_key, tipo, red) == esperada
+
+
+def test_clave_y_wif_bip84(contextos):
+    registro = DerivationEngine(contextos['mainnet'], ADDR_TYPE_P2WPKH, purpose=84).derive(CHAIN_RECEIVE, 0)
+    assert registro['clave_publica'] == '0330d54fd0dd420a6e5f8d3624f5f3482cae350f79d5f0753bf5beef9c2d91af3c'
+    assert registro['clave_privada'] == 'KyZpNDKnfs94vbrwhJneDi77V6jF64PWPF8x5cdJb8ifgg2DUc9d'
+
+
+def test_las_tres_direcciones_de_una_clave():
+    direcciones = encode_all(hash160(CLAVE_G), 'mainnet')
+    assert direcciones[ADDR_TYPE_P2WPKH] == 'bc1qw508d6qejxtdg4y5r3zarvary0c5xw7kv8f3t4'
+    assert direcciones[ADDR_TYPE_P2PKH] == '1BgGZ9tcN4rm9KBzDn7KprQz87SZ26SAMH'
+    for tipo, direccion in direcciones.items():
+        assert decode_address(direccion, 'mainnet')[0] == tipo
+    with pytest.raises(ValueError):
+        decode_address(direcciones[ADDR_TYPE_P2PKH], 'testnet')
+
+
+def test_la_red_de_un_motor_no_afecta_a_otros(contextos):
+    # Cada registro lleva su red: crear un motor de testnet no cambia la de los demás
+    principal = DerivationEngine(contextos['mainnet'], ADDR_TYPE_P2WPKH, purpose=84).derive(CHAIN_RECEIVE, 0)
+    prueba = DerivationEngine(contextos['testnet'], ADDR_TYPE_P2WPKH, purpose=84).derive(CHAIN_RECEIVE, 0)
+    assert principal.address == 'bc1qcr8te4kr609gcawutmrza0j4xv80jy8z306fyu'
+    assert prueba.address.startswith('tb1q')
+    assert encode_address(CLAVE_G, ADDR_TYPE_P2WPKH) == 'bc1qw508d6qejxtdg4y5r3zarvary0c5xw7kv8f3t4'
+    with pytest.raises(ValueError):
+        encode_address(CLAVE_G, ADDR_TYPE_P2WPKH, 'regtest')
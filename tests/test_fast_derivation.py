@@ -0,0 +1,101 @@
+"""Pruebas de la derivación rápida por lotes frente a ``bip32utils``."""
+
+import pytest
+from bip32utils import BIP32Key
+
+from creador.derivation import CHAIN_CHANGE, CHAIN_RECEIVE, DerivationEngine
+from creador.encoding import ADDR_TYPE_P2WPKH
+from creador.fast_derivation import DEFAULT_BATCH, ChainDeriver
+from creador.seed import SeedContext
+
+H = 0x80000000
+MNEMONICO = "abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon about"
+
+SEMILLA_1 = '000102030405060708090a0b0c0d0e0f'
+SEMILLA_2 = ('fffcf9f6f3f0edeae7e4e1dedbd8d5d2cfccc9c6c3c0bdbab7b4b1aeaba8a5a2'
+             '9f9c999693908d8a8784817e7b7875726f6c696663605d5a5754514e4b484542')
+
+# Pasos no endurecidos de los vectores de prueba de BIP-32:
+# (semilla, ruta del padre, índice, clave pública esperada)
+VECTORES_BIP32 = [
+    (SEMILLA_1, [0 + H], 1, '03501e454bf00751f24b1b489aa925215d66af2234e3891c3b21a52bedb3cd711c'),
+    (SEMILLA_1, [0 + H, 1, 2 + H], 2, '02e8445082a72f29b75ca48748a914df60622a609cacfce8ed0e35804560741d29'),
+    (SEMILLA_1, [0 + H, 1, 2 + H, 2], 1000000000,
+     '022a471424da5e657499d1ff51cb43c47481a03b1e77f951fe64cec9f5a48f7011'),
+    (SEMILLA_2, [], 0, '02fc9e5af0ac8d9b3cecfe2a888e2117ba3d089d8585886c9c826b6b22a98d12ea'),
+    (SEMILLA_2, [0, 2147483647 + H], 1, '03a7d1d856deb74c508e05031f9895dab54626251b3806e16b4bd12e781a7df5b9'),
+    (SEMILLA_2, [0, 2147483647 + H, 1, 2147483646 + H], 2,
+     '024d902e1a2fc7a8755ab5b694c575fce742c48d9ff192e63df5193e4c7afe1f9c'),
+]
+
+
+def publico(nodo):
+    """Copia solo pública de un nodo de bip32utils."""
+    return BIP32Key.fromExtendedKey(nodo.ExtendedKey(private=False))
+
+
+def nodo_de_cadena(cadena):
+    """Nodo m/84'/0'/0'/cadena de la semilla de prueba."""
+    return SeedContext(MNEMONICO, language="english").chain_node(84, 0, cadena)
+
+
+def referencia(nodo, inicio, cantidad):
+    """Hijos calculados uno a uno con ``ChildKey``."""
+    hijos = [nodo.ChildKey(indice) for indice in range(inicio, inicio + cantidad)]
+    return [(hijo.PublicKey(), None if nodo.public else hijo.PrivateKey()) for hijo in hijos]
+
+
+@pytest.mark.parametrize('semilla, ruta, indice, esperada', VECTORES_BIP32)
+def test_vectores_bip32(semilla, ruta, indice, esperada):
+    nodo = BIP32Key.fromEntropy(bytes.fromhex(semilla))
+    for paso in ruta:
+        nodo = nodo.ChildKey(paso)
+    hijo = nodo.ChildKey(indice)
+
+    for padre in (nodo, publico(nodo)):
+        [(_, clave_publica, clave_privada)] = ChainDeriver.from_bip32(padre).derive_range(indice, 1)
+        assert clave_publica.hex() == esperada
+        assert clave_privada == (None if padre.public else hijo.PrivateKey())
+
+
+@pytest.mark.parametrize('cadena', [CHAIN_RECEIVE, CHAIN_CHANGE])
+@pytest.mark.parametrize('inicio', [0, 1, 17, DEFAULT_BATCH - 1, 1000])
+def test_rangos_iguales_a_bip32utils(cadena, inicio):
+    nodo = nodo_de_cadena(cadena)
+    for padre in (nodo, publico(nodo)):
+        obtenidos = ChainDeriver.from_bip32(padre).derive_range(inicio, 5)
+        assert [indice for indice, _, _ in obtenidos] == list(range(inicio, inicio + 5))
+        assert [(pub, priv) for _, pub, priv in obtenidos] == referencia(padre, inicio, 5)
+
+
+def test_lotes_que_cruzan_el_tamano_de_lote():
+    nodo = publico(nodo_de_cadena(CHAIN_RECEIVE))
+    obtenidos = list(ChainDeriver.from_bip32(nodo).iter_range(DEFAULT_BATCH - 2, 4, batch=DEFAULT_BATCH))
+    assert [(pub, priv) for _, pub, priv in obtenidos] == referencia(nodo, DEFAULT_BATCH - 2, 4)
+
+
+def test_limite_de_los_indices_endurecidos():
+    nodo = nodo_de_cadena(CHAIN_CHANGE)
+    derivador = ChainDeriver.from_bip32(nodo)
+
+    # El último índice no endurecido se deriva igual que con ChildKey
+    obtenidos = derivador.derive_range(H - 3, 3)
+    assert [indice for indice, _, _ in obtenidos] == [H - 3, H - 2, H - 1]
+    assert [(pub, priv) for _, pub, priv in obtenidos] == referencia(nodo, H - 3, 3)
+    assert derivador.derive_range(H, 0) == []
+
+    # Un rango que alcanza los endurecidos o empieza en negativo se rechaza
+    for inicio, cantidad in ((H - 3, 4), (H, 1), (-1, 2), (0, -1)):
+        with pytest.raises(ValueError):
+            derivador.derive_range(inicio, cantidad)
+
+
+@pytest.mark.parametrize('cadena', [CHAIN_RECEIVE, CHAIN_CHANGE])
+def test_motor_igual_a_bip32utils(cadena):
+    contexto = SeedContext(MNEMONICO, language="english")
+    nodo = contexto.chain_node(84, 0, cadena)
+    for solo_lectura in (False, True):
+        motor = DerivationEngine(contexto, ADDR_TYPE_P2WPKH, purpose=84, watch_only=solo_lectura)
+        registros = list(motor.derive_range(cadena, 300, 3))
+        esperados = referencia(publico(nodo) if solo_lectura else nodo, 300, 3)
+        assert [(r.public_key, r.private_key) for r in registros] == esperados
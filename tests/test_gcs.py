@@ -0,0 +1,67 @@
+"""Pruebas de los filtros compactos de bloque (BIP-158)."""
+
+import hashlib
+import random
+
+import pytest
+
+from creador.gcs import ItemSet, build_filter, match_any
+
+# Vector de BIP-158: filtro básico del bloque génesis de testnet
+GENESIS_TESTNET = bytes.fromhex('000000000933ea01ad0ee984209779baaec3ced90fa3f408719526f8d77f4943')[::-1]
+GENESIS_SCRIPT = bytes.fromhex(
+    '4104678afdb0fe5548271967f1a67130b7105cd6a828e03909a67962e0ea1f61deb649f6bc3f4cef38'
+    'c4f35504e51ec112de5c384df7ba0b8d578a4c702b6bf11d5fac')
+GENESIS_FILTER = bytes.fromhex('019dfca8')
+
+
+def scripts(cantidad, semilla):
+    azar = random.Random(semilla)
+    return [b'\x00\x14' + azar.randbytes(20) for _ in range(cantidad)]
+
+
+def hash_bloque(n):
+    return hashlib.sha256(n.to_bytes(4, 'little')).digest()
+
+
+def test_vector_del_bloque_genesis():
+    assert build_filter([GENESIS_SCRIPT], GENESIS_TESTNET) == GENESIS_FILTER
+    assert match_any(GENESIS_FILTER, GENESIS_TESTNET, [GENESIS_SCRIPT])
+
+
+def test_todos_los_elementos_coinciden():
+    elementos = scripts(300, 1)
+    filtro = build_filter(elementos, hash_bloque(1))
+    for script in elementos:
+        assert match_any(filtro, hash_bloque(1), [script])
+
+
+def test_pocos_falsos_positivos():
+    bloques = [(hash_bloque(n), build_filter(scripts(200, n), hash_bloque(n))) for n in range(50)]
+    ajenos = scripts(20, 'cartera')
+    coincidencias = sum(match_any(filtro, bloque, [script]) for bloque, filtro in bloques for script in ajenos)
+    # Con M = 784931 la probabilidad es de 1/784931 por consulta
+    assert coincidencias <= 1
+
+
+def test_conjunto_preparado_igual_que_por_script():
+    cartera = scripts(40, 'cartera')
+    conjunto = ItemSet(cartera)
+    for n in range(30):
+        # La mitad de los bloques paga a un script de la cartera
+        elementos = scripts(100, n) + ([cartera[n]] if n % 2 else [])
+        filtro = build_filter(elementos, hash_bloque(n))
+        por_script = any(match_any(filtro, hash_bloque(n), [script]) for script in cartera)
+        assert match_any(filtro, hash_bloque(n), conjunto) == por_script == bool(n % 2)
+
+
+def test_filtro_vacio_y_truncado():
+    vacio = build_filter([], hash_bloque(0))
+    assert vacio == b'\x00'
+    assert not match_any(vacio, hash_bloque(0), scripts(5, 0))
+    assert not match_any(GENESIS_FILTER, GENESIS_TESTNET, [])
+
+    elementos = scripts(50, 2)
+    filtro = build_filter(elementos, hash_bloque(2))
+    with pytest.raises(ValueError):
+        match_any(filtro[:1], hash_bloque(2), elementos)  # Solo queda el número de elementos
@@ -0,0 +1,96 @@
+"""Pruebas del almacén de cabeceras: persistencia, reapertura y reorganizaciones."""
+
+import os
+
+import pytest
+
+from creador.blocks import double_sha256
+from creador.headers import GENESIS_HEADER, HEADER_SIZE, HeaderError, HeaderStore, bits_to_target, header_time
+
+REGTEST_BITS = 0x207fffff
+
+
+def minar_cabecera(anterior, tiempo, marca=b'\x00'):
+    """Cabecera con prueba de trabajo válida para la dificultad mínima de regtest."""
+    objetivo = bits_to_target(REGTEST_BITS)
+    base = (1).to_bytes(4, 'little') + anterior + marca * 32 + tiempo.to_bytes(4, 'little') \
+        + REGTEST_BITS.to_bytes(4, 'little')
+    nonce = 0
+    while int.from_bytes(double_sha256(base + nonce.to_bytes(4, 'little')), 'little') > objetivo:
+        nonce += 1
+    return base + nonce.to_bytes(4, 'little')
+
+
+def minar_cadena(anterior, cantidad, marca=b'\x00'):
+    """Cabeceras consecutivas tras ``anterior`` (cabecera de 80 bytes)."""
+    cabeceras = []
+    tiempo = header_time(anterior)
+    for _ in range(cantidad):
+        tiempo += 600
+        anterior = minar_cabecera(double_sha256(anterior), tiempo, marca)
+        cabeceras.append(anterior)
+    return cabeceras
+
+
+@pytest.fixture
+def ruta(tmp_path):
+    return str(tmp_path / 'cabeceras' / 'regtest.dat')
+
+
+def test_la_cadena_se_conserva_al_reabrir(ruta):
+    cadena = minar_cadena(GENESIS_HEADER['regtest'], 30)
+    with HeaderStore(ruta, 'regtest') as almacen:
+        assert almacen.connect(cadena[:20]).connected == 20
+        assert almacen.connect(cadena[10:]).connected == 10  # Las ya conocidas se saltan
+        punta, hash_diez = almacen.tip_hash, almacen.hash_at(10)
+
+    with HeaderStore(ruta, 'regtest') as almacen:
+        assert almacen.tip_height == 30
+        assert almacen.tip_hash == punta == double_sha256(cadena[-1])
+        assert almacen.hash_at(10) == hash_diez
+        assert almacen.is_main_chain(hash_diez)
+        assert almacen.connect(minar_cadena(cadena[-1], 2)).connected == 2
+    assert os.path.getsize(ruta) == 33 * HEADER_SIZE
+
+
+def test_registro_incompleto_se_descarta(ruta):
+    with HeaderStore(ruta, 'regtest') as almacen:
+        almacen.connect(minar_cadena(GENESIS_HEADER['regtest'], 5))
+    with open(ruta, 'ab') as f:
+        f.write(b'\x01' * 37)  # Escritura interrumpida
+
+    with HeaderStore(ruta, 'regtest') as almacen:
+        assert almacen.tip_height == 5
+    assert os.path.getsize(ruta) == 6 * HEADER_SIZE
+
+
+def test_archivo_de_otra_red(ruta):
+    HeaderStore(ruta, 'regtest').close()
+    with pytest.raises(ValueError, match="otra red"):
+        HeaderStore(ruta, 'testnet')
+
+
+def test_reorganizacion_persistente(ruta):
+    principal = minar_cadena(GENESIS_HEADER['regtest'], 10)
+    rama = minar_cadena(principal[5], 6, marca=b'\x01')
+    with HeaderStore(ruta, 'regtest') as almacen:
+        almacen.connect(principal)
+        assert almacen.is_main_chain(double_sha256(principal[-1]))
+        assert tuple(almacen.connect(rama[:4])) == (0, None, 0)  # Menos trabajo: se ignora
+        resultado = almacen.connect(rama)
+        assert (resultado.connected, resultado.fork_height, resultado.disconnected) == (6, 6, 4)
+        assert not almacen.is_main_chain(double_sha256(principal[-1]))
+
+    with HeaderStore(ruta, 'regtest') as almacen:
+        assert almacen.tip_height == 12
+        assert almacen.tip_hash == double_sha256(rama[-1])
+        assert almacen.hash_at(6) == double_sha256(principal[5])
+        assert almacen.height_of(double_sha256(principal[-1])) is None
+
+
+def test_cabeceras_que_no_enlazan(ruta):
+    with HeaderStore(ruta, 'regtest') as almacen:
+        cadena = minar_cadena(GENESIS_HEADER['regtest'], 3)
+        with pytest.raises(HeaderError):
+            almacen.connect(cadena[1:])
+        assert almacen.tip_height == 0
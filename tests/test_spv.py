@@ -0,0 +1,130 @@
+"""Pruebas del modo ligero (SPV) contra el nodo P2P local de pruebas."""
+
+import asyncio
+
+from creador.blocks import double_sha256, encode_varint
+from creador.headers import HeaderStore, bits_to_target
+from creador.index import AddressIndex, key_script_pubkey
+from creador.p2p import PeerAddress, PeerConnection
+from creador.p2p_mock import MockPeer
+from creador.spv import SpvEngine
+
+REGTEST_BITS = 0x207fffff
+CLAVE = b'\x02' + bytes(range(20))
+AJENO = b'\x00\x14' + b'\xee' * 20
+
+
+def serializar_tx(entradas, salidas):
+    cuerpo = [encode_varint(len(entradas))]
+    for outpoint in entradas:
+        cuerpo.append(outpoint + b'\x00' + b'\xff\xff\xff\xff')
+    cuerpo.append(encode_varint(len(salidas)))
+    for importe, script in salidas:
+        cuerpo.append(importe.to_bytes(8, 'little') + encode_varint(len(script)) + script)
+    tx = (2).to_bytes(4, 'little') + b''.join(cuerpo) + bytes(4)
+    return tx, double_sha256(tx)
+
+
+class Cadena:
+    """Bloques minados para regtest con una coinbase y las transacciones pedidas."""
+
+    def __init__(self):
+        self.bloques = []
+        self.bloque([])
+
+    def bloque(self, txs):
+        altura = len(self.bloques)
+        anterior = double_sha256(self.bloques[-1][:80]) if self.bloques else bytes(32)
+        coinbase, _ = serializar_tx([altura.to_bytes(36, 'little')], [(50_000, AJENO)])
+        base = (1).to_bytes(4, 'little') + anterior + bytes(32) \
+            + (1_600_000_000 + 600 * altura).to_bytes(4, 'little') + REGTEST_BITS.to_bytes(4, 'little')
+        objetivo = bits_to_target(REGTEST_BITS)
+        nonce = 0
+        while int.from_bytes(double_sha256(base + nonce.to_bytes(4, 'little')), 'little') > objetivo:
+            nonce += 1
+        bloque = base + nonce.to_bytes(4, 'little') + encode_varint(len(txs) + 1) + coinbase + b''.join(txs)
+        self.bloques.append(bloque)
+        return bloque
+
+
+def cartera(*claves):
+    indice = AddressIndex()
+    for i, clave in enumerate(claves):
+        indice.add(clave, 0, 0, i)
+    return indice
+
+
+def cadena_con_pagos(bloques=30):
+    cadena = Cadena()
+    pago, txid = serializar_tx([bytes(36)], [(70_000, key_script_pubkey(CLAVE))])
+    for altura in range(1, bloques + 1):
+        cadena.bloque([pago] if altura == 5 else [])
+    gasto, _ = serializar_tx([txid + bytes(4)], [(20_000, key_script_pubkey(CLAVE))])
+    return cadena, gasto
+
+
+async def sincronizar(nodo, indice, ruta_cabeceras, ruta_estado, inicio=0):
+    """Una sesión: abre el motor con el estado guardado, sincroniza y lo cierra."""
+    motor = SpvEngine(PeerConnection(PeerAddress('127.0.0.1', nodo.port), 'regtest'), indice, 'regtest',
+                      start_height=inicio, state_path=ruta_estado,
+                      headers=HeaderStore(ruta_cabeceras, 'regtest', genesis_header=nodo.blocks[0][:80]))
+    try:
+        return await motor.sync(), motor.balance(), motor.scanned_height
+    finally:
+        await motor.close()
+
+
+def test_el_estado_se_reanuda_entre_sesiones(tmp_path):
+    cadena, gasto = cadena_con_pagos()
+    nodo = MockPeer(cadena.bloques)
+    rutas = (str(tmp_path / 'cabeceras.dat'), str(tmp_path / 'spv.sqlite3'))
+
+    async def escenario():
+        await nodo.start()
+        try:
+            stats, saldo, altura = await sincronizar(nodo, cartera(CLAVE), *rutas)
+            assert (stats.filters, stats.relevant, saldo, altura) == (31, 1, 70_000, 30)
+
+            # Segunda sesión: nada nuevo que comprobar
+            stats, saldo, altura = await sincronizar(nodo, cartera(CLAVE), *rutas)
+            assert (stats.filters, stats.matched, saldo, altura) == (0, 0, 70_000, 30)
+
+            # Un bloque nuevo con el gasto: solo se comprueba su filtro
+            nodo.add_block(cadena.bloque([gasto]))
+            stats, saldo, altura = await sincronizar(nodo, cartera(CLAVE), *rutas)
+            assert (stats.filters, stats.relevant, saldo, altura) == (1, 1, 20_000, 31)
+        finally:
+            await nodo.close()
+
+    asyncio.run(escenario())
+
+
+def test_nacimiento_y_cambios_de_cartera_reinician(tmp_path):
+    cadena, _ = cadena_con_pagos()
+    nodo = MockPeer(cadena.bloques)
+    rutas = (str(tmp_path / 'cabeceras.dat'), str(tmp_path / 'spv.sqlite3'))
+    otra = b'\x02' + bytes(range(1, 21))
+
+    async def escenario():
+        await nodo.start()
+        try:
+            await sincronizar(nodo, cartera(CLAVE), *rutas)
+            # Otra altura de nacimiento: se comprueba desde ella
+            stats, saldo, _ = await sincronizar(nodo, cartera(CLAVE), *rutas, inicio=10)
+            assert (stats.filters, saldo) == (21, 0)
+            # Cartera ampliada: se vuelve a comprobar desde el nacimiento
+            stats, saldo, _ = await sincronizar(nodo, cartera(CLAVE, otra), *rutas)
+            assert (stats.filters, saldo) == (31, 70_000)
+        finally:
+            await nodo.close()
+
+    asyncio.run(escenario())
+
+
+def test_cartera_sin_claves_no_se_conecta(tmp_path):
+    # Nadie escucha en el puerto: si se intentara conectar, fallaría
+    nodo = MockPeer(Cadena().bloques)
+    nodo.port = 9
+    stats, saldo, altura = asyncio.run(sincronizar(nodo, AddressIndex(), str(tmp_path / 'cabeceras.dat'),
+                                                   str(tmp_path / 'spv.sqlite3')))
+    assert (stats.headers, stats.filters, saldo, altura) == (0, 0, 0, -1)
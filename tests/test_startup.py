@@ -0,0 +1,68 @@
+"""Pruebas del arranque: módulos diferidos, presupuesto de tiempo e informe."""
+
+import importlib.util
+import os
+import subprocess
+import sys
+
+import pytest
+
+from creador.startup import PROFILE_ENV, StartupProfile, profile_requested
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Módulos que solo se importan cuando se usa la función que los necesita
+DIFERIDOS = [
+    'mnemonic', 'bip32utils', 'webbrowser', 'dialogs',
+    'creador.parallel', 'creador.discovery', 'creador.cache', 'creador.electrum',
+    'creador.utxo', 'creador.p2p', 'creador.spv', 'creador.headers',
+]
+
+
+def ejecutar(*argumentos, **entorno):
+    return subprocess.run([sys.executable, *argumentos], cwd=RAIZ, capture_output=True, text=True,
+                          env=dict(os.environ, **entorno), timeout=120)
+
+
+def test_importar_el_programa_no_carga_los_modulos_pesados():
+    codigo = ("import sys, CreadorCarterasBitcoinHD\n"
+              f"print(','.join(m for m in {DIFERIDOS!r} if m in sys.modules))")
+    resultado = ejecutar('-c', codigo)
+    assert resultado.returncode == 0, resultado.stderr
+    assert resultado.stdout.strip() == ''
+
+
+def test_arranque_dentro_del_presupuesto():
+    script = os.path.join(RAIZ, 'benchmarks', 'startup_budget.py')
+    especificacion = importlib.util.spec_from_file_location('startup_budget', script)
+    presupuesto = importlib.util.module_from_spec(especificacion)
+    especificacion.loader.exec_module(presupuesto)
+    limite = (presupuesto.PRESUPUESTO_VENTANA_MS if presupuesto.hay_pantalla()
+              else presupuesto.PRESUPUESTO_IMPORTACION_MS)
+    resultado = ejecutar(script, str(limite), '3')
+    assert resultado.returncode == 0, resultado.stdout + resultado.stderr
+    assert "Dentro del presupuesto" in resultado.stdout
+
+
+def test_informe_con_la_variable_de_entorno():
+    codigo = "import CreadorCarterasBitcoinHD as app; print(app.PERFIL_ARRANQUE.report())"
+    resultado = ejecutar('-c', codigo, **{PROFILE_ENV: '1'})
+    assert resultado.returncode == 0, resultado.stderr
+    assert "módulos importados" in resultado.stdout
+    assert "creador.derivation" in resultado.stdout
+
+
+def test_perfil_de_arranque(monkeypatch):
+    reloj = iter([10.0, 10.05, 10.2])
+    perfil = StartupProfile(clock=lambda: next(reloj))
+    assert perfil.mark("módulos importados") == pytest.approx(0.05)
+    assert perfil.mark("primera ventana") == pytest.approx(0.2)
+    informe = perfil.report()
+    assert informe.startswith("Arranque: 200.0 ms hasta «primera ventana»")
+    assert "módulos importados" in informe
+
+    monkeypatch.delenv(PROFILE_ENV, raising=False)
+    assert profile_requested(['programa', '--perfil-arranque'])
+    assert not profile_requested(['programa'])
+    monkeypatch.setenv(PROFILE_ENV, '1')
+    assert profile_requested(['programa'])
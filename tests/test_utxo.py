@@ -0,0 +1,157 @@
+"""Pruebas del índice local de UTXO sobre archivos de bloques sintéticos."""
+
+import asyncio
+
+from creador.blocks import NETWORK_MAGIC, double_sha256, encode_varint
+from creador.derivation import CHAIN_CHANGE, CHAIN_RECEIVE, DerivationEngine
+from creador.discovery import DiscoveryEngine, ScriptStatus
+from creador.encoding import ADDR_TYPE_P2WPKH
+from creador.index import AddressIndex, key_script_pubkey, record_keys
+from creador.seed import SeedContext
+from creador.utxo import UtxoHistoryBackend, UtxoIndexer
+
+MAGIA = NETWORK_MAGIC['regtest']
+CLAVE_A = b'\x02' + bytes(range(20))
+CLAVE_B = b'\x02' + bytes(range(20, 40))
+AJENO = b'\x00\x14' + b'\xee' * 20
+MNEMONICO = "abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon about"
+
+
+def serializar_tx(entradas, salidas):
+    """Transacción sin testigos; devuelve (bytes, txid en orden interno)."""
+    cuerpo = [encode_varint(len(entradas))]
+    for outpoint in entradas:
+        cuerpo.append(outpoint + b'\x00' + b'\xff\xff\xff\xff')
+    cuerpo.append(encode_varint(len(salidas)))
+    for importe, script in salidas:
+        cuerpo.append(importe.to_bytes(8, 'little') + encode_varint(len(script)) + script)
+    tx = (2).to_bytes(4, 'little') + b''.join(cuerpo) + bytes(4)
+    return tx, double_sha256(tx)
+
+
+def outpoint(txid, vout):
+    return txid + vout.to_bytes(4, 'little')
+
+
+class Cadena:
+    """Genera registros ``blk*.dat`` de bloques enlazados (o de ramas laterales)."""
+
+    def __init__(self):
+        self.punta = bytes(32)
+        self.creados = 0
+
+    def bloque(self, txs, anterior=None):
+        """Registro del bloque y su hash; sin ``anterior`` se construye sobre la punta."""
+        self.creados += 1
+        cabecera = (1).to_bytes(4, 'little') + (anterior or self.punta) + self.creados.to_bytes(32, 'little') \
+            + bytes(4) + (0x207fffff).to_bytes(4, 'little') + bytes(4)
+        bloque = cabecera + encode_varint(len(txs)) + b''.join(txs)
+        digest = double_sha256(cabecera)
+        if anterior is None:
+            self.punta = digest
+        return MAGIA + len(bloque).to_bytes(4, 'little') + bloque, digest
+
+
+def cartera():
+    indice = AddressIndex()
+    indice.add(CLAVE_A, 0, 0, 0)
+    indice.add(CLAVE_B, 0, 0, 1)
+    return indice
+
+
+def indexador(directorio, estado=None, indice=None):
+    return UtxoIndexer(str(directorio), indice or cartera(), state_path=estado, network='regtest', workers=1)
+
+
+def test_salidas_y_gastos_de_la_cartera(tmp_path):
+    cadena = Cadena()
+    pago, txid_pago = serializar_tx([bytes(36)], [(50_000, key_script_pubkey(CLAVE_A)),
+                                                  (70_000, key_script_pubkey(CLAVE_B)),
+                                                  (90_000, AJENO)])
+    gasto, _ = serializar_tx([outpoint(txid_pago, 0)], [(49_000, AJENO)])
+    (tmp_path / 'blk00000.dat').write_bytes(cadena.bloque([pago])[0] + cadena.bloque([gasto])[0])
+
+    with indexador(tmp_path) as utxo:
+        stats = utxo.update()
+        assert (stats.blocks, stats.outputs, stats.spends) == (2, 2, 1)
+        restantes = utxo.utxos()
+        assert [(u.txid, u.vout, u.value, u.key) for u in restantes] == [
+            (txid_pago[::-1].hex(), 1, 70_000, CLAVE_B)]
+        assert utxo.balance() == 70_000
+        estados = utxo.statuses()
+        assert estados[CLAVE_A] == ScriptStatus(2, 0, 0)
+        assert estados[CLAVE_B] == ScriptStatus(1, 70_000, 0)
+
+
+def test_los_falsos_positivos_del_filtro_se_descartan(tmp_path):
+    salidas = [(1_000 + i, b'\x00\x14' + i.to_bytes(20, 'little')) for i in range(200)]
+    pago, _ = serializar_tx([bytes(36)], salidas + [(50_000, key_script_pubkey(CLAVE_A))])
+    (tmp_path / 'blk00000.dat').write_bytes(Cadena().bloque([pago])[0])
+
+    # Con esta tasa el filtro deja pasar buena parte de las salidas ajenas
+    with UtxoIndexer(str(tmp_path), cartera(), network='regtest', workers=1, fp_rate=0.5) as utxo:
+        assert utxo.update().outputs == 1
+        assert utxo.balance() == 50_000
+
+
+def test_reanudar_lee_solo_los_bloques_nuevos(tmp_path):
+    estado = str(tmp_path / 'estado' / 'utxo.sqlite3')
+    cadena = Cadena()
+    pago, txid_pago = serializar_tx([bytes(36)], [(50_000, key_script_pubkey(CLAVE_A))])
+    archivo = tmp_path / 'blk00000.dat'
+    primero, _ = cadena.bloque([pago])
+    archivo.write_bytes(primero)
+    with indexador(tmp_path, estado) as utxo:
+        assert utxo.update().bytes == len(primero)
+        assert utxo.balance() == 50_000
+
+    # El nodo añade un bloque que gasta la salida y deja otro a medio escribir
+    gasto, _ = serializar_tx([outpoint(txid_pago, 0)], [(10_000, key_script_pubkey(CLAVE_B))])
+    segundo, _ = cadena.bloque([gasto])
+    with open(archivo, 'ab') as f:
+        f.write(segundo + cadena.bloque([pago])[0][:50])
+
+    with indexador(tmp_path, estado) as utxo:
+        stats = utxo.update()
+        assert (stats.bytes, stats.blocks) == (len(segundo), 1)
+        assert utxo.balance() == 10_000
+        assert utxo.update().blocks == 0
+
+
+def test_bloques_de_una_rama_abandonada(tmp_path):
+    cadena = Cadena()
+    pago, txid_pago = serializar_tx([bytes(36)], [(50_000, key_script_pubkey(CLAVE_A))])
+    base, hash_base = cadena.bloque([pago])
+    # Rama lateral de un solo bloque: gasta la salida y paga a la cartera
+    gasto, _ = serializar_tx([outpoint(txid_pago, 0)], [(30_000, key_script_pubkey(CLAVE_B))])
+    lateral, hash_lateral = cadena.bloque([gasto], anterior=hash_base)
+    principal = [cadena.bloque([])[0] for _ in range(2)]
+    (tmp_path / 'blk00000.dat').write_bytes(base + lateral + b''.join(principal))
+
+    with indexador(tmp_path) as utxo:
+        assert utxo.update().blocks == 4
+        assert hash_lateral not in utxo.best_chain() and len(utxo.best_chain()) == 3
+        assert utxo.balance() == 50_000
+        assert CLAVE_B not in utxo.statuses()
+        # Otra fuente de la cadena principal (por ejemplo, un HeaderStore) decide en su lugar
+        assert utxo.balance(lambda bloque: True) == 30_000
+
+
+def test_el_backend_amplia_la_cartera_con_el_motor(tmp_path):
+    motor = DerivationEngine(SeedContext(MNEMONICO, language="english"), ADDR_TYPE_P2WPKH, purpose=84)
+    usadas = {(CHAIN_RECEIVE, 10): 1_000, (CHAIN_RECEIVE, 35): 2_000, (CHAIN_CHANGE, 3): 4_000}
+    salidas = []
+    for (cadena_hd, indice), importe in usadas.items():
+        clave = next(record_keys(motor.derive(cadena_hd, indice)))[0]
+        salidas.append((importe, key_script_pubkey(clave)))
+    pago, _ = serializar_tx([bytes(36)], salidas)
+    (tmp_path / 'blk00000.dat').write_bytes(Cadena().bloque([pago])[0])
+
+    backend = UtxoHistoryBackend(indexador(tmp_path, indice=AddressIndex()), engine=motor, gap_limit=20)
+    descubrimiento = DiscoveryEngine(motor, backend, gap_limit=20)
+    resultados = asyncio.run(descubrimiento.discover())
+    encontrados = {(r.chain, r.index): r.status.confirmed for cadena_hd in resultados
+                   for r in resultados[cadena_hd] if r.status.used}
+    assert encontrados == usadas
+    assert descubrimiento.last_used == {CHAIN_RECEIVE: 35, CHAIN_CHANGE: 3}
+    asyncio.run(backend.close())
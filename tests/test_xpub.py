@@ -0,0 +1,43 @@
+"""Pruebas de la exportación e importación de claves extendidas públicas (SLIP-132)."""
+
+import pytest
+
+from creador.derivation import CHAIN_RECEIVE, DerivationEngine
+from creador.encoding import ADDR_TYPE_MULTI, ADDR_TYPE_P2PKH, ADDR_TYPE_P2SH_P2WPKH, ADDR_TYPE_P2WPKH
+from creador.seed import SeedContext
+from creador.xpub import WatchOnlyContext, export_account_xpub
+
+MNEMONICO = "abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon about"
+
+# Claves de cuenta de los vectores de BIP-49 y BIP-84
+YPUB = 'ypub6Ww3ibxVfGzLrAH1PNcjyAWenMTbbAosGNB6VvmSEgytSER9azLDWCxoJwW7Ke7icmizBMXrzBx9979FfaHxHcrArf3zbeJJJUZPf663zsP'
+ZPUB = 'zpub6rFR7y4Q2AijBEqTUquhVz398htDFrtymD9xYYfG1m4wAcvPhXNfE3EfH1r1ADqtfSdVCToUG868RvUUkgDKf31mGDtKsAYz2oz2AGutZYs'
+
+
+@pytest.fixture(scope='module')
+def contexto():
+    return SeedContext(MNEMONICO, language="english")
+
+
+def test_prefijo_segun_el_proposito(contexto):
+    assert export_account_xpub(contexto, ADDR_TYPE_P2WPKH, 84) == ZPUB
+    assert export_account_xpub(contexto, ADDR_TYPE_P2SH_P2WPKH, 49) == YPUB
+    assert export_account_xpub(contexto, None, 84) == ZPUB
+    assert export_account_xpub(contexto, None, 44).startswith('xpub')
+
+
+@pytest.mark.parametrize('tipo, proposito', [
+    (ADDR_TYPE_P2WPKH, 44), (ADDR_TYPE_P2SH_P2WPKH, 44), (ADDR_TYPE_P2PKH, 84),
+    (ADDR_TYPE_P2WPKH, 49), (ADDR_TYPE_MULTI, 84), (None, 86),
+])
+def test_combinaciones_que_violan_slip132(contexto, tipo, proposito):
+    with pytest.raises(ValueError):
+        export_account_xpub(contexto, tipo, proposito)
+
+
+def test_la_clave_exportada_deriva_las_mismas_direcciones(contexto):
+    solo_lectura = WatchOnlyContext(export_account_xpub(contexto, None, 84))
+    assert (solo_lectura.addr_type, solo_lectura.default_purpose) == (ADDR_TYPE_P2WPKH, 84)
+    registro = DerivationEngine(solo_lectura, solo_lectura.addr_type).derive(CHAIN_RECEIVE, 0)
+    assert registro.address == 'bc1qcr8te4kr609gcawutmrza0j4xv80jy8z306fyu'
+    assert registro.private_key is None
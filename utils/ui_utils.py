@@ -6,12 +6,8 @@ import os
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, font as tkfont
 from tkinter.scrolledtext import ScrolledText
-from PIL import Image, ImageTk
-import qrcode
-from io import BytesIO
-import base64
-import webbrowser
 import json
+from collections import OrderedDict
 from typing import Any, Dict, List, Optional, Tuple, Union, Callable
 
 # Importar constantes de la interfaz de usuario
@@ -19,8 +15,7 @@ from .ui_constants import THEMES, LANGUAGES, FONT_SIZES, BUTTON_STYLES, \
     ENTRY_STYLES, LABEL_STYLES, FRAME_STYLES, NOTEBOOK_STYLES, \
     TREEVIEW_STYLES, SCROLLBAR_STYLES, MENU_STYLES, MESSAGE_STYLES
 
-# Importar configuraciones
-from config import Config
+# qrcode y PIL solo los usa QRCodeDialog: se importan al abrir el diálogo
 
 class ToolTip:
     """
@@ -275,6 +270,9 @@ class QRCodeDialog(tk.Toplevel):
         self.resizable(False, False)
         self.protocol('WM_DELETE_WINDOW', self.destroy)
         
+        import qrcode
+        from PIL import ImageTk
+
         # Generar el código QR
         qr = qrcode.QRCode(
             version=1,
@@ -329,3 +327,244 @@ class QRCodeDialog(tk.Toplevel):
             'El texto ha sido copiado al portapapeles.',
             parent=self
         )
+
+class VirtualTreeview(ttk.Frame):
+    """
+    Tabla virtualizada basada en ttk.Treeview.
+    
+    Solo se materializan las filas visibles en la ventana; al desplazarse, los
+    valores se piden a ``row_fetcher(indice)`` (motor de derivación o almacén)
+    y se guardan en una pequeña caché LRU. El número de elementos del Treeview
+    no depende del número total de filas, por lo que la memoria se mantiene
+    plana aunque la tabla represente millones de direcciones.
+    
+    Si se indica ``range_loader(primera, fin)``, se llama una vez por repintado
+    con el tramo visible de filas que no están en caché, antes de pedirlas,
+    para que sus datos se puedan cargar de una sola vez.
+    """
+    def __init__(self, parent, columns: Tuple[str, ...],
+                 row_fetcher: Optional[Callable[[int], Tuple]] = None,
+                 cache_size: int = 1024, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.tree = ttk.Treeview(self, columns=columns, show='headings',
+                                 selectmode='browse')
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL,
+                                       command=self._on_scrollbar)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        self._columns = columns
+        self._fetch = row_fetcher
+        self._load_range: Optional[Callable[[int, int], None]] = None
+        self._row_count = 0
+        self._first = 0
+        self._visible = 1
+        self._selected: Optional[int] = None
+        self._cache: 'OrderedDict[int, Tuple]' = OrderedDict()
+        self._cache_size = cache_size
+        self._render_pending = None
+        
+        # Altura de fila para calcular cuántas filas caben en la vista
+        self._row_height = self._lookup_row_height()
+        
+        self.tree.bind('<Configure>', self._on_configure)
+        self.tree.bind('<MouseWheel>', self._on_mousewheel)
+        self.tree.bind('<Button-4>', lambda e: self.scroll(-3))
+        self.tree.bind('<Button-5>', lambda e: self.scroll(3))
+        self.tree.bind('<<TreeviewSelect>>', self._on_select)
+        self.tree.bind('<Up>', lambda e: self._move_selection(-1))
+        self.tree.bind('<Down>', lambda e: self._move_selection(1))
+        self.tree.bind('<Prior>', lambda e: self._move_selection(-self._visible))
+        self.tree.bind('<Next>', lambda e: self._move_selection(self._visible))
+        self.tree.bind('<Home>', lambda e: self._move_selection(-self._row_count))
+        self.tree.bind('<End>', lambda e: self._move_selection(self._row_count))
+    
+    def _lookup_row_height(self) -> int:
+        """Obtiene la altura de fila configurada en el estilo del Treeview."""
+        try:
+            height = int(ttk.Style().lookup('Treeview', 'rowheight') or 0)
+        except (tk.TclError, ValueError):
+            height = 0
+        if height <= 0:
+            height = tkfont.nametofont('TkDefaultFont').metrics('linespace') + 4
+        return height
+    
+    def __getattr__(self, name: str) -> Any:
+        """Redirige los atributos no encontrados al Treeview (heading, column...)."""
+        if name == 'tree':
+            raise AttributeError(name)
+        return getattr(self.tree, name)
+    
+    @property
+    def row_count(self) -> int:
+        """Número total de filas representadas."""
+        return self._row_count
+    
+    def set_rows(self, row_count: int,
+                 row_fetcher: Optional[Callable[[int], Tuple]] = None,
+                 range_loader: Optional[Callable[[int, int], None]] = None) -> None:
+        """Sustituye el contenido de la tabla.
+        
+        Args:
+            row_count: Número total de filas
+            row_fetcher: Función que devuelve los valores de la fila ``indice``
+            range_loader: Función que prepara de una vez las filas [primera, fin)
+        """
+        if row_fetcher is not None:
+            self._fetch = row_fetcher
+        if range_loader is not None:
+            self._load_range = range_loader
+        self._row_count = max(0, row_count)
+        self._first = 0
+        self._selected = None
+        self._cache.clear()
+        self._schedule_render()
+    
+    def set_row_count(self, row_count: int) -> None:
+        """Actualiza el número de filas conservando la posición y la caché."""
+        self._row_count = max(0, row_count)
+        self._first = min(self._first, max(0, self._row_count - self._visible))
+        self._schedule_render()
+    
+    def refresh(self) -> None:
+        """Descarta la caché y vuelve a pedir las filas visibles."""
+        self._cache.clear()
+        self._schedule_render()
+    
+    def clear(self) -> None:
+        """Vacía la tabla."""
+        self.set_rows(0)
+    
+    def selected_index(self) -> Optional[int]:
+        """Devuelve el índice absoluto de la fila seleccionada."""
+        return self._selected
+    
+    def identify_index(self, y: int) -> Optional[int]:
+        """Devuelve el índice absoluto de la fila en la coordenada ``y``."""
+        item = self.tree.identify_row(y)
+        if not item:
+            return None
+        index = self._first + int(item)
+        return index if index < self._row_count else None
+    
+    def select_index(self, index: int) -> None:
+        """Selecciona la fila ``index`` y la hace visible."""
+        if not 0 <= index < self._row_count:
+            return
+        self._selected = index
+        self.see(index)
+        self._schedule_render()
+    
+    def see(self, index: int) -> None:
+        """Desplaza la vista para que la fila ``index`` sea visible."""
+        if index < self._first:
+            self._scroll_to(index)
+        elif index >= self._first + self._visible:
+            self._scroll_to(index - self._visible + 1)
+    
+    def scroll(self, rows: int) -> None:
+        """Desplaza la vista ``rows`` filas (negativo hacia arriba)."""
+        self._scroll_to(self._first + rows)
+    
+    def _scroll_to(self, first: int) -> None:
+        first = max(0, min(first, self._row_count - self._visible))
+        if first != self._first:
+            self._first = first
+            self._schedule_render()
+    
+    def _row(self, index: int) -> Tuple:
+        """Devuelve los valores de una fila usando la caché LRU."""
+        values = self._cache.get(index)
+        if values is not None:
+            self._cache.move_to_end(index)
+            return values
+        values = tuple(self._fetch(index)) if self._fetch else ()
+        self._cache[index] = values
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return values
+    
+    def _schedule_render(self) -> None:
+        """Agrupa varias peticiones de repintado en una sola."""
+        if self._render_pending is None:
+            self._render_pending = self.after_idle(self._render)
+    
+    def _render(self) -> None:
+        """Vuelca en el Treeview las filas de la ventana visible."""
+        self._render_pending = None
+        items = self.tree.get_children()
+        
+        # Ajustar el número de elementos del Treeview a las filas visibles
+        for slot in range(len(items), self._visible):
+            self.tree.insert('', tk.END, iid=str(slot), values=())
+        for slot in range(self._visible, len(items)):
+            self.tree.delete(str(slot))
+        
+        if self._load_range is not None:
+            missing = [index for index in range(self._first, min(self._first + self._visible, self._row_count))
+                       if index not in self._cache]
+            if missing:
+                self._load_range(missing[0], missing[-1] + 1)
+        
+        selected_slot = None
+        for slot in range(self._visible):
+            index = self._first + slot
+            if index < self._row_count:
+                self.tree.item(str(slot), values=self._row(index))
+                if index == self._selected:
+                    selected_slot = str(slot)
+            else:
+                self.tree.item(str(slot), values=())
+        
+        if selected_slot is not None:
+            self.tree.selection_set(selected_slot)
+        elif self.tree.selection():
+            self.tree.selection_remove(self.tree.selection())
+        
+        if self._row_count > 0:
+            first = self._first / self._row_count
+            last = min(1.0, (self._first + self._visible) / self._row_count)
+            self.scrollbar.set(first, last)
+        else:
+            self.scrollbar.set(0.0, 1.0)
+    
+    def _on_configure(self, event: tk.Event) -> None:
+        """Recalcula cuántas filas caben al cambiar el tamaño de la tabla."""
+        visible = max(1, event.height // self._row_height - 1)
+        if visible != self._visible:
+            self._visible = visible
+            self._first = min(self._first, max(0, self._row_count - self._visible))
+            self._schedule_render()
+    
+    def _on_scrollbar(self, *args) -> None:
+        """Traduce los comandos de la barra de desplazamiento a índices de fila."""
+        if not args:
+            return
+        if args[0] == 'moveto':
+            self._scroll_to(int(float(args[1]) * self._row_count))
+        elif args[0] == 'scroll':
+            amount = int(args[1])
+            if args[2] == 'pages':
+                amount *= self._visible
+            self.scroll(amount)
+    
+    def _on_mousewheel(self, event: tk.Event) -> str:
+        """Maneja el desplazamiento con la rueda del ratón."""
+        self.scroll(int(-1 * (event.delta / 120)) * 3)
+        return 'break'
+    
+    def _on_select(self, event: tk.Event = None) -> None:
+        """Guarda la selección como índice absoluto."""
+        selection = self.tree.selection()
+        if selection:
+            index = self._first + int(selection[0])
+            if index < self._row_count:
+                self._selected = index
+    
+    def _move_selection(self, delta: int) -> str:
+        """Mueve la selección con el teclado desplazando la vista si es necesario."""
+        if self._row_count == 0:
+            return 'break'
+        current = self._selected if self._selected is not None else self._first
+        self.select_index(max(0, min(self._row_count - 1, current + delta)))
+        return 'break'